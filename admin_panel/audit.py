@@ -0,0 +1,177 @@
+# admin_panel/audit.py
+"""
+Журнал аудита (DatabaseLog).
+
+audit.record(...) ставит событие в ограниченную очередь после фиксации
+транзакции действия (откаченное действие в журнал не попадает), фоновый
+поток пишет события пачками и при временной ошибке базы повторяет запись.
+Если очередь переполнена, событие записывается сразу. AUDIT_ASYNC = False -
+событие пишется сразу в транзакции действия. Время события фиксируется в
+момент record().
+
+Таблица DatabaseLog хранит только свежие события (AUDIT_HOT_DAYS дней).
+Более старые переносятся командой archive_audit_logs в помесячные архивы
+AUDIT_ARCHIVE_DIR/audit-ГГГГ-ММ.jsonl.gz (одна строка JSON на событие),
+читать их можно командой query_audit_logs.
+"""
+import atexit
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from admin_panel.models import DatabaseLog
+from journal_project.batch_writer import BatchWriter
+
+# Поля события в архиве
+ARCHIVE_FIELDS = (
+    'id', 'created_at', 'user_id', 'user_type', 'user_name', 'action',
+    'model_name', 'object_id', 'details', 'ip_address',
+)
+
+
+def _setting(name, default):
+    return getattr(settings, f'AUDIT_{name}', default)
+
+
+class AuditWriter(BatchWriter):
+    thread_name = 'audit-writer'
+
+    def write_batch(self, batch):
+        return self.bulk_insert(DatabaseLog, batch)
+
+
+writer = AuditWriter(
+    batch_size=_setting('BATCH_SIZE', 100),
+    flush_interval=_setting('FLUSH_INTERVAL', 1.0),
+    max_queue=_setting('MAX_QUEUE', 5000),
+)
+
+atexit.register(writer.flush)
+
+
+# ==================== ЗАПИСЬ ====================
+
+def record(action, model_name, object_id=None, details=None, user=None, request=None, ip_address=None):
+    """
+    Событие аудита. user - Student, выполнивший действие (None - система),
+    IP берётся из request, если не передан явно.
+    """
+    if ip_address is None and request is not None:
+        ip_address = request.META.get('REMOTE_ADDR')
+
+    log = DatabaseLog(
+        user_id=user.id if user else None,
+        user_type=user.user_type if user else None,
+        user_name=user.full_name if user else 'Система',
+        action=action,
+        model_name=model_name,
+        object_id=object_id,
+        details=details or {},
+        ip_address=ip_address,
+        created_at=timezone.now(),
+    )
+
+    if not _setting('ASYNC', True):
+        log.save()
+        return log
+
+    def enqueue():
+        if not writer.put(log):
+            log.save()
+
+    transaction.on_commit(enqueue)
+    return log
+
+
+# ==================== АРХИВ ====================
+
+def archive_dir():
+    return str(_setting('ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'audit_archive')))
+
+
+def archive_path(month):
+    """Файл архива за месяц 'ГГГГ-ММ'"""
+    return os.path.join(archive_dir(), f'audit-{month}.jsonl.gz')
+
+
+def archive_months():
+    """Месяцы, за которые есть архивы (по возрастанию)"""
+    if not os.path.isdir(archive_dir()):
+        return []
+    return sorted(
+        name[len('audit-'):-len('.jsonl.gz')]
+        for name in os.listdir(archive_dir())
+        if name.startswith('audit-') and name.endswith('.jsonl.gz')
+    )
+
+
+def archive_old_logs(days=None, chunk_size=1000, dry_run=False):
+    """
+    Переносит события старше days дней из таблицы в архивы по месяцам.
+    Строки удаляются только после того, как записаны на диск.
+    Возвращает {месяц: число событий}.
+    """
+    if days is None:
+        days = _setting('HOT_DAYS', 90)
+    cutoff = timezone.now() - timedelta(days=days)
+    old_logs = DatabaseLog.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id')
+
+    moved = {}
+    if dry_run:
+        for created_at in old_logs.values_list('created_at', flat=True).iterator():
+            month = created_at.strftime('%Y-%m')
+            moved[month] = moved.get(month, 0) + 1
+        return moved
+
+    os.makedirs(archive_dir(), exist_ok=True)
+    while True:
+        rows = list(old_logs.values(*ARCHIVE_FIELDS)[:chunk_size])
+        if not rows:
+            break
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row['created_at'].strftime('%Y-%m'), []).append(row)
+
+        # Дописываем новый gzip-фрагмент в конец файла месяца
+        for month, month_rows in by_month.items():
+            with open(archive_path(month), 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='ab') as gz:
+                    for row in month_rows:
+                        line = json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+                        gz.write(line.encode('utf-8') + b'\n')
+                raw.flush()
+                os.fsync(raw.fileno())
+            moved[month] = moved.get(month, 0) + len(month_rows)
+
+        DatabaseLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+    return moved
+
+
+def iter_archived(month_from=None, month_to=None):
+    """События из архивов за месяцы [month_from, month_to] в порядке времени"""
+    for month in archive_months():
+        if month_from and month < month_from:
+            continue
+        if month_to and month > month_to:
+            continue
+        seen = set()
+        with gzip.open(archive_path(month), 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                # Повторный перенос после сбоя мог записать событие дважды
+                if event['id'] in seen:
+                    continue
+                seen.add(event['id'])
+                event['created_at'] = parse_datetime(event['created_at'])
+                yield event
@@ -0,0 +1,126 @@
+# admin_panel/exports.py
+"""
+Выгрузки для деканата: оценки, пропуски, успеваемость и журнал действий.
+
+Каждая выгрузка ограничивается группой, курсом или уровнем образования
+(и, по желанию, периодом) и читается из базы через .iterator(), поэтому
+объём выгрузки не влияет на память процесса.
+"""
+import json
+from datetime import datetime, timedelta
+
+from django.db import models
+from django.utils import timezone
+
+from admin_panel.models import Student, Group, DatabaseLog
+from students.models import StudentGrade, Attendance, StudentPerformance
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Параметр запроса -> путь от группы
+SCOPES = {
+    'group': 'id',
+    'course': 'course_id',
+    'level': 'course__form__level_id',
+}
+
+
+def scope_groups(scope, scope_id):
+    """Группы, попадающие в выгрузку"""
+    return Group.objects.filter(**{SCOPES[scope]: scope_id})
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _grades(groups, date_from, date_to):
+    grades = StudentGrade.objects.filter(group__in=groups)
+    if date_from:
+        grades = grades.filter(date__gte=date_from)
+    if date_to:
+        grades = grades.filter(date__lte=date_to)
+    grade_types = dict(StudentGrade.GRADE_TYPES)
+    rows = grades.order_by('group__name', 'student__full_name', 'date', 'id').values_list(
+        'group__name', 'student__full_name', 'subject__name', 'date',
+        'grade_type', 'raw_value', 'points', 'marked_by__full_name', 'comment',
+    )
+    for group, student, subject, date, grade_type, raw_value, points, marked_by, comment in \
+            rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield (group, student, subject, date.isoformat(), grade_types.get(grade_type, grade_type),
+               raw_value, points, marked_by, comment)
+
+
+def _attendance(groups, date_from, date_to):
+    attendances = Attendance.objects.filter(group__in=groups)
+    if date_from:
+        attendances = attendances.filter(date__gte=date_from)
+    if date_to:
+        attendances = attendances.filter(date__lte=date_to)
+    rows = attendances.order_by('group__name', 'student__full_name', 'date', 'id').values_list(
+        'group__name', 'student__full_name', 'date', 'hours', 'reason', 'marked_by__full_name',
+    )
+    for group, student, date, hours, reason, marked_by in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield group, student, date.isoformat(), hours, reason, marked_by
+
+
+def _performance(groups, date_from, date_to):
+    # Успеваемость - текущий итог, период к ней не применяется
+    rows = StudentPerformance.objects.filter(student__group__in=groups).order_by(
+        'student__group__name', 'student__full_name', 'subject__name'
+    ).values_list(
+        'student__group__name', 'student__full_name', 'subject__name', 'total_points', 'target_points',
+    )
+    for group, student, subject, total, target in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        progress = round(min(100, total / target * 100), 1) if target else 0
+        yield group, student, subject, round(total, 2), target, progress, max(0, round(target - total, 2))
+
+
+def _logs(groups, date_from, date_to):
+    # События по студентам и группам, попадающим в выгрузку
+    logs = DatabaseLog.objects.filter(
+        models.Q(model_name='Student', object_id__in=Student.objects.filter(group__in=groups).values('id')) |
+        models.Q(model_name='Group', object_id__in=groups.values('id'))
+    )
+    # Границы периода - моментами времени, чтобы работал индекс по created_at
+    if date_from:
+        logs = logs.filter(created_at__gte=_day_start(date_from))
+    if date_to:
+        logs = logs.filter(created_at__lt=_day_start(date_to + timedelta(days=1)))
+    actions = dict(DatabaseLog.ACTION_TYPES)
+    rows = logs.order_by('created_at', 'id').values_list(
+        'created_at', 'user_name', 'action', 'model_name', 'object_id', 'details', 'ip_address',
+    )
+    for created_at, user_name, action, model_name, object_id, details, ip in \
+            rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield (created_at.strftime('%d.%m.%Y %H:%M:%S'), user_name or 'Система',
+               actions.get(action, action), model_name, object_id, json.dumps(details, ensure_ascii=False), ip)
+
+
+# Тип выгрузки -> (название, заголовок таблицы, модель для журнала, строки)
+EXPORTS = {
+    'grades': (
+        'Оценки',
+        ['Группа', 'Студент', 'Предмет', 'Дата', 'Тип оценки', 'Оценка', 'Баллы', 'Поставил', 'Комментарий'],
+        'StudentGrade',
+        _grades,
+    ),
+    'attendance': (
+        'Пропуски',
+        ['Группа', 'Студент', 'Дата', 'Часов', 'Причина', 'Отметил'],
+        'Attendance',
+        _attendance,
+    ),
+    'performance': (
+        'Успеваемость',
+        ['Группа', 'Студент', 'Предмет', 'Баллы', 'Цель', 'Прогресс, %', 'Осталось'],
+        'StudentPerformance',
+        _performance,
+    ),
+    'logs': (
+        'Журнал действий',
+        ['Время', 'Пользователь', 'Действие', 'Модель', 'ID объекта', 'Детали', 'IP'],
+        'DatabaseLog',
+        _logs,
+    ),
+}
@@ -0,0 +1,31 @@
+# admin_panel/management/commands/archive_audit_logs.py
+from django.core.management.base import BaseCommand
+from admin_panel import audit
+
+class Command(BaseCommand):
+    help = 'Перенос старых событий аудита из DatabaseLog в помесячные архивы (JSONL + gzip)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Оставить в таблице события за последние N дней '
+                                                     '(по умолчанию AUDIT_HOT_DAYS)')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет перенесено')
+    
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run')
+        # Сначала дописываем в таблицу то, что ещё в очереди
+        audit.writer.flush()
+        
+        moved = audit.archive_old_logs(days=options.get('days'), dry_run=dry_run)
+        
+        if not moved:
+            self.stdout.write('Нет событий для переноса')
+            return
+        
+        for month, count in sorted(moved.items()):
+            self.stdout.write(f'{month}: {count} → {audit.archive_path(month)}')
+        
+        total = sum(moved.values())
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Будет перенесено событий: {total} (dry-run)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Перенесено событий: {total}'))
@@ -0,0 +1,207 @@
+# admin_panel/management/commands/bench_server.py
+import http.client
+import io
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from importlib import import_module
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import reverse
+
+from admin_panel.management.commands.bench_sqlite_contention import percentile
+from admin_panel.management.commands.bench_views import DEFAULT_DATASET
+from admin_panel.management.commands.serve import default_workers
+from journal_project.benchmark import BenchContext
+
+# Сервер -> аргументы manage.py
+SERVERS = {
+    # Как сейчас в amvera.yaml (без автоперезагрузки - она не влияет на обработку запросов)
+    'runserver': lambda port, options: ['runserver', f'127.0.0.1:{port}', '--noreload'],
+    'asgi': lambda port, options: ['serve', '--host', '127.0.0.1', '--port', str(port),
+                                   '--workers', str(options['workers'])],
+}
+
+READY_TIMEOUT = 30  # секунд на запуск сервера
+
+
+def read_endpoints(ctx):
+    """JSON API чтения (async view) с параметрами для данных seed_bench"""
+    return {
+        'elders:api_get_schedule': reverse('api_get_schedule') + '?' + urlencode(
+            {'week_type': 'even', 'group_id': ctx.group.id}),
+        'elders:api_get_subjects': reverse('api_get_subjects'),
+        'elders:api_get_comments': reverse('api_get_comments') + '?week_type=even',
+        'students:api_grades': reverse('api_grades'),
+        'students:api_schedule': reverse('api_schedule') + '?week_type=even',
+    }
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест JSON API чтения: запросов/с, p50/p95 и ошибки у runserver (текущий запуск) '
+            'и у manage.py serve (ASGI, uvicorn). Серверы работают на копии базы с данными seed_bench, '
+            'рабочая база не изменяется')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', default=','.join(SERVERS), help='Серверы через запятую')
+        parser.add_argument('--workers', type=int, default=default_workers(), help='Процессов ASGI-сервера')
+        parser.add_argument('--concurrency', type=int, default=32, help='Одновременных клиентов')
+        parser.add_argument('--duration', type=float, default=10.0, help='Секунд на замер')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Секунд прогрева перед замером')
+        parser.add_argument('--port', type=int, default=8900, help='Порт серверов')
+        parser.add_argument('--dir', help='Каталог для копии базы (по умолчанию системный temp)')
+
+    def handle(self, *args, **options):
+        servers = [s.strip() for s in options['servers'].split(',') if s.strip()]
+        unknown = set(servers) - set(SERVERS)
+        if unknown:
+            raise CommandError(f'Неизвестные серверы: {", ".join(sorted(unknown))}')
+
+        workdir = tempfile.mkdtemp(prefix='bench-server-', dir=options['dir'])
+        try:
+            self.stdout.write('Копия базы и заполнение (seed_bench)...')
+            path, cookie, endpoints = self.prepare_database(workdir)
+            self.stdout.write(f'URL: {", ".join(endpoints)}')
+            self.stdout.write(
+                f'{"сервер":<10} {"процессов":>9} {"запросов/с":>11} {"p50 мс":>8} {"p95 мс":>8} {"ошибок":>7}'
+            )
+            results = {}
+            for server in servers:
+                result = self.measure(server, path, cookie, list(endpoints.values()), workdir, options)
+                results[server] = result
+                workers = options['workers'] if server == 'asgi' else 1
+                self.stdout.write(
+                    f'{server:<10} {workers:>9} {result["rps"]:>11.0f} {result["p50_ms"]:>8.1f} '
+                    f'{result["p95_ms"]:>8.1f} {result["errors"]:>7}'
+                )
+            if results.get('runserver', {}).get('rps') and 'asgi' in results:
+                self.stdout.write(f'asgi / runserver: x{results["asgi"]["rps"] / results["runserver"]["rps"]:.2f}')
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def prepare_database(self, workdir):
+        """Копия текущей базы + seed_bench + сессия старосты и студента; (путь, cookie, URL)"""
+        connection = connections[DEFAULT_DB_ALIAS]
+        source = str(connection.settings_dict['NAME'])
+        path = os.path.join(workdir, 'bench.sqlite3')
+        if os.path.exists(source):
+            # backup API: согласованная копия и при работающем сервере (WAL)
+            with sqlite3.connect(f'file:{source}?mode=ro', uri=True) as src, sqlite3.connect(path) as dst:
+                src.backup(dst)
+
+        # Подготовка идёт через соединение Django, переключённое на копию (как в тестовой базе)
+        connection.close()
+        connection.settings_dict['NAME'] = path
+        try:
+            call_command('migrate', interactive=False, verbosity=0)
+            call_command('seed_bench', *[f'--{key}={value}' for key, value in DEFAULT_DATASET.items()],
+                         stdout=io.StringIO())
+            ctx = BenchContext()
+            session = import_module(settings.SESSION_ENGINE).SessionStore()
+            session.update({**ctx.session('elder'), **ctx.session('student')})
+            session.save()
+            cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+            return path, cookie, read_endpoints(ctx)
+        finally:
+            connection.close()
+            connection.settings_dict['NAME'] = source
+
+    def measure(self, server, path, cookie, paths, workdir, options):
+        port = options['port']
+        log_path = os.path.join(workdir, f'{server}.log')
+        env = {**os.environ, 'SQLITE_PATH': path, 'LOG_LEVEL': 'WARNING'}
+        command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *SERVERS[server](port, options)]
+        with open(log_path, 'wb') as log:
+            process = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            self.wait_ready(process, port, paths[0], log_path)
+            self.run_clients(port, paths, cookie, options['concurrency'], options['warmup'])
+            return self.run_clients(port, paths, cookie, options['concurrency'], options['duration'])
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def wait_ready(self, process, port, path, log_path):
+        deadline = time.monotonic() + READY_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                with open(log_path, encoding='utf-8', errors='replace') as log:
+                    raise CommandError(f'Сервер завершился при запуске:\n{log.read()[-2000:]}')
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+                conn.request('GET', path)
+                conn.getresponse().read()
+                conn.close()
+                return
+            except (OSError, http.client.HTTPException):
+                time.sleep(0.2)
+        raise CommandError(f'Сервер не ответил за {READY_TIMEOUT} с')
+
+    def run_clients(self, port, paths, cookie, concurrency, duration):
+        """concurrency потоков по кругу запрашивают paths (keep-alive, если сервер его держит)"""
+        stop = threading.Event()
+        start = threading.Barrier(concurrency + 1)
+        lock = threading.Lock()
+        latencies, counters = [], {'errors': 0}
+
+        def client(index):
+            conn, local, errors, n = None, [], 0, index
+            start.wait()
+            while not stop.is_set():
+                path = paths[n % len(paths)]
+                n += 1
+                started = time.perf_counter()
+                try:
+                    if conn is None:
+                        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    conn.request('GET', path, headers={'Cookie': cookie})
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status == 200:
+                        local.append((time.perf_counter() - started) * 1000)
+                    else:
+                        errors += 1
+                    if response.will_close:
+                        conn.close()
+                        conn = None
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+            if conn is not None:
+                conn.close()
+            with lock:
+                latencies.extend(local)
+                counters['errors'] += errors
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'errors': counters['errors'],
+        }
@@ -0,0 +1,165 @@
+# admin_panel/management/commands/bench_sqlite_contention.py
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction, OperationalError
+
+from journal_project.database import sqlite_database, PROFILES
+
+SCHEMA = (
+    'CREATE TABLE bench_grade (id INTEGER PRIMARY KEY, student_id INTEGER, subject_id INTEGER, '
+    'points REAL, created_at REAL)',
+    'CREATE TABLE bench_performance (student_id INTEGER, subject_id INTEGER, total REAL, '
+    'PRIMARY KEY (student_id, subject_id))',
+)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = ('Пропускная способность записи в SQLite при N параллельных писателях: '
+            'профили stock (как в Django по умолчанию) и production (journal_project/database.py). '
+            'Замер идёт на временной базе, рабочая не затрагивается')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', default='1,4,8', help='Числа писателей через запятую')
+        parser.add_argument('--readers', type=int, default=2, help='Параллельных читателей')
+        parser.add_argument('--duration', type=float, default=5.0, help='Секунд на замер')
+        parser.add_argument('--profiles', default=','.join(reversed(PROFILES)), help='Профили через запятую')
+        parser.add_argument('--students', type=int, default=200, help='Студентов в таблице баллов')
+        parser.add_argument('--dir', help='Каталог для временной базы (по умолчанию системный temp)')
+
+    def handle(self, *args, **options):
+        profiles = [p.strip() for p in options['profiles'].split(',') if p.strip()]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f'Неизвестные профили: {", ".join(sorted(unknown))}')
+        try:
+            writer_counts = [int(n) for n in options['writers'].split(',')]
+        except ValueError:
+            raise CommandError('--writers: числа через запятую')
+
+        self.stdout.write(
+            f'{"профиль":<11} {"писат.":>6} {"записей/с":>10} {"ошибок":>7} {"p50 мс":>8} {"p95 мс":>8} {"чтений/с":>9}'
+        )
+        workdir = tempfile.mkdtemp(prefix='sqlite-contention-', dir=options['dir'])
+        try:
+            for profile in profiles:
+                for writers in writer_counts:
+                    result = self.measure(profile, writers, options, workdir)
+                    self.stdout.write(
+                        f'{profile:<11} {writers:>6} {result["writes_per_sec"]:>10.0f} {result["errors"]:>7} '
+                        f'{result["p50_ms"]:>8.1f} {result["p95_ms"]:>8.1f} {result["reads_per_sec"]:>9.0f}'
+                    )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def measure(self, profile, writers, options, workdir):
+        """Один замер на новой базе; каждый поток работает через своё соединение Django"""
+        alias = f'contention_{profile}_{writers}'
+        path = os.path.join(workdir, f'{alias}.sqlite3')
+        # Временный алиас: потоки получают свои соединения через connections[alias]
+        connections.settings[alias] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            alias: sqlite_database(path, profile),
+        })[alias]
+        try:
+            self.create_schema(alias, options['students'])
+            return self.run_threads(alias, writers, options)
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+
+    def create_schema(self, alias, students):
+        with connections[alias].cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany(
+                'INSERT INTO bench_performance (student_id, subject_id, total) VALUES (%s, %s, 0)',
+                [(student_id, subject_id) for student_id in range(students) for subject_id in range(5)],
+            )
+
+    def run_threads(self, alias, writers, options):
+        students = options['students']
+        stop = threading.Event()
+        start = threading.Barrier(writers + options['readers'] + 1)
+        lock = threading.Lock()
+        latencies, counters = [], {'errors': 0, 'reads': 0}
+
+        def writer(index):
+            # Как api_add_grade: чтение баллов, новая оценка, пересчёт баллов - в одной транзакции
+            local, errors, n = [], 0, index
+            start.wait()
+            while not stop.is_set():
+                student_id, subject_id = n % students, n % 5
+                n += writers
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=alias):
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute(
+                                'SELECT total FROM bench_performance WHERE student_id = %s AND subject_id = %s',
+                                [student_id, subject_id],
+                            )
+                            cursor.fetchone()
+                            cursor.execute(
+                                'INSERT INTO bench_grade (student_id, subject_id, points, created_at) '
+                                'VALUES (%s, %s, %s, %s)',
+                                [student_id, subject_id, 5, time.time()],
+                            )
+                            cursor.execute(
+                                'UPDATE bench_performance SET total = total + %s '
+                                'WHERE student_id = %s AND subject_id = %s',
+                                [5, student_id, subject_id],
+                            )
+                    local.append((time.perf_counter() - started) * 1000)
+                except OperationalError:
+                    errors += 1
+            connections[alias].close()
+            with lock:
+                latencies.extend(local)
+                counters['errors'] += errors
+
+        def reader():
+            reads = 0
+            start.wait()
+            while not stop.is_set():
+                try:
+                    with connections[alias].cursor() as cursor:
+                        cursor.execute('SELECT subject_id, SUM(total) FROM bench_performance GROUP BY subject_id')
+                        cursor.fetchall()
+                    reads += 1
+                except OperationalError:
+                    pass
+            connections[alias].close()
+            with lock:
+                counters['reads'] += reads
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        began = time.perf_counter()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        return {
+            'writes_per_sec': len(latencies) / elapsed,
+            'errors': counters['errors'],
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'reads_per_sec': counters['reads'] / elapsed,
+        }
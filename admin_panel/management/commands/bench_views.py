@@ -0,0 +1,107 @@
+# admin_panel/management/commands/bench_views.py
+import io
+import json
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases, setup_test_environment, teardown_test_environment
+
+from journal_project import benchmark
+
+# Данные по умолчанию, если базовой линии ещё нет (небольшие - замер идёт минуты)
+DEFAULT_DATASET = {
+    'seed': 42, 'levels': 1, 'forms': 1, 'courses': 2, 'groups': 2, 'students': 20,
+    'subjects': 6, 'grades': 30, 'absences': 6, 'comments': 10,
+}
+
+class Command(BaseCommand):
+    help = ('Замер числа запросов, времени (p50/p95) и размера ответа всех URL admin_panel, elders '
+            'и students на данных seed_bench и сравнение с базовой линией')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=getattr(settings, 'BENCHMARK_BASELINE', None),
+                            help='Файл базовой линии (JSON)')
+        parser.add_argument('--iterations', type=int, default=10, help='Замеров на URL')
+        parser.add_argument('--warmup', type=int, default=1, help='Прогревочных запросов на URL')
+        parser.add_argument('--only', help='Только URL, в имени которых есть подстрока')
+        parser.add_argument('--update-baseline', action='store_true', help='Записать результаты как базовую линию')
+        parser.add_argument('--no-latency', action='store_true', help='Не проверять время ответа')
+        parser.add_argument('--latency-tolerance', type=float, default=3.0,
+                            help='Во сколько раз p95 может превысить базовую линию')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Мерить на текущей базе без заполнения (по умолчанию - тестовая база + seed_bench)')
+        parser.add_argument('--json', help='Сохранить результаты в файл')
+
+    def handle(self, *args, **options):
+        missing = benchmark.uncovered()
+        if missing:
+            raise CommandError(f'Нет сценария для URL: {", ".join(missing)}')
+
+        baseline_path = options['baseline']
+        baseline = None
+        if baseline_path and os.path.exists(baseline_path):
+            baseline = benchmark.load_baseline(baseline_path)
+        dataset = (baseline or {}).get('dataset', DEFAULT_DATASET)
+
+        if options['current_db']:
+            results = self.measure(options)
+        else:
+            # Отдельная тестовая база: замер не трогает рабочие данные и повторяем
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                self.stdout.write('Заполнение тестовой базы (seed_bench)...')
+                call_command('seed_bench', *[f'--{key}={value}' for key, value in dataset.items()],
+                             stdout=io.StringIO())
+                results = self.measure(options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+
+        if options['update_baseline']:
+            if not baseline_path:
+                raise CommandError('Не задан файл базовой линии (--baseline или BENCHMARK_BASELINE)')
+            os.makedirs(os.path.dirname(baseline_path) or '.', exist_ok=True)
+            if baseline and options['only']:
+                # Частичный замер обновляет только свои URL
+                results = {**baseline['views'], **results}
+            benchmark.save_baseline(baseline_path, results, dataset)
+            self.stdout.write(self.style.SUCCESS(f'Базовая линия записана: {baseline_path} ({len(results)} URL)'))
+            return
+
+        if baseline is None:
+            self.stdout.write(self.style.WARNING('Базовой линии нет - сравнение пропущено (--update-baseline)'))
+            return
+
+        failures = benchmark.compare(
+            results, baseline,
+            latency_tolerance=options['latency_tolerance'],
+            check_latency=not options['no_latency'],
+        )
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f'Превышен бюджет: {len(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'Все {len(results)} URL в пределах бюджета'))
+
+    def measure(self, options):
+        self.stdout.write(f'{"URL":<45} {"код":>4} {"запр":>5} {"p50 мс":>8} {"p95 мс":>8} {"байт":>9}')
+
+        def progress(name, result):
+            self.stdout.write(
+                f'{name:<45} {result["status"]:>4} {result["queries"]:>5} '
+                f'{result["p50_ms"]:>8} {result["p95_ms"]:>8} {result["bytes"]:>9}'
+            )
+
+        return benchmark.run(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            only=options['only'],
+            progress=progress,
+        )
@@ -0,0 +1,140 @@
+# admin_panel/management/commands/build_static.py
+import os
+import re
+import textwrap
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+# Встроенный блок без src; атрибуты сохраняются
+INLINE_BLOCK = re.compile(r'(?P<indent>[ \t]*)<(?P<tag>script|style)(?P<attrs>(?:\s[^>]*)?)>(?P<body>.*?)</(?P=tag)>', re.S)
+TEMPLATE_SYNTAX = re.compile(r'{[{%#]')
+LOAD_STATIC = '{% load static %}'
+
+# Куда выносится блок: тег -> (каталог, расширение, ссылка)
+OUTPUTS = {
+    'script': ('js', '.js', '<script{attrs} src="{{% static \'{name}\' %}}"></script>'),
+    'style': ('css', '.css', '<link rel="stylesheet" href="{{% static \'{name}\' %}}"{attrs}>'),
+}
+HEADERS = {'.js': '// static/{name}\n\n', '.css': '/* static/{name} */\n\n'}
+
+
+def inline_blocks(text, min_size):
+    """Блоки <script>/<style> шаблона: (совпадение, можно ли вынести)"""
+    for match in INLINE_BLOCK.finditer(text):
+        if 'src=' in match.group('attrs'):
+            continue
+        body = match.group('body')
+        if len(body.strip()) < min_size:
+            continue
+        yield match, not TEMPLATE_SYNTAX.search(body)
+
+
+def static_name(template, tag, index):
+    """admin_panel/dashboard.html -> admin_panel/js/dashboard.js; base.html -> css/base.css"""
+    folder, ext, _ = OUTPUTS[tag]
+    app, _, page = template.rpartition('/')
+    page = os.path.splitext(page)[0] + (f'-{index}' if index > 1 else '')
+    return '/'.join(part for part in (app, folder, page + ext) if part)
+
+
+class Command(BaseCommand):
+    help = ('Сборка статики: collectstatic с BuildStaticFilesStorage (сжатие JS/CSS, хэш в именах, .gz/.br) '
+            'и отчёт о размерах. --extract - вместо сборки вынести встроенные <script>/<style> шаблонов в static')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--extract', action='store_true',
+                            help='Вынести встроенные блоки без шаблонных тегов в файлы static и заменить ссылками')
+        parser.add_argument('--dry-run', action='store_true', help='С --extract: только показать, что будет вынесено')
+        parser.add_argument('--min-size', type=int, default=512,
+                            help='Блоки меньше (символов) остаются в шаблоне')
+
+    def handle(self, *args, **options):
+        if options['extract']:
+            pending = self.extract(options['min_size'], options['dry_run'])
+            if pending:
+                self.stdout.write(f'Остались в шаблонах (есть шаблонные теги): {len(pending)}')
+            return
+
+        call_command('collectstatic', interactive=False, clear=True, verbosity=0)
+        self.report()
+
+    # ==================== ВЫНОС ИЗ ШАБЛОНОВ ====================
+
+    def extract(self, min_size, dry_run):
+        """Выносит блоки; возвращает список блоков, оставшихся из-за шаблонных тегов"""
+        static_dir = settings.STATICFILES_DIRS[0]
+        pending = []
+        for templates_dir in settings.TEMPLATES[0]['DIRS']:
+            for root, _, files in os.walk(templates_dir):
+                for filename in sorted(files):
+                    if not filename.endswith('.html'):
+                        continue
+                    path = os.path.join(root, filename)
+                    template = os.path.relpath(path, templates_dir).replace(os.sep, '/')
+                    pending += self.extract_template(path, template, static_dir, min_size, dry_run)
+        return pending
+
+    def extract_template(self, path, template, static_dir, min_size, dry_run):
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+
+        pending, replacements, counters = [], [], {}
+        for match, movable in inline_blocks(text, min_size):
+            tag = match.group('tag')
+            if not movable:
+                pending.append(f'{template}: <{tag}>')
+                self.stdout.write(f'  {template}: <{tag}> с шаблонными тегами - остаётся')
+                continue
+            counters[tag] = counters.get(tag, 0) + 1
+            name = static_name(template, tag, counters[tag])
+            body = textwrap.dedent(match.group('body')).strip('\n')
+            self.stdout.write(f'  {template}: <{tag}> {len(body)} симв. -> static/{name}')
+            if dry_run:
+                continue
+            target = os.path.join(static_dir, *name.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(HEADERS[os.path.splitext(name)[1]].format(name=name) + body + '\n')
+            reference = OUTPUTS[tag][2].format(attrs=match.group('attrs'), name=name)
+            replacements.append((match.start(), match.end(), match.group('indent') + reference))
+
+        if replacements and not dry_run:
+            for start, end, reference in reversed(replacements):
+                text = text[:start] + reference + text[end:]
+            if LOAD_STATIC not in text:
+                extends = re.match(r'\s*{% extends [^%]*%}\n', text)
+                at = extends.end() if extends else 0
+                text = text[:at] + LOAD_STATIC + '\n' + text[at:]
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return pending
+
+    # ==================== ОТЧЁТ ====================
+
+    def report(self):
+        """Размеры файлов проекта: исходник, после сжатия, .gz, .br"""
+        root = settings.STATIC_ROOT
+        totals = [0, 0, 0, 0]
+        rows = []
+        for static_dir in settings.STATICFILES_DIRS:
+            for dirpath, _, files in os.walk(static_dir):
+                for filename in files:
+                    source = os.path.join(dirpath, filename)
+                    name = os.path.relpath(source, static_dir).replace(os.sep, '/')
+                    hashed = staticfiles_storage.hashed_files.get(staticfiles_storage.hash_key(name))
+                    if not hashed:
+                        continue
+                    built = os.path.join(root, hashed)
+                    sizes = [os.path.getsize(source), os.path.getsize(built)]
+                    for suffix in ('.gz', '.br'):
+                        sizes.append(os.path.getsize(built + suffix) if os.path.exists(built + suffix) else sizes[1])
+                    rows.append((hashed, sizes))
+                    totals = [t + s for t, s in zip(totals, sizes)]
+
+        self.stdout.write(f'{"файл":<52} {"исходный":>9} {"сжатый":>9} {"gzip":>9} {"brotli":>9}')
+        for hashed, sizes in sorted(rows, key=lambda row: -row[1][0]):
+            self.stdout.write(f'{hashed:<52} ' + ' '.join(f'{size:>9}' for size in sizes))
+        self.stdout.write(f'{"итого":<52} ' + ' '.join(f'{size:>9}' for size in totals))
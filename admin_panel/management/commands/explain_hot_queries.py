@@ -0,0 +1,53 @@
+# admin_panel/management/commands/explain_hot_queries.py
+import io
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases, setup_test_environment, teardown_test_environment
+
+from journal_project import query_plans
+from admin_panel.management.commands.bench_views import DEFAULT_DATASET
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN QUERY PLAN горячих запросов view (journal_project/query_plans.py) '
+            'на данных seed_bench; ошибка, если какой-то запрос просматривает таблицу целиком')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', help='Только запросы, в имени которых есть подстрока')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Проверить текущую базу (по умолчанию - тестовая база + seed_bench)')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Перед проверкой собрать статистику (ANALYZE), как на рабочей базе')
+
+    def handle(self, *args, **options):
+        if options['current_db']:
+            plans, failures = self.collect(options)
+        else:
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                self.stdout.write('Заполнение тестовой базы (seed_bench)...')
+                call_command('seed_bench', *[f'--{key}={value}' for key, value in DEFAULT_DATASET.items()],
+                             stdout=io.StringIO())
+                plans, failures = self.collect(options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        for name, plan in plans.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for detail in plan:
+                line = f'    {detail}'
+                self.stdout.write(self.style.ERROR(line) if query_plans.is_full_scan(detail) else line)
+
+        if failures:
+            raise CommandError(f'Полный просмотр таблицы: {len(failures)}\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'Все {len(plans)} запросов используют индексы'))
+
+    def collect(self, options):
+        if options['analyze']:
+            from django.db import connection
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        return query_plans.check(only=options['only'])
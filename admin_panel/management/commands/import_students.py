@@ -0,0 +1,59 @@
+# admin_panel/management/commands/import_students.py
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from admin_panel.models import Group
+from admin_panel.student_import import import_students, detect_format, IMPORT_CHUNK_SIZE, IMPORT_FORMATS
+
+class Command(BaseCommand):
+    help = 'Массовый импорт студентов из CSV/XLSX (столбцы: ФИО, Логин, Пароль, Группа, Email, Телефон)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл CSV или XLSX')
+        parser.add_argument('--group', type=int, help='ID группы для всех строк (столбец «Группа» не читается)')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Формат файла (по умолчанию - по расширению)')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Строк в одной пачке')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить файл, ничего не создавая')
+        parser.add_argument('--report', help='Сохранить отчёт по строкам (с выданными паролями) в CSV')
+
+    def handle(self, *args, **options):
+        group = None
+        if options['group']:
+            group = Group.objects.filter(id=options['group']).first()
+            if group is None:
+                raise CommandError(f'Группа с ID {options["group"]} не найдена')
+
+        try:
+            with open(options['path'], 'rb') as f:
+                report = import_students(
+                    f,
+                    options['format'] or detect_format(options['path']),
+                    group=group,
+                    dry_run=options['dry_run'],
+                    chunk_size=options['chunk_size'],
+                    filename=options['path'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for row in report['rows']:
+            if row['status'] == 'error':
+                self.stdout.write(self.style.ERROR(f'Строка {row["row"]}: {"; ".join(row["errors"])}'))
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f, delimiter=';')
+                writer.writerow(['Строка', 'Логин', 'ФИО', 'Статус', 'ID', 'Пароль', 'Ошибки'])
+                for row in report['rows']:
+                    writer.writerow([
+                        row['row'], row['login'], row['full_name'], row['status'],
+                        row.get('id', ''), row.get('password', ''), '; '.join(row.get('errors', [])),
+                    ])
+            self.stdout.write(f'Отчёт: {options["report"]}')
+
+        summary = f'Строк: {report["total"]}, ошибок: {report["errors"]}'
+        if options['dry_run']:
+            valid = report['total'] - report['errors']
+            self.stdout.write(self.style.WARNING(f'{summary}, будет создано: {valid} (dry-run)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary}, создано: {report["created"]}'))
@@ -0,0 +1,78 @@
+# admin_panel/management/commands/query_audit_logs.py
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from admin_panel import audit
+from admin_panel.models import DatabaseLog
+
+class Command(BaseCommand):
+    help = 'Поиск событий аудита в архивах (и, по желанию, в таблице DatabaseLog)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='month_from', help='С месяца ГГГГ-ММ')
+        parser.add_argument('--to', dest='month_to', help='По месяц ГГГГ-ММ')
+        parser.add_argument('--action', help='Действие (create, update, delete, move, ...)')
+        parser.add_argument('--model', help='Модель (Student, Group, ...)')
+        parser.add_argument('--user', help='ID или часть имени пользователя')
+        parser.add_argument('--object-id', type=int, help='ID объекта')
+        parser.add_argument('--contains', help='Подстрока в деталях события')
+        parser.add_argument('--include-hot', action='store_true', help='Искать и в таблице DatabaseLog')
+        parser.add_argument('--limit', type=int, default=100, help='Максимум событий (0 - без ограничения)')
+        parser.add_argument('--json', action='store_true', help='Вывод в формате JSONL')
+    
+    def handle(self, *args, **options):
+        limit = options['limit']
+        found = 0
+        for event in self._events(options):
+            if not self._matches(event, options):
+                continue
+            self._print(event, options['json'])
+            found += 1
+            if limit and found >= limit:
+                break
+        
+        if not options['json']:
+            self.stdout.write(f'Найдено событий: {found}')
+    
+    def _events(self, options):
+        yield from audit.iter_archived(options['month_from'], options['month_to'])
+        if options['include_hot']:
+            logs = DatabaseLog.objects.order_by('created_at', 'id').values(*audit.ARCHIVE_FIELDS)
+            for event in logs.iterator():
+                month = event['created_at'].strftime('%Y-%m')
+                if options['month_from'] and month < options['month_from']:
+                    continue
+                if options['month_to'] and month > options['month_to']:
+                    continue
+                yield event
+    
+    def _matches(self, event, options):
+        if options['action'] and event['action'] != options['action']:
+            return False
+        if options['model'] and event['model_name'] != options['model']:
+            return False
+        if options['object_id'] is not None and event['object_id'] != options['object_id']:
+            return False
+        user = options['user']
+        if user:
+            if user.isdigit():
+                if event['user_id'] != int(user):
+                    return False
+            elif user.lower() not in (event['user_name'] or '').lower():
+                return False
+        contains = options['contains']
+        if contains and contains.lower() not in json.dumps(event['details'], ensure_ascii=False).lower():
+            return False
+        return True
+    
+    def _print(self, event, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False))
+            return
+        self.stdout.write(
+            f"{event['created_at'].strftime('%d.%m.%Y %H:%M:%S')}  {event['action']:<8} "
+            f"{event['model_name']} #{event['object_id'] or '-'}  "
+            f"{event['user_name'] or 'Система'}  "
+            f"{json.dumps(event['details'], ensure_ascii=False)}"
+        )
@@ -0,0 +1,12 @@
+# admin_panel/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from admin_panel import search_index
+
+class Command(BaseCommand):
+    help = 'Полная перестройка поискового индекса студентов (FTS5 или триграммы в памяти)'
+    
+    def handle(self, *args, **options):
+        count = search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано студентов: {count} ({search_index.backend()})'
+        ))
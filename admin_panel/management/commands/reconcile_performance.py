@@ -0,0 +1,67 @@
+# admin_panel/management/commands/reconcile_performance.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from students.models import StudentGrade, StudentPerformance, GradebookEntry
+
+class Command(BaseCommand):
+    help = 'Сверка StudentPerformance.total_points с оценками и пересборка баллов'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, help='ID группы (по умолчанию - вся БД)')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать расхождения')
+    
+    def handle(self, *args, **options):
+        group_id = options.get('group')
+        dry_run = options.get('dry_run')
+        
+        grades = StudentGrade.objects.all()
+        performances = StudentPerformance.objects.all()
+        if group_id:
+            grades = grades.filter(subject__group_id=group_id)
+            performances = performances.filter(subject__group_id=group_id)
+        
+        # Фактические суммы баллов одним сгруппированным запросом
+        actual = {
+            (row['student_id'], row['subject_id']): row['total'] or 0
+            for row in grades.values('student_id', 'subject_id').annotate(total=Sum('points'))
+        }
+        
+        to_update = []
+        now = timezone.now()
+        for perf in performances:
+            key = (perf.student_id, perf.subject_id)
+            expected = actual.pop(key, 0)
+            if perf.total_points != expected:
+                self.stdout.write(
+                    f'Расхождение: студент {perf.student_id}, предмет {perf.subject_id}: '
+                    f'{perf.total_points} → {expected}'
+                )
+                perf.total_points = expected
+                perf.last_updated = now
+                to_update.append(perf)
+        
+        # Оценки есть, а записи об успеваемости нет
+        to_create = []
+        for (student_id, subject_id), total in actual.items():
+            self.stdout.write(
+                f'Нет успеваемости: студент {student_id}, предмет {subject_id}: {total}'
+            )
+            to_create.append(StudentPerformance(
+                student_id=student_id, subject_id=subject_id, total_points=total
+            ))
+        
+        drift = len(to_update) + len(to_create)
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Найдено расхождений: {drift} (dry-run, изменения не записаны)'))
+            return
+        
+        with transaction.atomic():
+            StudentPerformance.objects.bulk_update(to_update, ['total_points', 'last_updated'], batch_size=500)
+            StudentPerformance.objects.bulk_create(to_create, batch_size=500)
+            cells = GradebookEntry.rebuild(group_id)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Исправлено расхождений: {drift}, ячеек журнала: {cells}'
+        ))
@@ -0,0 +1,361 @@
+# admin_panel/management/commands/seed_bench.py
+import random
+import string
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from admin_panel import principals, search_index
+from admin_panel.models import (
+    EducationalLevel, StudyForm, Course, Group, Student, ElderPermission,
+    StudentCountRollup, HierarchyVersion,
+)
+from journal_project.schedule_utils import invalidate_week_types, get_week_type
+from students.models import (
+    StudentProfile, Subject, Schedule, ScheduleComment, StudentPerformance,
+    StudentGrade, WeekType, Attendance, SeminarSlot, GradebookEntry,
+)
+from students.schedule_cache import invalidate_group_schedule
+
+# Всё, что создаёт команда, помечено префиксом - так его можно найти и удалить
+PREFIX = 'bench'
+
+LEVELS = ['Бакалавриат', 'Магистратура', 'Специалитет', 'Аспирантура', 'СПО']
+FORMS = ['Очная форма', 'Заочная форма', 'Очно-заочная форма']
+SUBJECTS = [
+    'Теория государства и права', 'Конституционное право', 'Гражданское право',
+    'Уголовное право', 'Административное право', 'Трудовое право', 'Римское право',
+    'История государства и права', 'Финансовое право', 'Международное право',
+    'Семейное право', 'Уголовный процесс', 'Гражданский процесс', 'Криминалистика',
+    'Экологическое право', 'Философия', 'Иностранный язык', 'Логика',
+]
+SURNAMES = [
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов',
+    'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев',
+    'Семёнов', 'Егоров', 'Павлов', 'Козлов', 'Степанов', 'Николаев', 'Орлов',
+    'Андреев', 'Макаров', 'Никитин', 'Захаров', 'Зайцев', 'Соловьёв', 'Борисов',
+]
+MALE_NAMES = ['Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Артём',
+              'Илья', 'Кирилл', 'Михаил', 'Никита', 'Матвей', 'Роман', 'Егор']
+FEMALE_NAMES = ['Анастасия', 'Мария', 'Анна', 'Виктория', 'Екатерина', 'Наталья',
+                'Марина', 'Полина', 'Дарья', 'Алина', 'Ксения', 'Елизавета', 'Софья']
+PATRONYMICS = ['Александров', 'Дмитриев', 'Сергеев', 'Андреев', 'Алексеев', 'Михайлов',
+               'Владимиров', 'Николаев', 'Игорев', 'Викторов', 'Павлов', 'Евгеньев']
+ROOMS = [f'{floor}{room:02d}' for floor in range(1, 6) for room in range(1, 20)]
+PAIR_TIMES = [('8:00', '9:30'), ('9:40', '11:10'), ('11:30', '13:00'),
+              ('13:10', '14:40'), ('15:00', '16:30'), ('16:40', '18:10')]
+LESSON_TYPES = ['lecture', 'seminar', 'seminar', 'practice']
+# Тип оценки и её «сырое» значение; повторы задают частоту
+GRADE_VARIANTS = [
+    ('performance', 'Выст'), ('performance', 'Выст'), ('supplement', 'Доп'), ('question', 'Вопр'),
+    ('plus', '+'), ('plus', '+'), ('minus', '-'), ('numeric_3', '3'), ('numeric_4', '4'),
+    ('numeric_4', '4'), ('numeric_5', '5'), ('numeric_5', '5'), ('numeric_2', '2'),
+]
+REASONS = ['', '', '', 'Болезнь', 'Уважительная причина', 'Соревнования', 'Семейные обстоятельства']
+COMMENTS = ['Перенос в другую аудиторию', 'Занятие отменяется', 'Принести конспекты',
+            'Контрольная работа', 'Замена преподавателя', 'Консультация перед зачётом']
+
+
+# Таблицы, которые пишутся через RowBuffer, и порядок их полей
+BUFFERED_FIELDS = {
+    StudentProfile: ('user', 'group', 'total_hours', 'remaining_hours'),
+    Attendance: ('student', 'group', 'date', 'hours', 'reason', 'marked_by', 'created_at'),
+    StudentGrade: ('student', 'group', 'subject', 'grade_type', 'raw_value', 'points', 'date',
+                   'is_today', 'marked_by', 'comment', 'created_at', 'updated_at'),
+    StudentPerformance: ('student', 'subject', 'total_points', 'target_points', 'last_updated'),
+    GradebookEntry: ('group', 'student', 'subject', 'grades_count', 'total_points', 'target_points',
+                     'progress', 'updated_at'),
+    SeminarSlot: ('schedule', 'group', 'slot_number', 'student', 'is_active', 'created_at', 'updated_at'),
+    ScheduleComment: ('group', 'comment', 'week_type', 'day', 'lesson', 'date', 'is_urgent',
+                      'is_active', 'created_by', 'created_at'),
+}
+
+
+class RowBuffer:
+    """
+    Копит строки одной таблицы (значения в порядке fields, уже в виде для
+    базы) и пишет их executemany по batch_size штук. Экземпляры моделей не
+    создаются - для сотен тысяч строк это основная часть времени bulk_create.
+    """
+
+    def __init__(self, model, fields, batch_size, counts):
+        qn = connection.ops.quote_name
+        columns = [model._meta.get_field(field).column for field in fields]
+        self.sql = (
+            f'INSERT INTO {qn(model._meta.db_table)} ({", ".join(qn(column) for column in columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})'
+        )
+        self.name = model.__name__
+        self.batch_size = batch_size
+        self.counts = counts
+        self.rows = []
+
+    def add(self, *values):
+        self.rows.append(values)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            with connection.cursor() as cursor:
+                cursor.executemany(self.sql, self.rows)
+            self.counts[self.name] = self.counts.get(self.name, 0) + len(self.rows)
+            self.rows = []
+
+
+class Command(BaseCommand):
+    help = ('Генерация большого детерминированного набора данных для нагрузочных тестов: '
+            'дерево групп, студенты, расписание, оценки, пропуски, слоты и комментарии')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора (одинаковое зерно - одинаковые данные)')
+        parser.add_argument('--levels', type=int, default=3, help='Уровней образования')
+        parser.add_argument('--forms', type=int, default=2, help='Форм обучения на уровень')
+        parser.add_argument('--courses', type=int, default=4, help='Курсов на форму')
+        parser.add_argument('--groups', type=int, default=3, help='Групп на курс')
+        parser.add_argument('--students', type=int, default=25, help='Студентов в группе')
+        parser.add_argument('--subjects', type=int, default=8, help='Предметов у группы')
+        parser.add_argument('--pairs', type=int, default=3, help='Пар в день (пн-сб, обе недели)')
+        parser.add_argument('--grades', type=int, default=40, help='Оценок на студента за семестр')
+        parser.add_argument('--absences', type=int, default=8, help='Пропусков на студента за семестр')
+        parser.add_argument('--comments', type=int, default=10, help='Комментариев к расписанию на группу')
+        parser.add_argument('--weeks', type=int, default=18, help='Недель в семестре')
+        parser.add_argument('--start', type=date.fromisoformat,
+                            help='Начало семестра ГГГГ-ММ-ДД (по умолчанию 1 сентября или 1 февраля)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Объектов в одном bulk_create')
+        parser.add_argument('--clear', action='store_true', help='Только удалить ранее созданные данные')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.rng = random.Random(options['seed'])
+        self.counts = {}
+        self.batch_size = options['batch_size']
+
+        bench_students = Student.objects.filter(login__startswith=f'{PREFIX}_')
+        student_ids = set(bench_students.values_list('id', flat=True))
+        with transaction.atomic():
+            removed = self.clear()
+            groups = [] if options['clear'] else self.seed(options, started)
+        student_ids.update(bench_students.values_list('id', flat=True))
+
+        # Кэши и индексы, которые обычно обновляет save()
+        for group in groups:
+            invalidate_group_schedule(group.id)
+        invalidate_week_types()
+        principals.invalidate(student_ids)
+        search_index.rebuild()
+
+        if removed:
+            self.stdout.write(f'Удалены прежние данные: {removed} студентов и их дерево')
+        if options['clear']:
+            return
+        total = sum(self.counts.values())
+        for name, count in sorted(self.counts.items()):
+            self.stdout.write(f'  {name}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {time.monotonic() - started:.1f} с (seed={options["seed"]})'
+        ))
+
+    def seed(self, options, started):
+        start = options['start'] or self.semester_start()
+        days = [start + timedelta(days=i) for i in range(options['weeks'] * 7)]
+        self.semester_days = [day for day in days if day.isoweekday() <= 6]
+        if not self.semester_days:
+            raise CommandError('Пустой семестр: проверьте --weeks')
+        # Даты и время - сразу в виде для базы (строки пишутся мимо ORM)
+        self.db_days = [connection.ops.adapt_datefield_value(day) for day in self.semester_days]
+        self.db_now = connection.ops.adapt_datetimefield_value(timezone.now())
+        self.grade_points = {}
+        for grade_type, _ in GRADE_VARIANTS:
+            grade = StudentGrade(grade_type=grade_type)
+            grade.calculate_points()
+            self.grade_points[grade_type] = grade.points
+
+        groups = self.create_tree(options)
+        self.stdout.write(f'Групп: {len(groups)}')
+        self.create_week_types(start, options['weeks'])
+        for index, group in enumerate(groups, start=1):
+            self.fill_group(group, options)
+            if index % 50 == 0:
+                self.stdout.write(f'  заполнено групп: {index}/{len(groups)} ({time.monotonic() - started:.0f} с)')
+        for buffer in self.buffers.values():
+            buffer.flush()
+
+        # bulk_create минует save() - производные данные считаем сами
+        StudentCountRollup.refresh(StudentCountRollup.levels_of_groups([group.id for group in groups]))
+        HierarchyVersion.bump()
+        return groups
+
+    # ==================== ОЧИСТКА ====================
+
+    def clear(self):
+        """Удаляет данные прошлого запуска (студенты и дерево с префиксом)"""
+        students = Student.objects.filter(login__startswith=f'{PREFIX}_')
+        removed = students.count()
+        level_ids = list(EducationalLevel.objects.filter(name__startswith=f'[{PREFIX}]').values_list('id', flat=True))
+        if not removed and not level_ids:
+            return 0
+        # Массовые таблицы удаляем заранее одним DELETE на таблицу, чтобы
+        # каскад от студентов и групп не собирал сотни тысяч строк в память
+        groups = Group.objects.filter(level_id__in=level_ids)
+        for model in (StudentGrade, Attendance, SeminarSlot, ScheduleComment, GradebookEntry):
+            model.objects.filter(group__in=groups).delete()
+        StudentPerformance.objects.filter(student__in=students).delete()
+        StudentProfile.objects.filter(user__in=students).delete()
+        students.delete()
+        EducationalLevel.objects.filter(id__in=level_ids).delete()
+        StudentCountRollup.refresh(level_ids)
+        return removed
+
+    # ==================== ДЕРЕВО ====================
+
+    def semester_start(self):
+        today = date.today()
+        if 2 <= today.month <= 8:
+            return date(today.year, 2, 1)
+        return date(today.year if today.month >= 9 else today.year - 1, 9, 1)
+
+    def create_tree(self, options):
+        levels = EducationalLevel.objects.bulk_create([
+            EducationalLevel(name=f'[{PREFIX}] {LEVELS[i % len(LEVELS)]} {i + 1}', order=100 + i)
+            for i in range(options['levels'])
+        ])
+        forms = StudyForm.objects.bulk_create([
+            StudyForm(name=FORMS[i % len(FORMS)], level=level, order=i)
+            for level in levels for i in range(options['forms'])
+        ])
+        courses = Course.objects.bulk_create([
+            Course(number=i + 1, form=form, order=i)
+            for form in forms for i in range(options['courses'])
+        ])
+        groups = Group.objects.bulk_create([
+            Group(name=f'ЮР-{course.id}{i + 1:02d}', course=course, form=course.form, level=course.form.level)
+            for course in courses for i in range(options['groups'])
+        ])
+        self.counts.update({
+            'EducationalLevel': len(levels), 'StudyForm': len(forms),
+            'Course': len(courses), 'Group': len(groups),
+        })
+
+        self.buffers = {
+            model: RowBuffer(model, fields, self.batch_size, self.counts)
+            for model, fields in BUFFERED_FIELDS.items()
+        }
+        self.login_seq = 0
+        return groups
+
+    def create_week_types(self, start, weeks):
+        """Ручные настройки чётности: пара недель семестра с обратной чётностью"""
+        monday = start - timedelta(days=start.isoweekday() - 1)
+        mondays = [monday + timedelta(weeks=i) for i in range(weeks)]
+        flipped = self.rng.sample(mondays, min(2, len(mondays)))
+        created = WeekType.objects.bulk_create([
+            WeekType(date=day, week_type='odd' if get_week_type(day) == 'even' else 'even')
+            for day in flipped
+        ], ignore_conflicts=True)
+        self.counts['WeekType'] = len(created)
+
+    # ==================== ГРУППА ====================
+
+    def person_name(self):
+        surname = self.rng.choice(SURNAMES)
+        if self.rng.random() < 0.5:
+            return f'{surname} {self.rng.choice(MALE_NAMES)} {self.rng.choice(PATRONYMICS)}ич'
+        surname = surname[:-1] + 'ёва' if surname.endswith('ёв') else surname + 'а'
+        return f'{surname} {self.rng.choice(FEMALE_NAMES)} {self.rng.choice(PATRONYMICS)}на'
+
+    def fill_group(self, group, options):
+        rng = self.rng
+
+        # Студенты (первый - староста)
+        students = []
+        for i in range(options['students']):
+            self.login_seq += 1
+            students.append(Student(
+                login=f'{PREFIX}_{self.login_seq}',
+                password=''.join(rng.choices(string.ascii_letters + string.digits, k=8)),
+                full_name=self.person_name(),
+                group=group,
+                user_type='student',
+                is_elder=i == 0,
+                is_active=True,
+            ))
+        Student.objects.bulk_create(students, batch_size=self.batch_size)
+        self.counts['Student'] = self.counts.get('Student', 0) + len(students)
+        if not students:
+            return
+        elder = students[0]
+        ElderPermission.objects.create(student=elder)
+
+        # Предметы и расписание на обе недели
+        teachers = {name: self.person_name() for name in SUBJECTS}
+        names = rng.sample(SUBJECTS, min(options['subjects'], len(SUBJECTS)))
+        subjects = Subject.objects.bulk_create([
+            Subject(name=name, group=group, teacher=teachers[name]) for name in names
+        ])
+        self.counts['Subject'] = self.counts.get('Subject', 0) + len(subjects)
+
+        lessons = []
+        for week_type in ('even', 'odd'):
+            for day in range(1, 7):
+                for pair in range(1, min(options['pairs'], len(PAIR_TIMES)) + 1):
+                    subject = rng.choice(subjects)
+                    start_time, end_time = PAIR_TIMES[pair - 1]
+                    lessons.append(Schedule(
+                        group=group, day=day, week_type=week_type, pair_number=pair,
+                        start_time=start_time, end_time=end_time, subject=subject.name,
+                        teacher=subject.teacher, room=rng.choice(ROOMS), lesson_type=rng.choice(LESSON_TYPES),
+                    ))
+        lessons = Schedule.objects.bulk_create(lessons, batch_size=self.batch_size)
+        self.counts['Schedule'] = self.counts.get('Schedule', 0) + len(lessons)
+
+        buffers, days, now = self.buffers, self.db_days, self.db_now
+        student_ids = [student.id for student in students]
+        for lesson in lessons:
+            if lesson.lesson_type != 'seminar':
+                continue
+            for slot_number in (1, 2):
+                student_id = rng.choice(student_ids) if rng.random() < 0.6 else None
+                buffers[SeminarSlot].add(lesson.id, group.id, slot_number, student_id, True, now, now)
+
+        for _ in range(options['comments']):
+            lesson = rng.choice(lessons)
+            buffers[ScheduleComment].add(
+                group.id, rng.choice(COMMENTS), lesson.week_type, lesson.day, lesson.id,
+                rng.choice(days), rng.random() < 0.2, True, elder.id, now,
+            )
+
+        # Оценки, пропуски и всё, что из них считается
+        subject_ids = [subject.id for subject in subjects]
+        for student_id in student_ids:
+            absent_hours = 0
+            for _ in range(options['absences']):
+                hours = rng.choice((2, 2, 2, 4, 6))
+                absent_hours += hours
+                buffers[Attendance].add(
+                    student_id, group.id, rng.choice(days), hours, rng.choice(REASONS), elder.id, now,
+                )
+            buffers[StudentProfile].add(student_id, group.id, absent_hours, max(0, 20 - absent_hours))
+
+            totals = {}
+            counts = {}
+            for _ in range(options['grades']):
+                subject_id = rng.choice(subject_ids)
+                grade_type, raw_value = rng.choice(GRADE_VARIANTS)
+                points = self.grade_points[grade_type]
+                totals[subject_id] = totals.get(subject_id, 0) + points
+                counts[subject_id] = counts.get(subject_id, 0) + 1
+                buffers[StudentGrade].add(
+                    student_id, group.id, subject_id, grade_type, raw_value, points,
+                    rng.choice(days), False, elder.id, '', now, now,
+                )
+
+            for subject_id, total in totals.items():
+                buffers[StudentPerformance].add(student_id, subject_id, total, 21, now)
+                buffers[GradebookEntry].add(
+                    group.id, student_id, subject_id, counts[subject_id], total, 21,
+                    GradebookEntry.calculate_progress(total, 21), now,
+                )
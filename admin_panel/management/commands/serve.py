@@ -0,0 +1,63 @@
+# admin_panel/management/commands/serve.py
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ASGI_APP = 'journal_project.asgi:application'
+
+# SQLite пишет один процесс за раз, а у каждого процесса свои кэши в памяти,
+# поэтому больше четырёх процессов по умолчанию не запускаем
+MAX_DEFAULT_WORKERS = 4
+
+
+def default_workers():
+    return int(os.environ.get('WEB_CONCURRENCY') or min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS))
+
+
+class Command(BaseCommand):
+    help = ('Production-сервер: ASGI-приложение (journal_project/asgi.py) под uvicorn '
+            'в нескольких процессах. Вместо runserver')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='0.0.0.0', help='Адрес')
+        parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 80)), help='Порт')
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='Процессов (по умолчанию WEB_CONCURRENCY или число ядер, не больше 4)')
+        parser.add_argument('--keep-alive', type=int, default=5, help='Секунд держать простаивающее соединение')
+        parser.add_argument('--backlog', type=int, default=2048, help='Очередь соединений на сокете')
+        parser.add_argument('--limit-concurrency', type=int,
+                            help='Одновременных соединений на процесс, сверх - ответ 503')
+
+    def handle(self, *args, **options):
+        try:
+            import uvicorn
+        except ImportError:
+            raise CommandError('Не установлен uvicorn: pip install -r requirements.txt')
+
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers: не меньше 1')
+        if workers > 1 and settings.SCHEDULE_CACHE_BACKEND == 'locmem':
+            # Сброс кэша расписания и пользователей при записи не дойдёт до других процессов
+            self.stderr.write(self.style.WARNING(
+                'Кэш в памяти процесса при нескольких процессах: задайте SCHEDULE_CACHE_BACKEND=file'
+            ))
+
+        self.stdout.write(f'ASGI {ASGI_APP} на {options["host"]}:{options["port"]}, процессов: {workers}')
+        uvicorn.run(
+            ASGI_APP,
+            host=options['host'],
+            port=options['port'],
+            workers=workers,
+            backlog=options['backlog'],
+            limit_concurrency=options['limit_concurrency'],
+            timeout_keep_alive=options['keep_alive'],
+            # За прокси платформы: адрес клиента и схема из X-Forwarded-*
+            proxy_headers=True,
+            forwarded_allow_ips='*',
+            # Django не поддерживает lifespan; журнал - через settings.LOGGING, без access log
+            lifespan='off',
+            log_config=None,
+            access_log=False,
+        )
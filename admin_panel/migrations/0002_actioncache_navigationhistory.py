@@ -12,41 +12,52 @@ class Migration(migrations.Migration):
         migrations.swappable_dependency(settings.AUTH_USER_MODEL),
     ]
 
+    # Ремонт истории миграций. 0001_initial уже создаёт таблицы ActionCache и
+    # NavigationHistory: эта миграция осталась от параллельной ветки истории
+    # (вторая ветка - 0002_deleteditemcache, сливаются в 0006_merge). Раньше она
+    # создавала таблицы повторно, и migrate на пустой базе падал с
+    # «table already exists». Теперь меняется только состояние моделей: оно то же,
+    # что и раньше, а базы, где миграция уже применена, её не выполняют снова
     operations = [
-        migrations.CreateModel(
-            name='ActionCache',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('action', models.CharField(choices=[('delete', 'Удаление'), ('edit', 'Редактирование'), ('move', 'Перемещение'), ('create', 'Создание')], max_length=20, verbose_name='Действие')),
-                ('model_name', models.CharField(max_length=100, verbose_name='Модель')),
-                ('object_id', models.IntegerField(blank=True, null=True, verbose_name='ID объекта')),
-                ('object_data', models.JSONField(default=dict, verbose_name='Данные объекта')),
-                ('parent_data', models.JSONField(default=dict, verbose_name='Данные родителя')),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('is_restored', models.BooleanField(default=False, verbose_name='Восстановлено')),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ActionCache',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('action', models.CharField(choices=[('delete', 'Удаление'), ('edit', 'Редактирование'), ('move', 'Перемещение'), ('create', 'Создание')], max_length=20, verbose_name='Действие')),
+                        ('model_name', models.CharField(max_length=100, verbose_name='Модель')),
+                        ('object_id', models.IntegerField(blank=True, null=True, verbose_name='ID объекта')),
+                        ('object_data', models.JSONField(default=dict, verbose_name='Данные объекта')),
+                        ('parent_data', models.JSONField(default=dict, verbose_name='Данные родителя')),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('is_restored', models.BooleanField(default=False, verbose_name='Восстановлено')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                    ],
+                    options={
+                        'verbose_name': 'Кэш действия',
+                        'verbose_name_plural': 'Кэш действий',
+                        'ordering': ['-created_at'],
+                    },
+                ),
+                migrations.CreateModel(
+                    name='NavigationHistory',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('content_type', models.CharField(max_length=50, verbose_name='Тип контента')),
+                        ('object_id', models.IntegerField(verbose_name='ID объекта')),
+                        ('title', models.CharField(max_length=200, verbose_name='Название')),
+                        ('path', models.CharField(max_length=500, verbose_name='Путь')),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                    ],
+                    options={
+                        'verbose_name': 'История навигации',
+                        'verbose_name_plural': 'История навигации',
+                        'ordering': ['-created_at'],
+                    },
+                ),
             ],
-            options={
-                'verbose_name': 'Кэш действия',
-                'verbose_name_plural': 'Кэш действий',
-                'ordering': ['-created_at'],
-            },
-        ),
-        migrations.CreateModel(
-            name='NavigationHistory',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('content_type', models.CharField(max_length=50, verbose_name='Тип контента')),
-                ('object_id', models.IntegerField(verbose_name='ID объекта')),
-                ('title', models.CharField(max_length=200, verbose_name='Название')),
-                ('path', models.CharField(max_length=500, verbose_name='Путь')),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
-            ],
-            options={
-                'verbose_name': 'История навигации',
-                'verbose_name_plural': 'История навигации',
-                'ordering': ['-created_at'],
-            },
+            database_operations=[],
         ),
     ]
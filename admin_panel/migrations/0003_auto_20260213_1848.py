@@ -10,21 +10,29 @@ class Migration(migrations.Migration):
         ('admin_panel', '0002_deleteditemcache'),
     ]
 
+    # Ремонт истории миграций, как в 0002_actioncache_navigationhistory:
+    # таблицу ElderPermission уже создаёт 0001_initial, поэтому здесь меняется
+    # только состояние моделей, без повторного CREATE TABLE
     operations = [
-        migrations.CreateModel(
-            name='ElderPermission',
-            fields=[
-                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('permissions', models.JSONField(default=dict, verbose_name='Права')),
-                ('can_manage_elders', models.BooleanField(default=False, verbose_name='Управление старостами')),
-                ('max_students', models.IntegerField(default=100, verbose_name='Макс. студентов')),
-                ('created_at', models.DateTimeField(auto_now_add=True)),
-                ('updated_at', models.DateTimeField(auto_now=True)),
-                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='permissions', to='admin_panel.student', verbose_name='Староста')),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ElderPermission',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('permissions', models.JSONField(default=dict, verbose_name='Права')),
+                        ('can_manage_elders', models.BooleanField(default=False, verbose_name='Управление старостами')),
+                        ('max_students', models.IntegerField(default=100, verbose_name='Макс. студентов')),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                        ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='permissions', to='admin_panel.student', verbose_name='Староста')),
+                    ],
+                    options={
+                        'verbose_name': 'Права старосты',
+                        'verbose_name_plural': 'Права старост',
+                    },
+                ),
             ],
-            options={
-                'verbose_name': 'Права старосты',
-                'verbose_name_plural': 'Права старост',
-            },
+            database_operations=[],
         ),
     ]
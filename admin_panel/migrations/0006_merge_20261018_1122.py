@@ -0,0 +1,14 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:22
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0002_actioncache_navigationhistory'),
+        ('admin_panel', '0005_remove_databaselog_user_databaselog_user_id_and_more'),
+    ]
+
+    operations = [
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+def fill_rollups(apps, schema_editor):
+    """Считает студентов по всему дереву для уже существующих данных"""
+    Student = apps.get_model('admin_panel', 'Student')
+    StudentCountRollup = apps.get_model('admin_panel', 'StudentCountRollup')
+
+    paths = {
+        'group': 'group_id',
+        'course': 'group__course_id',
+        'form': 'group__course__form_id',
+        'level': 'group__course__form__level_id',
+    }
+    rows = []
+    students = Student.objects.filter(group__isnull=False)
+    for node_type, path in paths.items():
+        counts = students.values(path, 'group__course__form__level_id').annotate(
+            n=models.Count('id')
+        ).values_list(path, 'group__course__form__level_id', 'n').order_by()
+        for node_id, level_id, n in counts:
+            rows.append(StudentCountRollup(node_type=node_type, node_id=node_id,
+                                           level_id=level_id, student_count=n))
+    StudentCountRollup.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0006_merge_20261018_1122'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='actioncache',
+            name='action',
+            field=models.CharField(choices=[('delete', '🗑️ Удаление'), ('edit', '✏️ Редактирование'), ('move', '🔄 Перемещение'), ('create', '✅ Создание')], max_length=20, verbose_name='Действие'),
+        ),
+        migrations.CreateModel(
+            name='StudentCountRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_type', models.CharField(choices=[('level', 'Уровень образования'), ('form', 'Форма обучения'), ('course', 'Курс'), ('group', 'Группа')], max_length=10, verbose_name='Тип узла')),
+                ('node_id', models.IntegerField(verbose_name='ID узла')),
+                ('level_id', models.IntegerField(db_index=True, verbose_name='Уровень образования')),
+                ('student_count', models.IntegerField(default=0, verbose_name='Студентов')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Счётчик студентов',
+                'verbose_name_plural': 'Счётчики студентов',
+                'unique_together': {('node_type', 'node_id')},
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
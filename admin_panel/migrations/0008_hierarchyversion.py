@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0007_studentcountrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версия')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Версия дерева',
+                'verbose_name_plural': 'Версия дерева',
+            },
+        ),
+    ]
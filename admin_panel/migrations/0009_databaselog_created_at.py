@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:34
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0008_hierarchyversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='databaselog',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
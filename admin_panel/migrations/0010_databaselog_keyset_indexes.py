@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0009_databaselog_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='databaselog',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Лог', 'verbose_name_plural': 'Логи'},
+        ),
+        migrations.AlterField(
+            model_name='databaselog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='databaselog',
+            index=models.Index(fields=['-created_at', '-id'], name='dblog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='databaselog',
+            index=models.Index(fields=['action', '-created_at', '-id'], name='dblog_action_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='databaselog',
+            index=models.Index(fields=['model_name', '-created_at', '-id'], name='dblog_model_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='databaselog',
+            index=models.Index(fields=['user_id', '-created_at', '-id'], name='dblog_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='databaselog',
+            index=models.Index(fields=['object_id', '-created_at', '-id'], name='dblog_object_created_idx'),
+        ),
+    ]
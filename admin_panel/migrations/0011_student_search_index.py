@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations
+
+# Схема и заполнение индекса на момент миграции - копия, а не импорт
+# admin_panel.search_index: изменения модуля не должны менять историю
+FTS_TABLE = 'admin_panel_student_search'
+
+FTS_CREATE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    'name_text, login_text, email_text, '
+    'full_name UNINDEXED, login UNINDEXED, email UNINDEXED, phone UNINDEXED, '
+    'user_type UNINDEXED, is_elder UNINDEXED, is_active UNINDEXED, '
+    '"group" UNINDEXED, path UNINDEXED, '
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+FTS_INSERT = (
+    f'INSERT INTO {FTS_TABLE} (rowid, name_text, login_text, email_text, '
+    'full_name, login, email, phone, user_type, is_elder, is_active, "group", path) '
+    'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'
+)
+
+SOURCE_FIELDS = (
+    'id', 'full_name', 'login', 'email', 'phone', 'user_type', 'is_elder', 'is_active',
+    'group__name', 'group__level__name', 'group__form__name', 'group__course__number',
+)
+
+
+def normalize(text):
+    return (text or '').casefold().replace('ё', 'е')
+
+
+def fts_row(values):
+    (student_id, full_name, login, email, phone, user_type, is_elder, is_active,
+     group_name, level_name, form_name, course_number) = values
+    path_parts = []
+    if group_name:
+        if level_name:
+            path_parts.append(level_name)
+        if form_name:
+            path_parts.append(form_name)
+        if course_number is not None:
+            path_parts.append(f"{course_number} курс")
+        path_parts.append(group_name)
+    return (
+        student_id, normalize(full_name), normalize(login), normalize(email),
+        full_name, login, email or '', phone or '', user_type, bool(is_elder), bool(is_active),
+        group_name or 'Нет группы', ' → '.join(path_parts) if path_parts else 'Нет группы',
+    )
+
+
+def create_search_index(apps, schema_editor):
+    """Таблица FTS5 для поиска студентов и её заполнение (только SQLite с FTS5)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Student = apps.get_model('admin_panel', 'Student')
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(FTS_CREATE)
+        except Exception:
+            # SQLite собран без FTS5 - поиск работает по триграммам
+            return
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        rows = Student.objects.values_list(*SOURCE_FIELDS).iterator(chunk_size=2000)
+        cursor.executemany(FTS_INSERT, [fts_row(values) for values in rows])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0010_databaselog_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_orphans(apps, schema_editor):
+    """Записи с id не студента: история не критична, новая связь их не допускает"""
+    NavigationHistory = apps.get_model('admin_panel', 'NavigationHistory')
+    Student = apps.get_model('admin_panel', 'Student')
+    NavigationHistory.objects.exclude(user_id__in=Student.objects.values('id')).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0011_student_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphans, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='navigationhistory',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='navigation_history', to='admin_panel.student', verbose_name='Пользователь'),
+        ),
+    ]
@@ -1,8 +1,27 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # ==================== ОБРАЗОВАТЕЛЬНЫЕ СТРУКТУРЫ ====================
 
+def _search_reindex(student_ids=None, **lookup):
+    """Обновляет поисковый индекс студентов (путь в дереве хранится в нём)"""
+    from admin_panel import search_index
+    if student_ids is None:
+        student_ids = Student.objects.filter(**lookup).values_list('id', flat=True)
+    search_index.index_students(student_ids)
+
+
+def _student_ids(**lookup):
+    return list(Student.objects.filter(**lookup).values_list('id', flat=True))
+
+
+def _invalidate_principals(student_ids):
+    """Сбрасывает кэшированные снимки пользователей сессий (admin_panel/principals.py)"""
+    from admin_panel import principals
+    principals.invalidate(student_ids)
+
+
 class EducationalLevel(models.Model):
     """Уровень образования (Бакалавриат, Магистратура, Специалитет)"""
     name = models.CharField(max_length=100, verbose_name="Название")
@@ -19,12 +38,25 @@ class EducationalLevel(models.Model):
         return self.name
     
     def student_count(self):
-        count = 0
-        for form in self.forms.all():
-            for course in form.courses.all():
-                for group in course.groups.all():
-                    count += group.students.count()
-        return count
+        return StudentCountRollup.count_for('level', self.id)
+    
+    def save(self, *args, **kwargs):
+        old_name = None
+        if self.pk:
+            old_name = EducationalLevel.objects.filter(pk=self.pk).values_list('name', flat=True).first()
+        super().save(*args, **kwargs)
+        HierarchyVersion.bump()
+        if old_name is not None and old_name != self.name:
+            _search_reindex(group__level=self)
+    
+    def delete(self, *args, **kwargs):
+        level_id = self.id
+        student_ids = _student_ids(group__level=self)
+        result = super().delete(*args, **kwargs)
+        StudentCountRollup.refresh([level_id])
+        _search_reindex(student_ids)
+        _invalidate_principals(student_ids)
+        return result
 
 
 class StudyForm(models.Model):
@@ -43,11 +75,28 @@ class StudyForm(models.Model):
         return f"{self.level.name} - {self.name}"
     
     def student_count(self):
-        count = 0
-        for course in self.courses.all():
-            for group in course.groups.all():
-                count += group.students.count()
-        return count
+        return StudentCountRollup.count_for('form', self.id)
+    
+    def save(self, *args, **kwargs):
+        # Форму перенесли на другой уровень - пересчитываем счётчики обоих уровней
+        old = None
+        if self.pk:
+            old = StudyForm.objects.filter(pk=self.pk).values_list('name', 'level_id').first()
+        super().save(*args, **kwargs)
+        if old and old[1] != self.level_id:
+            StudentCountRollup.refresh([old[1], self.level_id])
+        HierarchyVersion.bump()
+        if old and old[0] != self.name:
+            _search_reindex(group__form=self)
+    
+    def delete(self, *args, **kwargs):
+        level_id = self.level_id
+        student_ids = _student_ids(group__form=self)
+        result = super().delete(*args, **kwargs)
+        StudentCountRollup.refresh([level_id])
+        _search_reindex(student_ids)
+        _invalidate_principals(student_ids)
+        return result
 
 
 class Course(models.Model):
@@ -66,7 +115,28 @@ class Course(models.Model):
         return f"{self.number} курс"
     
     def student_count(self):
-        return sum(group.students.count() for group in self.groups.all())
+        return StudentCountRollup.count_for('course', self.id)
+    
+    def save(self, *args, **kwargs):
+        # Курс перенесли в другую форму - пересчитываем счётчики уровней старой и новой формы
+        old = None
+        if self.pk:
+            old = Course.objects.filter(pk=self.pk).values_list('number', 'form_id', 'form__level_id').first()
+        super().save(*args, **kwargs)
+        if old and old[1] != self.form_id:
+            StudentCountRollup.refresh({old[2], *StudentCountRollup.levels_of_courses([self.id])})
+        HierarchyVersion.bump()
+        if old and old[0] != self.number:
+            _search_reindex(group__course=self)
+    
+    def delete(self, *args, **kwargs):
+        level_ids = StudentCountRollup.levels_of_courses([self.id])
+        student_ids = _student_ids(group__course=self)
+        result = super().delete(*args, **kwargs)
+        StudentCountRollup.refresh(level_ids)
+        _search_reindex(student_ids)
+        _invalidate_principals(student_ids)
+        return result
 
 
 class Group(models.Model):
@@ -88,6 +158,215 @@ class Group(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def student_count(self):
+        return StudentCountRollup.count_for('group', self.id)
+    
+    def save(self, *args, **kwargs):
+        # Группу перенесли на другой курс - пересчитываем счётчики обоих уровней
+        old = None
+        if self.pk:
+            old = Group.objects.filter(pk=self.pk).values_list('course_id', 'name', 'form_id', 'level_id').first()
+        super().save(*args, **kwargs)
+        if old and old[0] != self.course_id:
+            StudentCountRollup.refresh(StudentCountRollup.levels_of_courses([old[0], self.course_id]))
+        HierarchyVersion.bump()
+        # Путь студентов в поисковом индексе
+        if old and old != (self.course_id, self.name, self.form_id, self.level_id):
+            student_ids = _student_ids(group=self)
+            _search_reindex(student_ids)
+            _invalidate_principals(student_ids)
+    
+    def delete(self, *args, **kwargs):
+        level_ids = StudentCountRollup.levels_of_groups([self.id])
+        student_ids = _student_ids(group=self)
+        result = super().delete(*args, **kwargs)
+        StudentCountRollup.refresh(level_ids)
+        _search_reindex(student_ids)
+        _invalidate_principals(student_ids)
+        return result
+
+
+class StudentCountRollup(models.Model):
+    """
+    Число студентов в узлах дерева (уровень, форма, курс, группа).
+    Создание, перевод и удаление одного студента сдвигают счётчики его
+    группы и узлов над ней на ±1; массовые операции и изменения дерева
+    пересчитывают затронутые уровни образования целиком.
+    """
+    NODE_TYPES = [
+        ('level', 'Уровень образования'),
+        ('form', 'Форма обучения'),
+        ('course', 'Курс'),
+        ('group', 'Группа'),
+    ]
+    
+    # Путь от группы до узла каждого типа
+    NODE_PATHS = {
+        'group': 'group_id',
+        'course': 'group__course_id',
+        'form': 'group__course__form_id',
+        'level': 'group__course__form__level_id',
+    }
+    
+    node_type = models.CharField(max_length=10, choices=NODE_TYPES, verbose_name="Тип узла")
+    node_id = models.IntegerField(verbose_name="ID узла")
+    level_id = models.IntegerField(db_index=True, verbose_name="Уровень образования")
+    student_count = models.IntegerField(default=0, verbose_name="Студентов")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Счётчик студентов"
+        verbose_name_plural = "Счётчики студентов"
+        unique_together = ['node_type', 'node_id']
+    
+    def __str__(self):
+        return f"{self.node_type} #{self.node_id}: {self.student_count}"
+    
+    @staticmethod
+    def levels_of_groups(group_ids):
+        """Уровни образования, к которым относятся группы"""
+        group_ids = [group_id for group_id in group_ids if group_id]
+        if not group_ids:
+            return set()
+        return set(Group.objects.filter(id__in=group_ids).values_list('course__form__level_id', flat=True))
+    
+    @staticmethod
+    def levels_of_courses(course_ids):
+        """Уровни образования, к которым относятся курсы"""
+        course_ids = [course_id for course_id in course_ids if course_id]
+        if not course_ids:
+            return set()
+        return set(Course.objects.filter(id__in=course_ids).values_list('form__level_id', flat=True))
+    
+    @classmethod
+    def aggregate(cls, level_ids=None):
+        """
+        Считает студентов по узлам - один агрегирующий запрос на каждый
+        уровень иерархии. Возвращает {(тип узла, id): (уровень, число)}
+        """
+        students = Student.objects.filter(group__isnull=False)
+        if level_ids is not None:
+            students = students.filter(group__course__form__level_id__in=level_ids)
+        
+        counts = {}
+        for node_type, path in cls.NODE_PATHS.items():
+            rows = students.values(path, 'group__course__form__level_id').annotate(
+                n=models.Count('id')
+            ).values_list(path, 'group__course__form__level_id', 'n').order_by()
+            for node_id, level_id, n in rows:
+                counts[(node_type, node_id)] = (level_id, n)
+        return counts
+    
+    @classmethod
+    def refresh(cls, level_ids=None):
+        """Пересчитывает счётчики для уровней образования (или для всего дерева)"""
+        if level_ids is not None:
+            level_ids = [level_id for level_id in level_ids if level_id]
+            if not level_ids:
+                return
+        
+        with transaction.atomic():
+            counts = cls.aggregate(level_ids)
+            rows = cls.objects.all()
+            if level_ids is not None:
+                rows = rows.filter(level_id__in=level_ids)
+            rows.delete()
+            cls.objects.bulk_create([
+                cls(node_type=node_type, node_id=node_id, level_id=level_id, student_count=n)
+                for (node_type, node_id), (level_id, n) in counts.items()
+            ])
+            HierarchyVersion.bump()
+    
+    @classmethod
+    def shift(cls, group_id, delta):
+        """Сдвигает на delta счётчики группы и её курса, формы и уровня"""
+        if not group_id or not delta:
+            return
+        path = Group.objects.filter(id=group_id).values_list(
+            'course_id', 'course__form_id', 'course__form__level_id'
+        ).first()
+        if path is None or path[2] is None:
+            return
+        course_id, form_id, level_id = path
+        nodes = (
+            models.Q(node_type='group', node_id=group_id)
+            | models.Q(node_type='course', node_id=course_id)
+            | models.Q(node_type='form', node_id=form_id)
+            | models.Q(node_type='level', node_id=level_id)
+        )
+        with transaction.atomic():
+            updated = cls.objects.filter(nodes).update(
+                student_count=models.F('student_count') + delta, updated_at=timezone.now()
+            )
+            if updated < len(cls.NODE_PATHS):
+                # Первый студент узла - строки счётчика ещё нет, пересчитываем уровень
+                cls.refresh([level_id])
+                return
+            HierarchyVersion.bump()
+    
+    @classmethod
+    def counts(cls, node_type, node_ids=None):
+        """{id узла: число студентов} для узлов одного типа (одним запросом)"""
+        rows = cls.objects.filter(node_type=node_type)
+        if node_ids is not None:
+            rows = rows.filter(node_id__in=list(node_ids))
+        return dict(rows.values_list('node_id', 'student_count'))
+    
+    @classmethod
+    def count_for(cls, node_type, node_id):
+        return cls.counts(node_type, [node_id]).get(node_id, 0)
+    
+    @classmethod
+    def attach(cls, levels):
+        """
+        Проставляет student_total во всё дерево уровней (формы, курсы и группы
+        должны быть предзагружены) - одним запросом к таблице счётчиков.
+        Метод student_count() узлов при этом не затирается.
+        """
+        counts = {}
+        for node_type, node_id, n in cls.objects.values_list('node_type', 'node_id', 'student_count'):
+            counts[(node_type, node_id)] = n
+        for level in levels:
+            level.student_total = counts.get(('level', level.id), 0)
+            for form in level.forms.all():
+                form.student_total = counts.get(('form', form.id), 0)
+                for course in form.courses.all():
+                    course.student_total = counts.get(('course', course.id), 0)
+                    for group in course.groups.all():
+                        group.student_total = counts.get(('group', group.id), 0)
+        return levels
+
+
+class HierarchyVersion(models.Model):
+    """
+    Версия дерева уровней/форм/курсов/групп вместе со счётчиками студентов.
+    Увеличивается при любом изменении дерева, по ней строится ETag api/tree/
+    """
+    version = models.PositiveIntegerField(default=0, verbose_name="Версия")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Версия дерева"
+        verbose_name_plural = "Версия дерева"
+    
+    def __str__(self):
+        return f"Версия дерева {self.version}"
+    
+    @classmethod
+    def current(cls):
+        """Объект версии (создаётся при первом обращении)"""
+        obj, created = cls.objects.get_or_create(pk=1)
+        return obj
+    
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1, updated_at=timezone.now()):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
+    
+    @property
+    def etag(self):
+        return f'tree-{self.version}-{int(self.updated_at.timestamp())}'
 
 
 # ==================== ПОЛЬЗОВАТЕЛИ ====================
@@ -133,7 +412,27 @@ class Student(models.Model):
             import string
             chars = string.ascii_letters + string.digits
             self.password = ''.join(random.choice(chars) for _ in range(8))
+        
+        # Счётчики дерева сдвигаем только при смене группы
+        old_group_id = None
+        if self.pk:
+            old_group_id = Student.objects.filter(pk=self.pk).values_list('group_id', flat=True).first()
         super().save(*args, **kwargs)
+        if old_group_id != self.group_id:
+            StudentCountRollup.shift(old_group_id, -1)
+            StudentCountRollup.shift(self.group_id, 1)
+        _search_reindex([self.pk])
+        # Пароль, группа, роль - снимок сессии перечитается при следующем запросе
+        _invalidate_principals([self.pk])
+    
+    def delete(self, *args, **kwargs):
+        from admin_panel import search_index
+        student_id, group_id = self.pk, self.group_id
+        result = super().delete(*args, **kwargs)
+        StudentCountRollup.shift(group_id, -1)
+        search_index.remove_students([student_id])
+        _invalidate_principals([student_id])
+        return result
 
 
 # ==================== ПРАВА И РАЗРЕШЕНИЯ ====================
@@ -252,19 +551,30 @@ class DatabaseLog(models.Model):
     object_id = models.IntegerField(null=True, blank=True, verbose_name="ID объекта")
     details = models.JSONField(default=dict, verbose_name="Детали")
     ip_address = models.GenericIPAddressField(null=True, blank=True, verbose_name="IP адрес")
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Время события задаётся при постановке в очередь аудита, а не при записи
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         verbose_name = "Лог"
         verbose_name_plural = "Логи"
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        # Постраничный просмотр идёт по (created_at, id), в том числе с фильтрами
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='dblog_created_idx'),
+            models.Index(fields=['action', '-created_at', '-id'], name='dblog_action_created_idx'),
+            models.Index(fields=['model_name', '-created_at', '-id'], name='dblog_model_created_idx'),
+            models.Index(fields=['user_id', '-created_at', '-id'], name='dblog_user_created_idx'),
+            models.Index(fields=['object_id', '-created_at', '-id'], name='dblog_object_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_action_display()} - {self.model_name} - {self.created_at}"
 
 class NavigationHistory(models.Model):
     """История навигации для кнопок Назад/Вперёд"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Пользователь")
+    # admin_id сессии - это id Student, а не auth.User
+    user = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='navigation_history',
+                             verbose_name="Пользователь")
     content_type = models.CharField(max_length=50, verbose_name="Тип контента")
     object_id = models.IntegerField(verbose_name="ID объекта")
     title = models.CharField(max_length=200, verbose_name="Название")
@@ -0,0 +1,104 @@
+# admin_panel/navigation.py
+"""
+Фоновая запись истории навигации.
+
+События складываются в очередь в памяти процесса, фоновый поток пишет их
+пачками (bulk_create) - когда набралось NAVIGATION_HISTORY_BATCH_SIZE
+событий или прошло NAVIGATION_HISTORY_FLUSH_INTERVAL секунд. Раз в
+NAVIGATION_HISTORY_COMPACT_INTERVAL секунд у пользователей, по которым
+были записи, остаются только последние NAVIGATION_HISTORY_KEEP записей.
+Запрос на просмотр папки не ждёт записи в базу. NAVIGATION_HISTORY_ASYNC =
+False - событие пишется сразу в потоке запроса (тесты, замеры bench_views).
+"""
+import atexit
+import time
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
+
+from admin_panel.models import NavigationHistory
+from journal_project.batch_writer import BatchWriter
+
+
+def _setting(name, default):
+    return getattr(settings, f'NAVIGATION_HISTORY_{name}', default)
+
+
+class NavigationHistoryWriter(BatchWriter):
+    """Буфер событий навигации с компактацией до последних keep записей"""
+
+    thread_name = 'navigation-history-writer'
+
+    def __init__(self, keep=50, compact_interval=300.0, **kwargs):
+        super().__init__(idle_interval=compact_interval, **kwargs)
+        self.keep = keep
+        self.compact_interval = compact_interval
+        self._touched_users = set()
+        self._last_compact = time.monotonic()
+
+    def record(self, user_id, content_type, object_id, title, path):
+        """Ставит событие в очередь (не блокирует запрос) или пишет сразу"""
+        item = NavigationHistory(
+            user_id=user_id,
+            content_type=content_type,
+            object_id=object_id,
+            title=title[:200],
+            path=path[:500],
+        )
+        if not _setting('ASYNC', True):
+            try:
+                with self.lock:
+                    item.save()
+                    self._touched_users.add(user_id)
+            except (OperationalError, InterfaceError):
+                # Временная ошибка базы - повтор в фоне, как у пачек
+                self.put(item)
+            self.on_idle()
+            return
+        # История не критична - при переполнении очереди событие теряется
+        self.put(item)
+
+    def write_batch(self, batch):
+        failed = self.bulk_insert(NavigationHistory, batch)
+        self._touched_users.update(item.user_id for item in batch)
+        return failed
+
+    def on_idle(self):
+        if time.monotonic() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def compact(self, user_ids=None):
+        """Оставляет каждому пользователю только последние self.keep записей"""
+        with self.lock:
+            if user_ids is None:
+                user_ids, self._touched_users = self._touched_users, set()
+            self._last_compact = time.monotonic()
+            deleted = 0
+            for user_id in user_ids:
+                # id самой старой записи, которую нужно оставить
+                boundary = list(
+                    NavigationHistory.objects.filter(user_id=user_id)
+                    .order_by('-id').values_list('id', flat=True)[self.keep - 1:self.keep]
+                )
+                if boundary:
+                    deleted += NavigationHistory.objects.filter(
+                        user_id=user_id, id__lt=boundary[0]
+                    ).delete()[0]
+            return deleted
+
+
+writer = NavigationHistoryWriter(
+    batch_size=_setting('BATCH_SIZE', 50),
+    flush_interval=_setting('FLUSH_INTERVAL', 2.0),
+    keep=_setting('KEEP', 50),
+    compact_interval=_setting('COMPACT_INTERVAL', 300.0),
+    max_queue=_setting('MAX_QUEUE', 10000),
+)
+
+# Дописываем хвост очереди при остановке процесса
+atexit.register(writer.flush)
+
+
+def record_navigation(user_id, content_type, object_id, title, path):
+    """Записывает переход в историю навигации (в фоне)"""
+    writer.record(user_id, content_type, object_id, title, path)
@@ -0,0 +1,170 @@
+# admin_panel/principals.py
+"""
+Пользователь сессии без запросов к базе.
+
+Снимок пользователя и его группы (поля без пароля) хранится в кэше
+CACHES['principals'] по ID. PrincipalMiddleware по ключам сессии
+(student_id, elder_id, admin_id) кладёт в request.student, request.elder
+и request.admin объекты Student с уже загруженной группой - в обычном
+случае без единого запроса.
+
+Снимок сбрасывается при сохранении и удалении студента, при изменении
+и удалении его группы и узлов дерева над ней (save()/delete() моделей).
+При кэше в памяти процесса (по умолчанию) другие процессы увидят
+изменения не позже чем через PRINCIPAL_CACHE_TIMEOUT секунд.
+
+aget_student/afrom_request - для async view; PrincipalMiddleware работает
+в обоих режимах и под ASGI не переводит запрос в поток.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import caches
+
+from admin_panel.models import Student, Group
+
+PRINCIPAL_CACHE_ALIAS = 'principals'
+
+# Версия формата снимка - входит в ключ, при смене полей старые снимки не читаются
+SNAPSHOT_VERSION = 1
+
+STUDENT_FIELDS = (
+    'id', 'login', 'full_name', 'email', 'phone', 'group_id', 'user_type',
+    'is_elder', 'is_active', 'telegram_id', 'created_at', 'updated_at',
+)
+GROUP_FIELDS = ('id', 'name', 'course_id', 'form_id', 'level_id', 'created_at', 'updated_at')
+
+# Роль -> ключ сессии
+SESSION_KEYS = {
+    'student': 'student_id',
+    'elder': 'elder_id',
+    'admin': 'admin_id',
+}
+
+
+def _cache():
+    return caches[PRINCIPAL_CACHE_ALIAS]
+
+
+def _key(student_id):
+    return f'v{SNAPSHOT_VERSION}:{student_id}'
+
+
+def _snapshot_queryset(student_id):
+    return Student.objects.select_related('group').filter(id=student_id)
+
+
+def _dump(student):
+    if student is None:
+        return None
+    return {
+        'student': [getattr(student, field) for field in STUDENT_FIELDS],
+        'group': [getattr(student.group, field) for field in GROUP_FIELDS] if student.group else None,
+    }
+
+
+def _snapshot(student_id):
+    return _dump(_snapshot_queryset(student_id).first())
+
+
+async def _asnapshot(student_id):
+    return _dump(await _snapshot_queryset(student_id).afirst())
+
+
+def _build(snapshot):
+    db = Student.objects.db
+    # Поля, которых нет в снимке (пароль), загрузятся при обращении
+    student = Student.from_db(db, STUDENT_FIELDS, snapshot['student'])
+    group = Group.from_db(db, GROUP_FIELDS, snapshot['group']) if snapshot['group'] else None
+    Student.group.field.set_cached_value(student, group)
+    return student
+
+
+def get_student(student_id):
+    """Student с загруженной группой из кэша; Student.DoesNotExist, если его нет"""
+    if not student_id:
+        raise Student.DoesNotExist
+    key = _key(student_id)
+    snapshot = _cache().get(key)
+    if snapshot is None:
+        snapshot = _snapshot(student_id)
+        if snapshot is None:
+            raise Student.DoesNotExist
+        _cache().set(key, snapshot)
+    return _build(snapshot)
+
+
+def from_request(request, role):
+    """Пользователь сессии для роли ('student', 'elder', 'admin'); Student.DoesNotExist, если его нет"""
+    student = getattr(request, role, None)
+    if student is None:
+        student = get_student(request.session.get(SESSION_KEYS[role]))
+    return student
+
+
+async def aget_student(student_id):
+    """Асинхронный get_student"""
+    if not student_id:
+        raise Student.DoesNotExist
+    key = _key(student_id)
+    snapshot = await _cache().aget(key)
+    if snapshot is None:
+        snapshot = await _asnapshot(student_id)
+        if snapshot is None:
+            raise Student.DoesNotExist
+        await _cache().aset(key, snapshot)
+    return _build(snapshot)
+
+
+async def afrom_request(request, role):
+    """Асинхронный from_request"""
+    student = getattr(request, role, None)
+    if student is None:
+        student = await aget_student(await request.session.aget(SESSION_KEYS[role]))
+    return student
+
+
+def invalidate(student_ids):
+    """Сбрасывает снимки пользователей"""
+    keys = [_key(student_id) for student_id in student_ids if student_id]
+    if keys:
+        _cache().delete_many(keys)
+
+
+class PrincipalMiddleware:
+    """request.student / request.elder / request.admin по ключам сессии (None - не вошёл или удалён)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        session = getattr(request, 'session', None)
+        for role, session_key in SESSION_KEYS.items():
+            student = None
+            student_id = session.get(session_key) if session is not None else None
+            if student_id:
+                try:
+                    student = get_student(student_id)
+                except Student.DoesNotExist:
+                    pass
+            setattr(request, role, student)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        session = getattr(request, 'session', None)
+        for role, session_key in SESSION_KEYS.items():
+            student = None
+            student_id = await session.aget(session_key) if session is not None else None
+            if student_id:
+                try:
+                    student = await aget_student(student_id)
+                except Student.DoesNotExist:
+                    pass
+            setattr(request, role, student)
+        return await self.get_response(request)
@@ -0,0 +1,344 @@
+# admin_panel/search_index.py
+"""
+Поисковый индекс студентов для search_items.
+
+Основной вариант - виртуальная таблица SQLite FTS5 (миграция 0011):
+поиск по префиксам слов ФИО, логина и email без учёта регистра (в том
+числе кириллицы, ё = е), ранжирование bm25. В индексе лежат и данные для
+выдачи, включая путь в дереве, поэтому поиск - один запрос без JOIN.
+
+Если FTS5 нет (другая СУБД или SQLite без FTS5), используется триграммный
+индекс в памяти процесса. Он строится при первом поиске и перестраивается
+раз в SEARCH_INDEX_FALLBACK_TTL секунд - изменения из других процессов
+видны не сразу.
+
+Индекс обновляют save()/delete() студента и узлов дерева (при переименовании
+меняется путь), массовый импорт и команда rebuild_search_index.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+FTS_TABLE = 'admin_panel_student_search'
+
+# Столбцы FTS5: сначала нормализованный текст для поиска, затем данные для выдачи
+FTS_CREATE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    'name_text, login_text, email_text, '
+    'full_name UNINDEXED, login UNINDEXED, email UNINDEXED, phone UNINDEXED, '
+    'user_type UNINDEXED, is_elder UNINDEXED, is_active UNINDEXED, '
+    '"group" UNINDEXED, path UNINDEXED, '
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+# Веса bm25 для name_text, login_text, email_text
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+RESULT_FIELDS = (
+    'full_name', 'login', 'email', 'phone', 'user_type', 'is_elder', 'is_active', 'group', 'path',
+)
+
+# Поля студента, из которых собирается документ индекса
+SOURCE_FIELDS = (
+    'id', 'full_name', 'login', 'email', 'phone', 'user_type', 'is_elder', 'is_active',
+    'group__name', 'group__level__name', 'group__form__name', 'group__course__number',
+)
+
+_RESULT_COLUMNS = ', '.join(f'"{field}"' for field in RESULT_FIELDS)
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Регистр и ё: «Пётр» и «ПЕТР» ищутся одинаково"""
+    return (text or '').casefold().replace('ё', 'е')
+
+
+def query_terms(query):
+    return _WORD.findall(normalize(query))
+
+
+def _document(values):
+    (student_id, full_name, login, email, phone, user_type, is_elder, is_active,
+     group_name, level_name, form_name, course_number) = values
+    path_parts = []
+    if group_name:
+        if level_name:
+            path_parts.append(level_name)
+        if form_name:
+            path_parts.append(form_name)
+        if course_number is not None:
+            path_parts.append(f"{course_number} курс")
+        path_parts.append(group_name)
+    return {
+        'id': student_id,
+        'full_name': full_name,
+        'login': login,
+        'email': email or '',
+        'phone': phone or '',
+        'user_type': user_type,
+        'is_elder': bool(is_elder),
+        'is_active': bool(is_active),
+        'group': group_name or 'Нет группы',
+        'path': ' → '.join(path_parts) if path_parts else 'Нет группы',
+    }
+
+
+def documents(students):
+    """Документы индекса для queryset студентов"""
+    for values in students.values_list(*SOURCE_FIELDS).iterator(chunk_size=2000):
+        yield _document(values)
+
+
+def _documents(student_ids=None):
+    from admin_panel.models import Student
+    students = Student.objects.all()
+    if student_ids is not None:
+        students = students.filter(id__in=student_ids)
+    return documents(students)
+
+
+# ==================== FTS5 ====================
+
+_fts_state = {}
+
+
+def fts_available():
+    """Есть ли таблица FTS5 в текущей базе (проверяется один раз на базу)"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _fts_state:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_state[name] = cursor.fetchone() is not None
+    return _fts_state[name]
+
+
+def create_fts_table(cursor):
+    """Создаёт таблицу FTS5; False - SQLite собран без FTS5"""
+    try:
+        cursor.execute(FTS_CREATE)
+    except Exception:
+        return False
+    _fts_state.clear()
+    return True
+
+
+def drop_fts_table(cursor):
+    cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_state.clear()
+
+
+def _fts_delete(cursor, student_ids):
+    ids = list(student_ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(chunk))})', chunk
+        )
+
+
+def fts_insert(cursor, docs):
+    cursor.executemany(
+        f'INSERT INTO {FTS_TABLE} (rowid, name_text, login_text, email_text, {_RESULT_COLUMNS}) '
+        f'VALUES ({", ".join(["%s"] * (4 + len(RESULT_FIELDS)))})',
+        [
+            (doc['id'], normalize(doc['full_name']), normalize(doc['login']), normalize(doc['email']),
+             *(doc[field] for field in RESULT_FIELDS))
+            for doc in docs
+        ],
+    )
+
+
+def _fts_search(terms, limit):
+    # Каждое слово запроса - префикс какого-то слова в ФИО, логине или email
+    match = '{name_text login_text email_text} : (' + ' AND '.join(f'"{term}"*' for term in terms) + ')'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, {_RESULT_COLUMNS} '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, {", ".join(map(str, FTS_WEIGHTS))}), full_name LIMIT %s',
+            [match, limit],
+        )
+        rows = cursor.fetchall()
+    results = []
+    for row in rows:
+        result = {'id': row[0], **dict(zip(RESULT_FIELDS, row[1:]))}
+        result['is_elder'] = bool(result['is_elder'])
+        result['is_active'] = bool(result['is_active'])
+        results.append(result)
+    return results
+
+
+# ==================== ТРИГРАММЫ (ЗАПАСНОЙ ВАРИАНТ) ====================
+
+class TrigramIndex:
+    """
+    Индекс в памяти: триграммы начал слов -> ID студентов.
+    Слово с меткой начала '\\x02ива...' даёт триграммы, по которым
+    находятся документы, где какое-то слово начинается с запроса.
+    """
+
+    # Вес совпадения в поле (как FTS_WEIGHTS)
+    WEIGHTS = (('full_name', 10), ('login', 5), ('email', 1))
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.docs = {}
+        self.words = {}
+        self.grams = defaultdict(set)
+        self.built_at = None
+
+    @staticmethod
+    def _trigrams(word):
+        marked = '\x02' + word
+        return {marked[i:i + 3] for i in range(len(marked) - 2)}
+
+    def _add(self, doc):
+        words = {field: set(_WORD.findall(normalize(doc[field]))) for field, _ in self.WEIGHTS}
+        self.docs[doc['id']] = doc
+        self.words[doc['id']] = words
+        for field_words in words.values():
+            for word in field_words:
+                for gram in self._trigrams(word):
+                    self.grams[gram].add(doc['id'])
+
+    def _remove(self, student_id):
+        words = self.words.pop(student_id, None)
+        self.docs.pop(student_id, None)
+        if not words:
+            return
+        for field_words in words.values():
+            for word in field_words:
+                for gram in self._trigrams(word):
+                    self.grams[gram].discard(student_id)
+
+    def rebuild(self):
+        with self.lock:
+            self.docs, self.words, self.grams = {}, {}, defaultdict(set)
+            for doc in _documents():
+                self._add(doc)
+            self.built_at = time.monotonic()
+
+    def update(self, docs, removed_ids=()):
+        with self.lock:
+            if self.built_at is None:
+                return
+            for student_id in removed_ids:
+                self._remove(student_id)
+            for doc in docs:
+                self._remove(doc['id'])
+                self._add(doc)
+
+    def _ensure_fresh(self):
+        if self.built_at is None or time.monotonic() - self.built_at > self.ttl:
+            self.rebuild()
+
+    def search(self, terms, limit):
+        self._ensure_fresh()
+        with self.lock:
+            candidates = None
+            for term in terms:
+                # У однобуквенного слова триграмм нет - проверяется перебором ниже
+                for gram in self._trigrams(term):
+                    ids = self.grams.get(gram, set())
+                    candidates = set(ids) if candidates is None else candidates & ids
+            if candidates is None:
+                candidates = set(self.docs)
+
+            scored = []
+            for student_id in candidates:
+                words = self.words[student_id]
+                score = 0
+                for term in terms:
+                    term_score = max(
+                        (weight for field, weight in self.WEIGHTS
+                         if any(word.startswith(term) for word in words[field])),
+                        default=0,
+                    )
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    doc = self.docs[student_id]
+                    scored.append((-score, doc['full_name'], doc))
+            scored.sort(key=lambda item: item[:2])
+            return [dict(doc) for _, _, doc in scored[:limit]]
+
+
+trigram_index = TrigramIndex(ttl=getattr(settings, 'SEARCH_INDEX_FALLBACK_TTL', 300.0))
+
+
+# ==================== API ====================
+
+def backend():
+    mode = getattr(settings, 'SEARCH_INDEX_BACKEND', 'auto')
+    if mode == 'trigram' or not fts_available():
+        return 'trigram'
+    return 'fts5'
+
+
+def search(query, limit=50):
+    """Студенты, у которых каждое слово запроса - начало слова в ФИО, логине или email"""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    if backend() == 'fts5':
+        return _fts_search(terms, limit)
+    return trigram_index.search(terms, limit)
+
+
+def index_students(student_ids):
+    """Переиндексирует студентов; отсутствующих в базе убирает из индекса"""
+    student_ids = set(student_ids)
+    if not student_ids:
+        return
+    docs = list(_documents(student_ids))
+    removed = student_ids - {doc['id'] for doc in docs}
+    if fts_available():
+        with connection.cursor() as cursor:
+            _fts_delete(cursor, student_ids)
+            fts_insert(cursor, docs)
+    trigram_index.update(docs, removed)
+
+
+def index_queryset(students):
+    """Переиндексирует студентов из queryset (например, всех студентов группы)"""
+    index_students(students.values_list('id', flat=True))
+
+
+def remove_students(student_ids):
+    student_ids = set(student_ids)
+    if fts_available():
+        with connection.cursor() as cursor:
+            _fts_delete(cursor, student_ids)
+    trigram_index.update([], student_ids)
+
+
+def rebuild():
+    """Полная перестройка индекса; возвращает число проиндексированных студентов"""
+    if not fts_available():
+        trigram_index.rebuild()
+        return len(trigram_index.docs)
+
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        batch = []
+        for doc in _documents():
+            batch.append(doc)
+            if len(batch) >= 1000:
+                fts_insert(cursor, batch)
+                count += len(batch)
+                batch = []
+        fts_insert(cursor, batch)
+        count += len(batch)
+    if trigram_index.built_at is not None:
+        trigram_index.rebuild()
+    return count
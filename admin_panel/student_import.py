@@ -0,0 +1,391 @@
+# admin_panel/student_import.py
+"""
+Массовый импорт студентов из CSV/XLSX.
+
+Файл читается потоком и обрабатывается пачками по IMPORT_CHUNK_SIZE строк:
+на пачку - один запрос за группами по названиям (или ID), один IN-запрос
+за уже занятыми логинами и bulk_create студентов, профилей и прав старост.
+Весь импорт идёт в одной транзакции. Строки с ошибками пропускаются и
+попадают в отчёт, остальные создаются; dry_run - только проверка.
+"""
+import csv
+import io
+import itertools
+import random
+import string
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+
+from admin_panel.models import Student, Group, ElderPermission, StudentCountRollup
+from admin_panel import audit, principals, search_index
+from students.models import StudentProfile
+
+IMPORT_CHUNK_SIZE = 500
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+# Поле -> допустимые заголовки столбца (без учёта регистра)
+COLUMNS = {
+    'full_name': ('full_name', 'фио', 'студент', 'имя'),
+    'login': ('login', 'логин'),
+    'password': ('password', 'пароль'),
+    'group': ('group', 'группа'),
+    'group_id': ('group_id', 'id группы'),
+    'email': ('email', 'почта'),
+    'phone': ('phone', 'телефон'),
+    'user_type': ('user_type', 'тип'),
+    'is_elder': ('is_elder', 'староста'),
+}
+
+TRUE_VALUES = ('1', 'true', 'yes', 'да', '+', 'on')
+
+PASSWORD_CHARS = string.ascii_letters + string.digits
+
+
+def generate_password(length=8):
+    """Пароль как у Student.save() - bulk_create save() не вызывает"""
+    return ''.join(random.choices(PASSWORD_CHARS, k=length))
+
+
+def detect_format(filename):
+    return 'xlsx' if filename.lower().endswith('.xlsx') else 'csv'
+
+
+# ==================== ЧТЕНИЕ ФАЙЛА ====================
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    first = text.readline()
+    # Excel в русской локали сохраняет CSV через ';'
+    delimiter = ';' if first.count(';') >= first.count(',') else ','
+    yield from csv.reader(itertools.chain([first], text), delimiter=delimiter)
+
+
+_XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def _xlsx_text(element):
+    return ''.join(t.text or '' for t in element.iter(f'{_XLSX_NS}t'))
+
+
+def _xlsx_column(ref):
+    """'C12' -> 2"""
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord('A') + 1
+    return index - 1
+
+
+def _iter_xlsx(fileobj):
+    """Строки первого листа XLSX; лист разбирается потоком (iterparse)"""
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise ValueError('Файл не является XLSX')
+
+    with archive:
+        shared = []
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            with archive.open('xl/sharedStrings.xml') as f:
+                for _, element in iterparse(f):
+                    if element.tag == f'{_XLSX_NS}si':
+                        shared.append(_xlsx_text(element))
+                        element.clear()
+
+        sheets = sorted(name for name in archive.namelist()
+                        if name.startswith('xl/worksheets/') and name.endswith('.xml'))
+        if not sheets:
+            raise ValueError('В файле XLSX нет листов')
+        sheet = 'xl/worksheets/sheet1.xml' if 'xl/worksheets/sheet1.xml' in sheets else sheets[0]
+
+        with archive.open(sheet) as f:
+            for _, element in iterparse(f):
+                if element.tag != f'{_XLSX_NS}row':
+                    continue
+                row = []
+                for cell in element.iter(f'{_XLSX_NS}c'):
+                    column = _xlsx_column(cell.get('r', '')) if cell.get('r') else len(row)
+                    cell_type = cell.get('t')
+                    value_element = cell.find(f'{_XLSX_NS}v')
+                    value = value_element.text if value_element is not None else None
+                    if cell_type == 's' and value is not None:
+                        value = shared[int(value)]
+                    elif cell_type == 'inlineStr':
+                        value = _xlsx_text(cell)
+                    elif cell_type is None and value and value.endswith('.0'):
+                        # Целые числа (логины, телефоны) Excel может хранить как 123.0
+                        value = value[:-2]
+                    row.extend([''] * (column - len(row)))
+                    row.append(value or '')
+                yield row
+                element.clear()
+
+
+def iter_records(fileobj, file_format='csv'):
+    """
+    (номер строки, {поле: значение}) для каждой непустой строки файла.
+    Первая непустая строка - заголовок.
+    """
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат: {file_format}')
+    rows = _iter_csv(fileobj) if file_format == 'csv' else _iter_xlsx(fileobj)
+
+    fields = None
+    for line, row in enumerate(rows, start=1):
+        values = [str(value).strip() for value in row]
+        if not any(values):
+            continue
+        if fields is None:
+            aliases = {alias: field for field, names in COLUMNS.items() for alias in names}
+            fields = [aliases.get(value.lower()) for value in values]
+            if 'full_name' not in fields or 'login' not in fields:
+                raise ValueError('В заголовке нужны столбцы «ФИО» (full_name) и «Логин» (login)')
+            continue
+        yield line, {field: value for field, value in zip(fields, values) if field}
+
+    if fields is None:
+        raise ValueError('Файл пуст')
+
+
+# ==================== ИМПОРТ ====================
+
+class StudentImport:
+    """Состояние одного импорта: кэш групп, логины из файла, отчёт"""
+
+    def __init__(self, group=None, dry_run=False, max_students=None, students_only=False,
+                 chunk_size=IMPORT_CHUNK_SIZE):
+        # group - все строки идут в эту группу, столбцы группы не читаются
+        if students_only and group is None:
+            # Импорт старосты - только в его группу, группы из файла не принимаются
+            raise ValueError('Для импорта старосты нужна его группа')
+        self.group = group
+        self.students_only = students_only
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size
+        self.capacity = None
+        if group is not None and max_students:
+            self.capacity = max(0, max_students - group.students.count())
+        self.groups_by_name = {}
+        self.group_ids = set()
+        self.seen_logins = set()
+        self.touched_group_ids = set()
+        self.rows = []
+        self.created = 0
+
+    # ---------- Группы ----------
+
+    def _resolve_groups(self, records):
+        """Один запрос за всеми ещё неизвестными группами пачки"""
+        if self.group is not None:
+            return
+        names = {r['group'] for _, r in records if r.get('group') and not r.get('group_id')} - set(self.groups_by_name)
+        ids = {int(r['group_id']) for _, r in records if r.get('group_id', '').isdigit()} - self.group_ids
+        if not names and not ids:
+            return
+        found = Group.objects.filter(
+            Q(name__in=names) | Q(id__in=ids)
+        ).values_list('id', 'name')
+        for group_id, name in found:
+            self.group_ids.add(group_id)
+            if name in names:
+                # Одинаковые названия на разных курсах - группу по имени не определить
+                self.groups_by_name[name] = None if name in self.groups_by_name else group_id
+        for name in names:
+            self.groups_by_name.setdefault(name, 0)
+
+    def _group_id(self, record, errors):
+        if self.group is not None:
+            return self.group.id
+        if record.get('group_id'):
+            if not record['group_id'].isdigit() or int(record['group_id']) not in self.group_ids:
+                errors.append(f'Группа с ID {record["group_id"]} не найдена')
+                return None
+            return int(record['group_id'])
+        if record.get('group'):
+            group_id = self.groups_by_name.get(record['group'])
+            if group_id is None:
+                errors.append(f'Несколько групп с названием «{record["group"]}», укажите group_id')
+            elif group_id == 0:
+                errors.append(f'Группа «{record["group"]}» не найдена')
+            return group_id or None
+        return None
+
+    # ---------- Проверка строки ----------
+
+    def _validate(self, record, taken_logins):
+        errors = []
+        full_name = record.get('full_name', '')
+        login = record.get('login', '')
+        if not full_name:
+            errors.append('Не указано ФИО')
+        elif len(full_name) > 200:
+            errors.append('ФИО длиннее 200 символов')
+        if not login:
+            errors.append('Не указан логин')
+        elif len(login) > 100:
+            errors.append('Логин длиннее 100 символов')
+        elif login in taken_logins:
+            errors.append(f'Логин «{login}» уже существует')
+        elif login in self.seen_logins:
+            errors.append(f'Логин «{login}» повторяется в файле')
+
+        user_type = record.get('user_type') or 'student'
+        if self.students_only:
+            user_type = 'student'
+        elif user_type not in dict(Student.USER_TYPES):
+            errors.append(f'Неизвестный тип пользователя: {user_type}')
+
+        if record.get('email'):
+            try:
+                validate_email(record['email'])
+            except ValidationError:
+                errors.append(f'Некорректный email: {record["email"]}')
+        if len(record.get('phone', '')) > 20:
+            errors.append('Телефон длиннее 20 символов')
+        if len(record.get('password', '')) > 128:
+            errors.append('Пароль длиннее 128 символов')
+
+        group_id = self._group_id(record, errors)
+
+        if not errors and self.capacity is not None:
+            if self.capacity <= 0:
+                errors.append('Достигнут лимит студентов группы')
+            else:
+                self.capacity -= 1
+
+        if not errors:
+            self.seen_logins.add(login)
+        return errors, user_type, group_id
+
+    # ---------- Пачка ----------
+
+    def process_chunk(self, records):
+        self._resolve_groups(records)
+        logins = {record['login'] for _, record in records if record.get('login')}
+        taken = set(Student.objects.filter(login__in=logins).values_list('login', flat=True))
+
+        students = []
+        for line, record in records:
+            errors, user_type, group_id = self._validate(record, taken)
+            row = {'row': line, 'login': record.get('login', ''), 'full_name': record.get('full_name', '')}
+            if errors:
+                row.update(status='error', errors=errors)
+                self.rows.append(row)
+                continue
+
+            generated = not record.get('password')
+            is_elder = (not self.students_only and user_type == 'student'
+                        and record.get('is_elder', '').lower() in TRUE_VALUES)
+            student = Student(
+                login=record['login'],
+                password=record.get('password') or generate_password(),
+                full_name=record['full_name'],
+                email=record.get('email') or None,
+                phone=record.get('phone') or None,
+                group_id=group_id,
+                user_type=user_type,
+                is_elder=is_elder,
+                is_active=True,
+            )
+            row['status'] = 'ok' if self.dry_run else 'created'
+            if generated:
+                row['password'] = student.password
+            students.append((student, row))
+            self.rows.append(row)
+
+        if self.dry_run or not students:
+            return
+        self._create([student for student, _ in students])
+        for student, row in students:
+            row['id'] = student.id
+
+    def _create(self, students):
+        Student.objects.bulk_create(students, batch_size=self.chunk_size)
+        if any(student.pk is None for student in students):
+            # База не вернула ID из bulk_create - дочитываем по логинам
+            ids = dict(Student.objects.filter(
+                login__in=[student.login for student in students]
+            ).values_list('login', 'id'))
+            for student in students:
+                student.pk = student.id = ids[student.login]
+
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user_id=student.id, group_id=student.group_id, total_hours=0, remaining_hours=20)
+            for student in students if student.user_type in ('student', 'elder')
+        ], batch_size=self.chunk_size)
+        ElderPermission.objects.bulk_create([
+            ElderPermission(student_id=student.id)
+            for student in students if student.user_type == 'elder' or student.is_elder
+        ], batch_size=self.chunk_size)
+
+        search_index.index_students([student.id for student in students])
+        # ID удалённых ранее пользователей могут повториться - старые снимки сессий не нужны
+        principals.invalidate([student.id for student in students])
+        self.created += len(students)
+        self.touched_group_ids.update(student.group_id for student in students if student.group_id)
+
+    # ---------- Весь файл ----------
+
+    def run(self, records):
+        with transaction.atomic():
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    self.process_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.process_chunk(chunk)
+
+            # bulk_create не вызывает Student.save() - счётчики дерева обновляем сами
+            if self.touched_group_ids:
+                StudentCountRollup.refresh(StudentCountRollup.levels_of_groups(self.touched_group_ids))
+        return self.report()
+
+    def report(self):
+        errors = sum(1 for row in self.rows if row['status'] == 'error')
+        return {
+            'dry_run': self.dry_run,
+            'total': len(self.rows),
+            'created': self.created,
+            'errors': errors,
+            'rows': self.rows,
+        }
+
+
+def import_students(fileobj, file_format='csv', group=None, dry_run=False, max_students=None,
+                    students_only=False, chunk_size=IMPORT_CHUNK_SIZE, user=None, request=None, filename=''):
+    """
+    Импортирует пользователей из файла и возвращает отчёт по строкам.
+    group - общая группа для всех строк, иначе группа берётся из столбца
+    «Группа» (название) или group_id. Для старосты: students_only - только
+    студенты без прав старосты и только в group (обязательна), max_students -
+    лимит группы.
+    ValueError - файл не читается.
+    """
+    importer = StudentImport(group=group, dry_run=dry_run, max_students=max_students,
+                             students_only=students_only, chunk_size=chunk_size)
+    report = importer.run(iter_records(fileobj, file_format))
+
+    if not dry_run and report['created']:
+        audit.record(
+            action='import',
+            model_name='Student',
+            object_id=group.id if group else None,
+            details={
+                'file': filename,
+                'created': report['created'],
+                'errors': report['errors'],
+                'groups': sorted(importer.touched_group_ids),
+            },
+            user=user,
+            request=request,
+        )
+    return report
@@ -1,3 +1,689 @@
-from django.test import TestCase
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import warnings
+import zipfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, OperationalError, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.templatetags.static import static
+from django.urls import reverse
+
+from admin_panel import audit, navigation, principals, search_index
+from admin_panel.exports import EXPORTS
+from admin_panel.models import DatabaseLog, EducationalLevel, HierarchyVersion, NavigationHistory, Student, StudentCountRollup
+from students.models import StudentGrade, Subject
+from journal_project.batch_writer import BatchWriter
+from journal_project import assets, benchmark, database, log, query_plans, sql_profiler, streaming
+from journal_project.testing import add_group, make_group
+
+
+class ViewBudgetTest(TestCase):
+    """Число запросов и размер ответа всех URL в пределах базовой линии (bench_views)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.baseline = benchmark.load_baseline(settings.BENCHMARK_BASELINE)
+        call_command(
+            'seed_bench', *[f'--{key}={value}' for key, value in cls.baseline['dataset'].items()],
+            stdout=io.StringIO(),
+        )
+
+    def test_every_url_has_scenario(self):
+        self.assertEqual(benchmark.uncovered(), [])
+
+    def test_views_within_baseline(self):
+        results = benchmark.run(iterations=1, warmup=1)
+        # Время на машине тестов не сравнимо с базовой линией - только запросы, статус и размер
+        failures = benchmark.compare(results, self.baseline, check_latency=False)
+        self.assertEqual(failures, [])
+
+    def test_hot_queries_use_indexes(self):
+        plans, failures = query_plans.check()
+        self.assertTrue(plans)
+        self.assertEqual(failures, [])
+
+    def test_compare_flags_regression(self):
+        baseline = {'views': {'app:view': {'status': 200, 'queries': 3, 'p50_ms': 1.0, 'p95_ms': 2.0, 'bytes': 100}}}
+        ok = {'app:view': {'status': 200, 'queries': 3, 'p50_ms': 1.0, 'p95_ms': 6.0, 'bytes': 900}}
+        self.assertEqual(benchmark.compare(ok, baseline), [])
+
+        slow = {'app:view': {'status': 500, 'queries': 4, 'p50_ms': 1.0, 'p95_ms': 50.0, 'bytes': 5000}}
+        failures = benchmark.compare(slow, baseline)
+        self.assertEqual(len(failures), 4)
+        self.assertEqual(len(benchmark.compare(slow, baseline, check_latency=False)), 3)
+
+
+class SQLProfilerTest(TestCase):
+    """Отпечатки SQL и сводка SQLProfilerMiddleware"""
+
+    def test_fingerprint_ignores_values(self):
+        self.assertEqual(
+            sql_profiler.fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\''),
+            sql_profiler.fingerprint('SELECT *  FROM t WHERE id IN (%s) AND name = \'yy\''),
+        )
+
+    def test_repeated_queries_flagged(self):
+        queries = [{'sql': f'SELECT * FROM t WHERE id = {i}', 'ms': 1.0} for i in range(6)]
+        summary = sql_profiler.summarize(queries, n1_threshold=5)
+        self.assertEqual(summary['queries'], 6)
+        self.assertEqual(summary['duplicates'][0]['count'], 6)
+        self.assertEqual(sql_profiler.summarize(queries[:4], n1_threshold=5)['duplicates'], [])
+
+    @override_settings(SQL_PROFILER_ENABLED=True, SQL_PROFILER_SLOW_LOG=None)
+    def test_middleware_records_endpoint(self):
+        sql_profiler.stats.clear()
+        # Накопленная сводка меняет размер страницы sql_profile в ViewBudgetTest
+        self.addCleanup(sql_profiler.stats.clear)
+        with self.assertLogs('journal_project.sql', 'INFO') as logs:
+            Client().get(reverse('admin_login'))
+        self.assertEqual(logs.records[0].endpoint, 'admin_login')
+        self.assertEqual([row['endpoint'] for row in sql_profiler.stats.worst()], ['admin_login'])
+
+    def test_sensitive_params_hidden(self):
+        hidden = [
+            'INSERT INTO "admin_panel_student" ("login", "password") VALUES (%s, %s)',
+            'UPDATE "admin_panel_admin" SET "password" = %s WHERE "id" = %s',
+            'SELECT "django_session"."session_data" FROM "django_session" WHERE "session_key" = %s',
+        ]
+        for sql in hidden:
+            self.assertEqual(sql_profiler._params({'sql': sql, 'params': ('login', 'secret')}), '[скрыто]')
+        query = {'sql': 'SELECT "full_name" FROM "admin_panel_student" WHERE "id" = %s', 'params': (1,)}
+        self.assertEqual(sql_profiler._params(query), '(1,)')
+
+    def test_stats_merge_processes(self):
+        stats = sql_profiler.EndpointStats(publish_interval=0)
+        self.addCleanup(caches['sql_profile'].delete_many, ['processes', 'process:other', stats._key()])
+        stats.add('students_list', queries=4, sql_ms=10.0, total_ms=30, n_plus_one=False)
+        # Сводка другого процесса сервера, опубликованная в общий кэш
+        other = sql_profiler.EndpointStats(publish_interval=0)
+        other._key = lambda: 'process:other'
+        other.add('students_list', queries=40, sql_ms=90.0, total_ms=400, n_plus_one=True)
+        other.add('admin_login', queries=1, sql_ms=1.0, total_ms=5, n_plus_one=False)
+        other.buckets.clear()  # в памяти этого процесса только свои запросы
+
+        rows = {row['endpoint']: row for row in stats.worst()}
+        self.assertEqual(stats.processes(), 2)
+        self.assertEqual(rows['students_list']['requests'], 2)
+        self.assertEqual(rows['students_list']['max_queries'], 40)
+        self.assertEqual(rows['students_list']['sql_ms'], 100.0)
+        self.assertEqual(rows['students_list']['n_plus_one'], 1)
+        self.assertEqual(rows['students_list']['p95_ms'], 500)
+        self.assertEqual(rows['admin_login']['requests'], 1)
+
+
+class LoggingTest(TestCase):
+    """ID запроса и сэмплирование журнала (journal_project/log.py)"""
+
+    def test_request_id_header(self):
+        response = Client().get(reverse('admin_login'), HTTP_X_REQUEST_ID='abc-123')
+        self.assertEqual(response['X-Request-ID'], 'abc-123')
+        response = Client().get(reverse('admin_login'), HTTP_X_REQUEST_ID='bad id\n')
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+    def test_sampling_by_request(self):
+        sampling = log.SamplingFilter({'journal_project.sql': 0.5, 'journal_project.sql.off': 0})
+
+        def record(name, level=logging.INFO, request_id='-'):
+            item = logging.LogRecord(name, level, __file__, 1, 'msg', (), None)
+            item.request_id = request_id
+            return item
+
+        kept = [sampling.filter(record('journal_project.sql', request_id=f'r{i}')) for i in range(1000)]
+        self.assertTrue(300 < sum(kept) < 700)
+        # Решение по одному запросу не меняется
+        self.assertEqual(kept[:50], [sampling.filter(record('journal_project.sql', request_id=f'r{i}')) for i in range(50)])
+        self.assertFalse(sampling.filter(record('journal_project.sql.off.child')))
+        self.assertTrue(sampling.filter(record('journal_project.sql.off', logging.WARNING)))
+        self.assertTrue(sampling.filter(record('elders.views')))
+
+
+class SQLiteProfileTest(TestCase):
+    """PRAGMA профиля production применяются при открытии соединения"""
+
+    def test_pragmas_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], database.SQLITE_BUSY_TIMEOUT * 1000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_stock_profile(self):
+        self.assertNotIn('OPTIONS', database.sqlite_database('x.sqlite3', 'stock'))
+        with self.assertRaises(ValueError):
+            database.sqlite_database('x.sqlite3', 'fast')
+
+
+class StudentSearchTest(TestCase):
+    """Поиск студентов: ё = е, регистр, несколько слов - префиксы"""
+
+    @classmethod
+    def setUpTestData(cls):
+        group = make_group('СПД-201', course=2)
+        cls.semin = Student.objects.create(login='semin', password='secret', full_name='Сёмин Пётр Ильич', group=group)
+        Student.objects.create(login='semenov', password='secret', full_name='Семенов Павел', group=group)
+        Student.objects.create(login='petrova', password='secret', full_name='Петрова Анна')
+
+    def setUp(self):
+        session = self.client.session
+        session.update({'admin_id': 1, 'is_custom_admin': True})
+        session.save()
+
+    def search(self, query):
+        response = self.client.get(reverse('search_items'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [result['full_name'] for result in response.json()['results']]
+
+    def check_search(self):
+        self.assertEqual(self.search('семин петр'), ['Сёмин Пётр Ильич'])
+        self.assertEqual(self.search('СЁМ ПЕТ'), ['Сёмин Пётр Ильич'])
+        self.assertEqual(sorted(self.search('сем')), ['Семенов Павел', 'Сёмин Пётр Ильич'])
+        self.assertEqual(sorted(self.search('пет')), ['Петрова Анна', 'Сёмин Пётр Ильич'])
+        self.assertEqual(self.search('сем анна'), [])
+
+    def test_fts5(self):
+        self.assertEqual(search_index.backend(), 'fts5')
+        self.check_search()
+        result = self.client.get(reverse('search_items'), {'q': 'семин'}).json()['results'][0]
+        self.assertEqual(result['id'], self.semin.id)
+        self.assertEqual(result['path'], 'Бакалавриат → Очная форма → 2 курс → СПД-201')
+
+    @override_settings(SEARCH_INDEX_BACKEND='trigram')
+    def test_trigram_fallback(self):
+        self.assertEqual(search_index.backend(), 'trigram')
+        search_index.trigram_index.rebuild()
+        self.check_search()
+
+
+class StudentCountRollupTest(TestCase):
+    """Счётчики студентов дерева: ±1 при создании, переводе и удалении совпадают с пересчётом"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group()
+        cls.level = cls.group.level
+        cls.neighbour = add_group(cls.group, 'СПД-102')
+        cls.master_group = make_group('МАГ-101', level='Магистратура', form='Заочная форма')
+
+    def counts(self):
+        # Узлы без студентов после пересчёта не хранятся, после сдвига остаются с нулём
+        return {
+            (node_type, node_id): n
+            for node_type, node_id, n in StudentCountRollup.objects.values_list('node_type', 'node_id', 'student_count')
+            if n
+        }
+
+    def expected(self):
+        return {key: n for key, (level_id, n) in StudentCountRollup.aggregate().items()}
+
+    def student(self, login, group):
+        return Student.objects.create(login=login, password='secret', full_name=login, group=group)
+
+    def test_shift_matches_recount(self):
+        # Первый студент группы - строк счётчика ещё нет, уровень пересчитывается
+        first = self.student('first', self.group)
+        self.assertEqual(self.counts(), self.expected())
+
+        with CaptureQueriesContext(connection) as captured:
+            second = self.student('second', self.group)
+        self.assertFalse([q['sql'] for q in captured if 'COUNT(' in q['sql']])
+        self.assertEqual(self.counts()[('level', self.level.id)], 2)
+
+        second.group = self.neighbour
+        second.save()
+        first.group = self.master_group
+        first.save()
+        self.assertEqual(self.counts(), self.expected())
+
+        second.delete()
+        first.group = None
+        first.save()
+        self.assertEqual(self.counts(), {})
+        self.assertEqual(self.expected(), {})
+
+    def test_tree_moves_recount_both_levels(self):
+        self.student('first', self.group)
+        self.student('second', self.master_group)
+        master = self.master_group.level
+
+        # Курс переносят в форму другого уровня
+        course = self.master_group.course
+        course.form = self.group.form
+        course.save()
+        self.assertEqual(self.counts(), self.expected())
+        self.assertEqual(self.counts()[('level', self.level.id)], 2)
+        self.assertNotIn(('level', master.id), self.counts())
+
+        # Форму переносят на другой уровень
+        form = self.group.form
+        form.level = master
+        form.save()
+        self.assertEqual(self.counts(), self.expected())
+        self.assertEqual(self.counts()[('level', master.id)], 2)
+
+    def test_attach_keeps_method(self):
+        self.student('first', self.group)
+        levels = StudentCountRollup.attach(EducationalLevel.objects.prefetch_related('forms__courses__groups'))
+        level = next(level for level in levels if level.id == self.level.id)
+        self.assertEqual(level.student_total, 1)
+        self.assertEqual(level.student_count(), 1)
+        group = level.forms.all()[0].courses.all()[0].groups.all()[0]
+        self.assertEqual((group.student_total, group.student_count()), (1, 1))
+
+
+class TreeETagTest(TestCase):
+    """api/tree/ отвечает 304 на If-None-Match, пока версия дерева не изменилась"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group()
+        Student.objects.create(login='student', password='secret', full_name='Иванов Иван', group=cls.group)
+
+    def setUp(self):
+        session = self.client.session
+        session.update({'admin_id': 1, 'is_custom_admin': True})
+        session.save()
+
+    def test_not_modified_until_bump(self):
+        response = self.client.get(reverse('tree'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        level = response.json()['levels'][0]
+        self.assertEqual(level[1:3], ['Бакалавриат', 1])
+
+        # 304 без сборки дерева: сессия и версия дерева
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('tree'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        HierarchyVersion.bump()
+        response = self.client.get(reverse('tree'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Новая группа меняет дерево - и версию
+        etag = response['ETag']
+        add_group(self.group, 'СПД-102')
+        response = self.client.get(reverse('tree'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['levels'][0][3][0][3][0][3]), 2)
+
+
+class ActionLogsCursorTest(TestCase):
+    """Логи действий по курсору: страницы без пропусков и повторов, ошибки параметров - 400"""
+
+    @classmethod
+    def setUpTestData(cls):
+        DatabaseLog.objects.bulk_create(
+            DatabaseLog(action='create' if i % 3 else 'delete', model_name='Student', object_id=i)
+            for i in range(23)
+        )
+        # По несколько записей на одно время - порядок внутри него задаёт id
+        start = datetime(2026, 3, 2, 9, 0, tzinfo=dt_timezone.utc)
+        for i, log_id in enumerate(DatabaseLog.objects.order_by('id').values_list('id', flat=True)):
+            DatabaseLog.objects.filter(id=log_id).update(created_at=start + timedelta(minutes=i // 4))
+
+    def setUp(self):
+        session = self.client.session
+        session.update({'admin_id': 1, 'is_custom_admin': True})
+        session.save()
+
+    def page(self, **params):
+        response = self.client.get(reverse('action_logs'), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))
+
+    def pages(self, cursor=None, **params):
+        ids = []
+        # Курсор, который не продвигается, не должен зациклить тест
+        for _ in range(DatabaseLog.objects.count() + 1):
+            page = self.page(**params, **({'cursor': cursor} if cursor else {}))
+            ids.extend(log['id'] for log in page['logs'])
+            cursor = page['next_cursor']
+            self.assertEqual(page['has_more'], cursor is not None)
+            if cursor is None:
+                return ids
+        self.fail(f'Курсор не дошёл до конца: {ids}')
+
+    def test_pages_cover_all_logs(self):
+        expected = list(DatabaseLog.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        for limit in (1, 4, 5, 23, 100):
+            self.assertEqual(self.pages(limit=limit), expected)
+        deleted = list(DatabaseLog.objects.filter(action='delete').order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.pages(limit=3, action='delete'), deleted)
+
+    def test_new_logs_do_not_shift_pages(self):
+        expected = list(DatabaseLog.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        first = self.page(limit=5)
+        DatabaseLog.objects.create(action='create', model_name='Student', object_id=100)
+        rest = self.pages(limit=5, cursor=first['next_cursor'])
+        self.assertEqual([log['id'] for log in first['logs']] + rest, expected)
+
+    def test_bad_params(self):
+        for params in ({'cursor': 'garbage'}, {'cursor': 'bm90LWEtZGF0ZXwx'}, {'limit': 'ten'},
+                       {'user_id': 'x'}, {'date_from': '02.03.2026'}):
+            response = self.client.get(reverse('action_logs'), params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+
+class ExportTest(TestCase):
+    """Выгрузки CSV/XLSX: заголовок, строки только своей области и периода"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group()
+        other = add_group(cls.group, 'СПД-102')
+        math = Subject.objects.create(name='Математика', group=cls.group)
+        for i, group in enumerate([cls.group, cls.group, other]):
+            student = Student.objects.create(login=f'student{i}', password='secret', full_name=f'Студент {i}',
+                                             group=group)
+            for day in (2, 3, 4):
+                StudentGrade.objects.create(student=student, subject=math, grade_type='numeric_5',
+                                            raw_value='5', date=date(2026, 3, day), comment='a;b "c"\nd')
+
+    def setUp(self):
+        session = self.client.session
+        session.update({'admin_id': 1, 'is_custom_admin': True})
+        session.save()
+
+    def export(self, kind='grades', **params):
+        response = self.client.get(reverse('export_data', args=[kind]), {'group': self.group.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv(self):
+        response, content = self.export(date_from='2026-03-03')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('.csv', response['Content-Disposition'])
+        self.assertTrue(content.startswith(codecs.BOM_UTF8))
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig')), delimiter=';'))
+        self.assertEqual(rows[0], EXPORTS['grades'][1])
+        # Две даты из трёх у двух студентов группы
+        self.assertEqual(len(rows), 1 + 4)
+        self.assertEqual({row[0] for row in rows[1:]}, {'СПД-101'})
+        self.assertEqual(rows[1][-1], 'a;b "c"\nd')
+
+    def test_csv_formula_cells_escaped(self):
+        rows = [['=HYPERLINK("http://x")', '+1', '-1+2', '@SUM(A1)', '\t=1', 'a=b', -5, 2.5, None]]
+        content = ''.join(streaming.iter_csv(['a'] * 9, rows))
+        parsed = list(csv.reader(io.StringIO(content.lstrip('\ufeff')), delimiter=';'))
+        self.assertEqual(parsed[1], ["'=HYPERLINK(\"http://x\")", "'+1", "'-1+2", "'@SUM(A1)", "'\t=1",
+                                     'a=b', '-5', '2.5', ''])
+
+        StudentGrade.objects.update(comment='=1+1')
+        rows = list(csv.reader(io.StringIO(self.export()[1].decode('utf-8-sig')), delimiter=';'))
+        self.assertEqual({row[-1] for row in rows[1:]}, {"'=1+1"})
+
+    def test_xlsx(self):
+        response, content = self.export('performance', format='xlsx')
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        ns = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        rows = [
+            [cell.findtext('.//x:t', namespaces=ns) or cell.findtext('x:v', namespaces=ns)
+             for cell in row.findall('x:c', ns)]
+            for row in sheet.iter(f'{{{ns["x"]}}}row')
+        ]
+        self.assertEqual(rows[0], EXPORTS['performance'][1])
+        self.assertEqual(len(rows), 1 + 2)
+        self.assertEqual(rows[1][:4], ['СПД-101', 'Студент 0', 'Математика', '15.0'])
+
+    def test_errors(self):
+        url = reverse('export_data', args=['grades'])
+        self.assertEqual(self.client.get(reverse('export_data', args=['secrets']), {'group': 1}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'group': self.group.id, 'format': 'pdf'}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'group': self.group.id, 'date_to': '03.03.2026'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'group': 999999}).status_code, 404)
+
+
+class AuditTest(TestCase):
+    """Аудит: событие пишется после фиксации действия, сбой записи не теряет событий"""
+
+    def test_sync_record(self):
+        # В тестах AUDIT_ASYNC выключен (journal_project/test_runner.py) - событие сразу в базе
+        log = audit.record('export', 'StudentGrade', details={'export': 'grades'}, ip_address='10.0.0.1')
+        self.assertEqual(DatabaseLog.objects.get().id, log.id)
+        self.assertEqual(DatabaseLog.objects.get().user_name, 'Система')
+
+    @override_settings(AUDIT_ASYNC=True)
+    def test_async_after_commit(self):
+        with mock.patch.object(audit.writer, 'put', return_value=True) as put:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        audit.record('delete', 'Student', object_id=1)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+            put.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    log = audit.record('delete', 'Student', object_id=2)
+                put.assert_not_called()
+            put.assert_called_once_with(log)
+
+        # Очередь переполнена - событие пишется сразу
+        with mock.patch.object(audit.writer, 'put', return_value=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                audit.record('delete', 'Student', object_id=3)
+        self.assertEqual(list(DatabaseLog.objects.values_list('object_id', flat=True)), [3])
+
+    def test_bulk_insert_keeps_locked_rows(self):
+        rows = [DatabaseLog(action='create', model_name='Student', object_id=i) for i in range(3)]
+        locked = OperationalError('database is locked')
+        with mock.patch.object(DatabaseLog.objects, 'bulk_create', side_effect=locked), \
+                mock.patch.object(DatabaseLog, 'save', side_effect=locked):
+            self.assertEqual(BatchWriter.bulk_insert(DatabaseLog, rows), rows)
+        self.assertEqual(BatchWriter.bulk_insert(DatabaseLog, rows), [])
+        self.assertEqual(DatabaseLog.objects.count(), 3)
+
+    def test_writer_retries_failed_batch(self):
+        class FlakyWriter(BatchWriter):
+            def __init__(self):
+                super().__init__(batch_size=10, flush_interval=0.01, retry_delays=(0.01,))
+                self.attempts = []
+                self.done = threading.Event()
+
+            def write_batch(self, batch):
+                self.attempts.append(list(batch))
+                if len(self.attempts) < 3:
+                    return batch  # «database is locked» - ничего не записано
+                self.done.set()
+                return []
+
+        writer = FlakyWriter()
+        with self.assertLogs('journal_project.batch_writer', 'WARNING') as logs:
+            writer.put('a')
+            writer.put('b')
+            self.assertTrue(writer.done.wait(5))
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(writer.attempts, [['a', 'b']] * 3)
+
+
+class NavigationHistoryTest(TestCase):
+    """История навигации: при NAVIGATION_HISTORY_ASYNC = False запись сразу, сбой базы - повтор в фоне"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Student.objects.create(login='admin', password='secret', full_name='Администратор',
+                                           user_type='admin')
+        cls.level = EducationalLevel.objects.create(name='Бакалавриат')
+
+    def setUp(self):
+        principals.invalidate([self.admin.id])
+        session = self.client.session
+        session.update({'admin_id': self.admin.id, 'is_custom_admin': True})
+        session.save()
+
+    def test_folder_visit_recorded(self):
+        response = self.client.get(reverse('folder_content'), {'type': 'level', 'id': self.level.id})
+        self.assertEqual(response.status_code, 200)
+        history = self.client.get(reverse('navigation_history')).json()['history']
+        self.assertEqual([(h['type'], h['object_id']) for h in history], [('level', self.level.id)])
+
+    def test_locked_database_requeued(self):
+        locked = OperationalError('database is locked')
+        with mock.patch.object(NavigationHistory, 'save', side_effect=locked), \
+                mock.patch.object(navigation.writer, 'put') as put:
+            navigation.record_navigation(self.admin.id, 'level', self.level.id, 'Бакалавриат', 'Бакалавриат')
+        self.assertEqual(put.call_args.args[0].object_id, self.level.id)
+        self.assertFalse(NavigationHistory.objects.exists())
+
+
+class MigrationsTest(TestCase):
+    """Тестовая база собирается миграциями с нуля и совпадает с моделями"""
+
+    def test_migrations_build_schema(self):
+        executor = MigrationExecutor(connection)
+        self.assertEqual(executor.migration_plan(executor.loader.graph.leaf_nodes()), [])
+        # Таблица FTS5 создаётся только миграцией 0011 - модели у неё нет
+        self.assertIn(search_index.FTS_TABLE, connection.introspection.table_names())
+
+    def test_models_match_migrations(self):
+        call_command('makemigrations', '--check', '--dry-run', stdout=io.StringIO())
+
+
+class StreamingASGITest(TestCase):
+    """Под ASGI потоковые ответы отдаются по частям, а не собираются целиком"""
+
+    def test_asgi_body_is_lazy(self):
+        produced = []
+
+        def rows():
+            for i in range(1000):
+                produced.append(i)
+                yield (i, f'Строка {i}')
+
+        request = AsyncRequestFactory().get('/')
+        response = streaming.streaming_table_response(request, ['id', 'name'], rows(), 'rows')
+        self.assertTrue(response.is_async)
+
+        async def first_part():
+            async for part in response:
+                return part
+
+        self.assertTrue(async_to_sync(first_part)().startswith('\ufeffid;name'.encode('utf-8')))
+        # Прочитана одна пачка частей, а не весь генератор
+        self.assertLess(len(produced), 1000)
+
+    def test_wsgi_body_stays_sync(self):
+        response = streaming.streaming_json_response(RequestFactory().get('/'), iter([1, 2]), 'items')
+        self.assertFalse(response.is_async)
+        self.assertEqual(b''.join(response), b'{"items":[1,2]}')
+
+    async def test_action_logs_stream(self):
+        await DatabaseLog.objects.abulk_create(
+            DatabaseLog(action='update', model_name='Student', object_id=i) for i in range(250)
+        )
+        session = await self.async_client.asession()
+        await session.aset('admin_id', 1)
+        await session.aset('is_custom_admin', True)
+        await session.asave()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response = await self.async_client.get(reverse('action_logs'), {'limit': 200})
+            self.assertTrue(response.is_async)
+            body = b''.join([part async for part in response.streaming_content])
+        # Django предупреждает, если итератор пришлось собрать в список
+        self.assertFalse([w for w in caught if 'must consume' in str(w.message)])
+        data = json.loads(body)
+        self.assertEqual(len(data['logs']), 200)
+        self.assertTrue(data['has_more'])
+
+
+class StaticAssetsTest(SimpleTestCase):
+    """Сборка статики: сжатие JS/CSS, имена с хэшем, .gz/.br и заголовки отдачи"""
+
+    def test_minify_js_keeps_literals(self):
+        source = (
+            "// комментарий\n"
+            "const url = 'http://a  b'; /* блок */\n"
+            "const re = /a  b\\/c/g, half = total / 2 / 1;\n"
+            "const html = `<td>  ${ items.map(i => `<b>  ${i}</b>`).join('') }  </td>`;\n"
+            "    if (re.test(url)) {\n        return html;\n    }\n"
+        )
+        self.assertEqual(assets.minify_js(source), (
+            "const url = 'http://a  b';\n"
+            "const re = /a  b\\/c/g, half = total / 2 / 1;\n"
+            "const html = `<td>  ${ items.map(i => `<b>  ${i}</b>`).join('') }  </td>`;\n"
+            "if (re.test(url)) {\nreturn html;\n}\n"
+        ))
+
+    def test_minify_js_division(self):
+        cases = {
+            'var b = a++ / 2; // c\nvar d = 3 / 4;': 'var b = a++ / 2;\nvar d = 3 / 4;',
+            'var b = a-- / 2; // c\nvar d = 3 / 4;': 'var b = a-- / 2;\nvar d = 3 / 4;',
+            'x = f(a) / 2; // c\ny = 1 / 3;': 'x = f(a) / 2;\ny = 1 / 3;',
+            'x = m[0] / 2; // c\ny = 1 / 3;': 'x = m[0] / 2;\ny = 1 / 3;',
+            'x = total\n  / count; // c\ny = 1 / 3;': 'x = total\n/ count;\ny = 1 / 3;',
+            'x = 10 / 2; // c\ny = $a / 3;': 'x = 10 / 2;\ny = $a / 3;',
+        }
+        for source, expected in cases.items():
+            self.assertEqual(assets.minify_js(source), expected + '\n', source)
+
+        # После операторов и ключевых слов - регулярное выражение
+        regexes = {
+            'x = a + /b c/.source; // c': 'x = a + /b c/.source;',
+            'return /a  b/g; // c': 'return /a  b/g;',
+            'if (/a  b/.test(s)) {} // c': 'if (/a  b/.test(s)) {}',
+        }
+        for source, expected in regexes.items():
+            self.assertEqual(assets.minify_js(source), expected + '\n', source)
+
+    def test_minify_css(self):
+        source = '/* шапка */\n.a > .b ,\n.c {\n    color: red;\n    content: "x  y";\n}\n'
+        self.assertEqual(assets.minify_css(source), '.a>.b,.c{color:red;content:"x  y"}\n')
+
+    def test_extract_leaves_only_templated_blocks(self):
+        out = io.StringIO()
+        call_command('build_static', '--extract', '--dry-run', stdout=out)
+        # Всё вынесено; в base.html остался короткий скрипт с {% if %}
+        self.assertNotIn('->', out.getvalue())
+
+    def test_build_and_serve(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root, STATIC_MANIFEST=True,
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        ):
+            call_command('build_static', stdout=io.StringIO())
+            url = static('css/base.css')
+            self.assertRegex(url, r'^/static/css/base\.[0-9a-f]{12}\.css$')
+            name = url[len(settings.STATIC_URL):]
+            self.assertTrue(os.path.exists(os.path.join(root, name + '.gz')))
+
+            immutable = assets._immutable_names()
+            request = RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+            response = assets.serve_built(request, name, immutable)
+            self.assertEqual(response['Cache-Control'], assets.CACHE_IMMUTABLE)
+            self.assertEqual(response['Content-Encoding'], 'br' if assets.brotli else 'gzip')
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            response.close()
+
+            response = assets.serve_built(RequestFactory().get('/static/css/base.css'), 'css/base.css', immutable)
+            self.assertEqual(response['Cache-Control'], assets.CACHE_REVALIDATE)
+            self.assertNotIn('Content-Encoding', response)
+            response.close()
+            self.assertIsNone(assets.serve_built(request, '../settings.py', immutable))
@@ -8,6 +8,7 @@ urlpatterns = [
     
     # Навигация и контент
     path('api/folder-content/', views.get_folder_content, name='folder_content'),
+    path('api/tree/', views.get_tree, name='tree'),
     path('api/student/<int:student_id>/', views.get_student, name='get_student'),
     
     # CRUD операции
@@ -21,7 +22,12 @@ urlpatterns = [
     path('api/search/', views.search_items, name='search_items'),
     path('api/navigation-history/', views.get_navigation_history, name='navigation_history'),
     path('api/action-logs/', views.get_action_logs, name='action_logs'),
+    path('api/export/<str:kind>/', views.export_data, name='export_data'),
+    path('api/import-students/', views.import_student_roster, name='import_students'),
     
+    # Профиль SQL
+    path('sql-profile/', views.sql_profile, name='sql_profile'),
+
     # Кэш
     path('api/clear-cache/', views.clear_cache, name='clear_cache'),
 
@@ -1,19 +1,38 @@
+import logging
 import random
 import string
-from django.views.decorators.http import require_http_methods
+import base64
+import binascii
+from django.views.decorators.http import require_http_methods, condition
+from django.utils.cache import patch_cache_control
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate
+from django.conf import settings
 from django.http import JsonResponse
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, timedelta
 from django.views.decorators.csrf import csrf_exempt
 from django.db import models
 import json
 from .models import (
     EducationalLevel, StudyForm, Course, Group, 
     Student, Department, Employee, DatabaseLog,
-    NavigationHistory, ActionCache, ElderPermission, DeletedItemCache
+    NavigationHistory, ActionCache, ElderPermission, DeletedItemCache,
+    StudentCountRollup, HierarchyVersion
 )
+from .navigation import record_navigation
+from . import audit, principals, search_index
+from .exports import EXPORTS, SCOPES, scope_groups
+from .student_import import import_students, detect_format
+from journal_project import sql_profiler
+from journal_project.streaming import streaming_json_response, streaming_table_response, EXPORT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+# Размер страницы логов действий по умолчанию и максимальный
+ACTION_LOGS_PAGE = 100
+ACTION_LOGS_MAX_PAGE = 500
 
 # ==================== КАСТОМНЫЕ ДЕКОРАТОРЫ ====================
 
@@ -21,7 +40,7 @@ def login_required_custom(view_func):
     """Кастомный декоратор проверки авторизации"""
     def wrapper(request, *args, **kwargs):
         if not request.session.get('admin_id') or not request.session.get('is_custom_admin'):
-            print("Декоратор: нет ID в сессии, перенаправляем")
+            logger.debug('Декоратор: нет ID в сессии, перенаправляем')
             return redirect('admin_login')
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -35,10 +54,9 @@ def generate_password(length=8):
 
 def get_admin_from_session(request):
     """Получение админа из сессии для логов"""
-    admin_id = request.session.get('admin_id')
-    if admin_id:
+    if request.session.get('admin_id'):
         try:
-            return Student.objects.get(id=admin_id)
+            return principals.from_request(request, 'admin')
         except Student.DoesNotExist:
             pass
     return None
@@ -115,12 +133,12 @@ def admin_logout(request):
 @login_required_custom
 def admin_dashboard(request):
     """Главная страница админ-панели"""
-    educational_levels = EducationalLevel.objects.prefetch_related(
-        'forms__courses__groups__students'
-    ).all()
+    educational_levels = StudentCountRollup.attach(
+        EducationalLevel.objects.prefetch_related('forms__courses__groups')
+    )
     
     departments = Department.objects.prefetch_related('employees').all()
-    recent_logs = DatabaseLog.objects.all()[:10]
+    recent_logs = DatabaseLog.objects.only('created_at', 'action', 'model_name', 'user_name')[:10]
     
     context = {
         'educational_levels': educational_levels,
@@ -152,13 +170,15 @@ def get_folder_content(request):
             data['title'] = level.name
             data['path'] = [{'type': 'level', 'id': level.id, 'name': level.name}]
             
-            for form in level.forms.all():
+            forms = list(level.forms.all())
+            counts = StudentCountRollup.counts('form', [f.id for f in forms])
+            for form in forms:
                 data['items'].append({
                     'type': 'form',
                     'id': form.id,
                     'name': form.name,
                     'icon': 'bi-folder',
-                    'count': form.student_count()
+                    'count': counts.get(form.id, 0)
                 })
                 
         elif folder_type == 'form':
@@ -169,13 +189,15 @@ def get_folder_content(request):
                 {'type': 'form', 'id': form.id, 'name': form.name}
             ]
             
-            for course in form.courses.all():
+            courses = list(form.courses.all())
+            counts = StudentCountRollup.counts('course', [c.id for c in courses])
+            for course in courses:
                 data['items'].append({
                     'type': 'course',
                     'id': course.id,
                     'name': f'{course.number} курс',
                     'icon': 'bi-layers',
-                    'count': course.student_count()
+                    'count': counts.get(course.id, 0)
                 })
                 
         elif folder_type == 'course':
@@ -187,13 +209,15 @@ def get_folder_content(request):
                 {'type': 'course', 'id': course.id, 'name': f'{course.number} курс'}
             ]
             
-            for group in course.groups.all():
+            groups = list(course.groups.all())
+            counts = StudentCountRollup.counts('group', [g.id for g in groups])
+            for group in groups:
                 data['items'].append({
                     'type': 'group',
                     'id': group.id,
                     'name': group.name,
                     'icon': 'bi-people',
-                    'count': group.students.count(),
+                    'count': counts.get(group.id, 0),
                 })
                 
         elif folder_type == 'group':
@@ -222,25 +246,66 @@ def get_folder_content(request):
                     'is_active': student.is_active
                 })
         
-        # Сохраняем в историю навигации
-        admin = get_admin_from_session(request)
-        if admin:
-            try:
-                NavigationHistory.objects.create(
-                    user_id=admin.id,
-                    content_type=folder_type,
-                    object_id=int(folder_id),
-                    title=data.get('title', 'Без названия'),
-                    path=' → '.join([p['name'] for p in data.get('path', [])])
-                )
-            except Exception as e:
-                print(f"Ошибка сохранения истории: {e}")
+        # Сохраняем в историю навигации (запись идёт в фоне пачками)
+        admin_id = request.session.get('admin_id')
+        if admin_id:
+            record_navigation(
+                user_id=admin_id,
+                content_type=folder_type,
+                object_id=int(folder_id),
+                title=data.get('title', 'Без названия'),
+                path=' → '.join([p['name'] for p in data.get('path', [])])
+            )
             
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
     
     return JsonResponse(data)
 
+def _tree_etag(request):
+    return HierarchyVersion.current().etag
+
+@login_required_custom
+@condition(etag_func=_tree_etag)
+def get_tree(request):
+    """
+    Всё дерево уровней/форм/курсов/групп со счётчиками студентов.
+    Компактный формат - вложенные массивы:
+    level = [id, название, студентов, [form, ...]]
+    form = [id, название, студентов, [course, ...]]
+    course = [id, номер, студентов, [group, ...]]
+    group = [id, название, студентов]
+    ETag меняется только вместе с версией дерева, поэтому браузер
+    перепроверяет его запросом с ответом 304.
+    """
+    counts = {}
+    for node_type, node_id, n in StudentCountRollup.objects.values_list('node_type', 'node_id', 'student_count'):
+        counts[(node_type, node_id)] = n
+    
+    children = {}
+    for group_id, name, course_id in Group.objects.order_by('name').values_list('id', 'name', 'course_id'):
+        children.setdefault(('course', course_id), []).append(
+            [group_id, name, counts.get(('group', group_id), 0)]
+        )
+    for course_id, number, form_id in Course.objects.order_by('number').values_list('id', 'number', 'form_id'):
+        children.setdefault(('form', form_id), []).append(
+            [course_id, number, counts.get(('course', course_id), 0), children.get(('course', course_id), [])]
+        )
+    for form_id, name, level_id in StudyForm.objects.order_by('order', 'name').values_list('id', 'name', 'level_id'):
+        children.setdefault(('level', level_id), []).append(
+            [form_id, name, counts.get(('form', form_id), 0), children.get(('form', form_id), [])]
+        )
+    levels = [
+        [level_id, name, counts.get(('level', level_id), 0), children.get(('level', level_id), [])]
+        for level_id, name in EducationalLevel.objects.order_by('order', 'name').values_list('id', 'name')
+    ]
+    
+    response = JsonResponse({'levels': levels},
+                            json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')})
+    # Браузер хранит дерево, но перед использованием перепроверяет ETag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 @login_required_custom
 def get_student(request, student_id):
     """Получение данных студента для редактирования"""
@@ -321,15 +386,13 @@ def create_item(request):
                 if user_type == 'elder' or is_elder:
                     ElderPermission.objects.get_or_create(student=student)
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='create',
                     model_name='Student',
                     object_id=student.id,
                     details={'student': student.full_name, 'login': student.login},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
                 return JsonResponse({'success': True, 'id': student.id})
@@ -346,15 +409,13 @@ def create_item(request):
                     order=data.get('order', 0)
                 )
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='create',
                     model_name='EducationalLevel',
                     object_id=level.id,
                     details={'level': level.name},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
                 return JsonResponse({'success': True, 'id': level.id})
@@ -418,15 +479,13 @@ def create_item(request):
                     level=course.form.level
                 )
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='create',
                     model_name='Group',
                     object_id=group.id,
                     details={'group': group.name, 'course': course.number},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
                 return JsonResponse({'success': True, 'id': group.id})
@@ -435,7 +494,7 @@ def create_item(request):
                 return JsonResponse({'success': False, 'error': f'Неизвестный тип: {item_type}'}, status=400)
                 
         except Exception as e:
-            print(f"Ошибка в create_item: {e}")
+            logger.debug('Ошибка в create_item: %s', e)
             return JsonResponse({'success': False, 'error': str(e)}, status=400)
     
     return JsonResponse({'error': 'Method not allowed'}, status=405)
@@ -449,7 +508,7 @@ def update_item(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            print(f"UPDATE REQUEST DATA: {data}")
+            logger.debug('UPDATE REQUEST DATA: %s', data)
             
             item_type = data.get('type')
             item_id = data.get('id')
@@ -485,7 +544,7 @@ def update_item(request):
                     student.is_active = str(data['is_active']).lower() in ['true', 'on', '1']
                 
                 student.save()
-                print(f"Student updated: {student.id} - {student.full_name}")
+                logger.debug('Student updated: %s - %s', student.id, student.full_name)
                 
                 # Обновляем права старосты
                 if student.user_type == 'elder':
@@ -505,15 +564,13 @@ def update_item(request):
                         perm.can_manage_elders = str(data.get('can_manage_elders', '')).lower() in ['true', 'on', '1']
                         perm.save()
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='update',
                     model_name='Student',
                     object_id=student.id,
                     details={'student': student.full_name},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
                 return JsonResponse({'success': True})
@@ -522,7 +579,7 @@ def update_item(request):
                 return JsonResponse({'success': False, 'error': f'Неизвестный тип: {item_type}'}, status=400)
                 
         except Exception as e:
-            print(f"ERROR in update_item: {e}")
+            logger.debug('ERROR in update_item: %s', e)
             return JsonResponse({'success': False, 'error': str(e)}, status=400)
     
     return JsonResponse({'error': 'Method not allowed'}, status=405)
@@ -546,30 +603,26 @@ def delete_item(request):
                 student_name = student.full_name
                 student.delete()
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='delete',
                     model_name='Student',
                     object_id=item_id,
                     details={'student': student_name},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
             elif item_type == 'group':
                 group = get_object_or_404(Group, id=item_id)
                 group_name = group.name
                 group.delete()
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='delete',
                     model_name='Group',
                     object_id=item_id,
                     details={'group': group_name},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
             elif item_type == 'course':
@@ -598,42 +651,14 @@ def delete_item(request):
 
 @login_required_custom
 def search_items(request):
-    """Поиск студентов по всей базе"""
+    """Поиск студентов по всей базе (по началам слов ФИО, логина и email)"""
     query = request.GET.get('q', '')
     
     if len(query) < 2:
         return JsonResponse({'results': [], 'count': 0})
     
-    students = Student.objects.filter(
-        models.Q(full_name__icontains=query) |
-        models.Q(login__icontains=query) |
-        models.Q(email__icontains=query)
-    ).select_related('group__course__form__level')[:50]
-    
-    results = []
-    for student in students:
-        path_parts = []
-        if student.group:
-            if student.group.level:
-                path_parts.append(student.group.level.name)
-            if student.group.form:
-                path_parts.append(student.group.form.name)
-            if student.group.course:
-                path_parts.append(f"{student.group.course.number} курс")
-            path_parts.append(student.group.name)
-        
-        results.append({
-            'id': student.id,
-            'full_name': student.full_name,
-            'login': student.login,
-            'email': student.email or '',
-            'phone': student.phone or '',
-            'user_type': student.user_type,
-            'is_elder': student.is_elder,
-            'is_active': student.is_active,
-            'group': student.group.name if student.group else 'Нет группы',
-            'path': ' → '.join(path_parts) if path_parts else 'Нет группы'
-        })
+    # Путь в дереве хранится в поисковом индексе - JOIN по иерархии не нужен
+    results = search_index.search(query, limit=50)
     
     return JsonResponse({'results': results, 'count': len(results)})
 
@@ -681,15 +706,13 @@ def rename_item(request):
             else:
                 return JsonResponse({'success': False, 'error': 'Неподдерживаемый тип'}, status=400)
             
-            DatabaseLog.objects.create(
-                user_id=admin.id if admin else None,
-                user_type=admin.user_type if admin else None,
-                user_name=admin.full_name if admin else 'Система',
+            audit.record(
                 action='update',
                 model_name=item_type.capitalize(),
                 object_id=item.id,
                 details={'old_name': old_name, 'new_name': new_name},
-                ip_address=request.META.get('REMOTE_ADDR')
+                user=admin,
+                request=request
             )
             
             return JsonResponse({'success': True})
@@ -722,10 +745,7 @@ def move_item(request):
                 student.group = target_group
                 student.save()
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='move',
                     model_name='Student',
                     object_id=student.id,
@@ -734,7 +754,8 @@ def move_item(request):
                         'to': target_group.name,
                         'student': student.full_name
                     },
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
                 return JsonResponse({'success': True})
@@ -800,7 +821,7 @@ def view_passwords(request):
         
         return JsonResponse({'passwords': data})
     except Exception as e:
-        print(f"Ошибка в view_passwords: {e}")
+        logger.debug('Ошибка в view_passwords: %s', e)
         return JsonResponse({'error': str(e)}, status=500)
 
 @login_required_custom
@@ -829,15 +850,13 @@ def generate_and_set_password(request):
         student.save()
         
         admin = get_admin_from_session(request)
-        DatabaseLog.objects.create(
-            user_id=admin.id if admin else None,
-            user_type=admin.user_type if admin else None,
-            user_name=admin.full_name if admin else 'Система',
+        audit.record(
             action='update',
             model_name='Student',
             object_id=student.id,
             details={'action': 'password_changed', 'new_password': new_password},
-            ip_address=request.META.get('REMOTE_ADDR')
+            user=admin,
+            request=request
         )
         
         return JsonResponse({
@@ -851,27 +870,219 @@ def generate_and_set_password(request):
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'error': 'Неверный формат JSON'}, status=400)
     except Exception as e:
-        print(f"Ошибка в generate_and_set_password: {e}")
+        logger.debug('Ошибка в generate_and_set_password: %s', e)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 # ==================== ЛОГИ ====================
 
+def _encode_log_cursor(created_at, log_id):
+    raw = f'{created_at.isoformat()}|{log_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _decode_log_cursor(cursor):
+    """(created_at, id) из курсора или ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, log_id = raw.rsplit('|', 1)
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(log_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Некорректный курсор')
+
+def _parse_log_date(value, end_of_day=False):
+    """Дата ГГГГ-ММ-ДД или дата-время ISO; для дат конца периода - начало следующего дня"""
+    try:
+        day = parse_date(value)
+        moment = None if day else parse_datetime(value)
+    except ValueError:
+        day = moment = None
+    if day:
+        if end_of_day:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, datetime.min.time())
+    if moment is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
 @login_required_custom
 def get_action_logs(request):
-    """Получение расширенных логов действий"""
-    logs = DatabaseLog.objects.all()[:100]
+    """
+    Логи действий постранично, от новых к старым.
+    Фильтры: action, model, user_id, object_id, date_from, date_to.
+    Страница задаётся курсором (next_cursor из предыдущего ответа) по
+    (created_at, id), поэтому любая страница читается по индексу за одно
+    и то же время. Ответ отдаётся потоком.
+    """
+    params = request.GET
+    try:
+        limit = min(max(int(params.get('limit', ACTION_LOGS_PAGE)), 1), ACTION_LOGS_MAX_PAGE)
+        
+        logs = DatabaseLog.objects.order_by('-created_at', '-id')
+        if params.get('action'):
+            logs = logs.filter(action=params['action'])
+        if params.get('model'):
+            logs = logs.filter(model_name=params['model'])
+        if params.get('user_id'):
+            logs = logs.filter(user_id=int(params['user_id']))
+        if params.get('object_id'):
+            logs = logs.filter(object_id=int(params['object_id']))
+        if params.get('date_from'):
+            logs = logs.filter(created_at__gte=_parse_log_date(params['date_from']))
+        if params.get('date_to'):
+            logs = logs.filter(created_at__lt=_parse_log_date(params['date_to'], end_of_day=True))
+        if params.get('cursor'):
+            created_at, log_id = _decode_log_cursor(params['cursor'])
+            logs = logs.filter(
+                models.Q(created_at__lt=created_at) |
+                models.Q(created_at=created_at, id__lt=log_id)
+            )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    action_names = dict(DatabaseLog.ACTION_TYPES)
+    page = {'last': None, 'has_more': False}
+    
+    def rows():
+        # Берём на одну запись больше, чтобы узнать, есть ли следующая страница
+        fields = ('id', 'created_at', 'user_name', 'action', 'model_name', 'object_id', 'details', 'ip_address')
+        for i, log in enumerate(logs.values(*fields)[:limit + 1].iterator(chunk_size=ACTION_LOGS_PAGE)):
+            if i == limit:
+                page['has_more'] = True
+                break
+            page['last'] = log
+            yield {
+                'id': log['id'],
+                'user': log['user_name'] or 'Система',
+                'action': action_names.get(log['action'], log['action']),
+                'action_code': log['action'],
+                'model': log['model_name'],
+                'object_id': log['object_id'],
+                'details': log['details'],
+                'ip': log['ip_address'],
+                'time': log['created_at'].strftime('%d.%m.%Y %H:%M:%S')
+            }
+    
+    def tail():
+        last = page['last']
+        next_cursor = None
+        if page['has_more'] and last:
+            next_cursor = _encode_log_cursor(last['created_at'], last['id'])
+        return {'next_cursor': next_cursor, 'has_more': page['has_more']}
+    
+    return streaming_json_response(request, rows(), 'logs', tail)
+
+# ==================== ЭКСПОРТ ====================
+
+@login_required_custom
+def export_data(request, kind):
+    """
+    Выгрузка оценок, пропусков, успеваемости или журнала действий в CSV/XLSX.
+    Параметры: group, course или level (область), format (csv|xlsx),
+    date_from/date_to (ГГГГ-ММ-ДД). Файл отдаётся потоком.
+    """
+    if kind not in EXPORTS:
+        return JsonResponse({'error': f'Неизвестная выгрузка: {kind}'}, status=404)
+    title, header, model_name, rows = EXPORTS[kind]
+    
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Неизвестный формат: {export_format}'}, status=400)
+    
+    scope = next((name for name in SCOPES if request.GET.get(name)), None)
+    if not scope:
+        return JsonResponse({'error': 'Укажите group, course или level'}, status=400)
+    
+    try:
+        scope_id = int(request.GET[scope])
+        dates = {}
+        for param in ('date_from', 'date_to'):
+            if request.GET.get(param):
+                dates[param] = parse_date(request.GET[param])
+                if dates[param] is None:
+                    raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'Некорректные параметры выгрузки'}, status=400)
+    
+    groups = scope_groups(scope, scope_id)
+    if not groups.exists():
+        return JsonResponse({'error': 'Ничего не найдено'}, status=404)
     
-    data = [{
-        'id': log.id,
-        'user': log.user_name or 'Система',
-        'action': log.get_action_display(),
-        'model': log.model_name,
-        'details': log.details,
-        'ip': log.ip_address,
-        'time': log.created_at.strftime('%d.%m.%Y %H:%M:%S')
-    } for log in logs]
+    audit.record(
+        action='export',
+        model_name=model_name,
+        details={
+            'export': kind,
+            'format': export_format,
+            scope: scope_id,
+            **{param: value.isoformat() for param, value in dates.items()},
+        },
+        user=get_admin_from_session(request),
+        request=request
+    )
     
-    return JsonResponse({'logs': data})
+    filename = f"{kind}_{scope}{scope_id}_{timezone.now().strftime('%Y%m%d')}"
+    return streaming_table_response(
+        request,
+        header,
+        rows(groups, dates.get('date_from'), dates.get('date_to')),
+        filename,
+        export_format,
+        sheet_name=title,
+    )
+
+# ==================== ИМПОРТ ====================
+
+@login_required_custom
+@csrf_exempt
+@require_http_methods(["POST"])
+def import_student_roster(request):
+    """
+    Массовый импорт студентов из CSV/XLSX (поле file).
+    Необязательно: group_id - общая группа для всех строк, format (csv|xlsx),
+    dry_run - только проверка. Возвращает отчёт по каждой строке файла.
+    """
+    upload = request.FILES.get('file')
+    if not upload:
+        return JsonResponse({'success': False, 'error': 'Файл не передан'}, status=400)
+    
+    group = None
+    if request.POST.get('group_id'):
+        group = Group.objects.filter(id=request.POST['group_id']).first()
+        if group is None:
+            return JsonResponse({'success': False, 'error': 'Группа не найдена'}, status=404)
+    
+    try:
+        report = import_students(
+            upload.file,
+            request.POST.get('format') or detect_format(upload.name),
+            group=group,
+            dry_run=request.POST.get('dry_run') in ('1', 'true', 'on'),
+            user=get_admin_from_session(request),
+            request=request,
+            filename=upload.name,
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({'success': True, **report})
+
+# ==================== ПРОФИЛЬ SQL ====================
+
+@login_required_custom
+def sql_profile(request):
+    """Худшие URL по времени SQL за последний час по всем процессам (SQLProfilerMiddleware)"""
+    context = {
+        'enabled': getattr(settings, 'SQL_PROFILER_ENABLED', False),
+        'window_minutes': sql_profiler.stats.window // 60,
+        'endpoints': sql_profiler.stats.worst(),
+        'processes': sql_profiler.stats.processes(),
+        'slow_log': getattr(settings, 'SQL_PROFILER_SLOW_LOG', None),
+    }
+    return render(request, 'admin_panel/sql_profile.html', context)
 
 @login_required_custom
 def clear_cache(request):
@@ -885,14 +1096,12 @@ def clear_cache(request):
             ).delete()
             
             admin = get_admin_from_session(request)
-            DatabaseLog.objects.create(
-                user_id=admin.id if admin else None,
-                user_type=admin.user_type if admin else None,
-                user_name=admin.full_name if admin else 'Система',
+            audit.record(
                 action='clear_cache',
                 model_name='ActionCache',
                 details={'cleared': True},
-                ip_address=request.META.get('REMOTE_ADDR')
+                user=admin,
+                request=request
             )
             
             return JsonResponse({'success': True})
@@ -930,15 +1139,13 @@ def restore_item(request):
                 deleted_item.is_restored = True
                 deleted_item.save()
                 
-                DatabaseLog.objects.create(
-                    user_id=admin.id if admin else None,
-                    user_type=admin.user_type if admin else None,
-                    user_name=admin.full_name if admin else 'Система',
+                audit.record(
                     action='restore',
                     model_name='Student',
                     object_id=student.id,
                     details={'student': student.full_name},
-                    ip_address=request.META.get('REMOTE_ADDR')
+                    user=admin,
+                    request=request
                 )
                 
                 return JsonResponse({'success': True, 'id': student.id})
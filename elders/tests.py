@@ -1,3 +1,293 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from admin_panel import principals
+from admin_panel.models import Student
+from admin_panel.student_import import StudentImport
+from students.models import Attendance, GradebookEntry, Schedule, StudentGrade, StudentPerformance, Subject
+from journal_project.testing import add_group, make_group
+
+
+class ElderTestCase(TestCase):
+    """Группа со старостой; клиент вошёл как староста"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group()
+        cls.other_group = add_group(cls.group, 'СПД-102')
+        cls.elder = Student.objects.create(
+            login='elder', password='secret', full_name='Петров Пётр', group=cls.group, user_type='elder'
+        )
+
+    def setUp(self):
+        # Снимки пользователей в кэше переживают откат транзакции теста
+        principals.invalidate([self.elder.id])
+        session = self.client.session
+        session['elder_id'] = self.elder.id
+        session.save()
+
+
+class ImportStudentsTest(ElderTestCase):
+    """Импорт старосты создаёт студентов только в его группе"""
+
+    def post(self, content):
+        upload = SimpleUploadedFile('roster.csv', content.encode('utf-8'), content_type='text/csv')
+        return self.client.post(reverse('api_import_students'), {'file': upload})
+
+    def test_group_column_ignored(self):
+        response = self.post(
+            f'ФИО;Логин;Группа;group_id\nИванов Иван;ivanov;СПД-102;{self.other_group.id}\n'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(Student.objects.get(login='ivanov').group_id, self.group.id)
+
+    def test_elder_without_group_forbidden(self):
+        self.elder.group = None
+        self.elder.save()
+        response = self.post('ФИО;Логин;Группа\nИванов Иван;intruder;СПД-102\n')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Student.objects.filter(login='intruder').exists())
+
+    def test_students_only_requires_group(self):
+        with self.assertRaises(ValueError):
+            StudentImport(group=None, students_only=True)
+
+
+class BulkGradesTest(ElderTestCase):
+    """Массовые оценки: результат по каждой строке, число запросов не зависит от числа строк"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.students = [
+            Student.objects.create(login=f'student{i}', password='secret', full_name=f'Студент {i}', group=cls.group)
+            for i in range(8)
+        ]
+        cls.outsider = Student.objects.create(login='outsider', password='secret', full_name='Чужой',
+                                              group=cls.other_group)
+        cls.math = Subject.objects.create(name='Математика', group=cls.group)
+        cls.history = Subject.objects.create(name='История', group=cls.group)
+
+    def post(self, subject, rows):
+        return self.client.post(reverse('api_add_grades_bulk'), json.dumps({
+            'subject_id': subject.id, 'date': '2026-03-02', 'grades': rows,
+        }), content_type='application/json')
+
+    def test_missing_fields(self):
+        self.assertEqual(self.post(self.math, []).status_code, 400)
+        response = self.client.post(reverse('api_add_grades_bulk'), 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        foreign = Subject.objects.create(name='Чужой предмет', group=self.other_group)
+        response = self.post(foreign, [{'student_id': self.students[0].id, 'grade_type': 'plus'}])
+        self.assertEqual(response.status_code, 404)
+
+    def test_results_per_row(self):
+        first, second = self.students[:2]
+        response = self.post(self.math, [
+            {'student_id': first.id, 'grade_type': 'numeric_5'},
+            {'student_id': 'abc', 'grade_type': 'plus'},
+            {'student_id': self.outsider.id, 'grade_type': 'plus'},
+            {'student_id': second.id, 'grade_type': 'excellent'},
+            {'student_id': first.id, 'grade_type': 'numeric_3'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created'], data['failed']), (2, 3))
+        results = data['results']
+        self.assertEqual([r['index'] for r in results], [0, 1, 2, 3, 4])
+        self.assertEqual([r['success'] for r in results], [True, False, False, False, True])
+        self.assertEqual(results[1]['error'], 'Invalid student_id')
+        self.assertEqual(results[2]['error'], 'Студент не найден в группе')
+        self.assertIn('excellent', results[3]['error'])
+        self.assertEqual((results[0]['points'], results[4]['points']), (5, 3))
+        self.assertEqual(results[4]['total'], 8)
+
+        self.assertEqual(StudentGrade.objects.filter(subject=self.math).count(), 2)
+        self.assertFalse(StudentGrade.objects.filter(student=self.outsider).exists())
+        self.assertEqual(StudentPerformance.objects.get(student=first, subject=self.math).total_points, 8)
+
+    def test_query_count_independent_of_rows(self):
+        # Первый запрос кладёт снимок старосты в кэш
+        self.post(self.math, [{'student_id': self.students[0].id, 'grade_type': 'unknown'}])
+
+        def queries(subject, students):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.post(subject, [{'student_id': s.id, 'grade_type': 'plus'} for s in students])
+            self.assertEqual(response.json()['created'], len(students))
+            return len(captured)
+
+        self.assertEqual(queries(self.math, self.students[:2]), queries(self.history, self.students[2:]))
+
+
+class BulkAttendanceTest(ElderTestCase):
+    """Массовые пропуски: проверка данных, пропущенные студенты, число запросов не зависит от числа студентов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.students = [
+            Student.objects.create(login=f'student{i}', password='secret', full_name=f'Студент {i}', group=cls.group)
+            for i in range(8)
+        ]
+        cls.outsider = Student.objects.create(login='outsider', password='secret', full_name='Чужой',
+                                              group=cls.other_group)
+
+    def post(self, **data):
+        return self.client.post(reverse('api_add_attendance_bulk'), json.dumps(data),
+                                content_type='application/json')
+
+    def test_validation(self):
+        ids = [self.students[0].id]
+        self.assertEqual(self.post(hours=2, student_ids=ids).status_code, 400)
+        self.assertEqual(self.post(date='02.03.2026', hours=2, student_ids=ids).status_code, 400)
+        self.assertEqual(self.post(date='2026-03-02', hours=9, student_ids=ids).status_code, 400)
+        response = self.post(date='2026-03-02', hours=2, student_ids=[self.outsider.id])
+        self.assertEqual(response.json()['error'], 'Нет студентов для отметки')
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_skips_foreign_students(self):
+        first, second = self.students[:2]
+        response = self.post(date='2026-03-02', hours=2, reason='Олимпиада',
+                             student_ids=[first.id, second.id, self.outsider.id, 999999])
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(sorted(data['student_ids']), [first.id, second.id])
+        self.assertEqual(data['skipped'], sorted([str(self.outsider.id), '999999']))
+        self.assertEqual(set(Attendance.objects.values_list('student_id', 'hours', 'group_id')),
+                         {(first.id, 2, self.group.id), (second.id, 2, self.group.id)})
+
+    def test_all_group(self):
+        response = self.post(date='2026-03-02', hours=4, all_group=True)
+        # Вся группа - и студенты, и сам староста
+        self.assertEqual(response.json()['created'], len(self.students) + 1)
+        self.assertFalse(Attendance.objects.filter(student=self.outsider).exists())
+
+    def test_query_count_independent_of_students(self):
+        # Первый запрос кладёт снимок старосты в кэш
+        self.post(date='2026-03-01', hours=1, student_ids=[self.outsider.id])
+
+        def queries(students):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.post(date='2026-03-02', hours=2, student_ids=[s.id for s in students])
+            self.assertEqual(response.json()['created'], len(students))
+            return len(captured)
+
+        self.assertEqual(queries(self.students[:2]), queries(self.students[2:]))
+
+
+class CopyScheduleTest(ElderTestCase):
+    """Копирование недель: dry-run ничего не пишет, обмен сохраняет пары и тип недели"""
+
+    def setUp(self):
+        super().setUp()
+        self.lessons = {
+            (week_type, day, pair): Schedule.objects.create(
+                group=self.group, week_type=week_type, day=day, pair_number=pair, subject=subject, room=room
+            )
+            for week_type, day, pair, subject, room in [
+                ('even', 1, 1, 'Математика', '101'),
+                ('even', 1, 2, 'Физика', '102'),
+                ('odd', 1, 1, 'История', '201'),
+                ('odd', 2, 3, 'Химия', '203'),
+            ]
+        }
+        # Занятие другой группы не затрагивается
+        Schedule.objects.create(group=self.other_group, week_type='odd', day=1, pair_number=1, subject='Чужое')
+
+    def post(self, **data):
+        return self.client.post(reverse('api_copy_schedule'), json.dumps(data), content_type='application/json')
+
+    def snapshot(self):
+        return (
+            sorted(Schedule.objects.values_list('id', 'group_id', 'week_type', 'day', 'pair_number', 'subject', 'room')),
+            sorted(Subject.objects.values_list('group_id', 'name')),
+        )
+
+    def week(self, week_type):
+        return {
+            (lesson.day, lesson.pair_number): (lesson.subject, lesson.room)
+            for lesson in Schedule.objects.filter(group=self.group, week_type=week_type)
+        }
+
+    def test_dry_run_writes_nothing(self):
+        before = self.snapshot()
+        response = self.post(from_week='even', to_week='odd', mode='swap', dry_run=True)
+        self.assertEqual(response.status_code, 200)
+        diff = response.json()['diff']
+        self.assertEqual([(l['day'], l['pair_number']) for l in diff['odd']['added']], [(1, 2)])
+        self.assertEqual(diff['odd']['changed'][0]['fields']['subject'], {'old': 'История', 'new': 'Математика'})
+        self.assertEqual([l['id'] for l in diff['odd']['removed']], [self.lessons['odd', 2, 3].id])
+        self.assertEqual([l['id'] for l in diff['even']['removed']], [self.lessons['even', 1, 2].id])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_swap(self):
+        even, odd = self.week('even'), self.week('odd')
+        response = self.post(from_week='even', to_week='odd', mode='swap')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.week('even'), odd)
+        self.assertEqual(self.week('odd'), even)
+        # Совпавшие по (день, пара) занятия обновлены на месте - слоты и комментарии остаются
+        self.assertEqual(Schedule.objects.get(id=self.lessons['even', 1, 1].id).subject, 'История')
+        self.assertEqual(Schedule.objects.get(id=self.lessons['odd', 1, 1].id).subject, 'Математика')
+        self.assertEqual(Schedule.objects.get(group=self.other_group).subject, 'Чужое')
+        self.assertEqual(set(Subject.objects.filter(group=self.group).values_list('name', flat=True)),
+                         {'Математика', 'Физика', 'История', 'Химия'})
+
+    def test_copy_and_validation(self):
+        even = self.week('even')
+        self.assertEqual(self.post(from_week='even', to_week='odd').status_code, 200)
+        self.assertEqual((self.week('even'), self.week('odd')), (even, even))
+        self.assertEqual(self.post(from_week='even', to_week='even').status_code, 400)
+        self.assertEqual(self.post(from_week='even', to_week='weekly').status_code, 400)
+        self.assertEqual(self.post(from_week='even', to_week='odd', mode='merge').status_code, 400)
+
+
+class SeminarSlotsTest(ElderTestCase):
+    """Семинары со слотами: только группа старосты, без week_type - занятия 'both'"""
+
+    def setUp(self):
+        super().setUp()
+        for group, week_type, subject in [
+            (self.group, 'even', 'Математика'),
+            (self.group, 'both', 'Физика'),
+            (self.other_group, 'both', 'Чужое'),
+        ]:
+            Schedule.objects.create(group=group, week_type=week_type, day=1, pair_number=1, subject=subject,
+                                    lesson_type='seminar')
+
+    def subjects(self, **params):
+        response = self.client.get(reverse('api_seminar_slots'), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(seminar['subject'] for seminar in response.json()['seminars'])
+
+    def test_week_types(self):
+        self.assertEqual(self.subjects(week_type='even'), ['Математика', 'Физика'])
+        self.assertEqual(self.subjects(week_type='odd'), ['Физика'])
+        self.assertEqual(self.subjects(), ['Физика'])
+        response = self.client.get(reverse('api_seminar_slots'), {'week_type': 'weekly'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_group_id_ignored(self):
+        self.assertEqual(self.subjects(week_type='odd', group_id=self.other_group.id), ['Физика'])
+
+
+class DeleteStudentTest(ElderTestCase):
+    """Удаление студента: оценки, успеваемость и ячейки журнала уходят вместе с ним"""
 
-# Create your tests here.
+    def test_grades_and_gradebook_removed(self):
+        student = Student.objects.create(login='ivanov', password='secret', full_name='Иванов Иван', group=self.group)
+        math = Subject.objects.create(name='Математика', group=self.group)
+        StudentGrade.objects.create(student=student, subject=math, grade_type='numeric_5', raw_value='5',
+                                    date='2026-03-02')
+        response = self.client.post(reverse('api_delete_student'), json.dumps({'student_id': student.id}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(StudentGrade.objects.filter(student_id=student.id).exists())
+        self.assertFalse(StudentPerformance.objects.filter(student_id=student.id).exists())
+        self.assertFalse(GradebookEntry.objects.filter(student_id=student.id).exists())
@@ -17,9 +17,11 @@ urlpatterns = [
     path('api/update-lesson/', views.api_update_lesson, name='api_update_lesson'),
     path('api/delete-lesson/', views.api_delete_lesson, name='api_delete_lesson'),
     path('api/get-lesson/<int:lesson_id>/', views.api_get_lesson, name='api_get_lesson'),
+    path('api/copy-schedule/', views.api_copy_schedule, name='api_copy_schedule'),
     
     # Оценки
     path('api/add-grade/', views.api_add_grade, name='api_add_grade'),
+    path('api/add-grades-bulk/', views.api_add_grades_bulk, name='api_add_grades_bulk'),
     path('api/delete-grade/', views.api_delete_grade, name='api_delete_grade'),
     path('api/get-subjects/', views.api_get_subjects, name='api_get_subjects'),
     path('api/students-with-points/', views.api_students_with_points, name='api_students_with_points'),
@@ -27,11 +29,13 @@ urlpatterns = [
     
     # Пропуски
     path('api/add-attendance/', views.api_add_attendance, name='api_add_attendance'),
+    path('api/add-attendance-bulk/', views.api_add_attendance_bulk, name='api_add_attendance_bulk'),
     path('api/delete-attendance/', views.api_delete_attendance, name='api_delete_attendance'),
     path('api/attendance-history/', views.api_attendance_history, name='api_attendance_history'),
     
     # Студенты
     path('api/add-student/', views.api_add_student, name='api_add_student'),
+    path('api/import-students/', views.api_import_students, name='api_import_students'),
     path('api/update-student/', views.api_update_student, name='api_update_student'),
     path('api/delete-student/', views.api_delete_student, name='api_delete_student'),
     path('api/get-student/<int:student_id>/', views.api_get_student, name='api_get_student'),
@@ -1,26 +1,49 @@
-from django.db import models 
+from asgiref.sync import iscoroutinefunction
+from django.db import models, transaction
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from admin_panel.models import Student, Group, ElderPermission
-from students.models import StudentProfile, StudentGrade, Subject, Schedule, ScheduleComment, StudentPerformance, Attendance, SeminarSlot 
+from admin_panel import principals
+from admin_panel.student_import import import_students, detect_format
+from students.models import StudentProfile, StudentGrade, Subject, Schedule, ScheduleComment, StudentPerformance, Attendance, SeminarSlot, GradebookEntry
+from students.schedule_cache import get_week_lessons, aget_week_lessons
+from students.schedule_copy import copy_week
 from .utils import get_week_type_for_date, get_current_week_type
 import json
+import logging
 import random
 import string
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 # ==================== ДЕКОРАТОР ДЛЯ ПРОВЕРКИ ПРАВ СТАРОСТЫ ====================
 
 def elder_required(view_func):
-    """Декоратор для проверки прав старосты"""
+    """Декоратор для проверки прав старосты (для async view - асинхронная проверка)"""
+    if iscoroutinefunction(view_func):
+        async def async_wrapper(request, *args, **kwargs):
+            if not await request.session.aget('elder_id'):
+                return redirect('elder_login')
+            try:
+                elder = await principals.afrom_request(request, 'elder')
+            except Student.DoesNotExist:
+                return redirect('elder_login')
+            if elder.user_type != 'elder' and not elder.is_elder:
+                return redirect('elder_login')
+            request.elder = elder
+            request.group = elder.group
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     def wrapper(request, *args, **kwargs):
         elder_id = request.session.get('elder_id')
         if not elder_id:
             return redirect('elder_login')
         try:
-            elder = Student.objects.get(id=elder_id)
+            elder = principals.from_request(request, 'elder')
             # Проверяем, что пользователь действительно староста
             if elder.user_type != 'elder' and not elder.is_elder:
                 return redirect('elder_login')
@@ -41,24 +64,24 @@ def elder_login(request):
         login_input = request.POST.get('login')
         password_input = request.POST.get('password')
         
-        print(f"Попытка входа старосты: {login_input}")
+        logger.debug('Попытка входа старосты: %s', login_input)
         
         try:
             # Ищем студента по логину (как в admin_login)
             student = Student.objects.get(login=login_input)
-            print(f"Найден студент: {student.full_name}, user_type: {student.user_type}, is_elder: {student.is_elder}")
+            logger.debug('Найден студент: %s, user_type: %s, is_elder: %s', student.full_name, student.user_type, student.is_elder)
             
             # Проверяем пароль (простое сравнение, как в admin_login)
             if student.password != password_input:
                 error = 'Неверный пароль'
-                print("Неверный пароль")
+                logger.debug('Неверный пароль')
             # Проверяем, что это староста (user_type='elder' ИЛИ is_elder=True)
             elif student.user_type != 'elder' and not student.is_elder:
                 error = 'У вас нет прав старосты'
-                print("Не староста")
+                logger.debug('Не староста')
             else:
                 # Всё хорошо - пускаем
-                print("Вход разрешен")
+                logger.debug('Вход разрешен')
                 request.session['elder_id'] = student.id
                 request.session['elder_name'] = student.full_name
                 request.session['elder_group_id'] = student.group.id if student.group else None
@@ -78,7 +101,7 @@ def elder_login(request):
                 
         except Student.DoesNotExist:
             error = 'Пользователь не найден'
-            print("Пользователь не найден")
+            logger.debug('Пользователь не найден')
     
     return render(request, 'elders/login.html', {'error': error})
 
@@ -194,7 +217,7 @@ def api_add_lesson(request):
         return JsonResponse({'success': True, 'id': lesson.id})
         
     except Exception as e:
-        print(f"Error in api_add_lesson: {e}")
+        logger.debug('Error in api_add_lesson: %s', e)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 @elder_required
@@ -356,45 +379,23 @@ def elder_grades(request):
     week_display = 'Чётная' if week_type == 'even' else 'Нечётная'
     
     students = request.group.students.all().order_by('full_name') if request.group else []
-    students_count = students.count()
+    students_count = len(students)
     
-    # Добавляем студентам дополнительные атрибуты
-    for student in students:
-        # Количество предметов, по которым есть оценки
-        student.subjects_count = StudentGrade.objects.filter(
-            student=student
-        ).values_list('subject', flat=True).distinct().count()
-        
-        # Средний прогресс по всем предметам
-        performances = StudentPerformance.objects.filter(student=student)
-        if performances.exists():
-            total_progress = 0
-            for p in performances:
-                # Вычисляем прогресс вручную, если свойство не работает
-                progress = (p.total_points / p.target_points) * 100 if p.target_points else 0
-                total_progress += min(100, progress)
-            student.avg_progress = round(total_progress / performances.count(), 1)
-        else:
-            student.avg_progress = 0
+    # Сводка по журналу группы (один запрос к предрасчитанной таблице)
+    summary = GradebookEntry.group_summary(request.group)
     
     # Статистика по успеваемости
     at_risk_count = 0
     ready_count = 0
     
     for student in students:
-        performances = StudentPerformance.objects.filter(student=student)
-        student_at_risk = False
-        student_ready = True
-        
-        for perf in performances:
-            if perf.total_points < 15:
-                student_at_risk = True
-            if perf.total_points < 21:
-                student_ready = False
+        stats = summary.get(student.id, GradebookEntry.EMPTY_SUMMARY)
+        student.subjects_count = stats['subjects_count']
+        student.avg_progress = stats['avg_progress']
         
-        if student_at_risk:
+        if stats['at_risk']:
             at_risk_count += 1
-        if student_ready and performances.exists():
+        if stats['ready']:
             ready_count += 1
     
     # Получаем все предметы группы
@@ -497,7 +498,45 @@ def api_add_student(request):
         })
         
     except Exception as e:
-        print(f"Ошибка при добавлении студента: {e}")
+        logger.debug('Ошибка при добавлении студента: %s', e)
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+@elder_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_import_students(request):
+    """Импорт списка студентов группы из CSV/XLSX (поле file, dry_run - только проверка)"""
+    # Без группы импорт взял бы группы из файла - староста создал бы студентов где угодно
+    if request.group is None:
+        return JsonResponse({'success': False, 'error': 'Староста не привязан к группе'}, status=403)
+    try:
+        upload = request.FILES.get('file')
+        if not upload:
+            return JsonResponse({'success': False, 'error': 'Файл не передан'}, status=400)
+        
+        try:
+            max_students = request.elder.permissions.max_students
+        except ElderPermission.DoesNotExist:
+            max_students = None
+        
+        try:
+            report = import_students(
+                upload.file,
+                request.POST.get('format') or detect_format(upload.name),
+                group=request.group,
+                dry_run=request.POST.get('dry_run') in ('1', 'true', 'on'),
+                max_students=max_students,
+                students_only=True,
+                user=request.elder,
+                request=request,
+                filename=upload.name,
+            )
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        
+        return JsonResponse({'success': True, **report})
+        
+    except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 @elder_required
@@ -531,12 +570,15 @@ def api_delete_student(request):
         
         student = get_object_or_404(Student, id=student_id, group=request.group)
         
-        # Удаляем связанные данные
-        StudentProfile.objects.filter(user=student).delete()
-        StudentGrade.objects.filter(student=student).delete()
-        
-        # Удаляем студента
-        student.delete()
+        # Удаляем связанные данные. Оценки удаляются одним DELETE в обход
+        # StudentGrade.delete(): успеваемость и ячейки журнала студента уходят
+        # каскадом вместе с ним, поэтому всё в одной транзакции
+        with transaction.atomic():
+            StudentProfile.objects.filter(user=student).delete()
+            StudentGrade.objects.filter(student=student).delete()
+            
+            # Удаляем студента
+            student.delete()
         
         return JsonResponse({'success': True})
         
@@ -580,7 +622,7 @@ def api_add_grade(request):
     """Добавление оценки студенту"""
     try:
         data = json.loads(request.body)
-        print(f"Grade data received: {data}")  # Отладка
+        logger.debug('Grade data received: %s', data)
         
         student_id = data.get('student_id')
         subject_id = data.get('subject_id')
@@ -601,34 +643,24 @@ def api_add_grade(request):
             except:
                 grade_date = datetime.now().date()
         
-        # Создаем оценку
-        grade = StudentGrade.objects.create(
-            student=student,
-            subject=subject,
-            group=request.group,
-            grade_type=data['grade_type'],
-            raw_value=data.get('raw_value', data['grade_type']),
-            date=grade_date,
-            is_today=use_today,
-            marked_by=request.elder,
-            comment=data.get('comment', '')
-        )
-        
-        # Обновляем StudentPerformance
-        performance, created = StudentPerformance.objects.get_or_create(
-            student=student,
-            subject=subject,
-            defaults={'total_points': 0}
-        )
-        
-        # Пересчитываем общие баллы
-        total_points = StudentGrade.objects.filter(
-            student=student,
-            subject=subject
-        ).aggregate(total=models.Sum('points'))['total'] or 0
-        
-        performance.total_points = total_points
-        performance.save()
+        # Создаем оценку (баллы проводятся в StudentPerformance инкрементально)
+        with transaction.atomic():
+            grade = StudentGrade.objects.create(
+                student=student,
+                subject=subject,
+                group=request.group,
+                grade_type=data['grade_type'],
+                raw_value=data.get('raw_value', data['grade_type']),
+                date=grade_date,
+                is_today=use_today,
+                marked_by=request.elder,
+                comment=data.get('comment', '')
+            )
+            
+            total_points = StudentPerformance.objects.filter(
+                student=student,
+                subject=subject
+            ).values_list('total_points', flat=True).first() or 0
         
         return JsonResponse({
             'success': True,
@@ -641,7 +673,110 @@ def api_add_grade(request):
         })
         
     except Exception as e:
-        print(f"Error in api_add_grade: {e}")
+        logger.debug('Error in api_add_grade: %s', e)
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@elder_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_add_grades_bulk(request):
+    """Массовое добавление оценок по одному предмету (весь семинар одним запросом)"""
+    try:
+        data = json.loads(request.body)
+        subject_id = data.get('subject_id')
+        rows = data.get('grades') or []
+        
+        if not subject_id or not isinstance(rows, list) or not rows:
+            return JsonResponse({'success': False, 'error': 'Missing subject_id or grades'}, status=400)
+        
+        subject = Subject.objects.filter(id=subject_id, group=request.group).first()
+        if subject is None:
+            return JsonResponse({'success': False, 'error': 'Предмет не найден'}, status=404)
+        
+        # Обработка даты (одна на весь семинар)
+        use_today = data.get('use_today') == 'true' or data.get('use_today') is True
+        if use_today:
+            grade_date = datetime.now().date()
+        else:
+            try:
+                grade_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            except:
+                grade_date = datetime.now().date()
+        
+        # Проверяем всех студентов группы одним запросом
+        requested_ids = set()
+        for row in rows:
+            try:
+                requested_ids.add(int(row.get('student_id')))
+            except (TypeError, ValueError, AttributeError):
+                pass
+        group_student_ids = set(Student.objects.filter(
+            id__in=requested_ids, group=request.group
+        ).values_list('id', flat=True))
+        
+        grade_types = dict(StudentGrade.GRADE_TYPES)
+        results = []
+        grades = []
+        for index, row in enumerate(rows):
+            try:
+                student_id = int(row.get('student_id'))
+            except (TypeError, ValueError, AttributeError):
+                results.append({'index': index, 'success': False, 'error': 'Invalid student_id'})
+                continue
+            
+            grade_type = row.get('grade_type')
+            if student_id not in group_student_ids:
+                results.append({'index': index, 'student_id': student_id, 'success': False,
+                                'error': 'Студент не найден в группе'})
+                continue
+            if grade_type not in grade_types:
+                results.append({'index': index, 'student_id': student_id, 'success': False,
+                                'error': f'Неизвестный тип оценки: {grade_type}'})
+                continue
+            
+            results.append({'index': index, 'student_id': student_id, 'success': True})
+            grades.append(StudentGrade(
+                student_id=student_id,
+                subject=subject,
+                group=request.group,
+                grade_type=grade_type,
+                raw_value=row.get('raw_value', grade_type),
+                date=grade_date,
+                is_today=use_today,
+                marked_by=request.elder,
+                comment=row.get('comment', '')
+            ))
+        
+        created = StudentGrade.bulk_add(grades)
+        
+        totals = dict(StudentPerformance.objects.filter(
+            subject=subject,
+            student_id__in=[g.student_id for g in created]
+        ).values_list('student_id', 'total_points'))
+        
+        created_iter = iter(created)
+        for result in results:
+            if result['success']:
+                grade = next(created_iter)
+                result.update({
+                    'id': grade.id,
+                    'value': grade.raw_value,
+                    'points': grade.points,
+                    'total': totals.get(grade.student_id, 0)
+                })
+        
+        return JsonResponse({
+            'success': True,
+            'created': len(created),
+            'failed': len(results) - len(created),
+            'results': results
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Неверный формат JSON'}, status=400)
+    except Exception as e:
+        logger.debug('Error in api_add_grades_bulk: %s', e)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
@@ -655,6 +790,7 @@ def api_delete_grade(request):
         grade_id = data.get('grade_id')
         
         grade = get_object_or_404(StudentGrade, id=grade_id, student__group=request.group)
+        # StudentGrade.delete() сам списывает баллы из StudentPerformance
         grade.delete()
         
         return JsonResponse({'success': True})
@@ -689,7 +825,62 @@ def api_add_attendance(request):
         return JsonResponse({'success': True})
         
     except Exception as e:
-        print(f"Error adding attendance: {e}")
+        logger.debug('Error adding attendance: %s', e)
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@elder_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_add_attendance_bulk(request):
+    """Массовое добавление пропусков (например, вся группа на отменённой паре)"""
+    try:
+        data = json.loads(request.body)
+        
+        if not data.get('date') or not data.get('hours'):
+            return JsonResponse({'success': False, 'error': 'Missing date or hours'}, status=400)
+        
+        attendance_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+        hours = int(data['hours'])
+        valid_hours = dict(Attendance._meta.get_field('hours').choices)
+        if hours not in valid_hours:
+            return JsonResponse({'success': False, 'error': f'Недопустимое количество часов: {hours}'}, status=400)
+        
+        # Вся группа или выбранные студенты (проверяем принадлежность одним запросом)
+        students = Student.objects.filter(group=request.group)
+        if not data.get('all_group'):
+            students = students.filter(id__in=data.get('student_ids') or [])
+        student_ids = list(students.values_list('id', flat=True))
+        
+        if not student_ids:
+            return JsonResponse({'success': False, 'error': 'Нет студентов для отметки'}, status=400)
+        
+        created = Attendance.bulk_add([
+            Attendance(
+                student_id=student_id,
+                group=request.group,
+                date=attendance_date,
+                hours=hours,
+                reason=data.get('reason', ''),
+                marked_by=request.elder
+            )
+            for student_id in student_ids
+        ])
+        
+        requested = {str(i) for i in data.get('student_ids') or []}
+        skipped = sorted(requested - {str(i) for i in student_ids})
+        
+        return JsonResponse({
+            'success': True,
+            'created': len(created),
+            'student_ids': student_ids,
+            'skipped': skipped
+        })
+        
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': f'Неверные данные: {e}'}, status=400)
+    except Exception as e:
+        logger.debug('Error adding attendance bulk: %s', e)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
@@ -735,7 +926,7 @@ def api_get_lesson(request, lesson_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 @elder_required
-def api_get_schedule(request):
+async def api_get_schedule(request):
     """Получение расписания для отображения"""
     try:
         week_type = request.GET.get('week_type')
@@ -743,11 +934,11 @@ def api_get_schedule(request):
         
         if not week_type or not group_id:
             return JsonResponse({'error': 'Missing parameters'}, status=400)
+        if week_type not in dict(Schedule.WEEK_TYPES):
+            return JsonResponse({'error': 'Invalid week_type'}, status=400)
         
-        schedule = Schedule.objects.filter(
-            group_id=group_id,
-            week_type__in=[week_type, 'both']
-        ).order_by('day', 'pair_number')
+        # Расписание недели из кэша группы
+        schedule = await aget_week_lessons(group_id, week_type)
         
         data = [{
             'id': s.id,
@@ -857,36 +1048,23 @@ def api_update_lesson(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_copy_schedule(request):
-    """Копирование расписания с другой недели"""
+    """Копирование расписания с другой недели (или обмен недель местами)"""
     try:
         data = json.loads(request.body)
         from_week = data.get('from_week')
         to_week = data.get('to_week')
+        mode = data.get('mode', 'copy')
+        dry_run = bool(data.get('dry_run', False))
         
         if not from_week or not to_week:
             return JsonResponse({'success': False, 'error': 'Missing week parameters'}, status=400)
         
-        # Удаляем существующее расписание на целевой неделе
-        Schedule.objects.filter(group=request.group, week_type=to_week).delete()
-        
-        # Копируем с исходной недели
-        source_schedule = Schedule.objects.filter(group=request.group, week_type=from_week)
-        
-        for lesson in source_schedule:
-            Schedule.objects.create(
-                group=request.group,
-                day=lesson.day,
-                week_type=to_week,
-                pair_number=lesson.pair_number,
-                start_time=lesson.start_time,
-                end_time=lesson.end_time,
-                subject=lesson.subject,
-                teacher=lesson.teacher,
-                room=lesson.room,
-                lesson_type=lesson.lesson_type
-            )
+        try:
+            diff = copy_week(request.group, from_week, to_week, mode=mode, dry_run=dry_run)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
         
-        return JsonResponse({'success': True})
+        return JsonResponse({'success': True, 'dry_run': dry_run, 'diff': diff})
         
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -968,18 +1146,8 @@ def api_get_priority(request):
     
     return JsonResponse({'priority': priority_data, 'subject': subject})
 
-# ==================== ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ====================
-
-def get_week_type(date):
-    """Определение типа недели (четная/нечетная)"""
-    start_date = datetime(2024, 1, 1).date()
-    days_diff = (date - start_date).days
-    week_number = days_diff // 7
-    return 'even' if week_number % 2 == 0 else 'odd'
-
-
 @elder_required
-def api_get_subjects(request):
+async def api_get_subjects(request):
     """Получение списка предметов группы"""
     subjects = Subject.objects.filter(group=request.group, is_active=True)
     
@@ -987,7 +1155,7 @@ def api_get_subjects(request):
         'id': s.id,
         'name': s.name,
         'teacher': s.teacher
-    } for s in subjects]
+    } async for s in subjects]
     
     return JsonResponse({'subjects': data})
 
@@ -1041,6 +1209,7 @@ def api_delete_grade(request):
         grade_id = data.get('id')
         
         grade = get_object_or_404(StudentGrade, id=grade_id, student__group=request.group)
+        # StudentGrade.delete() сам списывает баллы из StudentPerformance
         grade.delete()
         
         return JsonResponse({'success': True})
@@ -1056,7 +1225,7 @@ def api_add_comment(request):
     """Добавление комментария к расписанию"""
     try:
         data = json.loads(request.body)
-        print("Received comment data:", data)  # Отладка
+        logger.debug('Received comment data: %s', data)
         
         comment = ScheduleComment.objects.create(
             group=request.group,
@@ -1071,19 +1240,20 @@ def api_add_comment(request):
         return JsonResponse({'success': True, 'id': comment.id})
         
     except Exception as e:
-        print("Error adding comment:", str(e))  # Отладка
+        logger.debug('Error adding comment: %s', e)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 @elder_required
-def api_get_comments(request):
+async def api_get_comments(request):
     """Получение комментариев"""
     try:
         week_type = request.GET.get('week_type')
         
+        # Автор загружается сразу: в async view ленивый запрос по FK невозможен
         comments = ScheduleComment.objects.filter(
             group=request.group,
             is_active=True
-        ).order_by('-created_at')
+        ).select_related('created_by').order_by('-created_at')
         
         if week_type:
             comments = comments.filter(
@@ -1100,12 +1270,12 @@ def api_get_comments(request):
             'is_urgent': c.is_urgent,
             'author': c.created_by.full_name if c.created_by else 'Система',
             'created_time': c.created_at.strftime('%H:%M %d.%m.%Y')
-        } for c in comments]
+        } async for c in comments]
         
         return JsonResponse({'comments': data})
         
     except Exception as e:
-        print("Error getting comments:", str(e))
+        logger.debug('Error getting comments: %s', e)
         return JsonResponse({'error': str(e), 'comments': []}, status=500)
 
 
@@ -1159,12 +1329,7 @@ def api_delete_attendance(request):
         data = json.loads(request.body)
         attendance = get_object_or_404(Attendance, id=data['id'], student__group=request.group)
         
-        # Обновляем профиль
-        profile = StudentProfile.objects.get_or_create(user=attendance.student)[0]
-        profile.total_hours -= attendance.hours
-        profile.remaining_hours = max(0, 20 - profile.total_hours)
-        profile.save()
-        
+        # Профиль пересчитывается в Attendance.delete()
         attendance.delete()
         
         return JsonResponse({'success': True})
@@ -1176,35 +1341,47 @@ def api_delete_attendance(request):
 @elder_required
 def api_seminar_slots(request):
     """Получение семинаров со слотами"""
-    week_type = request.GET.get('week_type')
-    group_id = request.GET.get('group_id')
+    # Без week_type - только занятия 'both', как до кэша расписания
+    week_type = request.GET.get('week_type') or 'both'
+    if week_type not in dict(Schedule.WEEK_TYPES):
+        return JsonResponse({'error': 'Invalid week_type'}, status=400)
+    # Только своя группа: group_id из запроса не используется
+    group_id = request.group.id if request.group else None
+    
+    # Семинары недели берём из кэша расписания группы
+    seminars = [
+        lesson for lesson in get_week_lessons(group_id, week_type)
+        if lesson.lesson_type == 'seminar'
+    ]
     
-    seminars = Schedule.objects.filter(
-        group_id=group_id,
-        week_type__in=[week_type, 'both'],
-        lesson_type='seminar'
-    ).order_by('day', 'pair_number')
+    # Слоты всех семинаров, предметы и баллы - по одному запросу на каждое
+    slots_by_seminar = {}
+    for slot in SeminarSlot.objects.filter(
+        schedule_id__in=[s.id for s in seminars]
+    ).select_related('student').order_by('slot_number'):
+        slots_by_seminar.setdefault(slot.schedule_id, []).append(slot)
+    
+    subject_ids = dict(
+        Subject.objects.filter(group=request.group).values_list('name', 'id')
+    )
+    points = {
+        (student_id, subject_id): total_points
+        for student_id, subject_id, total_points in StudentPerformance.objects.filter(
+            subject_id__in=subject_ids.values()
+        ).values_list('student_id', 'subject_id', 'total_points')
+    }
     
     data = []
     for seminar in seminars:
-        slots = SeminarSlot.objects.filter(schedule=seminar)
+        subject_id = subject_ids.get(seminar.subject)
         slots_data = []
-        for slot in slots:
-            student_points = 0
-            if slot.student:
-                try:
-                    subject = Subject.objects.get(name=seminar.subject, group=request.group)
-                    performance = StudentPerformance.objects.get(student=slot.student, subject=subject)
-                    student_points = performance.total_points
-                except:
-                    pass
-            
+        for slot in slots_by_seminar.get(seminar.id, []):
             slots_data.append({
                 'id': slot.id,
                 'slot_number': slot.slot_number,
                 'student_id': slot.student.id if slot.student else None,
                 'student_name': slot.student.full_name if slot.student else None,
-                'student_points': student_points
+                'student_points': points.get((slot.student_id, subject_id), 0) if slot.student else 0
             })
         
         data.append({
@@ -1271,7 +1448,7 @@ def api_student_points(request):
         
         return JsonResponse({'total_points': performance.total_points})
     except Exception as e:
-        print(f"Error in api_student_points: {e}")
+        logger.debug('Error in api_student_points: %s', e)
         return JsonResponse({'total_points': 0})
 
 def get_subject_id(seminar_id):
@@ -1283,19 +1460,6 @@ def get_subject_id(seminar_id):
     except:
         return None
 
-@elder_required
-def api_students_list(request):
-    """Список студентов группы"""
-    group_id = request.GET.get('group_id')
-    students = Student.objects.filter(group_id=group_id, is_active=True).order_by('full_name')
-    
-    data = [{
-        'id': s.id,
-        'name': s.full_name
-    } for s in students]
-    
-    return JsonResponse({'students': data})
-
 @elder_required
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -1349,7 +1513,7 @@ def api_get_subject_id(request):
         )
         return JsonResponse({'subject_id': subject.id})
     except (Schedule.DoesNotExist, Subject.DoesNotExist) as e:
-        print(f"Error in api_get_subject_id: {e}")
+        logger.debug('Error in api_get_subject_id: %s', e)
         return JsonResponse({'subject_id': None, 'error': str(e)})
 
 @elder_required
@@ -5,12 +5,24 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Production-запуск: manage.py serve (uvicorn, несколько процессов).
+Синхронный код запроса Django выполняет в отдельном потоке на запрос;
+пул для sync_to_async(thread_sensitive=False) задаёт переменная окружения
+ASGI_THREADS (asgiref).
+При SERVE_STATIC приложение само отдаёт /static/ (journal_project/assets.py).
 """
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'journal_project.settings')
 
 application = get_asgi_application()
+
+if settings.SERVE_STATIC:
+    from journal_project.assets import StaticFilesHandler
+
+    application = StaticFilesHandler(application)
@@ -0,0 +1,355 @@
+# journal_project/assets.py
+"""
+Сборка и отдача статики.
+
+manage.py build_static запускает collectstatic с BuildStaticFilesStorage
+(STORAGES['staticfiles']):
+- JS и CSS проекта (STATICFILES_DIRS) сжимаются: без комментариев,
+  отступов и лишних пробелов. Строки, шаблонные строки и регулярные
+  выражения не меняются, переводы строк в JS сохраняются - автоматическая
+  вставка «;» работает как в исходнике;
+- имя каждого файла получает хэш содержимого (staticfiles.json, как
+  у ManifestStaticFilesStorage);
+- для текстовых файлов рядом кладутся готовые .gz и .br (brotli -
+  если установлен пакет Brotli).
+
+При STATIC_MANIFEST=1 {% static %} ссылается на имена с хэшем даже при
+DEBUG, а StaticFilesHandler (journal_project/asgi.py) отдаёт их из
+STATIC_ROOT: готовый вариант по Accept-Encoding и Cache-Control на год
+(immutable) - новая версия файла получает новое имя. Без STATIC_MANIFEST
+(разработка, тесты) ссылки и отдача - по исходным именам, как раньше.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, StaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - сборка без .br
+    brotli = None
+
+# Что сжимается заранее и с какого размера (байт)
+COMPRESSIBLE = ('.js', '.css', '.svg', '.html', '.json', '.txt', '.xml', '.map', '.ico')
+MIN_COMPRESS_SIZE = 512
+
+# Вариант пишется, только если он меньше исходного хотя бы на 5%
+MIN_COMPRESS_RATIO = 0.95
+
+# Accept-Encoding -> расширение, в порядке предпочтения
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'public, max-age=0, must-revalidate'
+
+
+# ==================== СЖАТИЕ JS/CSS ====================
+
+# Слова, после которых «/» начинает регулярное выражение, а не деление
+_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'throw',
+    'delete', 'instanceof', 'new', 'yield', 'await',
+}
+# Знаки, после которых «/» начинает регулярное выражение. После ), ], имени,
+# числа, постфиксных ++/-- и перевода строки (ASI не разрывает выражение) - деление
+_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_WORD = re.compile(r'[\w$]+$')
+
+
+def _string_end(source, i):
+    """Индекс после строки в кавычках, начинающейся в i"""
+    quote, i = source[i], i + 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote or char == '\n':
+            return i + 1
+        i += 1
+    return i
+
+
+def _template_end(source, i):
+    """Индекс после шаблонной строки `...`, включая вложенные ${...}"""
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '`':
+            return i + 1
+        if char == '$' and source.startswith('{', i + 1):
+            i = _expression_end(source, i + 2)
+            continue
+        i += 1
+    return i
+
+
+def _expression_end(source, i):
+    """Индекс после «}», закрывающей ${ с позиции i"""
+    depth = 1
+    while i < len(source):
+        char = source[i]
+        if char in '\'"':
+            i = _string_end(source, i)
+            continue
+        if char == '`':
+            i = _template_end(source, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _regex_end(source, i):
+    """Индекс после регулярного выражения /.../флаги"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return i
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """Может ли «/» после уже выведенного кода начинать регулярное выражение"""
+    code = ''.join(out[-16:]).rstrip(' \n')
+    if not code:
+        return True
+    if code.endswith(('++', '--')):
+        return False
+    if code[-1] in _REGEX_AFTER:
+        return True
+    word = _WORD.search(code)
+    return bool(word) and word.group() in _REGEX_KEYWORDS
+
+
+def minify_js(source):
+    """Консервативное сжатие JS: убирает комментарии, отступы, пустые строки и повторные пробелы"""
+    out = []
+    i, n = 0, len(source)
+    while i < n:
+        char = source[i]
+        if char in '\'"':
+            end = _string_end(source, i)
+        elif char == '`':
+            end = _template_end(source, i)
+        elif char == '/' and source.startswith('/', i + 1):
+            i = source.find('\n', i)
+            i = n if i == -1 else i
+            continue
+        elif char == '/' and source.startswith('*', i + 1):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            # Многострочный комментарий мог разделять инструкции
+            _space(out, '\n' if '\n' in source[i:end] else ' ')
+            i = end
+            continue
+        elif char == '/' and _regex_allowed(out):
+            end = _regex_end(source, i)
+        elif char in ' \t\r\n':
+            _space(out, '\n' if char == '\n' else ' ')
+            i += 1
+            continue
+        else:
+            end = i + 1
+        out.append(source[i:end])
+        i = end
+    return ''.join(out).strip() + '\n'
+
+
+def _space(out, char):
+    """Пробел или перевод строки без повторов и хвостовых пробелов"""
+    if char == '\n':
+        while out and out[-1] == ' ':
+            out.pop()
+        if out and out[-1] != '\n':
+            out.append('\n')
+    elif out and out[-1] not in (' ', '\n'):
+        out.append(' ')
+
+
+# Пробелы вокруг этих символов в CSS не значимы
+_CSS_PUNCTUATION = set('{};,>')
+
+
+def minify_css(source):
+    """Сжатие CSS: убирает комментарии, переводы строк и пробелы вокруг { } ; , > и после :"""
+    out = []
+    i, n = 0, len(source)
+    while i < n:
+        char = source[i]
+        if char in '\'"':
+            end = _string_end(source, i)
+            out.append(source[i:end])
+            i = end
+            continue
+        if char == '/' and source.startswith('*', i + 1):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if char in ' \t\r\n':
+            if out and out[-1] not in _CSS_PUNCTUATION and out[-1] not in (' ', ':'):
+                out.append(' ')
+            i += 1
+            continue
+        if char in _CSS_PUNCTUATION and out and out[-1] == ' ':
+            out.pop()
+        if char == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(char)
+        i += 1
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# ==================== СБОРКА ====================
+
+def compress_file(path):
+    """Пишет path.gz и path.br (если меньше исходного); список созданных вариантов"""
+    if not path.endswith(COMPRESSIBLE):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    created = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(data) * MIN_COMPRESS_RATIO:
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            created.append(path + suffix)
+    return created
+
+
+def _project_dirs():
+    return {os.path.abspath(d) for d in settings.STATICFILES_DIRS if isinstance(d, str)}
+
+
+class BuildStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэш в именах + сжатие JS/CSS проекта + готовые .gz/.br"""
+
+    def url(self, name, force=False):
+        if not settings.STATIC_MANIFEST:
+            # Без сборки - исходные имена (разработка, тесты)
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force=True)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            project_dirs = _project_dirs()
+            for name, (storage, path) in list(paths.items()):
+                minify = MINIFIERS.get(os.path.splitext(name)[1])
+                if minify is None or '.min.' in name:
+                    continue
+                if os.path.abspath(getattr(storage, 'location', '')) not in project_dirs:
+                    continue
+                with self.open(name) as f:
+                    content = f.read().decode('utf-8')
+                self.delete(name)
+                self._save(name, ContentFile(minify(content).encode('utf-8')))
+                # Хэш считается по сжатому файлу в STATIC_ROOT
+                paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if not dry_run:
+            for name in paths:
+                compress_file(self.path(name))
+                hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+                if hashed_name and hashed_name != name:
+                    compress_file(self.path(hashed_name))
+
+
+# ==================== ОТДАЧА ====================
+
+def _accepted_encodings(request):
+    header = request.headers.get('Accept-Encoding', '')
+    return {part.split(';')[0].strip().lower() for part in header.split(',')}
+
+
+def _immutable_names():
+    return set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def serve_built(request, name, immutable_names):
+    """Ответ с файлом из STATIC_ROOT (None - такого файла нет)"""
+    try:
+        path = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        return None
+    if not os.path.isfile(path):
+        return None
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    accepted = _accepted_encodings(request)
+    has_variants, encoding = False, None
+    for candidate, suffix in ENCODINGS:
+        if os.path.isfile(path + suffix):
+            has_variants = True
+            if encoding is None and candidate in accepted:
+                encoding, path = candidate, path + suffix
+
+    stat = os.stat(path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    if has_variants:
+        response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = CACHE_IMMUTABLE if name in immutable_names else CACHE_REVALIDATE
+    return response
+
+
+class StaticFilesHandler(ASGIStaticFilesHandler):
+    """/static/: собранные файлы из STATIC_ROOT при STATIC_MANIFEST, иначе через finders (как runserver)"""
+
+    def __init__(self, application):
+        super().__init__(application)
+        self.immutable_names = _immutable_names() if settings.STATIC_MANIFEST else set()
+
+    def serve(self, request):
+        if settings.STATIC_MANIFEST:
+            response = serve_built(request, self.file_path(request.path).replace(os.sep, '/'), self.immutable_names)
+            if response is not None:
+                return response
+        return super().serve(request)
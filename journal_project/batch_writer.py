@@ -0,0 +1,170 @@
+# journal_project/batch_writer.py
+"""
+Общий фоновый писатель пачками.
+
+Запрос кладёт объект в ограниченную очередь и сразу возвращается, фоновый
+поток собирает пачку и пишет её одной транзакцией - когда набралось
+batch_size объектов или прошло flush_interval секунд с первого из них.
+Объекты, не записанные из-за временной ошибки базы (SQLite "database is
+locked", обрыв соединения), остаются в пачке и пишутся повторно с паузами
+retry_delays; пропускаются только объекты, которые база отвергла.
+Используется историей навигации и журналом аудита (admin_panel).
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.db import transaction, close_old_connections, InterfaceError, OperationalError
+from django.forms.models import model_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """Очередь объектов и поток, который пишет их пачками"""
+
+    thread_name = 'batch-writer'
+
+    def __init__(self, batch_size=50, flush_interval=2.0, max_queue=10000, idle_interval=60.0,
+                 retry_delays=(0.1, 0.5, 2.0, 5.0)):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.idle_interval = idle_interval
+        self.retry_delays = retry_delays
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        # Запись пачки и обслуживание (компактация, архив) не пересекаются
+        self.lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    # ---------- Переопределяется в наследниках ----------
+
+    def write_batch(self, batch):
+        """Пишет пачку; возвращает объекты, которые нужно записать повторно"""
+        raise NotImplementedError
+
+    def on_idle(self):
+        """Вызывается в потоке после каждой пачки и по таймауту простоя"""
+
+    # ---------- Приём объектов ----------
+
+    def put(self, item):
+        """Ставит объект в очередь. False - очередь переполнена"""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self._ensure_thread()
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    # ---------- Фоновый поток ----------
+
+    def _run(self):
+        batch = []
+        deadline = None
+        failures = 0
+        while True:
+            if deadline is None:
+                timeout = self.idle_interval
+            else:
+                timeout = max(0, deadline - time.monotonic())
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            except queue.Empty:
+                pass
+
+            try:
+                if batch:
+                    batch = self._write(batch)
+                self.on_idle()
+            except Exception:
+                logger.exception('Ошибка фоновой записи (%s)', self.thread_name)
+                batch = []
+
+            # У потока своё соединение с базой - не держим его между пачками
+            close_old_connections()
+
+            if batch:
+                # Незаписанное остаётся в пачке: пауза растёт, новые объекты добавляются к ней
+                delay = self.retry_delays[min(failures, len(self.retry_delays) - 1)]
+                failures += 1
+                logger.warning('%s: не записано %d, повтор через %.1f с', self.thread_name, len(batch), delay)
+                time.sleep(delay)
+                deadline = time.monotonic()
+            else:
+                failures = 0
+                deadline = None
+
+    def _write(self, batch):
+        with self.lock:
+            return list(self.write_batch(batch) or [])
+
+    def _write_with_retry(self, batch):
+        """Пачка с повторами по retry_delays; возвращает то, что записать не удалось"""
+        batch = self._write(batch)
+        for delay in self.retry_delays:
+            if not batch:
+                break
+            time.sleep(delay)
+            batch = self._write(batch)
+        return batch
+
+    def flush(self):
+        """Синхронно записывает всё, что накопилось в очереди"""
+        batch = []
+        lost = 0
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                lost += len(self._write_with_retry(batch))
+                batch = []
+        if batch:
+            lost += len(self._write_with_retry(batch))
+        if lost:
+            logger.error('%s: при сбросе очереди не записано %d', self.thread_name, lost)
+
+    # ---------- Помощники ----------
+
+    @staticmethod
+    def bulk_insert(model, batch):
+        """
+        bulk_create пачки; если пачка не прошла - по одной. Возвращает объекты,
+        не записанные из-за временной ошибки базы; отвергнутые базой
+        (нарушение ограничений) пропускаются с ошибкой в журнале.
+        """
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            return []
+        except Exception:
+            pass
+        failed = []
+        for obj in batch:
+            obj.pk = None
+            try:
+                with transaction.atomic():
+                    obj.save(force_insert=True)
+            except (OperationalError, InterfaceError):
+                obj.pk = None
+                failed.append(obj)
+            except Exception as e:
+                logger.error('%s отвергнут базой и пропущен: %s (%s)', model.__name__, e, model_to_dict(obj))
+        return failed
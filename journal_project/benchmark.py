@@ -0,0 +1,347 @@
+# journal_project/benchmark.py
+"""
+Замер всех URL admin_panel, elders и students тестовым клиентом Django.
+
+Для каждого URL описан сценарий (SCENARIOS): роль, метод и параметры
+запроса на данных seed_bench. Сценарий выполняется warmup + iterations
+раз; записываются число SQL-запросов (максимум по замерам), p50/p95
+времени ответа и размер ответа в байтах. Изменяющие запросы выполняются
+в транзакции, которая откатывается, - данные между замерами не меняются.
+
+Результаты сравниваются с базовой линией (benchmarks/baseline.json):
+превышение числа запросов, статус ответа, заметный рост размера или
+времени ответа считаются нарушением бюджета.
+"""
+import io
+import json
+import math
+import time
+from importlib import import_module
+
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse, URLPattern
+
+BENCH_APPS = ('admin_panel', 'elders', 'students')
+
+# URL, которые не замеряются (с причиной)
+SKIPPED = {
+    'admin_panel:admin_logout': 'сбрасывает сессию',
+    'elders:elder_logout': 'сбрасывает сессию',
+    'students:student_logout': 'сбрасывает сессию',
+}
+
+
+# ==================== ДАННЫЕ ====================
+
+class BenchContext:
+    """Объекты из данных seed_bench, на которые ссылаются сценарии"""
+
+    def __init__(self):
+        from admin_panel.models import Group, Student
+        from students.models import Subject, Schedule, SeminarSlot, StudentGrade, Attendance, ScheduleComment
+
+        groups = Group.objects.filter(students__is_elder=True).order_by('id')
+        self.group = groups.filter(level__name__startswith='[bench]').first() or groups.first()
+        if self.group is None:
+            raise ValueError('Нет группы со старостой - сначала выполните seed_bench')
+        self.course, self.form, self.level = self.group.course, self.group.form, self.group.level
+
+        students = self.group.students.order_by('id')
+        self.elder = students.filter(is_elder=True).first()
+        self.student = students.filter(is_elder=False).first() or self.elder
+        self.other_student = students.exclude(id__in=[self.elder.id, self.student.id]).first() or self.student
+        self.admin = Student.objects.filter(user_type='admin').order_by('id').first()
+        if self.admin is None:
+            self.admin = Student.objects.create(login='bench_admin', password='bench',
+                                                full_name='Администратор (бенчмарк)', user_type='admin')
+
+        self.subject = Subject.objects.filter(group=self.group).order_by('id').first()
+        self.lesson = Schedule.objects.filter(group=self.group).order_by('id').first()
+        self.seminar = (Schedule.objects.filter(group=self.group, lesson_type='seminar').order_by('id').first()
+                        or self.lesson)
+        self.slot = SeminarSlot.objects.filter(group=self.group).order_by('id').first()
+        self.grade = StudentGrade.objects.filter(group=self.group).order_by('id').first()
+        self.attendance = Attendance.objects.filter(group=self.group).order_by('id').first()
+        self.comment = ScheduleComment.objects.filter(group=self.group).order_by('id').first()
+
+    def session(self, role):
+        """Ключи сессии для роли"""
+        if role == 'admin':
+            return {'admin_id': self.admin.id, 'admin_type': 'admin', 'is_custom_admin': True}
+        if role == 'elder':
+            return {'elder_id': self.elder.id}
+        if role == 'student':
+            return {'student_id': self.student.id, 'student_group_id': self.group.id}
+        return {}
+
+
+def _roster():
+    """Файл импорта: новые студенты в группу бенчмарка"""
+    content = 'ФИО;Логин\n' + ''.join(f'Импорт Студент {i};bench_import_{i}\n' for i in range(20))
+    upload = io.BytesIO(content.encode('utf-8'))
+    upload.name = 'roster.csv'
+    return upload
+
+
+# ==================== СЦЕНАРИИ ====================
+
+def scenario(role, method='get', kwargs=None, params=None, body=None, files=None, mutates=None):
+    """
+    Описание запроса. kwargs/params/body/files - значения или функции от
+    BenchContext. mutates по умолчанию - все запросы, кроме GET.
+    """
+    return {
+        'role': role,
+        'method': method,
+        'kwargs': kwargs,
+        'params': params,
+        'body': body,
+        'files': files,
+        'mutates': method != 'get' if mutates is None else mutates,
+    }
+
+
+SCENARIOS = {
+    # ---------- admin_panel ----------
+    'admin_panel:admin_dashboard': scenario('admin'),
+    'admin_panel:admin_login': scenario(None),
+    'admin_panel:folder_content': scenario('admin', params=lambda c: {'type': 'course', 'id': c.course.id}),
+    'admin_panel:tree': scenario('admin'),
+    'admin_panel:get_student': scenario('admin', kwargs=lambda c: {'student_id': c.student.id}),
+    'admin_panel:create_item': scenario('admin', 'post', body=lambda c: {
+        'type': 'student', 'login': 'bench_created', 'full_name': 'Новый Студент', 'group_id': c.group.id,
+    }),
+    'admin_panel:update_item': scenario('admin', 'post', body=lambda c: {
+        'type': 'student', 'id': c.student.id, 'full_name': c.student.full_name, 'login': c.student.login,
+        'user_type': 'student', 'is_active': True,
+    }),
+    'admin_panel:delete_item': scenario('admin', 'post', body=lambda c: {'type': 'student', 'id': c.other_student.id}),
+    'admin_panel:rename_item': scenario('admin', 'post', body=lambda c: {
+        'type': 'group', 'id': c.group.id, 'name': c.group.name + '-Б',
+    }),
+    'admin_panel:move_item': scenario('admin', 'post', body=lambda c: {
+        'type': 'student', 'item_id': c.other_student.id, 'target_type': 'group', 'target_id': c.group.id,
+    }),
+    'admin_panel:search_items': scenario('admin', params=lambda c: {'q': c.student.full_name.split()[0][:4]}),
+    'admin_panel:navigation_history': scenario('admin'),
+    'admin_panel:action_logs': scenario('admin', params={'limit': 100}),
+    'admin_panel:export_data': scenario('admin', kwargs={'kind': 'grades'},
+                                        params=lambda c: {'group': c.group.id, 'format': 'csv'}),
+    'admin_panel:import_students': scenario('admin', 'post', params=lambda c: {'group_id': c.group.id},
+                                            files=lambda c: {'file': _roster()}),
+    'admin_panel:sql_profile': scenario('admin'),
+    'admin_panel:clear_cache': scenario('admin', 'post'),
+    'admin_panel:restore_item': scenario('admin', 'post', body={'cache_id': 0}),
+    'admin_panel:get_trash': scenario('admin'),
+    'admin_panel:view_passwords': scenario('admin'),
+    'admin_panel:generate_password': scenario('admin', 'post', body=lambda c: {'student_id': c.student.id}),
+
+    # ---------- elders ----------
+    'elders:elder_login': scenario(None),
+    'elders:elder_dashboard': scenario('elder'),
+    'elders:elder_schedule': scenario('elder'),
+    'elders:elder_attendance': scenario('elder'),
+    'elders:elder_grades': scenario('elder'),
+    'elders:elder_students': scenario('elder'),
+    'elders:student_detail': scenario('elder', kwargs=lambda c: {'student_id': c.student.id}),
+    'elders:api_get_schedule': scenario('elder', params=lambda c: {'week_type': 'even', 'group_id': c.group.id}),
+    'elders:api_add_lesson': scenario('elder', 'post', body=lambda c: {
+        'group_id': c.group.id, 'day': 7, 'week_type': 'even', 'pair_number': 1, 'start_time': '9:40', 'end_time': '11:10',
+        'subject': c.subject.name, 'teacher': '', 'room': '101', 'lesson_type': 'lecture',
+    }),
+    'elders:api_update_lesson': scenario('elder', 'post', body=lambda c: {
+        'id': c.lesson.id, 'day': c.lesson.day, 'week_type': c.lesson.week_type,
+        'pair_number': c.lesson.pair_number, 'start_time': c.lesson.start_time, 'end_time': c.lesson.end_time,
+        'subject': c.lesson.subject, 'teacher': c.lesson.teacher, 'room': '999', 'lesson_type': c.lesson.lesson_type,
+    }),
+    'elders:api_delete_lesson': scenario('elder', 'post', body=lambda c: {'id': c.lesson.id}),
+    'elders:api_get_lesson': scenario('elder', kwargs=lambda c: {'lesson_id': c.lesson.id}),
+    'elders:api_copy_schedule': scenario('elder', 'post', body={'from_week': 'even', 'to_week': 'odd'}),
+    'elders:api_add_grade': scenario('elder', 'post', body=lambda c: {
+        'student_id': c.student.id, 'subject_id': c.subject.id, 'use_today': True,
+        'grade_type': 'numeric_5', 'raw_value': '5',
+    }),
+    'elders:api_add_grades_bulk': scenario('elder', 'post', body=lambda c: {
+        'subject_id': c.subject.id, 'use_today': True,
+        'grades': [{'student_id': s_id, 'grade_type': 'plus', 'raw_value': '+'}
+                   for s_id in c.group.students.values_list('id', flat=True)],
+    }),
+    'elders:api_delete_grade': scenario('elder', 'post', body=lambda c: {'id': c.grade.id}),
+    'elders:api_get_subjects': scenario('elder'),
+    'elders:api_students_with_points': scenario('elder', params=lambda c: {'subject_id': c.subject.id}),
+    'elders:api_student_points': scenario('elder', params=lambda c: {
+        'student_id': c.student.id, 'subject': c.subject.name,
+    }),
+    'elders:api_add_attendance': scenario('elder', 'post', body=lambda c: {
+        'student_id': c.student.id, 'date': c.attendance.date.isoformat(), 'hours': 2,
+    }),
+    'elders:api_add_attendance_bulk': scenario('elder', 'post', body=lambda c: {
+        'date': c.attendance.date.isoformat(), 'hours': 2, 'all_group': True,
+    }),
+    'elders:api_delete_attendance': scenario('elder', 'post', body=lambda c: {'id': c.attendance.id}),
+    'elders:api_attendance_history': scenario('elder', params=lambda c: {'student_id': c.student.id}),
+    'elders:api_add_student': scenario('elder', 'post', params={
+        'full_name': 'Новый Студент', 'login': 'bench_elder_created', 'password': 'secret',
+    }),
+    'elders:api_import_students': scenario('elder', 'post', files=lambda c: {'file': _roster()}),
+    'elders:api_update_student': scenario('elder', 'post', body=lambda c: {
+        'student_id': c.student.id, 'full_name': c.student.full_name, 'login': c.student.login,
+    }),
+    'elders:api_delete_student': scenario('elder', 'post', body=lambda c: {'student_id': c.other_student.id}),
+    'elders:api_get_student': scenario('elder', kwargs=lambda c: {'student_id': c.student.id}),
+    'elders:api_update_student_password': scenario('elder', 'post', body=lambda c: {
+        'student_id': c.student.id, 'password': 'secret',
+    }),
+    'elders:api_generate_password': scenario('elder'),
+    'elders:api_add_comment': scenario('elder', 'post', body={'comment': 'Бенчмарк', 'week_type': 'even', 'day': 1}),
+    'elders:api_get_comments': scenario('elder', params={'week_type': 'even'}),
+    'elders:api_delete_comment': scenario('elder', 'post', body=lambda c: {'id': c.comment.id}),
+    'elders:api_seminar_slots': scenario('elder', params={'week_type': 'even'}),
+    'elders:api_assign_slot': scenario('elder', 'post', body=lambda c: {
+        'seminar_id': c.seminar.id, 'slot_number': 1, 'student_id': c.student.id,
+    }),
+    'elders:api_remove_slot': scenario('elder', 'post', body=lambda c: {'slot_id': c.slot.id}),
+    'elders:api_get_subject_id': scenario('elder', params=lambda c: {'seminar_id': c.seminar.id}),
+
+    # ---------- students ----------
+    'students:student_login': scenario(None),
+    'students:student_dashboard': scenario('student'),
+    'students:student_schedule': scenario('student'),
+    'students:student_attendance': scenario('student'),
+    'students:student_priority': scenario('student'),
+    'students:api_grades': scenario('student'),
+    'students:api_schedule': scenario('student', params={'week_type': 'even'}),
+}
+
+
+def url_names():
+    """Все именованные URL приложений BENCH_APPS в виде 'приложение:имя'"""
+    names = []
+    for app in BENCH_APPS:
+        for pattern in import_module(f'{app}.urls').urlpatterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                names.append(f'{app}:{pattern.name}')
+    return names
+
+
+def uncovered():
+    """URL без сценария и без причины пропуска"""
+    return [name for name in url_names() if name not in SCENARIOS and name not in SKIPPED]
+
+
+# ==================== ЗАМЕР ====================
+
+def _value(value, ctx):
+    return value(ctx) if callable(value) else value
+
+
+def percentile(values, p):
+    """Перцентиль по ближайшему рангу"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _response_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _request(client, name, spec, ctx):
+    url = reverse(name.split(':', 1)[1], kwargs=_value(spec['kwargs'], ctx))
+    params = _value(spec['params'], ctx) or {}
+    if spec['method'] == 'get':
+        return client.get(url, params)
+    if spec['body'] is not None:
+        return client.post(url, json.dumps(_value(spec['body'], ctx)), content_type='application/json')
+    return client.post(url, {**params, **(_value(spec['files'], ctx) or {})})
+
+
+def run_scenario(name, spec, ctx, iterations=10, warmup=1):
+    client = Client()
+    session = client.session
+    session.update(ctx.session(spec['role']))
+    session.save()
+
+    timings, query_counts = [], []
+    size = status = None
+    for i in range(warmup + iterations):
+        # Журнал запросов ограничен 9000 записями - при переполнении счёт даёт 0
+        reset_queries()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = _request(client, name, spec, ctx)
+                size = _response_size(response)
+                elapsed = time.perf_counter() - started
+            if spec['mutates']:
+                transaction.set_rollback(True)
+        status = response.status_code
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            query_counts.append(len(queries))
+
+    return {
+        'status': status,
+        'queries': max(query_counts),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'bytes': size,
+    }
+
+
+def run(iterations=10, warmup=1, only=None, progress=None):
+    """Замер всех сценариев; возвращает {имя: результат}"""
+    ctx = BenchContext()
+    results = {}
+    # Аудит и история навигации пишутся синхронно - их запросы входят в бюджет и не плавают
+    with override_settings(AUDIT_ASYNC=False, NAVIGATION_HISTORY_ASYNC=False):
+        for name, spec in SCENARIOS.items():
+            if only and only not in name:
+                continue
+            results[name] = run_scenario(name, spec, ctx, iterations, warmup)
+            if progress:
+                progress(name, results[name])
+    return results
+
+
+# ==================== БАЗОВАЯ ЛИНИЯ ====================
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, dataset):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'dataset': dataset, 'views': results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, latency_tolerance=3.0, bytes_tolerance=0.25, check_latency=True):
+    """
+    Нарушения бюджета: список строк. Число запросов не должно расти вовсе,
+    время p95 - больше чем в latency_tolerance раз (и минимум на 5 мс),
+    размер ответа - больше чем на bytes_tolerance (и минимум на 1 КБ).
+    """
+    budgets = baseline.get('views', {})
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is None:
+            failures.append(f'{name}: нет в базовой линии')
+            continue
+        if result['status'] != budget['status']:
+            failures.append(f'{name}: статус {result["status"]} (было {budget["status"]})')
+        if result['queries'] > budget['queries']:
+            failures.append(f'{name}: запросов {result["queries"]} > {budget["queries"]}')
+        if check_latency:
+            limit = max(budget['p95_ms'] * latency_tolerance, budget['p95_ms'] + 5)
+            if result['p95_ms'] > limit:
+                failures.append(f'{name}: p95 {result["p95_ms"]} мс > {limit:.1f} мс')
+        bytes_limit = max(budget['bytes'] * (1 + bytes_tolerance), budget['bytes'] + 1024)
+        if result['bytes'] > bytes_limit:
+            failures.append(f'{name}: ответ {result["bytes"]} байт > {bytes_limit:.0f}')
+    return failures
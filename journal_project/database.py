@@ -0,0 +1,64 @@
+# journal_project/database.py
+"""
+Настройки SQLite для settings.DATABASES.
+
+Профиль 'production' (по умолчанию, SQLITE_PROFILE):
+- PRAGMA при открытии соединения (OPTIONS['init_command']): журнал WAL -
+  чтение не ждёт записи; synchronous=NORMAL - в режиме WAL безопасно при
+  сбое процесса; mmap и кэш страниц побольше, временные таблицы в памяти;
+- busy_timeout: занятая другим писателем база ждёт до SQLITE_BUSY_TIMEOUT
+  секунд вместо ошибки «database is locked»;
+- transaction_mode=IMMEDIATE: atomic() сразу берёт блокировку записи.
+  Иначе транзакция, начавшая с чтения, при первой записи не может
+  дождаться блокировки и падает сразу, несмотря на busy_timeout;
+- постоянные соединения (CONN_MAX_AGE) с проверкой перед запросом.
+
+Профиль 'stock' - SQLite как в Django по умолчанию (для сравнения
+в manage.py bench_sqlite_contention).
+
+WAL требует общей памяти между процессами: база должна лежать на
+локальном диске (том /data), не на сетевой файловой системе. Рядом
+с базой появляются файлы -wal и -shm.
+"""
+
+# PRAGMA профиля production (порядок сохраняется)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,   # байт
+    'cache_size': -64 * 1024,         # отрицательное - в КиБ, т.е. 64 МиБ
+    'temp_store': 'MEMORY',
+}
+
+SQLITE_BUSY_TIMEOUT = 20              # секунд
+SQLITE_CONN_MAX_AGE = 600             # секунд
+
+PROFILES = ('production', 'stock')
+
+
+def init_command(pragmas):
+    return ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items())
+
+
+def sqlite_database(name, profile='production', **extra):
+    """Словарь для DATABASES: файл name с настройками профиля"""
+    if profile not in PROFILES:
+        raise ValueError(f'Неизвестный профиль SQLite: {profile} (допустимы: {", ".join(PROFILES)})')
+    database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+    }
+    if profile == 'production':
+        database.update({
+            'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': init_command({
+                    **SQLITE_PRAGMAS,
+                    'busy_timeout': SQLITE_BUSY_TIMEOUT * 1000,
+                }),
+                'transaction_mode': 'IMMEDIATE',
+            },
+        })
+    database.update(extra)
+    return database
@@ -0,0 +1,216 @@
+# journal_project/log.py
+"""
+Логирование проекта (подключается в settings.LOGGING).
+
+Запрос не пишет в stdout сам: QueueLogHandler кладёт запись в очередь
+и сразу возвращается, а QueueListener в отдельном потоке форматирует
+её (JSONFormatter - одна строка JSON) и выводит. Если очередь
+переполнена, запись отбрасывается и учитывается в dropped.
+
+RequestIDMiddleware присваивает каждому HTTP-запросу ID (заголовок
+X-Request-ID от прокси или новый) и возвращает его в ответе;
+RequestIDFilter добавляет его во все записи этого запроса. Middleware
+работает и под WSGI, и под ASGI (ID хранится в contextvar).
+
+SamplingFilter пропускает долю записей ниже WARNING по логгерам
+(LOG_SAMPLING = {'journal_project.sql': 0.1}). Решение принимается по
+ID запроса, поэтому записи одного запроса сохраняются или отбрасываются
+вместе. Записи WARNING и выше пишутся всегда.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Атрибуты LogRecord, которые не считаются дополнительными полями (extra)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def get_request_id():
+    return request_id_var.get()
+
+
+# ==================== ФОРМАТ ====================
+
+class JSONFormatter(logging.Formatter):
+    """Запись одной строкой JSON: время, уровень, логгер, сообщение, ID запроса и extra"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id and request_id != '-':
+            entry['request_id'] = request_id
+        if record.levelno >= logging.WARNING:
+            entry['where'] = f'{record.module}:{record.funcName}:{record.lineno}'
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Читаемый формат для разработки (LOG_FORMAT=text)"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = '-'
+        return super().format(record)
+
+
+# ==================== ФИЛЬТРЫ ====================
+
+class RequestIDFilter(logging.Filter):
+    """Добавляет в запись ID текущего HTTP-запроса"""
+
+    def filter(self, record):
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = request_id_var.get() or '-'
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает долю rate записей ниже WARNING для логгера и его потомков
+    (ближайший заданный предок). Записи с ID запроса сэмплируются по ID.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._cache = {}
+
+    def _rate(self, name):
+        if name not in self._cache:
+            rate, current = 1.0, name
+            while current:
+                if current in self.rates:
+                    rate = self.rates[current]
+                    break
+                current = current.rpartition('.')[0]
+            self._cache[name] = rate
+        return self._cache[name]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        request_id = getattr(record, 'request_id', None) or request_id_var.get()
+        if request_id and request_id != '-':
+            point = (zlib.crc32(f'{record.name}:{request_id}'.encode()) & 0xffffffff) / 2 ** 32
+        else:
+            point = random.random()
+        return point < rate
+
+
+# ==================== ОЧЕРЕДЬ ====================
+
+class QueueLogHandler(QueueHandler):
+    """
+    Обработчик для settings.LOGGING: очередь + поток QueueListener,
+    который пишет в stream (по умолчанию stdout) в формате fmt ('json' или 'text').
+    """
+
+    def __init__(self, stream=None, fmt='json', max_queue=10000):
+        super().__init__(queue.Queue(maxsize=max_queue))
+        self.dropped = 0
+        target = logging.StreamHandler(stream or sys.stdout)
+        target.setFormatter(TextFormatter() if fmt == 'text' else JSONFormatter())
+        self.listener = QueueListener(self.queue, target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def prepare(self, record):
+        # Сообщение и traceback вычисляются здесь: аргументы могут измениться после возврата
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+# ==================== MIDDLEWARE ====================
+
+class RequestIDMiddleware:
+    """ID запроса: из заголовка X-Request-ID (если корректный) или новый; возвращается в ответе"""
+
+    header = 'HTTP_X_REQUEST_ID'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _request_id(self, request):
+        request_id = request.META.get(self.header, '')
+        if not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return request_id
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request_id = self._request_id(request)
+        token = request_id_var.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
+
+    async def __acall__(self, request):
+        request_id = self._request_id(request)
+        token = request_id_var.set(request_id)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
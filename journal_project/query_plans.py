@@ -0,0 +1,110 @@
+# journal_project/query_plans.py
+"""
+Планы горячих запросов view (EXPLAIN QUERY PLAN).
+
+_hot_queries() повторяет запросы ORM из view на объектах BenchContext
+(данные seed_bench). check() выполняет EXPLAIN QUERY PLAN для каждого и
+возвращает нарушения - полный просмотр таблицы (SCAN без индекса).
+Сортировка во временном B-дереве нарушением не считается, но видна в плане.
+
+Запускается командой manage.py explain_hot_queries и тестом admin_panel.
+"""
+from django.db import connection
+
+from journal_project.benchmark import BenchContext
+
+
+def _hot_queries():
+    from admin_panel.models import Student
+    from students.models import (
+        Subject, Schedule, ScheduleComment, StudentGrade, StudentPerformance,
+        Attendance, SeminarSlot, GradebookEntry,
+    )
+    # Имя -> функция от BenchContext, возвращающая queryset (где в коде - в комментарии)
+    return {
+        # students/schedule_cache.py: get_week_schedule
+        'schedule_week': lambda c: Schedule.objects.filter(
+            group_id=c.group.id, week_type__in=['even', 'both']).order_by('day', 'pair_number'),
+        # elders/views.py: add_lesson, students/schedule_copy.py
+        'schedule_slot': lambda c: Schedule.objects.filter(
+            group_id=c.group.id, day=1, week_type='even', pair_number=1),
+        # students/schedule_page.py: build_schedule_page
+        'comments_schedule_page': lambda c: ScheduleComment.objects.filter(
+            group=c.group, is_active=True).order_by('-is_urgent', '-created_at'),
+        # elders/views.py: elder_schedule, api_get_comments
+        'comments_group': lambda c: ScheduleComment.objects.filter(
+            group=c.group, is_active=True).order_by('-created_at')[:20],
+        # students/views.py: student_priority, elders/views.py: api_student_points
+        'grades_student_subject': lambda c: StudentGrade.objects.filter(
+            student=c.student, subject=c.subject).order_by('-date')[:10],
+        # students/views.py: student_dashboard, elders/views.py: student_detail
+        'grades_student': lambda c: StudentGrade.objects.filter(
+            student=c.student).select_related('subject').order_by('-date'),
+        # students/models.py: GradebookEntry.refresh
+        'grades_count_cell': lambda c: StudentGrade.objects.filter(
+            student_id=c.student.id, subject_id=c.subject.id),
+        # admin_panel/exports.py: оценки группы за период
+        'grades_export': lambda c: StudentGrade.objects.filter(
+            group__in=[c.group], date__gte=c.attendance.date),
+        # elders/views.py: elder_dashboard
+        'grades_group_subjects': lambda c: StudentGrade.objects.filter(
+            student__group=c.group).values_list('subject', flat=True).distinct(),
+        # students/views.py: student_attendance, elders/views.py: student_detail
+        'attendance_student': lambda c: Attendance.objects.filter(student=c.student).order_by('-date'),
+        # admin_panel/exports.py: пропуски группы за период
+        'attendance_export': lambda c: Attendance.objects.filter(
+            group__in=[c.group], date__gte=c.attendance.date),
+        # elders/views.py: api_seminar_slots
+        'slots_seminars': lambda c: SeminarSlot.objects.filter(
+            schedule_id__in=[c.seminar.id]).select_related('student').order_by('slot_number'),
+        # elders/views.py: student_detail
+        'slots_student': lambda c: SeminarSlot.objects.filter(
+            student=c.student, schedule__week_type__in=['even', 'both'],
+        ).select_related('schedule').order_by('schedule__day', 'schedule__pair_number'),
+        # students/views.py, elders/views.py: предметы группы
+        'subjects_group': lambda c: Subject.objects.filter(group=c.group),
+        'subject_by_name': lambda c: Subject.objects.filter(name=c.subject.name, group=c.group),
+        # elders/views.py: api_seminar_slots (баллы по предметам группы)
+        'performance_subjects': lambda c: StudentPerformance.objects.filter(
+            subject_id__in=[c.subject.id]).values_list('student_id', 'subject_id', 'total_points'),
+        # elders/views.py: api_add_grades_bulk
+        'performance_bulk': lambda c: StudentPerformance.objects.filter(
+            subject=c.subject, student_id__in=[c.student.id, c.other_student.id]),
+        'performance_cell': lambda c: StudentPerformance.objects.filter(student=c.student, subject=c.subject),
+        # elders/views.py: elder_students (GradebookEntry.group_summary)
+        'gradebook_group': lambda c: GradebookEntry.objects.filter(student__group=c.group),
+        # admin_panel/principals.py: снимок пользователя сессии
+        'principal_snapshot': lambda c: Student.objects.select_related('group').filter(id=c.student.id),
+        # elders/views.py: elder_students
+        'students_group': lambda c: Student.objects.filter(group=c.group).order_by('full_name'),
+    }
+
+
+def explain(queryset):
+    """Строки плана SQLite (поле detail) для queryset"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def is_full_scan(detail):
+    """SCAN таблицы без индекса (SCAN ... USING INDEX - просмотр по индексу)"""
+    return detail.startswith('SCAN ') and ' USING ' not in detail
+
+
+def check(ctx=None, only=None):
+    """{имя: план} и список нарушений"""
+    if connection.vendor != 'sqlite':
+        raise RuntimeError('EXPLAIN QUERY PLAN поддерживается только для SQLite')
+    ctx = ctx or BenchContext()
+    plans, failures = {}, []
+    for name, build in _hot_queries().items():
+        if only and only not in name:
+            continue
+        plan = explain(build(ctx))
+        plans[name] = plan
+        for detail in plan:
+            if is_full_scan(detail):
+                failures.append(f'{name}: {detail}')
+    return plans, failures
@@ -1,23 +1,69 @@
 # schedule_utils.py
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, date
+
+# Опорная неделя семестра: 05.01.26 - чётная, дальше недели чередуются
+ANCHOR_DATE = date(2026, 1, 5)
+ANCHOR_WEEK_TYPE = 'even'
+
+# Ручные настройки из WeekType держим в памяти процесса: {дата: тип недели}.
+# Индекс сбрасывается при сохранении/удалении WeekType, а TTL подстраховывает
+# остальные процессы, в которых сброс не произошёл.
+WEEK_TYPE_CACHE_TTL = 300
+
+_overrides = None
+_overrides_loaded_at = 0
+_overrides_lock = threading.Lock()
+
+
+def _get_overrides():
+    """Возвращает индекс ручных настроек чётности (загружается одним запросом)"""
+    global _overrides, _overrides_loaded_at
+    
+    overrides = _overrides
+    if overrides is not None and time.monotonic() - _overrides_loaded_at < WEEK_TYPE_CACHE_TTL:
+        return overrides
+    
+    with _overrides_lock:
+        if _overrides is None or time.monotonic() - _overrides_loaded_at >= WEEK_TYPE_CACHE_TTL:
+            from students.models import WeekType
+            try:
+                _overrides = dict(WeekType.objects.values_list('date', 'week_type'))
+            except Exception:
+                # Таблица может отсутствовать (миграции ещё не применены)
+                _overrides = {}
+            _overrides_loaded_at = time.monotonic()
+        return _overrides
+
+
+def invalidate_week_types():
+    """Сбрасывает индекс ручных настроек чётности (вызывается из WeekType.save/delete)"""
+    global _overrides
+    with _overrides_lock:
+        _overrides = None
+
 
 def get_week_type(target_date=None):
     """
     Определяет тип недели (чётная/нечётная) для указанной даты.
     Возвращает "even" для чётной, "odd" для нечётной недели.
+    Сначала проверяет ручные настройки (WeekType), иначе считает от опорной недели.
     """
     if target_date is None:
         target_date = datetime.today().date()
+    elif isinstance(target_date, datetime):
+        target_date = target_date.date()
     
-    # Начальная точка отсчета - первая неделя сентября (нечётная)
-    start_date = datetime(2024, 9, 2).date()  # Первый понедельник сентября
-    
-    # Вычисляем разницу в неделях
-    delta = target_date - start_date
-    weeks_passed = delta.days // 7
+    override = _get_overrides().get(target_date)
+    if override:
+        return override
     
-    # Если прошло четное количество недель - нечётная, нечетное - чётная
-    return "even" if weeks_passed % 2 == 1 else "odd"
+    # Чётное количество недель от опорной - тип сохраняется, нечётное - меняется
+    weeks_passed = (target_date - ANCHOR_DATE).days // 7
+    if weeks_passed % 2 == 0:
+        return ANCHOR_WEEK_TYPE
+    return 'odd' if ANCHOR_WEEK_TYPE == 'even' else 'even'
 
 def get_russian_day_name(english_day_name):
     """
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from journal_project.database import sqlite_database
+
 """
 Django settings for journal_project project.
 
@@ -47,8 +49,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'journal_project.log.RequestIDMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'journal_project.sql_profiler.SQLProfilerMiddleware',  # только при SQL_PROFILER_ENABLED
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'admin_panel.principals.PrincipalMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -81,11 +86,135 @@ WSGI_APPLICATION = 'journal_project.wsgi.application'
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
 # База данных
+# WAL, busy_timeout, mmap и постоянные соединения - journal_project/database.py;
+# SQLITE_PROFILE=stock - SQLite без настроек; SQLITE_PATH - другой файл базы
+# (manage.py bench_server запускает серверы на копии)
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'production')
+SQLITE_PATH = os.environ.get('SQLITE_PATH') or (
+    '/data/db.sqlite3' if os.path.exists('/data/') else BASE_DIR / 'db.sqlite3'
+)
+
 DATABASES = {
+    'default': sqlite_database(SQLITE_PATH, SQLITE_PROFILE),
+}
+
+# Тесты: фоновая запись аудита и навигации выключена (journal_project/test_runner.py)
+TEST_RUNNER = 'journal_project.test_runner.TestRunner'
+
+
+# Кэш
+# Расписание кэшируется по (группа, тип недели). По умолчанию кэш в памяти
+# процесса; при нескольких процессах включите общий бэкенд:
+#   SCHEDULE_CACHE_BACKEND=file - файлы в /data/cache/schedule
+#   SCHEDULE_CACHE_BACKEND=db   - таблица schedule_cache (manage.py createcachetable)
+SCHEDULE_CACHE_BACKEND = os.environ.get('SCHEDULE_CACHE_BACKEND', 'locmem')
+
+# Сколько живёт снимок пользователя сессии. В своём процессе снимок сбрасывается
+# при сохранении пользователя сразу, в других (кэш в памяти) - по истечении срока
+PRINCIPAL_CACHE_TIMEOUT = 300
+
+SCHEDULE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'schedule',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/data/cache/schedule' if os.path.exists('/data/') else os.path.join(BASE_DIR, 'cache', 'schedule'),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'schedule_cache',
+    },
+}
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': '/data/db.sqlite3' if os.path.exists('/data/') else BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'schedule': {
+        **SCHEDULE_CACHE_BACKENDS[SCHEDULE_CACHE_BACKEND],
+        'TIMEOUT': 60 * 60 * 24,  # расписание меняется редко, сброс - при записи
+    },
+    # Снимки пользователей сессий (admin_panel/principals.py), тот же бэкенд с отдельным префиксом
+    'principals': {
+        **SCHEDULE_CACHE_BACKENDS[SCHEDULE_CACHE_BACKEND],
+        'KEY_PREFIX': 'principal',
+        'TIMEOUT': PRINCIPAL_CACHE_TIMEOUT,
+    },
+    # Сводка SQL-профиля всех процессов (journal_project/sql_profiler.py)
+    'sql_profile': {
+        **SCHEDULE_CACHE_BACKENDS[SCHEDULE_CACHE_BACKEND],
+        'KEY_PREFIX': 'sql_profile',
+    },
+}
+
+# История навигации админки пишется в фоне пачками (admin_panel/navigation.py)
+NAVIGATION_HISTORY_ASYNC = True          # False - запись сразу в потоке запроса
+NAVIGATION_HISTORY_BATCH_SIZE = 50       # записей в пачке
+NAVIGATION_HISTORY_FLUSH_INTERVAL = 2.0  # секунд до записи неполной пачки
+NAVIGATION_HISTORY_KEEP = 50             # записей на пользователя после компактации
+NAVIGATION_HISTORY_COMPACT_INTERVAL = 300.0
+
+# Журнал аудита (admin_panel/audit.py): запись в фоне пачками, события старше
+# AUDIT_HOT_DAYS дней переносятся в архивы командой archive_audit_logs
+AUDIT_ASYNC = True                       # False - событие пишется в транзакции действия
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 1.0
+AUDIT_HOT_DAYS = 90
+AUDIT_ARCHIVE_DIR = '/data/audit_archive' if os.path.exists('/data/') else os.path.join(BASE_DIR, 'audit_archive')
+
+# Поиск студентов (admin_panel/search_index.py): FTS5 в SQLite, без него -
+# триграммный индекс в памяти. 'auto' | 'trigram'
+SEARCH_INDEX_BACKEND = os.environ.get('SEARCH_INDEX_BACKEND', 'auto')
+SEARCH_INDEX_FALLBACK_TTL = 300.0        # секунд до перестройки индекса в памяти
+
+# Бюджеты запросов/времени/размера ответов для manage.py bench_views
+BENCHMARK_BASELINE = os.path.join(BASE_DIR, 'benchmarks', 'baseline.json')
+
+# Профилирование SQL по запросам (journal_project/sql_profiler.py), по умолчанию выключено
+SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER', '') == '1'
+SQL_PROFILER_N1_THRESHOLD = 5            # одинаковых запросов за HTTP-запрос - признак N+1
+SQL_PROFILER_SLOW_QUERIES = 50           # запросов - в журнал медленных
+SQL_PROFILER_SLOW_SQL_MS = 200           # мс SQL - в журнал медленных
+SQL_PROFILER_SLOW_LOG = os.path.join('/data/logs' if os.path.exists('/data/') else os.path.join(BASE_DIR, 'logs'), 'slow_sql.log')
+SQL_PROFILER_SLOW_LOG_MAX_BYTES = 10 * 1024 * 1024
+SQL_PROFILER_SLOW_LOG_BACKUPS = 5
+SQL_PROFILER_WINDOW = 3600               # секунд в сводке на странице админки
+SQL_PROFILER_PUBLISH_INTERVAL = 5.0      # секунд между публикациями сводки процесса в кэш
+
+# Логирование (journal_project/log.py): запись через очередь в отдельном потоке,
+# одна строка JSON на запись, ID запроса в каждой строке.
+# LOG_LEVEL=DEBUG включает отладочные сообщения view, LOG_FORMAT=text - читаемый вывод.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+# Доля записей ниже WARNING по логгерам, например {'journal_project.sql': 0.1}
+LOG_SAMPLING = {}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'journal_project.log.RequestIDFilter'},
+        'sampling': {'()': 'journal_project.log.SamplingFilter', 'rates': LOG_SAMPLING},
+    },
+    'handlers': {
+        'queue': {
+            'class': 'journal_project.log.QueueLogHandler',
+            'filters': ['request_id', 'sampling'],
+            'fmt': LOG_FORMAT,
+            'max_queue': 10000,
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': 'WARNING'},
+    'loggers': {
+        'django': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False},
+        'journal_project': {'level': LOG_LEVEL},
+        'admin_panel': {'level': LOG_LEVEL},
+        'elders': {'level': LOG_LEVEL},
+        'students': {'level': LOG_LEVEL},
+        'core': {'level': LOG_LEVEL},
+    },
 }
 
 
@@ -135,6 +264,21 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') 
 
+# Отдельного сервера статики нет: ASGI-приложение (journal_project/asgi.py)
+# само отдаёт /static/, как это делал runserver
+SERVE_STATIC = os.environ.get('SERVE_STATIC', '1') == '1'
+
+# Сборка статики (manage.py build_static, journal_project/assets.py): JS/CSS
+# сжимаются, имена получают хэш содержимого, рядом кладутся .gz и .br.
+# STATIC_MANIFEST=1 - ссылки {% static %} ведут на собранные файлы, и они
+# отдаются из STATIC_ROOT с кэшем на год
+STATIC_MANIFEST = os.environ.get('STATIC_MANIFEST', '') == '1'
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'journal_project.assets.BuildStaticFilesStorage'},
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
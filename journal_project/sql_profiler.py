@@ -0,0 +1,343 @@
+# journal_project/sql_profiler.py
+"""
+Профилирование SQL по запросам (включается SQL_PROFILER_ENABLED).
+
+SQLProfilerMiddleware перехватывает все SQL-запросы обработки HTTP-запроса
+(connection.execute_wrapper) и считает их число, суммарное время SQL и
+повторы одинаковых запросов - «отпечатков» (SQL без значений). Отпечаток,
+выполненный SQL_PROFILER_N1_THRESHOLD раз и больше, - признак N+1.
+
+По каждому запросу в логгер journal_project.sql пишется запись, сводка
+передаётся в extra (в JSON-журнале - поля строки).
+Если превышен порог (число запросов, время SQL или найден N+1), полный
+список запросов пишется в SQL_PROFILER_SLOW_LOG (ротация по размеру).
+
+Сводка по URL за последний час (stats) - поминутные агрегаты. Каждый
+процесс сервера копит свои и раз в SQL_PROFILER_PUBLISH_INTERVAL секунд
+кладёт их в кэш sql_profile (тот же бэкенд, что у кэша расписания: при
+нескольких процессах - SCHEDULE_CACHE_BACKEND=file). Страница админки
+«SQL-профиль» объединяет агрегаты всех процессов.
+
+Параметры запросов к паролям и сессиям в журнал медленных не пишутся.
+
+Запросы, выполняемые при отдаче потокового ответа (экспорт), уже после
+выхода из view, в профиль не попадают.
+
+Middleware только синхронный: execute_wrapper ставится на соединения
+потока. Под ASGI включённый профиль переводит цепочку в поток, и
+async view выполняют запросы ORM в нём же - они попадают в профиль.
+"""
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from journal_project.log import get_request_id
+
+logger = logging.getLogger('journal_project.sql')
+slow_logger = logging.getLogger('journal_project.sql.slow')
+
+
+def _setting(name, default):
+    return getattr(settings, f'SQL_PROFILER_{name}', default)
+
+
+# ==================== ОТПЕЧАТКИ ====================
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL без значений: литералы и списки IN (...) любой длины заменены на ?"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper: записывает SQL, параметры и время каждого запроса"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'params': params,
+                'many': many,
+                'ms': (time.perf_counter() - started) * 1000,
+            })
+
+
+def summarize(queries, n1_threshold=5):
+    """Число запросов, время SQL и повторяющиеся отпечатки (N+1)"""
+    counts = Counter(fingerprint(q['sql']) for q in queries)
+    duplicates = [
+        {'fingerprint': fp, 'count': count}
+        for fp, count in counts.most_common()
+        if count >= n1_threshold
+    ]
+    return {
+        'queries': len(queries),
+        'sql_ms': round(sum(q['ms'] for q in queries), 2),
+        'duplicates': duplicates,
+    }
+
+
+# ==================== СВОДКА ПО URL ====================
+
+# Границы корзин времени ответа, мс; p95 в сводке - верхняя граница корзины
+LATENCY_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Поля поминутного агрегата
+_REQUESTS, _QUERIES, _MAX_QUERIES, _SQL_MS, _N_PLUS_ONE, _LATENCY = range(6)
+
+
+def _empty_bucket():
+    return [0, 0, 0, 0.0, 0, [0] * (len(LATENCY_BOUNDS) + 1)]
+
+
+def _merge_bucket(target, bucket):
+    target[_REQUESTS] += bucket[_REQUESTS]
+    target[_QUERIES] += bucket[_QUERIES]
+    target[_MAX_QUERIES] = max(target[_MAX_QUERIES], bucket[_MAX_QUERIES])
+    target[_SQL_MS] += bucket[_SQL_MS]
+    target[_N_PLUS_ONE] += bucket[_N_PLUS_ONE]
+    target[_LATENCY] = [a + b for a, b in zip(target[_LATENCY], bucket[_LATENCY])]
+
+
+def _p95(latency):
+    """Верхняя граница корзины, в которую попал 95-й перцентиль"""
+    rank = sum(latency) * 0.95
+    seen = 0
+    for bound, count in zip(LATENCY_BOUNDS, latency):
+        seen += count
+        if seen >= rank:
+            return bound
+    return None  # дольше последней границы
+
+
+class EndpointStats:
+    """
+    Поминутные агрегаты по URL за последние window секунд.
+    Свои агрегаты процесс не чаще раза в publish_interval секунд кладёт в
+    кэш alias под ключом процесса; worst() объединяет все процессы.
+    """
+
+    def __init__(self, window=3600, publish_interval=5.0, alias='sql_profile'):
+        self.window = window
+        self.publish_interval = publish_interval
+        self.alias = alias
+        self.buckets = {}  # (минута, endpoint) -> агрегат
+        self.published_at = 0.0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key():
+        # PID при каждом обращении: процессы сервера могут получить модуль от родителя
+        return f'process:{os.getpid()}'
+
+    def add(self, endpoint, queries, sql_ms, total_ms, n_plus_one):
+        now = time.time()
+        with self.lock:
+            bucket = self.buckets.get((int(now // 60), endpoint))
+            if bucket is None:
+                bucket = self.buckets[(int(now // 60), endpoint)] = _empty_bucket()
+            bucket[_REQUESTS] += 1
+            bucket[_QUERIES] += queries
+            bucket[_MAX_QUERIES] = max(bucket[_MAX_QUERIES], queries)
+            bucket[_SQL_MS] += sql_ms
+            bucket[_N_PLUS_ONE] += bool(n_plus_one)
+            bucket[_LATENCY][bisect.bisect_left(LATENCY_BOUNDS, total_ms)] += 1
+            snapshot = None
+            if now - self.published_at >= self.publish_interval:
+                self.published_at = now
+                snapshot = self._snapshot(now)
+        if snapshot is not None:
+            self._publish(snapshot, now)
+
+    def _snapshot(self, now):
+        """Копия агрегатов в окне (под lock); старые минуты удаляются"""
+        oldest = int((now - self.window) // 60)
+        for key in [key for key in self.buckets if key[0] < oldest]:
+            del self.buckets[key]
+        return {key: [*bucket[:_LATENCY], list(bucket[_LATENCY])] for key, bucket in self.buckets.items()}
+
+    def _publish(self, snapshot, now):
+        cache = caches[self.alias]
+        cache.set(self._key(), snapshot, self.window)
+        # Список процессов: гонка двух процессов теряет запись одного из них
+        # до его следующей публикации, агрегаты при этом не теряются
+        processes = {key: at for key, at in (cache.get('processes') or {}).items() if at >= now - self.window}
+        processes[self._key()] = now
+        cache.set('processes', processes, self.window)
+
+    def collect(self):
+        """Агрегаты всех процессов: {ключ процесса: {(минута, endpoint): агрегат}}"""
+        now = time.time()
+        with self.lock:
+            local = self._snapshot(now)
+        cache = caches[self.alias]
+        others = [key for key in cache.get('processes') or {} if key != self._key()]
+        collected = {key: data for key, data in cache.get_many(others).items() if data}
+        collected[self._key()] = local
+        return collected
+
+    def processes(self):
+        """Сколько процессов публиковали сводку за окно (с текущим)"""
+        return len(set(caches[self.alias].get('processes') or {}) | {self._key()})
+
+    def worst(self, limit=50):
+        """URL по убыванию суммарного времени SQL за окно, по всем процессам"""
+        oldest = int((time.time() - self.window) // 60)
+        grouped = {}
+        for buckets in self.collect().values():
+            for (minute, endpoint), bucket in buckets.items():
+                if minute >= oldest:
+                    _merge_bucket(grouped.setdefault(endpoint, _empty_bucket()), bucket)
+
+        rows = []
+        for endpoint, bucket in grouped.items():
+            count = bucket[_REQUESTS]
+            rows.append({
+                'endpoint': endpoint,
+                'requests': count,
+                'avg_queries': round(bucket[_QUERIES] / count, 1),
+                'max_queries': bucket[_MAX_QUERIES],
+                'sql_ms': round(bucket[_SQL_MS], 1),
+                'avg_sql_ms': round(bucket[_SQL_MS] / count, 1),
+                'p95_ms': _p95(bucket[_LATENCY]),
+                'n_plus_one': bucket[_N_PLUS_ONE],
+            })
+        rows.sort(key=lambda row: row['sql_ms'], reverse=True)
+        return rows[:limit]
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+            self.published_at = 0.0
+        caches[self.alias].delete(self._key())
+
+
+stats = EndpointStats(window=_setting('WINDOW', 3600), publish_interval=_setting('PUBLISH_INTERVAL', 5.0))
+
+
+# ==================== ЖУРНАЛ МЕДЛЕННЫХ ЗАПРОСОВ ====================
+
+_slow_handler_lock = threading.Lock()
+
+
+def _slow_log():
+    """Логгер медленных запросов с файлом SQL_PROFILER_SLOW_LOG (подключается при первой записи)"""
+    path = _setting('SLOW_LOG', None)
+    if path and not slow_logger.handlers:
+        with _slow_handler_lock:
+            if not slow_logger.handlers:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                handler = RotatingFileHandler(
+                    path,
+                    maxBytes=_setting('SLOW_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                    backupCount=_setting('SLOW_LOG_BACKUPS', 5),
+                    encoding='utf-8',
+                )
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                slow_logger.addHandler(handler)
+                slow_logger.setLevel(logging.INFO)
+                slow_logger.propagate = False
+    return slow_logger
+
+
+# Параметры запросов с этими таблицами и столбцами (пароли, ключи и данные
+# сессий) в журнал не пишутся - все, а не только значения этих столбцов
+_HIDDEN_PARAMS = re.compile(r'\b(?:password|session_key|session_data|django_session)\b', re.IGNORECASE)
+
+
+def _params(query):
+    if _HIDDEN_PARAMS.search(query['sql']):
+        return '[скрыто]'
+    return repr(query['params'])
+
+
+def is_slow(summary):
+    return (
+        summary['queries'] >= _setting('SLOW_QUERIES', 50)
+        or summary['sql_ms'] >= _setting('SLOW_SQL_MS', 200)
+        or bool(summary['duplicates'])
+    )
+
+
+# ==================== MIDDLEWARE ====================
+
+def _endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.view_name:
+        return match.view_name
+    return request.path
+
+
+class SQLProfilerMiddleware:
+    """Профиль SQL каждого запроса: строка лога, журнал медленных, сводка за час"""
+
+    def __init__(self, get_response):
+        if not _setting('ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.n1_threshold = _setting('N1_THRESHOLD', 5)
+
+    def __call__(self, request):
+        recorders = [QueryRecorder(conn.alias) for conn in connections.all()]
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn, recorder in zip(connections.all(), recorders):
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        queries = [query for recorder in recorders for query in recorder.queries]
+        summary = summarize(queries, self.n1_threshold)
+        endpoint = _endpoint(request)
+        entry = {
+            'event': 'sql_profile',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'total_ms': total_ms,
+            **summary,
+        }
+        logger.info(
+            '%s %s: %s SQL, %s мс', request.method, request.path, summary['queries'], summary['sql_ms'],
+            extra=entry,
+        )
+        stats.add(endpoint, summary['queries'], summary['sql_ms'], total_ms, bool(summary['duplicates']))
+
+        if is_slow(summary):
+            entry['request_id'] = get_request_id()
+            entry['query_list'] = [
+                {'sql': q['sql'], 'params': _params(q), 'ms': round(q['ms'], 3), 'alias': q['alias']}
+                for q in queries
+            ]
+            _slow_log().warning(json.dumps(entry, ensure_ascii=False, default=str))
+        return response
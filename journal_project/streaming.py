@@ -0,0 +1,218 @@
+# journal_project/streaming.py
+"""
+Потоковые ответы: JSON-список, CSV и XLSX отдаются по частям, без сборки
+всего ответа в памяти.
+
+Django потоково отдаёт только итератор «своего» типа: под ASGI синхронный
+итератор сначала целиком собирается в список, под WSGI - асинхронный.
+Поэтому тело ответа строится по request: под ASGI синхронный генератор
+оборачивается в асинхронный, который берёт по STREAM_PARTS частей за один
+переход в поток запроса (там же идут чтения из базы).
+"""
+import csv
+import itertools
+import re
+import zipfile
+from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+# Частей ответа за один переход из цикла событий в поток запроса
+STREAM_PARTS = 100
+
+
+async def aiter_sync(iterator, parts=STREAM_PARTS):
+    """Синхронный итератор как асинхронный: next() выполняется в потоке запроса пачками по parts"""
+    iterator = iter(iterator)
+    take = sync_to_async(lambda: list(itertools.islice(iterator, parts)))
+    try:
+        while True:
+            chunk = await take()
+            if not chunk:
+                return
+            for part in chunk:
+                yield part
+    finally:
+        # Клиент отключился - генератор закрывается там же, где читал базу
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def stream_content(request, iterator):
+    """Тело StreamingHttpResponse того типа, который обработчик request отдаёт потоком"""
+    return aiter_sync(iterator) if isinstance(request, ASGIRequest) else iterator
+
+
+def iter_json(items, key, tail=None):
+    """
+    Отдаёт по частям объект {key: [...items], **tail()}.
+    tail вызывается после того, как все items отданы (например, для курсора
+    следующей страницы, который становится известен только в конце).
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield '{' + encoder.encode(key) + ':['
+    for i, item in enumerate(items):
+        yield (',' if i else '') + encoder.encode(item)
+    yield ']'
+    for name, value in (tail() if tail else {}).items():
+        yield ',' + encoder.encode(name) + ':' + encoder.encode(value)
+    yield '}'
+
+
+def streaming_json_response(request, items, key, tail=None, status=200):
+    return StreamingHttpResponse(
+        stream_content(request, iter_json(items, key, tail)),
+        content_type='application/json; charset=utf-8',
+        status=status,
+    )
+
+
+# ==================== CSV / XLSX ====================
+
+class _Echo:
+    """Файлоподобный объект: write() возвращает строку, а не пишет её"""
+
+    def write(self, value):
+        return value
+
+
+# Начало ячейки, которое Excel/LibreOffice читают как формулу (CSV injection)
+_CSV_FORMULA_START = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_START):
+        # Апостроф - текстовый префикс: ячейка показывается как есть и не вычисляется
+        return "'" + value
+    return value
+
+
+def iter_csv(header, rows):
+    """CSV построчно; BOM в начале - чтобы Excel открыл кириллицу как UTF-8"""
+    writer = csv.writer(_Echo(), delimiter=';')
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+class _ChunkSink:
+    """Приёмник для ZipFile: копит записанные байты, чтобы отдать их наружу"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+# Символы, недопустимые в XML 1.0
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    text = _XML_ILLEGAL.sub('', str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{xml_escape(text)}</t></is></c>'
+
+
+def iter_xlsx(header, rows, sheet_name='Лист1', rows_per_chunk=500):
+    """
+    XLSX потоком: лист пишется внутрь zip по мере чтения строк, наружу
+    отдаются уже сжатые куски. Строки - без общей таблицы строк
+    (inlineStr), поэтому память не зависит от объёма выгрузки.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _XLSX_RELS)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=xml_escape(sheet_name[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            pending = ['<row>' + ''.join(_xlsx_cell(value) for value in header) + '</row>']
+            for row in rows:
+                pending.append('<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>')
+                if len(pending) >= rows_per_chunk:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    yield sink.drain()
+            sheet.write(''.join(pending).encode('utf-8') + b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', iter_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', iter_xlsx),
+}
+
+
+def streaming_table_response(request, header, rows, filename, export_format='csv', sheet_name='Лист1'):
+    """Таблица (заголовок + строки) как скачиваемый CSV или XLSX, потоком"""
+    content_type, iterator = EXPORT_FORMATS[export_format]
+    if export_format == 'xlsx':
+        content = iterator(header, rows, sheet_name=sheet_name)
+    else:
+        content = iterator(header, rows)
+    response = StreamingHttpResponse(stream_content(request, content), content_type=content_type)
+    response['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(f'{filename}.{export_format}')}"
+    return response
@@ -0,0 +1,28 @@
+# journal_project/test_runner.py
+"""
+Запуск тестов (settings.TEST_RUNNER).
+
+Фоновые писатели (журнал аудита, история навигации) в тестах выключены:
+их поток писал бы в тестовую базу своим соединением в обход транзакции
+теста и упирался в её блокировку. Записи идут синхронно в потоке запроса,
+тесты могут их проверить.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+SYNC_WRITERS = {
+    'AUDIT_ASYNC': False,
+    'NAVIGATION_HISTORY_ASYNC': False,
+}
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._sync_writers = override_settings(**SYNC_WRITERS)
+        self._sync_writers.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._sync_writers.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,22 @@
+# journal_project/testing.py
+"""
+Общие данные для тестов приложений.
+
+Почти каждому тесту нужна группа, а над ней - ветка дерева
+Уровень → Форма → Курс. make_group создаёт её целиком, add_group -
+соседнюю группу на том же курсе.
+"""
+from admin_panel.models import EducationalLevel, StudyForm, Course, Group
+
+
+def make_group(name='СПД-101', level='Бакалавриат', form='Очная форма', course=1):
+    """Группа на новой ветке дерева: уровень, форма и курс создаются под неё"""
+    level = EducationalLevel.objects.create(name=level)
+    form = StudyForm.objects.create(name=form, level=level)
+    course = Course.objects.create(number=course, form=form)
+    return Group.objects.create(name=name, course=course, form=form, level=level)
+
+
+def add_group(group, name):
+    """Ещё одна группа на курсе group"""
+    return Group.objects.create(name=name, course=group.course, form=group.form, level=group.level)
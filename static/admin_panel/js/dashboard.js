@@ -0,0 +1,1374 @@
+// static/admin_panel/js/dashboard.js
+
+    // ========== ГЛОБАЛЬНЫЕ ПЕРЕМЕННЫЕ ==========
+    let navigationStack = [];
+    let currentPosition = -1;
+    let currentFolderType = null;
+    let currentFolderId = null;
+    let currentFolderName = null;
+    let currentItemToDelete = null;
+    let searchTimeout = null;
+    let treeIndex = null;
+
+    // ========== ДЕРЕВО НА КЛИЕНТЕ ==========
+    // Всё дерево уровней/форм/курсов/групп грузится одним запросом, дальше
+    // навигация по папкам идёт без сервера. Браузер перепроверяет дерево
+    // по ETag (ответ 304), поэтому повторная загрузка почти бесплатна.
+    const TREE_CHILD_TYPES = { level: 'form', form: 'course', course: 'group' };
+    const TREE_ICONS = { form: 'bi-folder', course: 'bi-layers', group: 'bi-people' };
+
+    function loadTree() {
+        return fetch('/admin-panel/api/tree/', { cache: 'no-cache' })
+            .then(response => {
+                if (!response.ok) throw new Error('Ошибка загрузки дерева');
+                return response.json();
+            })
+            .then(data => {
+                treeIndex = buildTreeIndex(data.levels || []);
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                treeIndex = null;
+            });
+    }
+
+    function buildTreeIndex(levels) {
+        const index = {};
+
+        function addNode(type, node, parentKey) {
+            const [id, name, count, children] = node;
+            const key = `${type}:${id}`;
+            index[key] = {
+                type: type,
+                id: id,
+                name: type === 'course' ? `${name} курс` : name,
+                count: count,
+                parent: parentKey,
+                children: []
+            };
+            if (parentKey) index[parentKey].children.push(key);
+            (children || []).forEach(child => addNode(TREE_CHILD_TYPES[type], child, key));
+        }
+
+        levels.forEach(level => addNode('level', level, null));
+        return index;
+    }
+
+    function treeFolderContent(type, id) {
+        const node = treeIndex && treeIndex[`${type}:${id}`];
+        if (!node) return null;
+
+        const path = [];
+        for (let key = `${type}:${id}`; key; key = treeIndex[key].parent) {
+            const item = treeIndex[key];
+            path.unshift({ type: item.type, id: item.id, name: item.name });
+        }
+
+        return {
+            type: type,
+            id: id,
+            title: node.name,
+            path: path,
+            items: node.children.map(key => {
+                const child = treeIndex[key];
+                return {
+                    type: child.type,
+                    id: child.id,
+                    name: child.name,
+                    icon: TREE_ICONS[child.type],
+                    count: child.count
+                };
+            })
+        };
+    }
+
+    function reloadFolderContent() {
+        // После изменений дерево перечитывается (ETag уже другой)
+        return loadTree().then(() => {
+            if (currentFolderType && currentFolderId) {
+                loadFolderContent(currentFolderType, currentFolderId);
+            }
+        });
+    }
+
+    loadTree();
+
+    // ========== РАСКРЫТИЕ ПАПОК ==========
+    function toggleTreeItem(element) {
+        const treeItem = element.closest('.tree-item');
+        const children = treeItem.querySelector('.tree-children');
+        const toggle = treeItem.querySelector('.tree-toggle');
+
+        if (children) {
+            if (children.style.display === 'none' || !children.style.display) {
+                children.style.display = 'block';
+                toggle.classList.add('expanded');
+            } else {
+                children.style.display = 'none';
+                toggle.classList.remove('expanded');
+            }
+        }
+    }
+
+    // ========== НАВИГАЦИЯ КАК В ПРОВОДНИКЕ ==========
+    function navigateTo(type, id, title) {
+        // Обрезаем стек если мы не в конце
+        if (currentPosition < navigationStack.length - 1) {
+            navigationStack = navigationStack.slice(0, currentPosition + 1);
+        }
+
+        // Добавляем в историю
+        navigationStack.push({
+            type: type,
+            id: id,
+            title: title
+        });
+
+        currentPosition = navigationStack.length - 1;
+        currentFolderType = type;
+        currentFolderId = id;
+        currentFolderName = title;
+
+        // Загружаем содержимое
+        loadFolderContent(type, id);
+        updateNavigationButtons();
+        updateBreadcrumb();
+        expandTreeItem(type, id);
+    }
+
+    function expandTreeItem(type, id) {
+        const treeItem = document.querySelector(`.tree-item[data-id="${id}"][data-type="${type}"]`);
+        if (!treeItem) return;
+
+        // Раскрываем все родительские папки
+        let parent = treeItem.closest('.tree-children');
+        while (parent) {
+            parent.style.display = 'block';
+            const toggle = parent.closest('.tree-item')?.querySelector('.tree-toggle');
+            if (toggle) toggle.classList.add('expanded');
+            parent = parent.parentElement?.closest('.tree-children');
+        }
+
+        // Подсвечиваем текущий элемент
+        document.querySelectorAll('.tree-item-header.active').forEach(el => {
+            el.classList.remove('active');
+        });
+
+        const header = treeItem.querySelector('.tree-item-header');
+        if (header) header.classList.add('active');
+    }
+
+    function goBack() {
+        if (currentPosition > 0) {
+            currentPosition--;
+            const item = navigationStack[currentPosition];
+            currentFolderType = item.type;
+            currentFolderId = item.id;
+            currentFolderName = item.title;
+            loadFolderContent(item.type, item.id);
+            updateNavigationButtons();
+            updateBreadcrumb();
+            expandTreeItem(item.type, item.id);
+        }
+    }
+
+    function goForward() {
+        if (currentPosition < navigationStack.length - 1) {
+            currentPosition++;
+            const item = navigationStack[currentPosition];
+            currentFolderType = item.type;
+            currentFolderId = item.id;
+            currentFolderName = item.title;
+            loadFolderContent(item.type, item.id);
+            updateNavigationButtons();
+            updateBreadcrumb();
+            expandTreeItem(item.type, item.id);
+        }
+    }
+
+    function goUp() {
+        const node = treeIndex && treeIndex[`${currentFolderType}:${currentFolderId}`];
+        if (node && node.parent) {
+            const parent = treeIndex[node.parent];
+            navigateTo(parent.type, parent.id, parent.name);
+            return;
+        }
+        if (currentFolderType && currentFolderId) {
+            fetch(`/admin-panel/api/folder-content/?type=${currentFolderType}&id=${currentFolderId}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.path && data.path.length > 1) {
+                        const parent = data.path[data.path.length - 2];
+                        navigateTo(parent.type, parent.id, parent.name);
+                    }
+                });
+        }
+    }
+
+    function jumpToHistory(index) {
+        if (index >= 0 && index < navigationStack.length) {
+            const item = navigationStack[index];
+            navigationStack = navigationStack.slice(0, index + 1);
+            currentPosition = index;
+            currentFolderType = item.type;
+            currentFolderId = item.id;
+            currentFolderName = item.title;
+            loadFolderContent(item.type, item.id);
+            updateNavigationButtons();
+            updateBreadcrumb();
+            expandTreeItem(item.type, item.id);
+        }
+    }
+
+    function updateNavigationButtons() {
+        const backBtn = document.getElementById('backBtn');
+        const forwardBtn = document.getElementById('forwardBtn');
+        const upBtn = document.getElementById('upBtn');
+
+        if (backBtn) backBtn.disabled = currentPosition <= 0;
+        if (forwardBtn) forwardBtn.disabled = currentPosition >= navigationStack.length - 1;
+        if (upBtn) upBtn.disabled = !currentFolderType || !currentFolderId;
+    }
+
+    function updateBreadcrumb() {
+        const breadcrumb = document.getElementById('pathBreadcrumb');
+        if (!breadcrumb) return;
+
+        if (navigationStack.length === 0) {
+            breadcrumb.innerHTML = '<span class="breadcrumb-item active">Главная</span>';
+            return;
+        }
+
+        let html = '<span class="breadcrumb-item" onclick="jumpToHistory(-1)">Главная</span>';
+
+        for (let i = 0; i < navigationStack.length; i++) {
+            html += ' <i class="bi bi-chevron-right"></i> ';
+            if (i === navigationStack.length - 1) {
+                html += `<span class="breadcrumb-item active">${navigationStack[i].title}</span>`;
+            } else {
+                html += `<span class="breadcrumb-item" onclick="jumpToHistory(${i})">${navigationStack[i].title}</span>`;
+            }
+        }
+
+        breadcrumb.innerHTML = html;
+    }
+
+    // ========== ПОИСК ==========
+    function openSearchModal() {
+        const modal = document.getElementById('searchModal');
+        modal.style.display = 'block';
+        document.getElementById('searchQuery').focus();
+        document.getElementById('searchResultsContainer').innerHTML = '';
+    }
+
+    function closeSearchModal() {
+        document.getElementById('searchModal').style.display = 'none';
+    }
+
+    function performSearch() {
+        const query = document.getElementById('searchQuery').value.trim();
+        const resultsContainer = document.getElementById('searchResultsContainer');
+
+        if (query.length < 2) {
+            resultsContainer.innerHTML = '<div class="text-center text-muted py-4">Введите минимум 2 символа</div>';
+            return;
+        }
+
+        resultsContainer.innerHTML = '<div class="text-center py-4"><div class="spinner-border"></div><p>Поиск...</p></div>';
+
+        fetch(`/admin-panel/api/search/?q=${encodeURIComponent(query)}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.results && data.results.length > 0) {
+                    let html = `<div class="mb-2">Найдено: <strong>${data.count}</strong></div>`;
+
+                    data.results.forEach(student => {
+                        html += `
+                            <div class="search-result-item" onclick="navigateToStudent(${student.id})">
+                                <i class="bi bi-person-circle fs-4"></i>
+                                <div class="search-result-info">
+                                    <div class="search-result-name">
+                                        ${student.full_name}
+                                        ${student.is_elder ? '<span class="badge-elder ms-2">Староста</span>' : ''}
+                                    </div>
+                                    <div class="search-result-path">
+                                        <i class="bi bi-box-arrow-in-right"></i> ${student.login} |
+                                        <i class="bi bi-envelope"></i> ${student.email || '—'}
+                                    </div>
+                                    <div class="search-result-path">
+                                        <i class="bi bi-folder"></i> ${student.path || 'Нет группы'}
+                                    </div>
+                                </div>
+                            </div>
+                        `;
+                    });
+
+                    resultsContainer.innerHTML = html;
+                } else {
+                    resultsContainer.innerHTML = '<div class="text-center text-muted py-4">Ничего не найдено</div>';
+                }
+            })
+            .catch(error => {
+                resultsContainer.innerHTML = '<div class="alert alert-danger">Ошибка поиска</div>';
+            });
+    }
+
+    // ========== ЗАГРУЗКА КОНТЕНТА ==========
+    function loadFolderContent(type, id) {
+        const container = document.getElementById('contentContainer');
+
+        // Папки берём из дерева на клиенте, за студентами группы идём на сервер
+        if (type !== 'group') {
+            const data = treeFolderContent(type, id);
+            if (data) {
+                renderFolderContent(data);
+                return;
+            }
+        }
+
+        container.innerHTML = '<div class="text-center py-5"><div class="spinner-border text-primary"></div><p class="mt-3">Загрузка данных...</p></div>';
+
+        fetch(`/admin-panel/api/folder-content/?type=${type}&id=${id}`)
+            .then(response => response.json())
+            .then(data => {
+                renderFolderContent(data);
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                container.innerHTML = '<div class="alert alert-danger">Ошибка загрузки данных</div>';
+            });
+    }
+
+    function renderFolderContent(data) {
+        const container = document.getElementById('contentContainer');
+
+        if (data.type === 'group') {
+            renderStudentsGrid(data.items || [], container);
+        } else {
+            renderFoldersGrid(data.items || [], data.type, container);
+        }
+    }
+
+    function renderFoldersGrid(items, parentType, container) {
+        if (!items || items.length === 0) {
+            container.innerHTML = `
+                <div class="text-center py-5">
+                    <i class="bi bi-folder2-open display-1 text-muted"></i>
+                    <h4 class="mt-3">Папка пуста</h4>
+                    <p class="text-muted">Нажмите "Добавить" чтобы создать новый элемент</p>
+                </div>
+            `;
+            return;
+        }
+
+        let html = '<div class="folders-grid">';
+
+        items.forEach(item => {
+            html += `
+                <div class="folder-item" ondblclick="navigateTo('${item.type}', ${item.id}, '${item.name}')">
+                    <div class="folder-icon">
+                        <i class="${item.icon || 'bi-folder'}"></i>
+                    </div>
+                    <div class="folder-name">${item.name}</div>
+                    <div class="folder-actions">
+                        <button class="folder-btn" onclick="event.stopPropagation(); renameFolder('${item.type}', ${item.id}, this)">
+                            <i class="bi bi-pencil"></i>
+                        </button>
+                        <button class="folder-btn" onclick="event.stopPropagation(); openDeleteModal('${item.type}', ${item.id})">
+                            <i class="bi bi-trash"></i>
+                        </button>
+                    </div>
+                    <div class="folder-stats">
+                        <span class="badge bg-secondary">${item.count || 0}</span>
+                    </div>
+                </div>
+            `;
+        });
+
+        html += '</div>';
+        container.innerHTML = html;
+    }
+
+    function renderStudentsGrid(students, container) {
+        if (!students || students.length === 0) {
+            container.innerHTML = `
+                <div class="text-center py-5">
+                    <i class="bi bi-people display-1 text-muted"></i>
+                    <h4 class="mt-3">В группе нет студентов</h4>
+                    <p class="text-muted">Нажмите "Добавить студента" чтобы создать первую запись</p>
+                    <button class="btn btn-primary mt-3" onclick="openCreateModal('student', ${currentFolderId})">
+                        <i class="bi bi-person-plus"></i> Добавить студента
+                    </button>
+                </div>
+            `;
+            return;
+        }
+
+        const sortedStudents = [...students].sort((a, b) => 
+            (a.full_name || '').localeCompare(b.full_name || '', 'ru')
+        );
+
+        let html = `
+            <div class="d-flex justify-content-between align-items-center mb-3">
+                <span class="badge bg-primary">Всего студентов: ${sortedStudents.length}</span>
+            </div>
+            <div class="students-grid">
+        `;
+
+        sortedStudents.forEach((student, index) => {
+            // Определяем иконку в зависимости от типа
+            let typeIcon = 'bi-person-circle';
+            let typeColor = '#6c757d';
+
+            switch(student.user_type) {
+                case 'elder':
+                    typeIcon = 'bi-star-fill';
+                    typeColor = '#ffc107';
+                    break;
+                case 'dean':
+                    typeIcon = 'bi-building';
+                    typeColor = '#6f42c1';
+                    break;
+                case 'teacher':
+                    typeIcon = 'bi-mortarboard';
+                    typeColor = '#0dcaf0';
+                    break;
+                case 'admin':
+                    typeIcon = 'bi-shield-lock';
+                    typeColor = '#dc3545';
+                    break;
+            }
+
+            html += `
+                <div class="student-card">
+                    <div class="student-number">${index + 1}</div>
+                    <div class="student-avatar">
+                        <i class="bi ${typeIcon}" style="color: ${typeColor};"></i>
+                    </div>
+                    <div class="student-info">
+                        <div class="student-name">
+                            ${student.full_name || 'Без имени'}
+                            <span class="badge" style="background: ${typeColor}; color: white; font-size: 11px;">
+                                ${getUserTypeName(student.user_type)}
+                            </span>
+                            ${student.is_elder ? '<span class="badge-elder">Староста</span>' : ''}
+                        </div>
+                        <div class="student-details">
+                            <span><i class="bi bi-box-arrow-in-right"></i> ${student.login || ''}</span>
+                            ${student.email ? `<span><i class="bi bi-envelope"></i> ${student.email}</span>` : ''}
+                            ${student.phone ? `<span><i class="bi bi-telephone"></i> ${student.phone}</span>` : ''}
+                        </div>
+                    </div>
+                    <div class="student-actions">
+                        <button class="btn-icon" onclick="event.stopPropagation(); openEditModal('student', ${student.id})">
+                            <i class="bi bi-pencil"></i>
+                        </button>
+                        <button class="btn-icon" onclick="event.stopPropagation(); openDeleteModal('student', ${student.id})">
+                            <i class="bi bi-trash"></i>
+                        </button>
+                    </div>
+                </div>
+            `;
+        });
+
+        html += '</div>';
+        container.innerHTML = html;
+    }
+
+    // ========== ПЕРЕИМЕНОВАНИЕ ==========
+    function renameFolder(type, id, button) {
+        const folderItem = button.closest('.folder-item');
+        const folderName = folderItem.querySelector('.folder-name');
+        const oldName = folderName.textContent.trim();
+
+        const input = document.createElement('input');
+        input.type = 'text';
+        input.value = oldName;
+        input.className = 'form-control form-control-sm';
+        input.style.width = '100%';
+
+        folderName.innerHTML = '';
+        folderName.appendChild(input);
+        input.focus();
+
+        input.addEventListener('blur', () => {
+            saveRename(type, id, input.value, folderName, oldName);
+        });
+
+        input.addEventListener('keypress', (e) => {
+            if (e.key === 'Enter') {
+                saveRename(type, id, input.value, folderName, oldName);
+            }
+        });
+    }
+
+    // Функция для получения названия типа
+    function getUserTypeName(type) {
+        const names = {
+            'student': 'Студент',
+            'elder': 'Староста',
+            'dean': 'Деканат',
+            'department': 'Отдел',
+            'teacher': 'Преподаватель',
+            'admin': 'Администратор'
+        };
+        return names[type] || type;
+    }
+
+    function saveRename(type, id, newName, element, oldName) {
+        fetch('/admin-panel/api/rename/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({
+                type: type,
+                id: id,
+                name: newName
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                element.innerHTML = newName;
+                showNotification(`✅ Переименовано в "${newName}"`, 'success');
+
+                reloadFolderContent();
+            } else {
+                element.innerHTML = oldName;
+                showNotification('❌ Ошибка при переименовании', 'danger');
+            }
+        });
+    }
+
+    // ========== ОСТАЛЬНЫЕ ФУНКЦИИ ==========
+
+    function showAddMenu() {
+        const menu = document.getElementById('addMenu');
+        const button = document.querySelector('.action-btn-primary');
+
+        menu.style.display = 'block';
+
+        if (button) {
+            const rect = button.getBoundingClientRect();
+            menu.style.top = (rect.bottom + window.scrollY + 5) + 'px';
+            menu.style.left = (rect.left + window.scrollX) + 'px';
+        }
+
+        setTimeout(() => {
+            document.addEventListener('click', hideAddMenuOnClickOutside);
+        }, 10);
+    }
+
+    function hideAddMenu() {
+        const menu = document.getElementById('addMenu');
+        menu.style.display = 'none';
+        document.removeEventListener('click', hideAddMenuOnClickOutside);
+    }
+
+    function hideAddMenuOnClickOutside(event) {
+        const menu = document.getElementById('addMenu');
+        const button = document.querySelector('.action-btn-primary');
+
+        if (!menu.contains(event.target) && !button.contains(event.target)) {
+            hideAddMenu();
+        }
+    }
+
+    function openCreateModal(type, parentId = null) {
+        const modal = document.getElementById('itemModal');
+        const modalTitle = document.getElementById('modalTitle');
+        const modalBody = document.getElementById('modalBody');
+        modalTitle.textContent = `Создание ${getTypeName(type)}`;
+        modalBody.innerHTML = generateCreateForm(type, parentId);
+        modal.style.display = 'block';
+        hideAddMenu();
+    }
+
+    function openEditModal(type, id) {
+        const modal = document.getElementById('itemModal');
+        const modalTitle = document.getElementById('modalTitle');
+        const modalBody = document.getElementById('modalBody');
+
+        modalTitle.textContent = `Редактирование ${getTypeName(type)}`;
+        modalBody.innerHTML = '<div class="text-center py-5"><div class="spinner-border text-primary"></div><p class="mt-3">Загрузка данных...</p></div>';
+        modal.style.display = 'block';
+
+        const url = type === 'student' 
+    ? `/admin-panel/api/student/${id}/`
+    : `/admin-panel/api/folder-content/?type=${type}&id=${id}`;
+
+        fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error('Ошибка сети');
+                return response.json();
+            })
+            .then(data => {
+                modalBody.innerHTML = generateEditForm(type, data);
+            })
+            .catch(error => {
+                console.error('Ошибка:', error);
+                modalBody.innerHTML = `
+                    <div class="text-center py-4">
+                        <i class="bi bi-exclamation-triangle-fill text-danger display-4"></i>
+                        <h4 class="mt-3 text-danger">Ошибка загрузки данных</h4>
+                        <p class="text-muted">Не удалось загрузить информацию</p>
+                        <button class="btn btn-primary mt-3" onclick="closeModal()">Закрыть</button>
+                    </div>
+                `;
+            });
+    }
+
+    function openDeleteModal(type, id) {
+        const modal = document.getElementById('deleteModal');
+        const deleteMessage = document.getElementById('deleteMessage');
+        currentItemToDelete = { type, id };
+        deleteMessage.textContent = `Вы действительно хотите удалить ${getTypeName(type)}? Это действие нельзя отменить!`;
+        modal.style.display = 'block';
+    }
+
+    function closeModal() {
+        document.getElementById('itemModal').style.display = 'none';
+    }
+
+    function closeDeleteModal() {
+        document.getElementById('deleteModal').style.display = 'none';
+        currentItemToDelete = null;
+    }
+
+    function confirmDelete() {
+        if (!currentItemToDelete) return;
+
+        const deleteBtn = document.querySelector('#deleteModal .action-btn-danger');
+        const originalText = deleteBtn.innerHTML;
+        deleteBtn.innerHTML = '<i class="bi bi-arrow-repeat"></i> Удаление...';
+        deleteBtn.disabled = true;
+
+        fetch('/admin-panel/api/delete/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify(currentItemToDelete)
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                closeDeleteModal();
+                reloadFolderContent();
+                showNotification('✅ Элемент успешно удален', 'success');
+            } else {
+                showNotification('❌ Ошибка при удалении: ' + (data.error || 'Неизвестная ошибка'), 'danger');
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showNotification('❌ Ошибка сети при удалении', 'danger');
+        })
+        .finally(() => {
+            deleteBtn.innerHTML = originalText;
+            deleteBtn.disabled = false;
+        });
+    }
+
+    // ========== ГЕНЕРАЦИЯ ФОРМ СОЗДАНИЯ ==========
+    function generateCreateForm(type, parentId) {
+        switch(type) {
+            case 'level':
+                return `
+                    <form id="createForm" onsubmit="submitCreateForm(event, 'level')">
+                        <div class="form-group">
+                            <label>🎓 Название уровня образования</label>
+                            <input type="text" class="form-control" name="name" required 
+                                   placeholder="Например: Бакалавриат, Магистратура, Специалитет">
+                        </div>
+                        <div class="form-group">
+                            <label>🔢 Порядок сортировки</label>
+                            <input type="number" class="form-control" name="order" value="1" min="1">
+                            <small class="text-muted">Чем меньше число, тем выше в списке</small>
+                        </div>
+                        <button type="submit" class="action-btn action-btn-primary w-100 mt-3">
+                            <i class="bi bi-check-circle"></i> Создать уровень
+                        </button>
+                    </form>
+                `;
+
+            case 'form':
+                return `
+                    <form id="createForm" onsubmit="submitCreateForm(event, 'form', ${parentId})">
+                        <div class="form-group">
+                            <label>📚 Форма обучения</label>
+                            <input type="text" class="form-control" name="name" required 
+                                   placeholder="Очная форма, Заочная форма, Очно-заочная форма">
+                        </div>
+                        <div class="form-group">
+                            <label>🔢 Порядок сортировки</label>
+                            <input type="number" class="form-control" name="order" value="1" min="1">
+                        </div>
+                        <button type="submit" class="action-btn action-btn-primary w-100 mt-3">
+                            <i class="bi bi-check-circle"></i> Создать форму
+                        </button>
+                    </form>
+                `;
+
+            case 'course':
+                return `
+                    <form id="createForm" onsubmit="submitCreateForm(event, 'course', ${parentId})">
+                        <div class="form-group">
+                            <label>📖 Номер курса</label>
+                            <input type="number" class="form-control" name="number" required 
+                                   min="1" max="6" placeholder="1">
+                        </div>
+                        <button type="submit" class="action-btn action-btn-primary w-100 mt-3">
+                            <i class="bi bi-check-circle"></i> Создать курс
+                        </button>
+                    </form>
+                `;
+
+            case 'group':
+                return `
+                    <form id="createForm" onsubmit="submitCreateForm(event, 'group', ${parentId})">
+                        <div class="form-group">
+                            <label>👥 Название группы</label>
+                            <input type="text" class="form-control" name="name" required 
+                                   placeholder="Например: СПД-103, Ю-201, ПД-101">
+                        </div>
+                        <div class="alert alert-info mt-2 mb-3 py-2">
+                            <small>
+                                <i class="bi bi-info-circle"></i>
+                                Группа будет создана в текущем курсе
+                            </small>
+                        </div>
+                        <button type="submit" class="action-btn action-btn-primary w-100 mt-3">
+                            <i class="bi bi-check-circle"></i> Создать группу
+                        </button>
+                    </form>
+                `;
+
+            case 'student':
+                return `
+                    <form id="createForm" onsubmit="submitCreateForm(event, 'student', ${parentId})">
+                        <div class="form-group">
+                            <label>👤 ФИО</label>
+                            <input type="text" class="form-control" name="full_name" required 
+                                   placeholder="Иванов Иван Иванович" id="studentFullName">
+                        </div>
+                        <div class="form-group">
+                            <label>🔐 Логин</label>
+                            <input type="text" class="form-control" name="login" required 
+                                   placeholder="ivanov.ii" id="studentLogin">
+                        </div>
+                        <div class="form-group">
+                            <label>📧 Email</label>
+                            <input type="email" class="form-control" name="email" 
+                                   placeholder="student@example.com">
+                        </div>
+                        <div class="form-group">
+                            <label>📱 Телефон</label>
+                            <input type="tel" class="form-control" name="phone" 
+                                   placeholder="+7 (999) 123-45-67">
+                        </div>
+                        <div class="form-group">
+                            <label>👥 Тип пользователя</label>
+                            <select class="form-control" name="user_type">
+                                <option value="student">🎓 Студент</option>
+                                <option value="elder">⭐ Староста</option>
+                                <option value="dean">🏛️ Деканат</option>
+                                <option value="department">📋 Отдел</option>
+                                <option value="teacher">👨‍🏫 Преподаватель</option>
+                                <option value="admin">🛠️ Администратор</option>
+                            </select>
+                        </div>
+                        <div class="alert alert-info mt-2">
+                            <small>
+                                <i class="bi bi-info-circle"></i>
+                                Пароль будет сгенерирован автоматически
+                            </small>
+                        </div>
+                        <button type="submit" class="action-btn action-btn-primary w-100 mt-3">
+                            <i class="bi bi-check-circle"></i> Создать пользователя
+                        </button>
+                    </form>
+                    <script>
+                        document.getElementById('studentFullName')?.addEventListener('input', function(e) {
+                            const name = e.target.value;
+                            const loginInput = document.getElementById('studentLogin');
+                            if (name && !loginInput.value) {
+                                const translit = {
+                                    'а':'a','б':'b','в':'v','г':'g','д':'d','е':'e',
+                                    'ё':'e','ж':'zh','з':'z','и':'i','й':'y','к':'k',
+                                    'л':'l','м':'m','н':'n','о':'o','п':'p','р':'r',
+                                    'с':'s','т':'t','у':'u','ф':'f','х':'h','ц':'ts',
+                                    'ч':'ch','ш':'sh','щ':'sch','ъ':'','ы':'y','ь':'',
+                                    'э':'e','ю':'yu','я':'ya'
+                                };
+                                let login = name.toLowerCase()
+                                    .split(' ')
+                                    .map((part, i) => {
+                                        let trans = '';
+                                        for (let char of part) {
+                                            trans += translit[char] || char;
+                                        }
+                                        return i === 0 ? trans : trans[0];
+                                    })
+                                    .join('.');
+                                loginInput.value = login;
+                            }
+                        });
+                    <\/script>
+                `;
+
+            default:
+                return `
+                    <div class="text-center py-4">
+                        <i class="bi bi-tools display-4 text-muted"></i>
+                        <p class="mt-3 text-muted">Форма для типа "${type}" в разработке</p>
+                    </div>
+                `;
+        }
+    }
+
+    function generateEditForm(type, data) {
+        if (type === 'student') {
+            const isElder = data.user_type === 'elder' || data.is_elder;
+
+            return `
+                <form id="editForm" onsubmit="submitEditForm(event, 'student', ${data.id})">
+                    <div class="card mb-3">
+                        <div class="card-header bg-light">
+                            <i class="bi bi-person"></i> Основная информация
+                        </div>
+                        <div class="card-body">
+                            <div class="form-group">
+                                <label>👤 ФИО</label>
+                                <input type="text" class="form-control" name="full_name" 
+                                       value="${data.full_name || ''}" required>
+                            </div>
+
+                            <div class="row">
+                                <div class="col-md-6">
+                                    <div class="form-group">
+                                        <label>🔐 Логин</label>
+                                        <input type="text" class="form-control" name="login" 
+                                               value="${data.login || ''}" required 
+                                               placeholder="Логин для входа">
+                                    </div>
+                                </div>
+                                <div class="col-md-6">
+                                    <div class="form-group">
+                                        <label>🔑 Пароль</label>
+                                        <div class="input-group">
+                                            <input type="text" class="form-control" name="password" 
+                                                   id="password-${data.id}" value="${data.password || ''}" 
+                                                   placeholder="Пароль для входа">
+                                            <button class="btn btn-outline-secondary" type="button" 
+                                                    onclick="togglePasswordVisibility(${data.id})">
+                                                <i class="bi bi-eye" id="eye-${data.id}"></i>
+                                            </button>
+                                            <button class="btn btn-outline-primary" type="button" 
+                                                    onclick="generatePasswordForStudent(${data.id})">
+                                                <i class="bi bi-arrow-repeat"></i>
+                                            </button>
+                                        </div>
+                                        <small class="text-muted">Пароль виден только администраторам</small>
+                                    </div>
+                                </div>
+                            </div>
+
+                            <div class="row">
+                                <div class="col-md-6">
+                                    <div class="form-group">
+                                        <label>📧 Email</label>
+                                        <input type="email" class="form-control" name="email" 
+                                               value="${data.email || ''}">
+                                    </div>
+                                </div>
+                                <div class="col-md-6">
+                                    <div class="form-group">
+                                        <label>📱 Телефон</label>
+                                        <input type="tel" class="form-control" name="phone" 
+                                               value="${data.phone || ''}">
+                                    </div>
+                                </div>
+                            </div>
+
+                            <div class="row">
+                                <div class="col-md-6">
+                                    <div class="form-group">
+                                        <label>👥 Тип пользователя</label>
+                                        <select class="form-control" name="user_type" id="user-type-${data.id}">
+                                            <option value="student" ${data.user_type === 'student' ? 'selected' : ''}>🎓 Студент</option>
+                                            <option value="elder" ${data.user_type === 'elder' ? 'selected' : ''}>⭐ Староста</option>
+                                            <option value="dean" ${data.user_type === 'dean' ? 'selected' : ''}>🏛️ Деканат</option>
+                                            <option value="department" ${data.user_type === 'department' ? 'selected' : ''}>📋 Отдел</option>
+                                            <option value="teacher" ${data.user_type === 'teacher' ? 'selected' : ''}>👨‍🏫 Преподаватель</option>
+                                            <option value="admin" ${data.user_type === 'admin' ? 'selected' : ''}>🛠️ Администратор</option>
+                                        </select>
+                                    </div>
+                                </div>
+                                <div class="col-md-6">
+                                    <div class="form-check mt-4">
+                                        <input type="checkbox" class="form-check-input" name="is_active" id="isActive" 
+                                               ${data.is_active ? 'checked' : ''}>
+                                        <label class="form-check-label" for="isActive">✅ Активен</label>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <div id="elder-permissions-${data.id}" style="display: ${isElder ? 'block' : 'none'};">
+                        <div class="card mb-3 border-warning">
+                            <div class="card-header bg-warning text-dark">
+                                <i class="bi bi-star-fill"></i> Расширенные права старосты
+                            </div>
+                            <div class="card-body">
+                                <div class="row">
+                                    <div class="col-md-6">
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_add_students" id="perm_add_students"
+                                                   ${data.permissions?.add_students ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_add_students">➕ Добавление студентов</label>
+                                        </div>
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_edit_students" id="perm_edit_students"
+                                                   ${data.permissions?.edit_students ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_edit_students">✏️ Редактирование студентов</label>
+                                        </div>
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_delete_students" id="perm_delete_students"
+                                                   ${data.permissions?.delete_students ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_delete_students">🗑️ Удаление студентов</label>
+                                        </div>
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_manage_schedule" id="perm_manage_schedule"
+                                                   ${data.permissions?.manage_schedule ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_manage_schedule">📅 Управление расписанием</label>
+                                        </div>
+                                    </div>
+                                    <div class="col-md-6">
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_manage_attendance" id="perm_manage_attendance"
+                                                   ${data.permissions?.manage_attendance ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_manage_attendance">✅ Учет посещаемости</label>
+                                        </div>
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_manage_grades" id="perm_manage_grades"
+                                                   ${data.permissions?.manage_grades ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_manage_grades">📊 Управление оценками</label>
+                                        </div>
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_create_chat" id="perm_create_chat"
+                                                   ${data.permissions?.create_chat ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_create_chat">💬 Создание чатов</label>
+                                        </div>
+                                        <div class="form-check mb-2">
+                                            <input type="checkbox" class="form-check-input" name="perm_export_reports" id="perm_export_reports"
+                                                   ${data.permissions?.export_reports ? 'checked' : ''}>
+                                            <label class="form-check-label" for="perm_export_reports">📄 Экспорт отчетов</label>
+                                        </div>
+                                    </div>
+                                </div>
+                                <div class="form-group mt-3">
+                                    <label>Максимум студентов в группе</label>
+                                    <input type="number" class="form-control" name="max_students" 
+                                           value="${data.permissions?.max_students || 100}" min="1" max="500">
+                                </div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <button type="submit" class="action-btn action-btn-primary w-100 mt-3">
+                        <i class="bi bi-check-circle"></i> Сохранить изменения
+                    </button>
+                </form>
+
+                <script>
+                    document.getElementById('user-type-${data.id}')?.addEventListener('change', function(e) {
+                        const permissionsDiv = document.getElementById('elder-permissions-${data.id}');
+                        if (e.target.value === 'elder') {
+                            permissionsDiv.style.display = 'block';
+                        } else {
+                            permissionsDiv.style.display = 'none';
+                        }
+                    });
+                <\/script>
+            `;
+        }
+        return '<p class="text-center text-muted py-4">Редактирование в разработке</p>';
+    }
+
+    function togglePasswordVisibility(studentId) {
+        const passwordInput = document.getElementById(`password-${studentId}`);
+        const eyeIcon = document.getElementById(`eye-${studentId}`);
+
+        if (passwordInput.type === 'password') {
+            passwordInput.type = 'text';
+            eyeIcon.classList.remove('bi-eye');
+            eyeIcon.classList.add('bi-eye-slash');
+        } else {
+            passwordInput.type = 'password';
+            eyeIcon.classList.remove('bi-eye-slash');
+            eyeIcon.classList.add('bi-eye');
+        }
+    }
+
+    function generatePasswordForStudent(studentId) {
+        if (!confirm('Сгенерировать новый случайный пароль?')) {
+            return;
+        }
+
+        const chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789';
+        let newPassword = '';
+        for (let i = 0; i < 8; i++) {
+            newPassword += chars.charAt(Math.floor(Math.random() * chars.length));
+        }
+
+        const passwordInput = document.getElementById(`password-${studentId}`);
+        if (passwordInput) {
+            passwordInput.value = newPassword;
+            showNotification('✅ Новый пароль сгенерирован', 'success');
+        }
+    }
+
+    function submitCreateForm(event, type, parentId) {
+        event.preventDefault();
+        const form = event.target;
+        const formData = new FormData(form);
+        const data = Object.fromEntries(formData.entries());
+        data.type = type;
+
+        if (parentId) {
+            if (type === 'student') data.group_id = parentId;
+            if (type === 'form') data.level_id = parentId;
+            if (type === 'course') data.form_id = parentId;
+            if (type === 'group') data.course_id = parentId;
+        }
+
+        fetch('/admin-panel/api/create/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify(data)
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                closeModal();
+                if (currentFolderType && currentFolderId) {
+                    reloadFolderContent();
+                } else {
+                    location.reload();
+                }
+                showNotification('✅ Элемент успешно создан', 'success');
+            } else {
+                alert('Ошибка: ' + data.error);
+            }
+        });
+    }
+
+    function submitEditForm(event, type, id) {
+        event.preventDefault();
+        const form = event.target;
+        const formData = new FormData(form);
+        const data = Object.fromEntries(formData.entries());
+
+        data.type = type;
+        data.id = id;
+
+        const submitBtn = form.querySelector('button[type="submit"]');
+        const originalText = submitBtn.innerHTML;
+        submitBtn.innerHTML = '<i class="bi bi-arrow-repeat"></i> Сохранение...';
+        submitBtn.disabled = true;
+
+        fetch('/admin-panel/api/update/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify(data)
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Ошибка сети');
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (data.success) {
+                closeModal();
+                reloadFolderContent();
+                showNotification('✅ Изменения сохранены!', 'success');
+            } else {
+                showNotification('❌ Ошибка: ' + (data.error || 'Неизвестная ошибка'), 'danger');
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showNotification('❌ Ошибка при сохранении', 'danger');
+        })
+        .finally(() => {
+            submitBtn.innerHTML = originalText;
+            submitBtn.disabled = false;
+        });
+    }
+
+    function toggleLogs() {
+        const panel = document.getElementById('logsPanel');
+        if (panel.style.display === 'none') {
+            panel.style.display = 'block';
+            loadLogs();
+        } else {
+            panel.style.display = 'none';
+        }
+    }
+
+    function loadLogs(cursor = null) {
+        const container = document.getElementById('logsContent');
+        const url = '/admin-panel/api/action-logs/' + (cursor ? `?cursor=${encodeURIComponent(cursor)}` : '');
+        fetch(url)
+            .then(response => response.json())
+            .then(data => {
+                let list = container.querySelector('.logs-list');
+                if (!cursor || !list) {
+                    container.innerHTML = '<div class="logs-list"></div>';
+                    list = container.querySelector('.logs-list');
+                }
+                container.querySelector('.logs-more')?.remove();
+
+                let html = '';
+                (data.logs || []).forEach(log => {
+                    html += `<div class="log-entry"><small>${log.time}</small><div><strong>${log.user}</strong> ${log.action}</div></div>`;
+                });
+                list.insertAdjacentHTML('beforeend', html);
+
+                // Следующая страница - по курсору из ответа
+                if (data.has_more && data.next_cursor) {
+                    container.insertAdjacentHTML('beforeend',
+                        `<button class="btn btn-sm btn-link logs-more" onclick="loadLogs('${data.next_cursor}')">Показать ещё</button>`);
+                }
+            });
+    }
+
+    function showNotification(message, type) {
+        const notification = document.createElement('div');
+        notification.className = `alert alert-${type} position-fixed top-0 end-0 m-3`;
+        notification.style.zIndex = '9999';
+        notification.innerHTML = message;
+        document.body.appendChild(notification);
+        setTimeout(() => notification.remove(), 3000);
+    }
+
+    function getTypeName(type) {
+        const names = {
+            'level': 'уровня образования',
+            'form': 'формы обучения',
+            'course': 'курса',
+            'group': 'группы',
+            'student': 'студента'
+        };
+        return names[type] || type;
+    }
+
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+
+    function importExcel() { alert('Импорт из Excel будет доступен в следующей версии'); }
+    function exportData() { alert('Экспорт данных будет доступен в следующей версии'); }
+    function navigateToStudent(studentId) { 
+        closeSearchModal();
+        alert('Переход к студенту будет доступен в следующей версии');
+    }
+
+    // ========== ИНИЦИАЛИЗАЦИЯ ========== (ее нет)
+
+
+    // ========== UNDO/REDO ==========
+    let actionHistory = [];
+    let currentActionIndex = -1;
+
+    function undoAction() {
+    showNotification('Функция "Отмена" в разработке', 'info');
+}
+
+function redoAction() {
+    showNotification('Функция "Повтор" в разработке', 'info');
+}
+
+
+    function clearCache() {
+    if (confirm('🗑️ Очистить кэш? Это действие нельзя отменить!')) {
+        fetch('/admin-panel/api/clear-cache/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCookie('csrftoken')
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showNotification('✅ Кэш успешно очищен', 'success');
+                localStorage.clear();
+                sessionStorage.clear();
+                setTimeout(() => location.reload(), 1000);
+            } else {
+                showNotification('❌ Ошибка при очистке кэша', 'danger');
+            }
+        });
+    }
+}
+
+
+
+    function openPasswordManager() {
+        const modal = document.getElementById('passwordModal');
+        const content = document.getElementById('passwordContent');
+
+        content.innerHTML = '<div class="text-center py-5"><div class="spinner-border text-primary"></div><p>Загрузка паролей...</p></div>';
+        modal.style.display = 'block';
+
+        fetch('/admin-panel/api/passwords/')
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                if (data.error) {
+                    content.innerHTML = `<div class="alert alert-danger">${data.error}</div>`;
+                    return;
+                }
+
+                if (data.passwords && data.passwords.length > 0) {
+                    let html = `
+                        <div class="table-responsive">
+                            <table class="table table-hover">
+                                <thead class="table-light">
+                                    <tr>
+                                        <th>ID</th>
+                                        <th>ФИО</th>
+                                        <th>Логин</th>
+                                        <th>Пароль</th>
+                                        <th>Тип</th>
+                                        <th>Группа</th>
+                                        <th>Действия</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                    `;
+
+                    data.passwords.forEach(user => {
+                        html += `
+                            <tr>
+                                <td>${user.id}</td>
+                                <td>${user.full_name}</td>
+                                <td><code>${user.login}</code></td>
+                                <td>
+                                    <span class="password-field" id="pass-${user.id}">
+                                        ••••••••
+                                    </span>
+                                    <button class="btn btn-sm btn-link" onclick="togglePassword(${user.id}, '${user.password}')">
+                                        <i class="bi bi-eye"></i>
+                                    </button>
+                                    <button class="btn btn-sm btn-link" onclick="copyPassword('${user.password}')">
+                                        <i class="bi bi-files"></i>
+                                    </button>
+                                </td>
+                                <td><span class="badge bg-info">${user.user_type}</span></td>
+                                <td>${user.group}</td>
+                                <td>
+                                    <button class="btn btn-sm btn-warning" onclick="generatePassword(${user.id})">
+                                        <i class="bi bi-arrow-repeat"></i> Новый
+                                    </button>
+                                </td>
+                            </tr>
+                        `;
+                    });
+
+                    html += `
+                                </tbody>
+                            </table>
+                        </div>
+                    `;
+                    content.innerHTML = html;
+                } else {
+                    content.innerHTML = '<div class="alert alert-info">Нет пользователей</div>';
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                content.innerHTML = `<div class="alert alert-danger">Ошибка загрузки: ${error.message}</div>`;
+            });
+    }
+
+    function togglePassword(userId, password) {
+        const field = document.getElementById(`pass-${userId}`);
+        if (field.textContent === '••••••••') {
+            field.textContent = password;
+        } else {
+            field.textContent = '••••••••';
+        }
+    }
+
+    function copyPassword(password) {
+        navigator.clipboard.writeText(password).then(() => {
+            showNotification('✅ Пароль скопирован', 'success');
+        }).catch(() => {
+            showNotification('❌ Ошибка копирования', 'danger');
+        });
+    }
+
+    function generatePassword(studentId) {
+        if (!confirm('Сгенерировать новый пароль? Старый пароль будет утерян.')) {
+            return;
+        }
+
+        fetch('/admin-panel/api/generate-password/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({student_id: studentId})
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (data.success) {
+                showNotification(`✅ Новый пароль для ${data.student_name}: ${data.new_password}`, 'success');
+                const field = document.getElementById(`pass-${studentId}`);
+                if (field) {
+                    field.setAttribute('onclick', `togglePassword(${studentId}, '${data.new_password}')`);
+                    field.textContent = '••••••••';
+                }
+            } else {
+                showNotification('❌ Ошибка: ' + (data.error || 'Неизвестная ошибка'), 'danger');
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showNotification('❌ Ошибка при генерации пароля', 'danger');
+        });
+    }
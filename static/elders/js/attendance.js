@@ -0,0 +1,125 @@
+// static/elders/js/attendance.js
+
+function openAddAttendance(studentId, studentName) {
+    document.getElementById('attendanceStudentId').value = studentId;
+    document.getElementById('attendanceStudentName').value = studentName;
+    document.getElementById('attendanceDate').value = new Date().toISOString().split('T')[0];
+
+    new bootstrap.Modal(document.getElementById('attendanceModal')).show();
+}
+
+document.getElementById('attendanceForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const data = {
+        student_id: formData.get('student_id'),
+        date: formData.get('date'),
+        hours: parseInt(formData.get('hours')),
+        reason: formData.get('reason')
+    };
+
+    fetch('/elders/api/add-attendance/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('attendanceModal')).hide();
+            showNotification('✅ Пропуск добавлен');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    });
+});
+
+function viewHistory(studentId) {
+    fetch(`/elders/api/attendance-history/?student_id=${studentId}`)
+        .then(r => r.json())
+        .then(data => {
+            const content = document.getElementById('historyContent');
+
+            if (data.history && data.history.length > 0) {
+                let html = `
+                    <div class="table-responsive">
+                        <table class="table table-custom">
+                            <thead>
+                                <tr>
+                                    <th>Дата</th>
+                                    <th>Часы</th>
+                                    <th>Причина</th>
+                                    <th>Кто отметил</th>
+                                    <th></th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                `;
+
+                data.history.forEach(item => {
+                    html += `
+                        <tr>
+                            <td>${item.date}</td>
+                            <td><span class="badge-custom badge-danger">${item.hours} ч</span></td>
+                            <td>${item.reason || '—'}</td>
+                            <td>${item.marked_by}</td>
+                            <td>
+                                <button class="btn btn-sm btn-outline-danger" onclick="deleteAttendance(${item.id})">
+                                    <i class="bi bi-trash"></i>
+                                </button>
+                            </td>
+                        </tr>
+                    `;
+                });
+
+                html += `
+                            </tbody>
+                        </table>
+                    </div>
+                    <div class="mt-3 text-end">
+                        <strong>Всего: ${data.total} / 20 часов</strong>
+                    </div>
+                `;
+
+                content.innerHTML = html;
+            } else {
+                content.innerHTML = '<div class="text-center py-4">Нет записей о пропусках</div>';
+            }
+
+            new bootstrap.Modal(document.getElementById('historyModal')).show();
+        });
+}
+
+function deleteAttendance(id) {
+    if (confirm('Удалить запись о пропуске?')) {
+        fetch('/elders/api/delete-attendance/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': PAGE.csrfToken,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ id: id })
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                showNotification('✅ Запись удалена');
+                location.reload();
+            }
+        });
+    }
+}
+
+function showNotification(message, type = 'success') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} position-fixed top-0 end-0 m-3`;
+    notification.style.zIndex = '9999';
+    notification.innerHTML = message;
+    document.body.appendChild(notification);
+    setTimeout(() => notification.remove(), 3000);
+}
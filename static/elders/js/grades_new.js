@@ -0,0 +1,509 @@
+// static/elders/js/grades_new.js
+
+    let currentWeekType = PAGE.weekType;
+    let currentGroupId = PAGE.groupId;
+    let currentDate = PAGE.currentDate;
+    let currentSeminarId = null;
+    let currentSlotNumber = null;
+
+    // Навигация по неделям
+    function changeWeekOffset(offset) {
+        let date = new Date(currentDate);
+        date.setDate(date.getDate() + (offset * 7));
+        window.location.href = `?date=${date.toISOString().split('T')[0]}`;
+    }
+
+    function goToToday() {
+        window.location.href = `?date=${new Date().toISOString().split('T')[0]}`;
+    }
+
+    function selectDate(date) {
+        window.location.href = `?date=${date}`;
+    }
+
+    function changeMonth(offset) {
+        let date = new Date(currentDate);
+        date.setMonth(date.getMonth() + offset);
+        window.location.href = `?date=${date.toISOString().split('T')[0]}`;
+    }
+
+    function toggleCalendar() {
+        const cal = document.getElementById('calendarSection');
+        const btn = document.getElementById('toggleCalendarBtn');
+
+        if (cal.style.display === 'none') {
+            cal.style.display = 'block';
+            btn.innerHTML = '<i class="bi bi-chevron-up"></i> Скрыть календарь';
+        } else {
+            cal.style.display = 'none';
+            btn.innerHTML = '<i class="bi bi-chevron-down"></i> Показать календарь';
+        }
+    }
+
+    // Загрузка семинаров
+    function loadSeminars() {
+        fetch(`/elders/api/seminar-slots/?week_type=${currentWeekType}&group_id=${currentGroupId}`)
+            .then(r => r.json())
+            .then(data => {
+                renderSeminars(data.seminars || []);
+            })
+            .catch(error => {
+                console.error('Error loading seminars:', error);
+            });
+    }
+
+    function renderSeminars(seminars) {
+        const days = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье'];
+        const scroll = document.getElementById('scheduleScroll');
+
+        // Группируем по дням
+        const byDay = {};
+        seminars.forEach(seminar => {
+            if (!byDay[seminar.day]) byDay[seminar.day] = [];
+            byDay[seminar.day].push(seminar);
+        });
+
+        let html = '';
+        for (let i = 1; i <= 7; i++) {
+            const daySeminars = byDay[i] || [];
+            const dayDate = getDateForDay(i);
+
+            html += `
+                <div class="seminar-day">
+                    <div class="day-header">
+                        <h3>${days[i-1]}</h3>
+                        <span class="day-date">${dayDate}</span>
+                    </div>
+
+                    ${daySeminars.map(seminar => {
+                        return `
+                            <div class="seminar-card">
+                                <div class="seminar-time">${seminar.start_time} - ${seminar.end_time}</div>
+                                <div class="seminar-subject">${seminar.subject}</div>
+                                <div class="seminar-teacher">${seminar.teacher || ''}</div>
+
+                                <div class="slots-container">
+                                    ${[1, 2].map(slotNum => {
+                                        const slot = seminar.slots?.find(s => s.slot_number === slotNum);
+                                        if (slot?.student_id) {
+                                            const pointsClass = slot.student_points >= 21 ? 'success' : 
+                                                              slot.student_points >= 15 ? 'warning' : 'danger';
+                                            return `
+                                                <div class="slot filled">
+                                                    <div class="slot-number">Слот ${slotNum}</div>
+                                                    <div class="slot-student">${slot.student_name}</div>
+                                                    <div class="slot-points text-${pointsClass}">
+                                                        ${slot.student_points}/21
+                                                    </div>
+                                                    <div class="slot-actions">
+                                                        <button class="slot-btn" onclick="gradeStudent(${slot.id}, ${slot.student_id}, '${slot.student_name}', '${seminar.subject}', ${seminar.id})">
+                                                            <i class="bi bi-pencil"></i>
+                                                        </button>
+                                                        <button class="slot-btn remove" onclick="removeFromSlot(${slot.id})">
+                                                            <i class="bi bi-x"></i>
+                                                        </button>
+                                                    </div>
+                                                </div>
+                                            `;
+                                        } else {
+                                            return `
+                                                <div class="slot">
+                                                    <div class="slot-number">Слот ${slotNum}</div>
+                                                    <div class="slot-student">—</div>
+                                                    <div class="slot-actions">
+                                                        <button class="slot-btn" onclick="openStudentSelect(${seminar.id}, ${slotNum})">
+                                                            <i class="bi bi-plus"></i>
+                                                        </button>
+                                                    </div>
+                                                </div>
+                                            `;
+                                        }
+                                    }).join('')}
+                                </div>
+                            </div>
+                        `;
+                    }).join('')}
+
+                    ${daySeminars.length === 0 ? `
+                        <div class="text-center text-muted py-4">
+                            Нет семинаров
+                        </div>
+                    ` : ''}
+                </div>
+            `;
+        }
+
+        scroll.innerHTML = html;
+    }
+
+    function getDateForDay(dayNumber) {
+        // Получаем дату для конкретного дня текущей недели
+        const date = new Date(currentDate);
+        const currentDay = date.getDay() || 7; // Преобразуем 0 (воскресенье) в 7
+        const diff = dayNumber - currentDay;
+        date.setDate(date.getDate() + diff);
+        return date.toLocaleDateString('ru-RU', { day: '2-digit', month: '2-digit' });
+    }
+
+    // Выбор студента для слота
+    function openStudentSelect(seminarId, slotNumber) {
+        currentSeminarId = seminarId;
+        currentSlotNumber = slotNumber;
+
+        // Получаем ID предмета
+        fetch(`/elders/api/get-subject-id/?seminar_id=${seminarId}`)
+            .then(r => r.json())
+            .then(data => {
+                if (data.subject_id) {
+                    return fetch(`/elders/api/students-with-points/?subject_id=${data.subject_id}`);
+                }
+                return Promise.reject('No subject ID');
+            })
+            .then(r => r.json())
+            .then(data => {
+                const list = document.getElementById('studentList');
+                list.innerHTML = data.students.map(s => `
+                    <div class="student-item" onclick="selectStudent(${s.id})">
+                        <span>${s.name}</span>
+                        <span class="points ${s.total_points >= 21 ? 'success' : s.total_points >= 15 ? 'warning' : 'danger'}">
+                            ${s.total_points}/21
+                        </span>
+                    </div>
+                `).join('');
+
+                new bootstrap.Modal(document.getElementById('selectStudentModal')).show();
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                alert('Ошибка загрузки студентов');
+            });
+    }
+
+    function selectStudent(studentId) {
+        fetch('/elders/api/assign-slot/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': PAGE.csrfToken,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                seminar_id: currentSeminarId,
+                slot_number: currentSlotNumber,
+                student_id: studentId
+            })
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                bootstrap.Modal.getInstance(document.getElementById('selectStudentModal')).hide();
+                loadSeminars();
+                showNotification('✅ Студент назначен');
+            } else {
+                showNotification('❌ Ошибка: ' + data.error, 'danger');
+            }
+        });
+    }
+
+    function removeFromSlot(slotId) {
+        if (confirm('Убрать студента из слота?')) {
+            fetch('/elders/api/remove-slot/', {
+                method: 'POST',
+                headers: {
+                    'X-CSRFToken': PAGE.csrfToken,
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ slot_id: slotId })
+            })
+            .then(r => r.json())
+            .then(data => {
+                if (data.success) {
+                    loadSeminars();
+                    showNotification('✅ Студент убран');
+                } else {
+                    showNotification('❌ Ошибка: ' + data.error, 'danger');
+                }
+            });
+        }
+    }
+    // Добавление оценки
+function gradeStudent(slotId, studentId, studentName, subject, seminarId) {
+    document.getElementById('gradeSlotId').value = slotId;
+    document.getElementById('gradeStudentId').value = studentId;
+    document.getElementById('gradeSeminarId').value = seminarId;
+    document.getElementById('gradeStudentName').value = studentName;
+    document.getElementById('gradeSubject').value = subject;
+
+    // ПОЛУЧАЕМ ID ПРЕДМЕТА ПО НАЗВАНИЮ
+    fetch(`/elders/api/get-subject-id/?seminar_id=${seminarId}`)
+        .then(r => r.json())
+        .then(data => {
+            if (data.subject_id) {
+                // Сохраняем subject_id в скрытое поле
+                const subjectIdInput = document.createElement('input');
+                subjectIdInput.type = 'hidden';
+                subjectIdInput.name = 'subject_id';
+                subjectIdInput.id = 'gradeSubjectId';
+                subjectIdInput.value = data.subject_id;
+
+                // Удаляем старый, если есть
+                const oldInput = document.getElementById('gradeSubjectId');
+                if (oldInput) oldInput.remove();
+
+                document.getElementById('gradeForm').appendChild(subjectIdInput);
+            }
+        });
+
+    const today = new Date();
+    const year = today.getFullYear();
+    const month = String(today.getMonth() + 1).padStart(2, '0');
+    const day = String(today.getDate()).padStart(2, '0');
+    document.getElementById('gradeDate').value = `${year}-${month}-${day}`;
+
+    // Загружаем текущие баллы студента
+    fetch(`/elders/api/student-points/?student_id=${studentId}&subject=${encodeURIComponent(subject)}`)
+        .then(r => r.json())
+        .then(data => {
+            const points = data.total_points || 0;
+            const progress = (points / 21) * 100;
+            document.getElementById('gradeCurrentPoints').textContent = points;
+            document.getElementById('gradeProgress').style.width = progress + '%';
+        });
+
+    new bootstrap.Modal(document.getElementById('gradeModal')).show();
+}
+
+    // Обработчики для кнопок типов оценок
+    document.querySelectorAll('.grade-type-btn').forEach(btn => {
+        btn.addEventListener('click', function() {
+            document.getElementById('gradeType').value = this.dataset.type;
+            document.getElementById('rawValue').value = this.dataset.value;
+
+            document.querySelectorAll('.grade-type-btn').forEach(b => {
+                b.classList.remove('active', 'btn-success');
+                b.classList.add('btn-outline-success');
+            });
+            this.classList.remove('btn-outline-success');
+            this.classList.add('active', 'btn-success');
+        });
+    });
+
+    // Отправка формы оценки
+    // Отправка формы оценки
+document.getElementById('gradeForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const data = {
+        slot_id: formData.get('slot_id'),
+        student_id: formData.get('student_id'),
+        seminar_id: formData.get('seminar_id'),
+        subject_id: formData.get('subject_id'),  // Добавлено!
+        grade_type: formData.get('grade_type'),
+        raw_value: formData.get('raw_value'),
+        date: formData.get('date'),
+        comment: formData.get('comment'),
+        use_today: 'false'
+    };
+
+    // Проверяем, что выбран тип оценки
+    if (!data.grade_type) {
+        showNotification('❌ Выберите тип оценки', 'danger');
+        return;
+    }
+
+    // Проверяем, что есть subject_id
+    if (!data.subject_id) {
+        showNotification('❌ Не удалось определить предмет', 'danger');
+        return;
+    }
+
+    fetch('/elders/api/add-grade/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('gradeModal')).hide();
+            loadSeminars();
+            showNotification('✅ Оценка добавлена');
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    });
+});
+
+    // Поиск студентов
+    document.getElementById('studentSearch')?.addEventListener('input', function() {
+        const search = this.value.toLowerCase();
+        document.querySelectorAll('.student-item').forEach(item => {
+            const name = item.querySelector('span').textContent.toLowerCase();
+            item.style.display = name.includes(search) ? 'flex' : 'none';
+        });
+    });
+
+    // Уведомления
+    function showNotification(message, type = 'success') {
+        const notification = document.createElement('div');
+        notification.className = `alert alert-${type} position-fixed top-0 end-0 m-3`;
+        notification.style.zIndex = '9999';
+        notification.innerHTML = message;
+        document.body.appendChild(notification);
+        setTimeout(() => notification.remove(), 3000);
+    }
+
+    // Инициализация
+    document.addEventListener('DOMContentLoaded', function() {
+        loadSeminars();
+    });
+
+   function quickGrade(studentId, studentName) {
+    window.quickGradeStudent = { id: studentId, name: studentName };
+
+    const modalHtml = `
+        <div class="modal fade" id="quickGradeModal" tabindex="-1">
+            <div class="modal-dialog">
+                <div class="modal-content">
+                    <div class="modal-header bg-success text-white">
+                        <h5 class="modal-title">Быстрая оценка: ${studentName}</h5>
+                        <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+                        <div class="mb-3">
+                            <label class="form-label fw-semibold">Предмет</label>
+                            <select class="form-select" id="quickSubjectSelect">
+                                <option value="">Выберите предмет</option>
+                                ${document.getElementById('subjectOptions').innerHTML}
+                            </select>
+                        </div>
+                        <div class="mb-3">
+                            <label class="form-label fw-semibold">Тип оценки</label>
+                            <div class="d-flex flex-wrap gap-2">
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="performance" data-value="выступление">🎤 выступление</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="supplement" data-value="дополнение">📝 дополнение</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="question" data-value="вопрос">❓ вопрос</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="plus" data-value="+">➕</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="minus" data-value="-">➖</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="numeric_2" data-value="2">2</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="numeric_3" data-value="3">3</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="numeric_4" data-value="4">4</button>
+                                <button type="button" class="btn btn-sm btn-outline-success quick-type-btn" data-type="numeric_5" data-value="5">5</button>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Отмена</button>
+                        <button type="button" class="btn btn-success" onclick="submitQuickGrade()">Добавить</button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    if (!document.getElementById('quickGradeModal')) {
+        document.body.insertAdjacentHTML('beforeend', modalHtml);
+    }
+
+    new bootstrap.Modal(document.getElementById('quickGradeModal')).show();
+
+    document.querySelectorAll('.quick-type-btn').forEach(btn => {
+        btn.addEventListener('click', function() {
+            document.querySelectorAll('.quick-type-btn').forEach(b => {
+                b.classList.remove('active', 'btn-success');
+                b.classList.add('btn-outline-success');
+            });
+            this.classList.remove('btn-outline-success');
+            this.classList.add('active', 'btn-success');
+            window.selectedQuickGrade = {
+                type: this.dataset.type,
+                value: this.dataset.value
+            };
+        });
+    });
+}
+
+function submitQuickGrade() {
+    const subjectId = document.getElementById('quickSubjectSelect').value;
+    if (!subjectId) {
+        showNotification('❌ Выберите предмет', 'danger');
+        return;
+    }
+    if (!window.selectedQuickGrade) {
+        showNotification('❌ Выберите тип оценки', 'danger');
+        return;
+    }
+
+    const csrfToken = PAGE.csrfToken;
+
+    const data = {
+        student_id: window.quickGradeStudent.id,
+        subject_id: subjectId,
+        grade_type: window.selectedQuickGrade.type,
+        raw_value: window.selectedQuickGrade.value,
+        use_today: 'true',
+        comment: ''
+    };
+
+    fetch('/elders/api/add-grade/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('quickGradeModal')).hide();
+            showNotification(`✅ Оценка добавлена для ${window.quickGradeStudent.name}`);
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    });
+}
+
+function submitQuickGrade() {
+    const subjectId = document.getElementById('quickSubjectSelect').value;
+    if (!subjectId) {
+        showNotification('❌ Выберите предмет', 'danger');
+        return;
+    }
+    if (!window.selectedQuickGrade) {
+        showNotification('❌ Выберите тип оценки', 'danger');
+        return;
+    }
+
+    const data = {
+        student_id: window.quickGradeStudent.id,
+        subject_id: subjectId,
+        grade_type: window.selectedQuickGrade.type,
+        raw_value: window.selectedQuickGrade.value,
+        use_today: 'true',
+        comment: ''
+    };
+
+    fetch('/elders/api/add-grade/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('quickGradeModal')).hide();
+            showNotification(`✅ Оценка добавлена для ${window.quickGradeStudent.name}`);
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    });
+}
@@ -0,0 +1,358 @@
+// static/elders/js/schedule.js
+
+let currentWeekType = PAGE.weekType;
+let currentGroupId = PAGE.groupId;
+let currentDate = PAGE.currentDate;
+
+// Соответствие номера пары и времени
+const pairTimes = {
+    1: { start: '8:00', end: '9:30' },
+    2: { start: '9:40', end: '11:10' },
+    3: { start: '11:20', end: '12:50' },
+    4: { start: '13:30', end: '15:00' },
+    5: { start: '15:10', end: '16:40' },
+    6: { start: '16:50', end: '18:20' }
+};
+
+// Навигация
+function changeWeekOffset(offset) {
+    let date = new Date(currentDate);
+    date.setDate(date.getDate() + (offset * 7));
+    window.location.href = `?date=${date.toISOString().split('T')[0]}`;
+}
+
+function goToToday() {
+    window.location.href = `?date=${new Date().toISOString().split('T')[0]}`;
+}
+
+function selectDate(date) {
+    window.location.href = `?date=${date}`;
+}
+
+function changeMonth(offset) {
+    let date = new Date(currentDate);
+    date.setMonth(date.getMonth() + offset);
+    window.location.href = `?date=${date.toISOString().split('T')[0]}`;
+}
+
+// Календарь
+function toggleCalendar() {
+    const cal = document.getElementById('calendarSection');
+    const btn = document.getElementById('toggleCalendarBtn');
+    const icon = btn.querySelector('i');
+
+    if (cal.style.display === 'none') {
+        cal.style.display = 'block';
+        btn.innerHTML = '<i class="bi bi-chevron-up"></i> Скрыть календарь';
+    } else {
+        cal.style.display = 'none';
+        btn.innerHTML = '<i class="bi bi-chevron-down"></i> Показать календарь';
+    }
+}
+
+// Загрузка расписания
+function loadSchedule() {
+    fetch(`/elders/api/get-schedule/?week_type=${currentWeekType}&group_id=${currentGroupId}`)
+        .then(response => response.json())
+        .then(data => {
+            renderSchedule(data.schedule || []);
+        });
+}
+
+function renderSchedule(schedule) {
+    const days = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье'];
+    const scroll = document.getElementById('scheduleScroll');
+
+    let html = '';
+    for (let i = 1; i <= 7; i++) {
+        const lessons = schedule.filter(l => l.day === i).sort((a, b) => a.pair_number - b.pair_number);
+
+        html += `
+            <div class="day-column">
+                <div class="day-header">
+                    <h3>${days[i-1]}</h3>
+                    <div class="day-actions">
+                        <button onclick="openAddCommentModal('day', ${i})" title="Комментарий">
+                            <i class="bi bi-chat"></i>
+                        </button>
+                    </div>
+                </div>
+
+                ${lessons.map(lesson => `
+                    <div class="lesson-card" onclick="editLesson(${lesson.id})">
+                        <div class="lesson-time">
+                            ${lesson.start_time} - ${lesson.end_time}
+                            <div class="lesson-actions">
+                                <button class="lesson-action-btn" onclick="event.stopPropagation(); deleteLesson(${lesson.id})">
+                                    <i class="bi bi-trash"></i>
+                                </button>
+                            </div>
+                        </div>
+                        <div class="lesson-subject">${lesson.subject}</div>
+                        <div class="lesson-teacher"><i class="bi bi-person"></i> ${lesson.teacher || 'Не указан'}</div>
+                        <div class="lesson-room"><i class="bi bi-door-open"></i> ${lesson.room || '—'}</div>
+                    </div>
+                `).join('')}
+
+                <button class="add-lesson-btn" onclick="addLesson(${i})">
+                    <i class="bi bi-plus-circle"></i> Добавить пару
+                </button>
+            </div>
+        `;
+    }
+
+    scroll.innerHTML = html;
+}
+
+// Обновить время при выборе номера пары
+function updateTimeByPair() {
+    const pair = document.getElementById('lessonPair').value;
+    const time = pairTimes[pair];
+    if (time) {
+        document.getElementById('lessonStart').value = time.start;
+        document.getElementById('lessonEnd').value = time.end;
+    }
+}
+
+// Редактирование пары
+function editLesson(id) {
+    document.getElementById('lessonModalTitle').textContent = 'Редактировать пару';
+    document.getElementById('deleteLessonBtn').style.display = 'block';
+
+    fetch(`/elders/api/get-lesson/${id}/`)
+        .then(r => r.json())
+        .then(data => {
+            document.getElementById('lessonId').value = data.id;
+            document.getElementById('lessonDay').value = data.day;
+            document.getElementById('lessonPair').value = data.pair_number;
+            document.getElementById('lessonStart').value = data.start_time;
+            document.getElementById('lessonEnd').value = data.end_time;
+            document.getElementById('lessonSubject').value = data.subject;
+            document.getElementById('lessonType').value = data.lesson_type;
+            document.getElementById('lessonTeacher').value = data.teacher || '';
+            document.getElementById('lessonRoom').value = data.room || '';
+
+            new bootstrap.Modal(document.getElementById('lessonModal')).show();
+        });
+}
+
+// Добавление новой пары
+function addLesson(day) {
+    document.getElementById('lessonModalTitle').textContent = 'Добавить пару';
+    document.getElementById('deleteLessonBtn').style.display = 'none';
+    document.getElementById('lessonId').value = '';
+    document.getElementById('lessonDay').value = day;
+    document.getElementById('lessonPair').value = '2';
+    document.getElementById('lessonStart').value = '9:40';
+    document.getElementById('lessonEnd').value = '11:10';
+    document.getElementById('lessonSubject').value = '';
+    document.getElementById('lessonType').value = 'lecture';
+    document.getElementById('lessonTeacher').value = '';
+    document.getElementById('lessonRoom').value = '';
+
+    new bootstrap.Modal(document.getElementById('lessonModal')).show();
+}
+
+// Сохранение пары
+document.getElementById('lessonForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const lessonId = formData.get('lesson_id');
+
+    const data = {
+        group_id: currentGroupId,
+        day: formData.get('day'),
+        week_type: formData.get('week_type'),
+        pair_number: formData.get('pair_number'),
+        start_time: formData.get('start_time'),
+        end_time: formData.get('end_time'),
+        subject: formData.get('subject'),
+        lesson_type: formData.get('lesson_type'),
+        teacher: formData.get('teacher'),
+        room: formData.get('room')
+    };
+
+    if (lessonId) {
+        data.id = lessonId;
+    }
+
+    const url = lessonId ? '/elders/api/update-lesson/' : '/elders/api/add-lesson/';
+
+    fetch(url, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('lessonModal')).hide();
+            loadSchedule();
+            showNotification(lessonId ? '✅ Пара обновлена' : '✅ Пара добавлена');
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    });
+});
+
+// Удаление пары
+function deleteLesson(id) {
+    if (!id) {
+        id = document.getElementById('lessonId').value;
+    }
+
+    if (!id || id === '') return;
+
+    if (confirm('Удалить эту пару?')) {
+        fetch('/elders/api/delete-lesson/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': PAGE.csrfToken,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ id: id })
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                bootstrap.Modal.getInstance(document.getElementById('lessonModal')).hide();
+                loadSchedule();
+                showNotification('✅ Пара удалена');
+            }
+        });
+    }
+}
+
+// Комментарии
+function toggleComments() {
+    document.getElementById('commentsPanel').classList.toggle('show');
+}
+
+function openAddCommentModal(type, target) {
+    const modal = new bootstrap.Modal(document.getElementById('commentModal'));
+    const scope = document.getElementById('commentScope');
+    const daySelector = document.getElementById('daySelector');
+    const dateSelector = document.getElementById('dateSelector');
+
+    daySelector.style.display = 'none';
+    dateSelector.style.display = 'none';
+
+    if (type === 'day') {
+        scope.value = 'day';
+        daySelector.style.display = 'block';
+    } else if (type === 'date') {
+        scope.value = 'date';
+        dateSelector.style.display = 'block';
+    } else {
+        scope.value = 'week';
+    }
+
+    modal.show();
+}
+
+document.getElementById('commentScope')?.addEventListener('change', function() {
+    document.getElementById('daySelector').style.display = this.value === 'day' ? 'block' : 'none';
+    document.getElementById('dateSelector').style.display = this.value === 'date' ? 'block' : 'none';
+});
+
+document.getElementById('commentForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const data = {
+        week_type: formData.get('week_type'),
+        comment: formData.get('comment'),
+        is_urgent: formData.get('is_urgent') === 'on',
+        scope: formData.get('scope')
+    };
+
+    if (data.scope === 'day') {
+        data.day = formData.get('day');
+    } else if (data.scope === 'date') {
+        data.date = formData.get('date');
+    }
+
+    fetch('/elders/api/add-comment/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('commentModal')).hide();
+            loadComments();
+            showNotification('✅ Комментарий добавлен');
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    });
+});
+
+function loadComments() {
+    fetch(`/elders/api/get-comments/?week_type=${currentWeekType}&group_id=${currentGroupId}`)
+        .then(r => r.json())
+        .then(data => {
+            const list = document.getElementById('commentsList');
+            const count = document.getElementById('commentCount');
+
+            if (data.comments?.length) {
+                if (count) count.textContent = data.comments.length;
+                list.innerHTML = data.comments.map(c => `
+                    <div class="comment-item ${c.is_urgent ? 'urgent' : ''}">
+                        <div class="comment-meta">
+                            <span><i class="bi bi-person"></i> ${c.author || 'Система'}</span>
+                            <button class="delete-comment" onclick="deleteComment(${c.id})">✕</button>
+                        </div>
+                        <div>${c.text}</div>
+                        <div class="text-muted mt-1 small"><i class="bi bi-clock"></i> ${c.created_time || ''}</div>
+                    </div>
+                `).join('');
+            } else {
+                list.innerHTML = '<div class="text-center text-muted py-4">Нет комментариев</div>';
+            }
+        });
+}
+
+function deleteComment(id) {
+    if (confirm('Удалить комментарий?')) {
+        fetch('/elders/api/delete-comment/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': PAGE.csrfToken,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({id: id})
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                loadComments();
+                showNotification('✅ Комментарий удален');
+            }
+        });
+    }
+}
+
+// Уведомления
+function showNotification(message, type = 'success') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} position-fixed top-0 end-0 m-3`;
+    notification.style.zIndex = '9999';
+    notification.innerHTML = message;
+    document.body.appendChild(notification);
+    setTimeout(() => notification.remove(), 3000);
+}
+
+// Инициализация
+document.addEventListener('DOMContentLoaded', function() {
+    loadSchedule();
+    loadComments();
+});
@@ -0,0 +1,142 @@
+// static/elders/js/student_detail.js
+
+// Функции для работы с оценками
+function updateSubjectId(select) {
+    document.getElementById('gradeSubjectId').value = select.value;
+}
+
+function toggleDateField() {
+    const isToday = document.getElementById('isToday').checked;
+    const dateField = document.getElementById('gradeDate');
+    const useToday = document.getElementById('useToday');
+
+    if (isToday) {
+        dateField.disabled = true;
+        useToday.value = 'true';
+        // Устанавливаем сегодняшнюю дату
+        const today = new Date();
+        const year = today.getFullYear();
+        const month = String(today.getMonth() + 1).padStart(2, '0');
+        const day = String(today.getDate()).padStart(2, '0');
+        dateField.value = `${year}-${month}-${day}`;
+    } else {
+        dateField.disabled = false;
+        useToday.value = 'false';
+    }
+}
+
+// Обработчики для кнопок типов оценок
+document.querySelectorAll('.grade-type-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.getElementById('gradeType').value = this.dataset.type;
+        document.getElementById('rawValue').value = this.dataset.value;
+
+        document.querySelectorAll('.grade-type-btn').forEach(b => {
+            b.classList.remove('active', 'btn-success');
+            b.classList.add('btn-outline-success');
+        });
+        this.classList.remove('btn-outline-success');
+        this.classList.add('active', 'btn-success');
+    });
+});
+
+// Отправка формы
+document.getElementById('gradeForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    // Проверяем, выбран ли предмет
+    if (!document.getElementById('gradeSubjectId').value) {
+        showNotification('❌ Выберите предмет', 'danger');
+        return;
+    }
+
+    // Проверяем, выбран ли тип оценки
+    if (!document.getElementById('gradeType').value) {
+        showNotification('❌ Выберите тип оценки', 'danger');
+        return;
+    }
+
+    const formData = new FormData(this);
+    const data = Object.fromEntries(formData.entries());
+
+    fetch('/elders/api/add-grade/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken,
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            bootstrap.Modal.getInstance(document.getElementById('gradeModal')).hide();
+            showNotification('✅ Оценка добавлена');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showNotification('❌ Ошибка: ' + data.error, 'danger');
+        }
+    })
+    .catch(error => {
+        showNotification('❌ Ошибка при сохранении', 'danger');
+    });
+});
+
+function showNotification(message, type = 'success') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} position-fixed top-0 end-0 m-3`;
+    notification.style.zIndex = '9999';
+    notification.innerHTML = message;
+    document.body.appendChild(notification);
+    setTimeout(() => notification.remove(), 3000);
+}
+
+function openGradeModal(subjectId, subjectName) {
+    document.getElementById('gradeSubjectId').value = subjectId;
+
+    // Выбираем нужный предмет в селекте
+    const select = document.getElementById('subjectSelect');
+    for (let option of select.options) {
+        if (option.value == subjectId) {
+            option.selected = true;
+            break;
+        }
+    }
+
+    // Сбрасываем тип оценки
+    document.getElementById('gradeType').value = '';
+    document.getElementById('rawValue').value = '';
+    document.querySelectorAll('.grade-type-btn').forEach(b => {
+        b.classList.remove('active', 'btn-success');
+        b.classList.add('btn-outline-success');
+    });
+
+    // Устанавливаем сегодняшнюю дату
+    document.getElementById('isToday').checked = true;
+    toggleDateField();
+
+    new bootstrap.Modal(document.getElementById('gradeModal')).show();
+}
+
+
+function deleteGrade(gradeId) {
+    if (confirm('Удалить оценку?')) {
+        fetch('/elders/api/delete-grade/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': PAGE.csrfToken,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ id: gradeId })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showNotification('✅ Оценка удалена');
+                setTimeout(() => location.reload(), 1000);
+            } else {
+                showNotification('❌ Ошибка при удалении', 'danger');
+            }
+        });
+    }
+}
@@ -0,0 +1,301 @@
+// static/elders/js/students.js
+
+    // Открыть модальное окно добавления
+    function openAddStudentModal() {
+        document.getElementById('addStudentForm').reset();
+        new bootstrap.Modal(document.getElementById('addStudentModal')).show();
+    }
+
+    // Генерация пароля
+    function generateRandomPassword(prefix) {
+        const chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789';
+        let password = '';
+        for (let i = 0; i < 8; i++) {
+            password += chars.charAt(Math.floor(Math.random() * chars.length));
+        }
+        document.getElementById(prefix + 'Password').value = password;
+    }
+
+    // Показать/скрыть пароль
+    function togglePasswordField(prefix) {
+        const field = document.getElementById(prefix + 'Password');
+        field.type = field.type === 'password' ? 'text' : 'password';
+    }
+
+    // Показать/скрыть пароль в карточке
+    function togglePassword(studentId, password) {
+        const span = document.getElementById(`pass-${studentId}`);
+        span.textContent = span.textContent === '••••••••' ? password : '••••••••';
+    }
+
+    // Редактирование студента
+    function editStudent(studentId) {
+        // Загружаем данные студента
+        fetch(`/elders/api/get-student/${studentId}/`)
+            .then(r => r.json())
+            .then(data => {
+                document.getElementById('editStudentId').value = data.id;
+                document.getElementById('editFullName').value = data.full_name;
+                document.getElementById('editLogin').value = data.login;
+                document.getElementById('editPassword').value = data.password;
+                document.getElementById('editEmail').value = data.email || '';
+                document.getElementById('editPhone').value = data.phone || '';
+                document.getElementById('editUserType').value = data.user_type;
+                document.getElementById('editIsActive').checked = data.is_active;
+
+                new bootstrap.Modal(document.getElementById('editStudentModal')).show();
+            });
+    }
+
+    // Отправка формы добавления
+document.getElementById('addStudentForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const submitBtn = this.querySelector('button[type="submit"]');
+    const originalText = submitBtn.innerHTML;
+    submitBtn.innerHTML = '<i class="bi bi-arrow-repeat"></i> Добавление...';
+    submitBtn.disabled = true;
+
+    fetch('/elders/api/add-student/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken
+        },
+        body: formData
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            // Закрываем модальное окно
+            const modal = bootstrap.Modal.getInstance(document.getElementById('addStudentModal'));
+            modal.hide();
+
+            // Показываем уведомление
+            showNotification('✅ Студент добавлен');
+
+            // ОБНОВЛЯЕМ СПИСОК СТУДЕНТОВ БЕЗ ПЕРЕЗАГРУЗКИ СТРАНИЦЫ
+            addStudentToGrid(data.student);
+
+            // Сбрасываем форму
+            document.getElementById('addStudentForm').reset();
+        } else {
+            showNotification('❌ ' + data.error, 'danger');
+        }
+    })
+    .catch(error => {
+        showNotification('❌ Ошибка при добавлении', 'danger');
+    })
+    .finally(() => {
+        submitBtn.innerHTML = originalText;
+        submitBtn.disabled = false;
+    });
+});
+
+// Функция для добавления студента в сетку без перезагрузки
+function addStudentToGrid(student) {
+    const studentsGrid = document.querySelector('.students-grid');
+    const emptyMessage = document.querySelector('.text-center.py-5');
+
+    // Если была заглушка "нет студентов", удаляем её
+    if (emptyMessage && emptyMessage.classList.contains('text-center')) {
+        emptyMessage.remove();
+    }
+
+    // Определяем следующий номер
+    const existingCards = document.querySelectorAll('.student-card');
+    const nextNumber = existingCards.length + 1;
+
+    // Создаём карточку нового студента
+    const newCard = document.createElement('div');
+    newCard.className = 'student-card';
+    newCard.id = `student-${student.id}`;
+    newCard.innerHTML = `
+        <div class="student-number">${nextNumber}</div>
+        <div class="student-avatar">
+            <i class="bi bi-person-circle" style="color: #28a745;"></i>
+        </div>
+        <div class="student-name">
+            ${student.full_name}
+        </div>
+        <div class="student-info">
+            <div class="info-row">
+                <span class="info-label">Логин</span>
+                <span><code>${student.login}</code></span>
+            </div>
+            <div class="info-row">
+                <span class="info-label">Пароль</span>
+                <span>
+                    <span class="password-field" id="pass-${student.id}">••••••••</span>
+                    <button class="btn btn-sm btn-link p-0 ms-2" onclick="togglePassword(${student.id}, '${student.password}')">
+                        <i class="bi bi-eye"></i>
+                    </button>
+                </span>
+            </div>
+            <div class="info-row">
+                <span class="info-label">Пропуски</span>
+                <span>
+                    <span class="badge-custom badge-success">0 ч.</span>
+                </span>
+            </div>
+            <div class="info-row">
+                <span class="info-label">Статус</span>
+                <span>
+                    <span class="badge-custom badge-success">Активен</span>
+                </span>
+            </div>
+        </div>
+        <div class="student-actions">
+            <button class="btn-icon" onclick="editStudent(${student.id})" title="Редактировать">
+                <i class="bi bi-pencil"></i>
+            </button>
+            <button class="btn-icon" onclick="generatePassword(${student.id})" title="Сгенерировать пароль">
+                <i class="bi bi-arrow-repeat"></i>
+            </button>
+            <button class="btn-icon delete" onclick="deleteStudent(${student.id}, '${student.full_name}')" title="Удалить">
+                <i class="bi bi-trash"></i>
+            </button>
+        </div>
+    `;
+
+    studentsGrid.appendChild(newCard);
+
+    // Обновляем нумерацию всех карточек
+    updateStudentNumbers();
+}
+
+// Функция для обновления нумерации студентов
+function updateStudentNumbers() {
+    const cards = document.querySelectorAll('.student-card');
+    cards.forEach((card, index) => {
+        const numberDiv = card.querySelector('.student-number');
+        if (numberDiv) {
+            numberDiv.textContent = index + 1;
+        }
+    });
+}
+
+    // Отправка формы редактирования
+    document.getElementById('editStudentForm')?.addEventListener('submit', function(e) {
+        e.preventDefault();
+
+        const formData = new FormData(this);
+        const data = Object.fromEntries(formData.entries());
+        data.is_active = document.getElementById('editIsActive').checked;
+
+        fetch('/elders/api/update-student/', {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': PAGE.csrfToken,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(data)
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                bootstrap.Modal.getInstance(document.getElementById('editStudentModal')).hide();
+                showNotification('✅ Данные обновлены');
+                setTimeout(() => location.reload(), 1000);
+            } else {
+                showNotification('❌ ' + data.error, 'danger');
+            }
+        });
+    });
+
+    // Генерация пароля для существующего студента
+    function generatePassword(studentId) {
+        if (!confirm('Сгенерировать новый пароль?')) return;
+
+        fetch('/elders/api/generate-password/')
+            .then(r => r.json())
+            .then(data => {
+                const newPassword = data.password;
+
+                fetch('/elders/api/update-student-password/', {
+                    method: 'POST',
+                    headers: {
+                        'X-CSRFToken': PAGE.csrfToken,
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        student_id: studentId,
+                        password: newPassword
+                    })
+                })
+                .then(r => r.json())
+                .then(data => {
+                    if (data.success) {
+                        showNotification(`✅ Новый пароль: ${newPassword}`);
+                        setTimeout(() => location.reload(), 1000);
+                    }
+                });
+            });
+    }
+
+    // Удаление студента
+    function deleteStudent(studentId, studentName) {
+        if (confirm(`Удалить студента ${studentName}?`)) {
+            fetch('/elders/api/delete-student/', {
+                method: 'POST',
+                headers: {
+                    'X-CSRFToken': PAGE.csrfToken,
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ student_id: studentId })
+            })
+            .then(r => r.json())
+            .then(data => {
+                if (data.success) {
+                    showNotification(`✅ Студент удален`);
+                    setTimeout(() => location.reload(), 1000);
+                } else {
+                    showNotification('❌ Ошибка при удалении', 'danger');
+                }
+            });
+        }
+    }
+
+    // Уведомления
+    function showNotification(message, type = 'success') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} position-fixed top-0 end-0 m-3`;
+    notification.style.zIndex = '9999';
+    notification.style.minWidth = '200px';
+    notification.style.boxShadow = '0 4px 12px rgba(0,0,0,0.15)';
+    notification.innerHTML = message;
+    document.body.appendChild(notification);
+
+    setTimeout(() => {
+        notification.style.opacity = '0';
+        notification.style.transition = 'opacity 0.3s';
+        setTimeout(() => notification.remove(), 300);
+    }, 3000);
+}
+
+function addAnotherStudent() {
+    const form = document.getElementById('addStudentForm');
+    const formData = new FormData(form);
+
+    fetch('/elders/api/add-student/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': PAGE.csrfToken
+        },
+        body: formData
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            // Добавляем в сетку
+            addStudentToGrid(data.student);
+            // Очищаем форму, но оставляем открытой
+            form.reset();
+            // Генерируем новый пароль
+            generateRandomPassword('add');
+            showNotification('✅ Студент добавлен');
+        } else {
+            showNotification('❌ ' + data.error, 'danger');
+        }
+    });
+}
@@ -0,0 +1,71 @@
+// static/students/js/schedule.js
+
+let activeSection = 'today';
+
+function showSection(sectionId) {
+    document.querySelectorAll('.schedule-section').forEach(section => {
+        section.style.display = 'none';
+    });
+
+    document.getElementById(`section-${sectionId}`).style.display = 'block';
+
+    document.querySelectorAll('.action-card').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    document.getElementById(`btn-${sectionId}`).classList.add('active');
+
+    activeSection = sectionId;
+}
+
+function toggleSection(sectionId) {
+    const content = document.getElementById(`content-${sectionId}`);
+    const icon = document.getElementById(`icon-${sectionId}`);
+
+    if (content.style.display === 'none') {
+        content.style.display = 'block';
+        icon.className = 'bi bi-chevron-up';
+    } else {
+        content.style.display = 'none';
+        icon.className = 'bi bi-chevron-down';
+    }
+}
+
+function toggleCommentsSection() {
+    const section = document.getElementById('comments-section');
+    const icon = document.getElementById('comments-icon');
+
+    if (section.style.display === 'none') {
+        section.style.display = 'block';
+        icon.className = 'bi bi-chevron-up';
+    } else {
+        section.style.display = 'none';
+        icon.className = 'bi bi-chevron-down';
+    }
+}
+
+function toggleCalendar() {
+    const cal = document.getElementById('calendarSection');
+    const btn = document.getElementById('toggleCalendarBtn');
+
+    if (cal.style.display === 'none') {
+        cal.style.display = 'block';
+        btn.innerHTML = '<i class="bi bi-chevron-up"></i> Скрыть календарь';
+    } else {
+        cal.style.display = 'none';
+        btn.innerHTML = '<i class="bi bi-chevron-down"></i> Показать календарь';
+    }
+}
+
+function selectDate(date) {
+    window.location.href = `?date=${date}`;
+}
+
+function changeMonth(offset) {
+    let date = new Date(PAGE.today);
+    date.setMonth(date.getMonth() + offset);
+    window.location.href = `?date=${date.toISOString().split('T')[0]}`;
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    showSection('today');
+});
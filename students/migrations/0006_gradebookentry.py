@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_gradebook(apps, schema_editor):
+    """Заполняет журнал по уже существующим оценкам и успеваемости"""
+    StudentGrade = apps.get_model('students', 'StudentGrade')
+    StudentPerformance = apps.get_model('students', 'StudentPerformance')
+    Subject = apps.get_model('students', 'Subject')
+    GradebookEntry = apps.get_model('students', 'GradebookEntry')
+
+    cells = {}
+    counts = StudentGrade.objects.values('student_id', 'subject_id').annotate(n=models.Count('id'))
+    for row in counts:
+        cells[(row['student_id'], row['subject_id'])] = {'grades_count': row['n']}
+
+    for perf in StudentPerformance.objects.values('student_id', 'subject_id', 'total_points', 'target_points'):
+        cell = cells.setdefault((perf['student_id'], perf['subject_id']), {'grades_count': 0})
+        cell['total_points'] = perf['total_points']
+        cell['target_points'] = perf['target_points']
+        if perf['target_points']:
+            cell['progress'] = min(100, (perf['total_points'] / perf['target_points']) * 100)
+        else:
+            cell['progress'] = 0
+
+    subject_groups = dict(Subject.objects.values_list('id', 'group_id'))
+    GradebookEntry.objects.bulk_create([
+        GradebookEntry(
+            student_id=student_id,
+            subject_id=subject_id,
+            group_id=subject_groups.get(subject_id),
+            **cell
+        )
+        for (student_id, subject_id), cell in cells.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0004_actionhistory_alter_elderpermission_id'),
+        ('students', '0005_remove_studentgrade_custom_type_studentgrade_group_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradebookEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grades_count', models.IntegerField(default=0, verbose_name='Количество оценок')),
+                ('total_points', models.FloatField(blank=True, null=True, verbose_name='Всего баллов')),
+                ('target_points', models.IntegerField(blank=True, null=True, verbose_name='Цель')),
+                ('progress', models.FloatField(blank=True, null=True, verbose_name='Прогресс, %')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_entries', to='admin_panel.group', verbose_name='Группа')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_entries', to='admin_panel.student', verbose_name='Студент')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_entries', to='students.subject', verbose_name='Предмет')),
+            ],
+            options={
+                'verbose_name': 'Ячейка журнала',
+                'verbose_name_plural': 'Журнал группы',
+                'unique_together': {('student', 'subject')},
+            },
+        ),
+        migrations.RunPython(fill_gradebook, migrations.RunPython.noop),
+    ]
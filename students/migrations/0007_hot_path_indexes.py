@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0011_student_search_index'),
+        ('students', '0006_gradebookentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', '-date'], name='attendance_student_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['group', 'date'], name='attendance_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulecomment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['group', '-created_at'], name='comment_group_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulecomment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['group', '-is_urgent', '-created_at'], name='comment_group_urgent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentgrade',
+            index=models.Index(fields=['student', 'subject', '-date'], name='grade_student_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentgrade',
+            index=models.Index(fields=['student', '-date', '-created_at'], name='grade_student_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentgrade',
+            index=models.Index(fields=['group', 'date'], name='grade_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['group', 'name'], name='subject_group_name_idx'),
+        ),
+    ]
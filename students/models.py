@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
 from admin_panel.models import Student, Group
+from journal_project.schedule_utils import invalidate_week_types
 
 class StudentProfile(models.Model):
     """Профиль студента"""
@@ -18,6 +21,36 @@ class StudentProfile(models.Model):
     
     def __str__(self):
         return f"Профиль: {self.user.full_name}"
+    
+    @classmethod
+    def recalculate(cls, student_ids):
+        """
+        Пересчитывает total_hours/remaining_hours для набора студентов:
+        один сгруппированный Sum('hours') и один bulk_update
+        """
+        student_ids = list(set(student_ids))
+        if not student_ids:
+            return
+        
+        totals = dict(
+            Attendance.objects.filter(student_id__in=student_ids)
+            .values('student_id')
+            .annotate(total=models.Sum('hours'))
+            .values_list('student_id', 'total')
+        )
+        
+        with transaction.atomic():
+            # Заводим недостающие профили (существующие пропускаются)
+            cls.objects.bulk_create(
+                [cls(user_id=student_id) for student_id in student_ids],
+                ignore_conflicts=True
+            )
+            profiles = list(cls.objects.filter(user_id__in=student_ids))
+            for profile in profiles:
+                total = totals.get(profile.user_id) or 0
+                profile.total_hours = total
+                profile.remaining_hours = max(0, 20 - total)
+            cls.objects.bulk_update(profiles, ['total_hours', 'remaining_hours'])
 
 class Subject(models.Model):
     """Предметы (для автоматического заполнения в оценках)"""
@@ -33,6 +66,10 @@ class Subject(models.Model):
         verbose_name_plural = "Предметы"
         ordering = ['name']
         unique_together = ['name', 'group']  # Предмет уникален в рамках группы
+        # Предметы группы по алфавиту - без сортировки
+        indexes = [
+            models.Index(fields=['group', 'name'], name='subject_group_name_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.group.name})"
@@ -76,6 +113,7 @@ class Schedule(models.Model):
         verbose_name = "Занятие"
         verbose_name_plural = "Расписание"
         ordering = ['day', 'pair_number']
+        # Индекс unique_together начинается с group - запросы недели группы идут по нему
         unique_together = ['group', 'day', 'week_type', 'pair_number']
     
     def __str__(self):
@@ -84,6 +122,7 @@ class Schedule(models.Model):
         return f"{day_name} ({week_name}) - {self.pair_number} пара: {self.subject}"
     
     def save(self, *args, **kwargs):
+        from students.schedule_cache import invalidate_group_schedule
         # При сохранении предмета, добавляем его в список предметов группы
         super().save(*args, **kwargs)
         Subject.objects.get_or_create(
@@ -91,6 +130,14 @@ class Schedule(models.Model):
             group=self.group,
             defaults={'teacher': self.teacher}
         )
+        invalidate_group_schedule(self.group_id)
+    
+    def delete(self, *args, **kwargs):
+        from students.schedule_cache import invalidate_group_schedule
+        group_id = self.group_id
+        result = super().delete(*args, **kwargs)
+        invalidate_group_schedule(group_id)
+        return result
 
 class ScheduleComment(models.Model):
     """Комментарии к расписанию"""
@@ -109,6 +156,15 @@ class ScheduleComment(models.Model):
         verbose_name = "Комментарий к расписанию"
         verbose_name_plural = "Комментарии к расписанию"
         ordering = ['-created_at']
+        # Активные комментарии группы (для страницы расписания срочные первыми).
+        # Индексы частичные: Django пишет is_active=True как WHERE "is_active",
+        # обычный индекс по этому столбцу SQLite не использует
+        indexes = [
+            models.Index(fields=['group', '-created_at'], condition=models.Q(is_active=True),
+                         name='comment_group_active_idx'),
+            models.Index(fields=['group', '-is_urgent', '-created_at'], condition=models.Q(is_active=True),
+                         name='comment_group_urgent_idx'),
+        ]
     
     def __str__(self):
         return f"Комментарий: {self.comment[:50]}"
@@ -152,6 +208,54 @@ class StudentPerformance(models.Model):
             return 'warning'
         else:
             return 'danger'
+    
+    def save(self, *args, **kwargs):
+        old = None
+        if not self._state.adding:
+            old = StudentPerformance.objects.filter(pk=self.pk).values_list('total_points', 'target_points').first()
+        super().save(*args, **kwargs)
+        if old is None or isinstance(self.total_points, models.expressions.Combinable):
+            # Новая запись - ячейка журнала считается один раз вместе с оценками
+            GradebookEntry.refresh(self.student_id, self.subject_id)
+            return
+        # Правка баллов или цели - ячейка сдвигается на разницу со старой записью
+        update_fields = kwargs.get('update_fields')
+        total_points, target_points = old
+        if update_fields is None or 'total_points' in update_fields:
+            total_points = self.total_points
+        if update_fields is None or 'target_points' in update_fields:
+            target_points = self.target_points
+        GradebookEntry.apply(self.student_id, self.subject_id, 0, total_points - old[0], target_points)
+    
+    def delete(self, *args, **kwargs):
+        student_id, subject_id = self.student_id, self.subject_id
+        result = super().delete(*args, **kwargs)
+        # Баллы и цель ячейки становятся NULL (или ячейка удаляется) - это не дельта, пересчёт
+        GradebookEntry.refresh(student_id, subject_id)
+        return result
+    
+    @classmethod
+    def apply_points(cls, student_id, subject_id, delta, grades=0):
+        """
+        Инкрементально применяет ±delta к total_points (grades - изменение
+        числа оценок для журнала группы).
+        Сложение выполняется в БД через F(), поэтому параллельные оценки
+        от нескольких старост не затирают друг друга.
+        """
+        with transaction.atomic():
+            performance, created = cls.objects.get_or_create(
+                student_id=student_id,
+                subject_id=subject_id,
+                defaults={'total_points': 0}
+            )
+            if delta:
+                cls.objects.filter(student_id=student_id, subject_id=subject_id).update(
+                    total_points=models.F('total_points') + delta,
+                    last_updated=timezone.now()
+                )
+            # save() новой записи уже пересчитал ячейку вместе с оценками - остаются только баллы
+            GradebookEntry.apply(student_id, subject_id, 0 if created else grades, delta,
+                                 performance.target_points)
 
 
 class GradeType(models.Model):
@@ -217,6 +321,12 @@ class StudentGrade(models.Model):
         verbose_name = "Оценка"
         verbose_name_plural = "Оценки"
         ordering = ['-date', '-created_at']
+        # Оценки студента (по предмету) от новых к старым; выгрузка группы за период
+        indexes = [
+            models.Index(fields=['student', 'subject', '-date'], name='grade_student_subject_idx'),
+            models.Index(fields=['student', '-date', '-created_at'], name='grade_student_date_idx'),
+            models.Index(fields=['group', 'date'], name='grade_group_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.full_name} - {self.subject.name}: {self.raw_value} ({self.points} баллов)"
@@ -225,7 +335,72 @@ class StudentGrade(models.Model):
         if not self.group_id:
             self.group = self.student.group
         self.calculate_points()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = StudentGrade.objects.filter(pk=self.pk).values(
+                    'student_id', 'subject_id', 'points'
+                ).first()
+            super().save(*args, **kwargs)
+            
+            # Проводим изменение баллов по журналу успеваемости
+            if previous and (previous['student_id'], previous['subject_id']) != (self.student_id, self.subject_id):
+                StudentPerformance.apply_points(previous['student_id'], previous['subject_id'],
+                                                -previous['points'], grades=-1)
+                previous = None
+            delta = self.points - (previous['points'] if previous else 0)
+            StudentPerformance.apply_points(self.student_id, self.subject_id, delta,
+                                            grades=0 if previous else 1)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            student_id, subject_id, points = self.student_id, self.subject_id, self.points
+            result = super().delete(*args, **kwargs)
+            StudentPerformance.apply_points(student_id, subject_id, -points, grades=-1)
+        return result
+    
+    @classmethod
+    def bulk_add(cls, grades):
+        """
+        Массовое добавление оценок по одному предмету (семинар целиком).
+        Баллы считаются заранее, оценки вставляются одним bulk_create,
+        а StudentPerformance обновляется одним проходом.
+        """
+        if not grades:
+            return []
+        
+        subject_id = grades[0].subject_id
+        deltas, counts = {}, {}
+        for grade in grades:
+            grade.calculate_points()
+            deltas[grade.student_id] = deltas.get(grade.student_id, 0) + grade.points
+            counts[grade.student_id] = counts.get(grade.student_id, 0) + 1
+        
+        with transaction.atomic():
+            created = cls.objects.bulk_create(grades, batch_size=500)
+            
+            # Заводим недостающие записи об успеваемости (существующие пропускаются)
+            StudentPerformance.objects.bulk_create([
+                StudentPerformance(student_id=student_id, subject_id=subject_id, total_points=0)
+                for student_id in deltas
+            ], ignore_conflicts=True)
+            
+            # Прибавляем баллы через F(), как и в apply_points
+            performances = list(StudentPerformance.objects.filter(
+                subject_id=subject_id, student_id__in=deltas
+            ))
+            now = timezone.now()
+            for perf in performances:
+                perf.total_points = models.F('total_points') + deltas[perf.student_id]
+                perf.last_updated = now
+            StudentPerformance.objects.bulk_update(performances, ['total_points', 'last_updated'])
+            
+            GradebookEntry.apply_many(subject_id, {
+                perf.student_id: (counts[perf.student_id], deltas[perf.student_id], perf.target_points)
+                for perf in performances
+            })
+        
+        return created
     
     def calculate_points(self):
         points_map = {
@@ -252,6 +427,16 @@ class WeekType(models.Model):
     
     def __str__(self):
         return f"{self.date.strftime('%d.%m.%Y')} - {self.get_week_type_display()}"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Сбрасываем индекс чётности недель
+        invalidate_week_types()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_week_types()
+        return result
 
 
 
@@ -276,6 +461,11 @@ class Attendance(models.Model):
         verbose_name = "Пропуск"
         verbose_name_plural = "Пропуски"
         ordering = ['-date']
+        # История пропусков студента; выгрузка группы за период
+        indexes = [
+            models.Index(fields=['student', '-date'], name='attendance_student_date_idx'),
+            models.Index(fields=['group', 'date'], name='attendance_group_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.full_name} - {self.hours}ч ({self.date})"
@@ -283,13 +473,27 @@ class Attendance(models.Model):
     def save(self, *args, **kwargs):
         if not self.group_id:
             self.group = self.student.group
-        super().save(*args, **kwargs)
-        # Обновляем профиль студента
-        profile = StudentProfile.objects.get_or_create(user=self.student)[0]
-        total = Attendance.objects.filter(student=self.student).aggregate(total=models.Sum('hours'))['total'] or 0
-        profile.total_hours = total
-        profile.remaining_hours = max(0, 20 - total)
-        profile.save()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Обновляем профиль студента
+            StudentProfile.recalculate([self.student_id])
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            student_id = self.student_id
+            result = super().delete(*args, **kwargs)
+            StudentProfile.recalculate([student_id])
+        return result
+    
+    @classmethod
+    def bulk_add(cls, attendances):
+        """Массовое добавление пропусков с одним пересчётом профилей"""
+        if not attendances:
+            return []
+        with transaction.atomic():
+            created = cls.objects.bulk_create(attendances, batch_size=500)
+            StudentProfile.recalculate([a.student_id for a in attendances])
+        return created
 
 
 class SeminarSlot(models.Model):
@@ -333,4 +537,202 @@ class SeminarSlot(models.Model):
                 return subject.id
             except Subject.DoesNotExist:
                 return None
-        return None
\ No newline at end of file
+        return None
+
+
+class GradebookEntry(models.Model):
+    """Журнал группы: ячейка студент × предмет (предрасчитанная сводка)"""
+    # Пороги, по которым старосте показываются «в зоне риска» и «готовы»
+    AT_RISK_POINTS = 15
+    READY_POINTS = 21
+    
+    EMPTY_SUMMARY = {
+        'subjects_count': 0,
+        'avg_progress': 0,
+        'at_risk': False,
+        'ready': False,
+    }
+    
+    group = models.ForeignKey('admin_panel.Group', on_delete=models.CASCADE,
+                             null=True, related_name='gradebook_entries', verbose_name="Группа")
+    student = models.ForeignKey('admin_panel.Student', on_delete=models.CASCADE,
+                               related_name='gradebook_entries', verbose_name="Студент")
+    subject = models.ForeignKey('Subject', on_delete=models.CASCADE,
+                               related_name='gradebook_entries', verbose_name="Предмет")
+    
+    # Из StudentGrade
+    grades_count = models.IntegerField(default=0, verbose_name="Количество оценок")
+    
+    # Из StudentPerformance (NULL - успеваемость по предмету ещё не заведена)
+    total_points = models.FloatField(null=True, blank=True, verbose_name="Всего баллов")
+    target_points = models.IntegerField(null=True, blank=True, verbose_name="Цель")
+    progress = models.FloatField(null=True, blank=True, verbose_name="Прогресс, %")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Ячейка журнала"
+        verbose_name_plural = "Журнал группы"
+        unique_together = ['student', 'subject']
+    
+    def __str__(self):
+        return f"{self.student_id} × {self.subject_id}: {self.total_points}"
+    
+    @staticmethod
+    def calculate_progress(total_points, target_points):
+        """Процент прогресса (та же формула, что и StudentPerformance.progress_percentage)"""
+        if total_points is None:
+            return None
+        if target_points:
+            return min(100, (total_points / target_points) * 100)
+        return 0
+    
+    @staticmethod
+    def _shift(grades, points, target_points, now):
+        """
+        Значения UPDATE, сдвигающие ячейку на grades оценок и points баллов.
+        Выражения считаются в БД от текущих значений ячейки; прогресс - по
+        той же формуле, что calculate_progress
+        """
+        total = Coalesce(models.F('total_points'), models.Value(0.0)) + points
+        if target_points:
+            progress = Least(models.Value(100.0), total / models.Value(float(target_points)) * models.Value(100.0))
+        else:
+            progress = models.Value(0.0)
+        return {
+            'grades_count': models.F('grades_count') + grades,
+            'total_points': total,
+            'target_points': target_points,
+            'progress': progress,
+            'updated_at': now,
+        }
+    
+    @classmethod
+    def apply(cls, student_id, subject_id, grades, points, target_points):
+        """
+        Сдвигает ячейку на те же дельты, что StudentPerformance.apply_points,
+        одним UPDATE через F(). Ячейки ещё нет (первая оценка по предмету) -
+        она считается один раз через refresh
+        """
+        updated = cls.objects.filter(student_id=student_id, subject_id=subject_id).update(
+            **cls._shift(grades, points, target_points, timezone.now())
+        )
+        if not updated:
+            cls.refresh(student_id, subject_id)
+    
+    @classmethod
+    def apply_many(cls, subject_id, changes):
+        """
+        apply для нескольких студентов по одному предмету (StudentGrade.bulk_add):
+        changes = {student_id: (grades, points, target_points)}, один bulk_update
+        """
+        entries = list(cls.objects.filter(subject_id=subject_id, student_id__in=changes))
+        now = timezone.now()
+        for entry in entries:
+            for field, value in cls._shift(*changes[entry.student_id], now).items():
+                setattr(entry, field, value)
+        cls.objects.bulk_update(entries, ['grades_count', 'total_points', 'target_points', 'progress', 'updated_at'])
+        missing = set(changes) - {entry.student_id for entry in entries}
+        if missing:
+            cls.rebuild(subject_id=subject_id, student_ids=list(missing))
+    
+    @classmethod
+    def refresh(cls, student_id, subject_id):
+        """Пересчитывает одну ячейку журнала по StudentGrade и StudentPerformance"""
+        grades_count = StudentGrade.objects.filter(
+            student_id=student_id, subject_id=subject_id
+        ).count()
+        performance = StudentPerformance.objects.filter(
+            student_id=student_id, subject_id=subject_id
+        ).values('total_points', 'target_points').first()
+        
+        if not grades_count and performance is None:
+            cls.objects.filter(student_id=student_id, subject_id=subject_id).delete()
+            return None
+        
+        total_points = performance['total_points'] if performance else None
+        target_points = performance['target_points'] if performance else None
+        entry, _ = cls.objects.update_or_create(
+            student_id=student_id,
+            subject_id=subject_id,
+            defaults={
+                'group_id': Subject.objects.filter(id=subject_id).values_list('group_id', flat=True).first(),
+                'grades_count': grades_count,
+                'total_points': total_points,
+                'target_points': target_points,
+                'progress': cls.calculate_progress(total_points, target_points),
+            }
+        )
+        return entry
+    
+    @classmethod
+    def rebuild(cls, group_id=None, subject_id=None, student_ids=None):
+        """
+        Пересборка журнала bulk-операциями: для всей БД, одной группы
+        или набора студентов по одному предмету
+        """
+        grades = StudentGrade.objects.all()
+        performances = StudentPerformance.objects.all()
+        subjects = Subject.objects.all()
+        entries = cls.objects.all()
+        if group_id is not None:
+            grades = grades.filter(subject__group_id=group_id)
+            performances = performances.filter(subject__group_id=group_id)
+            subjects = subjects.filter(group_id=group_id)
+            entries = entries.filter(subject__group_id=group_id)
+        if subject_id is not None:
+            grades = grades.filter(subject_id=subject_id)
+            performances = performances.filter(subject_id=subject_id)
+            subjects = subjects.filter(id=subject_id)
+            entries = entries.filter(subject_id=subject_id)
+        if student_ids is not None:
+            grades = grades.filter(student_id__in=student_ids)
+            performances = performances.filter(student_id__in=student_ids)
+            entries = entries.filter(student_id__in=student_ids)
+        
+        cells = {}
+        for row in grades.values('student_id', 'subject_id').annotate(n=models.Count('id')):
+            cells[(row['student_id'], row['subject_id'])] = {'grades_count': row['n']}
+        
+        for perf in performances.values('student_id', 'subject_id', 'total_points', 'target_points'):
+            cell = cells.setdefault((perf['student_id'], perf['subject_id']), {'grades_count': 0})
+            cell['total_points'] = perf['total_points']
+            cell['target_points'] = perf['target_points']
+            cell['progress'] = cls.calculate_progress(perf['total_points'], perf['target_points'])
+        
+        subject_groups = dict(subjects.values_list('id', 'group_id'))
+        with transaction.atomic():
+            entries.delete()
+            cls.objects.bulk_create([
+                cls(student_id=student_id, subject_id=subject_id,
+                    group_id=subject_groups.get(subject_id), **cell)
+                for (student_id, subject_id), cell in cells.items()
+            ], batch_size=500)
+        return len(cells)
+    
+    @classmethod
+    def group_summary(cls, group):
+        """
+        Сводка по студентам группы одним запросом.
+        Возвращает {student_id: {'subjects_count', 'avg_progress', 'at_risk', 'ready'}}
+        """
+        if group is None:
+            return {}
+        
+        rows = cls.objects.filter(student__group=group).values('student_id').annotate(
+            subjects_count=models.Count('id', filter=models.Q(grades_count__gt=0)),
+            performance_count=models.Count('id', filter=models.Q(total_points__isnull=False)),
+            avg_progress=models.Avg('progress'),
+            at_risk_count=models.Count('id', filter=models.Q(total_points__lt=cls.AT_RISK_POINTS)),
+            not_ready_count=models.Count('id', filter=models.Q(total_points__lt=cls.READY_POINTS)),
+        )
+        
+        summary = {}
+        for row in rows:
+            summary[row['student_id']] = {
+                'subjects_count': row['subjects_count'],
+                'avg_progress': round(row['avg_progress'], 1) if row['avg_progress'] is not None else 0,
+                'at_risk': row['at_risk_count'] > 0,
+                'ready': row['performance_count'] > 0 and row['not_ready_count'] == 0,
+            }
+        return summary
@@ -0,0 +1,89 @@
+# students/schedule_cache.py
+"""
+Кэш недельного расписания группы.
+
+Ключ - (группа, тип недели), значение - сериализованный список занятий
+этой недели (включая занятия 'both'). Бэкенд берётся из CACHES['schedule']
+(по умолчанию - память процесса, см. SCHEDULE_CACHE_BACKEND в settings).
+Кэш сбрасывается при сохранении/удалении Schedule и при копировании недели.
+Тип недели не из Schedule.WEEK_TYPES - ValueError, такие ключи в кэш не попадают.
+
+aget_week_schedule/aget_week_lessons - то же для async view (async API кэша и ORM).
+"""
+from django.core.cache import caches
+
+from students.models import Schedule
+
+SCHEDULE_CACHE_ALIAS = 'schedule'
+
+# Поля занятия, которые хранятся в кэше
+LESSON_FIELDS = (
+    'id', 'group_id', 'day', 'week_type', 'pair_number', 'start_time',
+    'end_time', 'subject', 'teacher', 'room', 'lesson_type',
+)
+
+WEEK_TYPES = ('even', 'odd')
+
+
+def _cache():
+    return caches[SCHEDULE_CACHE_ALIAS]
+
+
+def _key(group_id, week_type):
+    if week_type not in dict(Schedule.WEEK_TYPES):
+        raise ValueError(f'Неизвестный тип недели: {week_type}')
+    return f'schedule:{group_id}:{week_type}'
+
+
+def get_week_schedule(group_id, week_type):
+    """Занятия группы на неделю (список словарей, отсортирован по дню и паре)"""
+    if not group_id or not week_type:
+        return []
+
+    key = _key(group_id, week_type)
+    lessons = _cache().get(key)
+    if lessons is None:
+        lessons = list(_week_queryset(group_id, week_type))
+        _cache().set(key, lessons)
+    return lessons
+
+
+def _week_queryset(group_id, week_type):
+    return (
+        Schedule.objects.filter(group_id=group_id, week_type__in=[week_type, 'both'])
+        .order_by('day', 'pair_number')
+        .values(*LESSON_FIELDS)
+    )
+
+
+def _as_lessons(lessons, day=None):
+    return [Schedule(**lesson) for lesson in lessons if day is None or lesson['day'] == day]
+
+
+def get_week_lessons(group_id, week_type, day=None):
+    """То же, что get_week_schedule, но в виде объектов Schedule (для шаблонов)"""
+    return _as_lessons(get_week_schedule(group_id, week_type), day)
+
+
+async def aget_week_schedule(group_id, week_type):
+    """Асинхронный get_week_schedule"""
+    if not group_id or not week_type:
+        return []
+
+    key = _key(group_id, week_type)
+    lessons = await _cache().aget(key)
+    if lessons is None:
+        lessons = [lesson async for lesson in _week_queryset(group_id, week_type)]
+        await _cache().aset(key, lessons)
+    return lessons
+
+
+async def aget_week_lessons(group_id, week_type, day=None):
+    """Асинхронный get_week_lessons"""
+    return _as_lessons(await aget_week_schedule(group_id, week_type), day)
+
+
+def invalidate_group_schedule(group_id):
+    """Сбрасывает кэш расписания группы для всех типов недель"""
+    if group_id:
+        _cache().delete_many([_key(group_id, week_type) for week_type in WEEK_TYPES + ('both',)])
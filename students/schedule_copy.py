@@ -0,0 +1,143 @@
+# students/schedule_copy.py
+"""
+Копирование расписания между типами недель.
+
+Занятия сопоставляются по (день, пара). Совпавшие занятия целевой недели
+обновляются на месте, поэтому привязанные к ним слоты семинаров и
+комментарии сохраняются. Новые занятия создаются одним bulk_create,
+лишние удаляются одним запросом, предметы группы дополняются один раз.
+Режим dry_run только возвращает разницу, ничего не меняя.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from students.models import Schedule, Subject
+from students.schedule_cache import invalidate_group_schedule
+
+# Поля, которые переносятся с исходного занятия
+COPY_FIELDS = ('start_time', 'end_time', 'subject', 'teacher', 'room', 'lesson_type')
+
+COPY_MODES = ('copy', 'swap')
+
+
+def _lesson_data(lesson):
+    return {
+        'day': lesson.day,
+        'pair_number': lesson.pair_number,
+        **{field: getattr(lesson, field) for field in COPY_FIELDS},
+    }
+
+
+def _plan(source, target):
+    """Разница между неделями: что добавить, что обновить, что удалить"""
+    added, changed, removed = [], [], []
+    for key, lesson in source.items():
+        existing = target.get(key)
+        if existing is None:
+            added.append(lesson)
+            continue
+        diff = {
+            field: {'old': getattr(existing, field), 'new': getattr(lesson, field)}
+            for field in COPY_FIELDS
+            if getattr(existing, field) != getattr(lesson, field)
+        }
+        if diff:
+            changed.append((existing, lesson, diff))
+    for key, lesson in target.items():
+        if key not in source:
+            removed.append(lesson)
+    return added, changed, removed
+
+
+def _week(lessons, week_type):
+    return {
+        (lesson.day, lesson.pair_number): lesson
+        for lesson in lessons if lesson.week_type == week_type
+    }
+
+
+def copy_week(group, from_week, to_week, mode='copy', dry_run=False):
+    """
+    Копирует (mode='copy') или меняет местами (mode='swap') расписание
+    двух недель группы. Возвращает разницу по каждой изменённой неделе:
+    {to_week: {'added': [...], 'changed': [...], 'removed': [...]}, ...}
+    """
+    if mode not in COPY_MODES:
+        raise ValueError(f'Неизвестный режим копирования: {mode}')
+    week_types = dict(Schedule.WEEK_TYPES)
+    if from_week not in week_types or to_week not in week_types or from_week == to_week:
+        raise ValueError('Некорректные типы недель')
+
+    with transaction.atomic():
+        # Обе недели одним запросом, строки блокируются до конца транзакции
+        lessons = list(
+            Schedule.objects.select_for_update()
+            .filter(group=group, week_type__in=[from_week, to_week])
+        )
+        weeks = {from_week: _week(lessons, from_week), to_week: _week(lessons, to_week)}
+
+        directions = [(from_week, to_week)]
+        if mode == 'swap':
+            directions.append((to_week, from_week))
+
+        plans = {
+            target: _plan(weeks[source], weeks[target])
+            for source, target in directions
+        }
+
+        result = {
+            target: {
+                'added': [_lesson_data(lesson) for lesson in added],
+                'changed': [
+                    {'id': existing.id, 'day': existing.day,
+                     'pair_number': existing.pair_number, 'fields': diff}
+                    for existing, lesson, diff in changed
+                ],
+                'removed': [dict(_lesson_data(lesson), id=lesson.id) for lesson in removed],
+            }
+            for target, (added, changed, removed) in plans.items()
+        }
+        if dry_run:
+            return result
+
+        now = timezone.now()
+        to_delete, to_create, to_update = [], [], []
+        for target, (added, changed, removed) in plans.items():
+            to_delete.extend(lesson.id for lesson in removed)
+            to_create.extend(
+                Schedule(group=group, week_type=target, day=lesson.day,
+                         pair_number=lesson.pair_number,
+                         **{field: getattr(lesson, field) for field in COPY_FIELDS})
+                for lesson in added
+            )
+            # Обновляемые строки берём из снимка, новые значения - тоже из снимка,
+            # поэтому при обмене недель значения не перетирают друг друга
+            for existing, lesson, diff in changed:
+                update = Schedule(id=existing.id, updated_at=now,
+                                  **{field: getattr(lesson, field) for field in COPY_FIELDS})
+                to_update.append(update)
+
+        if to_delete:
+            Schedule.objects.filter(id__in=to_delete).delete()
+        if to_create:
+            Schedule.objects.bulk_create(to_create)
+        if to_update:
+            Schedule.objects.bulk_update(to_update, COPY_FIELDS + ('updated_at',))
+
+        # Предметы группы: недостающие добавляются одним запросом
+        subjects = {}
+        for lesson in to_create + to_update:
+            subjects.setdefault(lesson.subject, lesson.teacher)
+        if subjects:
+            existing_names = set(
+                Subject.objects.filter(group=group, name__in=subjects)
+                .values_list('name', flat=True)
+            )
+            Subject.objects.bulk_create([
+                Subject(name=name, group=group, teacher=teacher)
+                for name, teacher in subjects.items() if name not in existing_names
+            ], ignore_conflicts=True)
+
+        transaction.on_commit(lambda: invalidate_group_schedule(group.id))
+
+    return result
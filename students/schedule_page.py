@@ -0,0 +1,128 @@
+# students/schedule_page.py
+"""
+Сборка страницы расписания студента.
+
+Все активные комментарии группы загружаются одним запросом, расписание
+на две недели берётся из кэша расписания группы. Дальше всё раскладывается
+в памяти по дате, дню недели и занятию - в те же структуры, что ожидает
+шаблон students/schedule.html.
+"""
+from datetime import date as date_cls, timedelta
+from calendar import monthrange
+import calendar
+
+from students.models import ScheduleComment
+from students.schedule_cache import get_week_lessons
+from journal_project.schedule_utils import get_week_type
+
+
+def week_display(week_type):
+    """Название типа недели для шаблона"""
+    return 'Чётная' if week_type == 'even' else 'Нечётная'
+
+
+def _is_day_comment(comment, day_date):
+    """Комментарий на конкретную дату или на этот день недели (любой тип недели)"""
+    return comment.date == day_date or (comment.date is None and comment.day == day_date.isoweekday())
+
+
+def _is_week_comment(comment):
+    """Комментарий на всю неделю или общий (без привязки ко дню и дате)"""
+    return comment.day is None and comment.date is None
+
+
+def build_month_days(year, month, today, comments=()):
+    """Дни месяца с типом недели и отметками о комментариях"""
+    first_day, num_days = monthrange(year, month)
+
+    # Переводим номер дня (0-6 понедельник-воскресенье) в наш формат (1-7)
+    first_day = (first_day + 1) % 7
+    if first_day == 0:
+        first_day = 7
+
+    # Раскладываем комментарии по дате и по (тип недели, день недели)
+    by_date = {}
+    by_weekday = {}
+    for comment in comments:
+        if comment.date is not None:
+            by_date.setdefault(comment.date, []).append(comment)
+        elif comment.day is not None:
+            by_weekday.setdefault((comment.week_type, comment.day), []).append(comment)
+
+    days = []
+    for day in range(1, num_days + 1):
+        date = date_cls(year, month, day)
+        week_type = get_week_type(date)
+        day_comments = by_date.get(date, []) + by_weekday.get((week_type, date.isoweekday()), [])
+        days.append({
+            'day': day,
+            'date': date,
+            'week_type': week_type,
+            'is_today': date == today,
+            'has_comments': bool(day_comments),
+            'urgent_comments': any(c.is_urgent for c in day_comments),
+            'comments_count': len(day_comments),
+        })
+
+    return {
+        'first_day': first_day,
+        'days': days,
+        'month_name': calendar.month_name[month],
+        'year': year
+    }
+
+
+def build_schedule_page(group, today):
+    """Контекст страницы расписания для группы на дату today"""
+    tomorrow = today + timedelta(days=1)
+
+    current_week_type = get_week_type(today)
+    next_week_type = 'even' if current_week_type == 'odd' else 'odd'
+
+    # Все активные комментарии группы (один запрос)
+    all_comments = list(
+        ScheduleComment.objects.filter(group=group, is_active=True)
+        .select_related('created_by')
+        .order_by('-is_urgent', '-created_at')
+    )
+
+    # Расписание на текущую и следующую неделю (из кэша расписания группы)
+    current_lessons = get_week_lessons(group.id, current_week_type)
+    next_lessons = get_week_lessons(group.id, next_week_type)
+
+    comments = [c for c in all_comments if _is_day_comment(c, today) or _is_week_comment(c)]
+    today_comments = [c for c in comments if _is_day_comment(c, today)]
+    tomorrow_comments = [c for c in all_comments if _is_day_comment(c, tomorrow)]
+
+    # Комментарии к конкретным парам
+    lesson_comments = {}
+    for comment in sorted(all_comments, key=lambda c: c.created_at, reverse=True):
+        if comment.lesson_id:
+            lesson_comments.setdefault(comment.lesson_id, []).append(comment)
+
+    today_schedule = [lesson for lesson in current_lessons if lesson.day == today.isoweekday()]
+    for lesson in today_schedule:
+        lesson.lesson_comments = lesson_comments.get(lesson.id, [])
+        lesson.has_comments = bool(lesson.lesson_comments)
+
+    return {
+        'group': group,
+        'today': today,
+        'tomorrow': tomorrow,
+        'current_week_type': current_week_type,
+        'current_week_display': week_display(current_week_type),
+        'next_week_type': next_week_type,
+        'next_week_display': week_display(next_week_type),
+        'tomorrow_week_type': get_week_type(tomorrow),
+        'today_schedule': today_schedule,
+        # Как и раньше, завтрашние пары берём по типу текущей недели
+        'tomorrow_schedule': [lesson for lesson in current_lessons if lesson.day == tomorrow.isoweekday()],
+        'current_week_schedule': current_lessons,
+        'next_week_schedule': next_lessons,
+        'comments': comments,
+        'today_comments': today_comments,
+        'tomorrow_comments': tomorrow_comments,
+        'month_days': build_month_days(today.year, today.month, today, all_comments),
+        'monday': today - timedelta(days=today.weekday()),
+        'has_urgent': any(c.is_urgent for c in comments),
+    }
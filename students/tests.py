@@ -1,3 +1,314 @@
+import io
+from datetime import date, datetime, timedelta
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db.models import Sum
 from django.test import TestCase
 
-# Create your tests here.
+from admin_panel.models import Student
+from students.models import GradebookEntry, Schedule, ScheduleComment, StudentGrade, StudentPerformance, Subject
+from students.schedule_cache import aget_week_schedule
+from journal_project.schedule_utils import get_week_type
+from journal_project.testing import make_group
+
+
+class StudentScheduleQueriesTest(TestCase):
+    """Регрессия по числу запросов страницы расписания студента"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group('СПД-103')
+        cls.student = Student.objects.create(
+            login='student', password='secret', full_name='Иванов Иван', group=cls.group
+        )
+
+        today = datetime.now().date()
+        week_type = get_week_type(today)
+        lessons = []
+        for day in range(1, 7):
+            for pair in range(1, 4):
+                for lesson_week in ('even', 'odd'):
+                    lessons.append(Schedule.objects.create(
+                        group=cls.group, day=day, week_type=lesson_week, pair_number=pair,
+                        subject=f'Предмет {pair}'
+                    ))
+
+        today_lesson = next(
+            l for l in lessons if l.day == today.isoweekday() and l.week_type == week_type
+        ) if today.isoweekday() <= 6 else lessons[0]
+
+        # Комментарии всех видов: на дату, на день недели, на неделю, общие, к паре
+        for i in range(10):
+            ScheduleComment.objects.create(group=cls.group, comment=f'На дату {i}',
+                                           date=today + timedelta(days=i), is_urgent=i % 3 == 0,
+                                           created_by=cls.student)
+        for day in range(1, 8):
+            ScheduleComment.objects.create(group=cls.group, comment=f'День {day}',
+                                           week_type=week_type, day=day, created_by=cls.student)
+        ScheduleComment.objects.create(group=cls.group, comment='Неделя', week_type=week_type)
+        ScheduleComment.objects.create(group=cls.group, comment='Общий')
+        ScheduleComment.objects.create(group=cls.group, comment='К паре', lesson=today_lesson,
+                                       day=today_lesson.day, week_type=week_type)
+
+    def setUp(self):
+        session = self.client.session
+        session['student_id'] = self.student.id
+        session.save()
+        # Индекс чётности недель прогреваем заранее - он общий для процесса
+        get_week_type()
+        caches['schedule'].clear()
+
+    def test_schedule_page_query_count(self):
+        # сессия + студент с группой + комментарии + расписание двух недель
+        with self.assertNumQueries(5):
+            response = self.client.get('/students/schedule/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'students/schedule.html')
+
+        # Повторно студент с группой и расписание берутся из кэша
+        with self.assertNumQueries(2):
+            response = self.client.get('/students/schedule/')
+        self.assertEqual(len(response.context['current_week_schedule']), 18)
+
+    def test_session_student_invalidated_on_save(self):
+        self.client.get('/students/schedule/')
+        self.student.full_name = 'Петров Пётр'
+        self.student.save()
+
+        response = self.client.get('/students/schedule/')
+        self.assertEqual(response.context['student'].full_name, 'Петров Пётр')
+        self.assertEqual(response.context['student'].group, self.group)
+
+    def test_schedule_cache_invalidated_on_save(self):
+        self.client.get('/students/schedule/')
+        lesson = Schedule.objects.filter(group=self.group, week_type=get_week_type()).first()
+        lesson.subject = 'Новый предмет'
+        lesson.save()
+
+        response = self.client.get('/students/schedule/')
+        subjects = [l.subject for l in response.context['current_week_schedule']]
+        self.assertIn('Новый предмет', subjects)
+
+        lesson.delete()
+        response = self.client.get('/students/schedule/')
+        self.assertEqual(len(response.context['current_week_schedule']), 17)
+
+    def test_schedule_page_comments_bucketed(self):
+        response = self.client.get('/students/schedule/')
+        today = datetime.now().date()
+
+        self.assertIn('На дату 0', [c.comment for c in response.context['today_comments']])
+        self.assertIn('На дату 1', [c.comment for c in response.context['tomorrow_comments']])
+        self.assertTrue(response.context['has_urgent'])
+
+        month_days = {d['date']: d for d in response.context['month_days']['days']}
+        self.assertTrue(month_days[today]['has_comments'])
+        self.assertTrue(month_days[today]['urgent_comments'])
+
+
+class AsyncReadAPITest(TestCase):
+    """JSON API чтения - async view: работают под ASGI без перевода в поток"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group('СПД-103')
+        cls.student = Student.objects.create(
+            login='student', password='secret', full_name='Иванов Иван', group=cls.group
+        )
+        for day in range(1, 4):
+            for lesson_week in ('even', 'odd', 'both'):
+                Schedule.objects.create(group=cls.group, day=day, week_type=lesson_week,
+                                        pair_number=1 if lesson_week == 'both' else 2,
+                                        subject=f'Предмет {day}')
+        caches['schedule'].clear()
+
+    async def test_schedule_api(self):
+        session = await self.async_client.asession()
+        await session.aset('student_id', self.student.id)
+        await session.asave()
+
+        response = await self.async_client.get('/students/api/schedule/', {'week_type': 'even'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('X-Request-ID'))
+        self.assertEqual(len(response.json()), 6)
+
+        # Занятия 'both' входят в обе недели и идут по порядку пар
+        response = await self.async_client.get('/students/api/schedule/', {'week_type': 'odd'})
+        self.assertEqual([lesson['pair_number'] for lesson in response.json()], [1, 2] * 3)
+
+    async def test_invalid_week_type(self):
+        session = await self.async_client.asession()
+        await session.aset('student_id', self.student.id)
+        await session.asave()
+
+        invalid = ('weekly', '', 'even' * 100)
+        for week_type in invalid:
+            response = await self.async_client.get('/students/api/schedule/', {'week_type': week_type})
+            self.assertEqual(response.status_code, 400)
+        with self.assertRaises(ValueError):
+            await aget_week_schedule(self.group.id, 'weekly')
+        # В кэш попадают только известные типы недель
+        keys = [f'schedule:{self.group.id}:{week_type}' for week_type in invalid]
+        self.assertEqual(await caches['schedule'].aget_many(keys), {})
+
+    async def test_requires_session(self):
+        response = await self.async_client.get('/students/api/grades/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/elders/api/get-subjects/')
+        self.assertEqual(response.status_code, 302)
+
+
+class GradebookEntryTest(TestCase):
+    """Ячейки журнала обновляются дельтами и совпадают с полной пересборкой"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group('СПД-103')
+        cls.students = [
+            Student.objects.create(login=f'student{i}', password='secret', full_name=f'Студент {i}', group=cls.group)
+            for i in range(3)
+        ]
+        cls.math = Subject.objects.create(name='Математика', group=cls.group)
+        cls.history = Subject.objects.create(name='История', group=cls.group)
+
+    def grade(self, student, subject, grade_type='numeric_5'):
+        return StudentGrade.objects.create(student=student, subject=subject, grade_type=grade_type,
+                                           raw_value=grade_type, date=date(2026, 3, 2))
+
+    def cells(self):
+        return sorted(GradebookEntry.objects.values_list(
+            'student_id', 'subject_id', 'group_id', 'grades_count', 'total_points', 'target_points', 'progress'
+        ))
+
+    def test_incremental_matches_rebuild(self):
+        first, second, third = self.students
+        grade = self.grade(first, self.math)
+        self.grade(first, self.math, 'numeric_3')
+        moved = self.grade(second, self.math, 'plus')
+        removed = self.grade(second, self.history)
+
+        grade.grade_type = 'numeric_2'
+        grade.save()
+        moved.subject = self.history
+        moved.save()
+        removed.delete()
+        StudentGrade.bulk_add([
+            StudentGrade(student=student, group=self.group, subject=self.math, grade_type='numeric_4',
+                         raw_value='4', date=date(2026, 3, 3))
+            for student in (first, third, third)
+        ])
+        for _ in range(5):
+            self.grade(third, self.history)
+
+        incremental = self.cells()
+        GradebookEntry.rebuild()
+        self.assertEqual(incremental, self.cells())
+        # Сверка с исходными данными: 2 + 3 + 4 баллов, 25 баллов при цели 21 - 100%
+        self.assertIn((first.id, self.math.id, self.group.id, 3, 9.0, 21, 9 / 21 * 100), incremental)
+        self.assertIn((third.id, self.history.id, self.group.id, 5, 25.0, 21, 100.0), incremental)
+
+    def test_performance_edit_shifts_cell(self):
+        first, second, _ = self.students
+        for _ in range(3):
+            self.grade(first, self.math)
+        self.grade(second, self.math)
+        performance = StudentPerformance.objects.get(student=first, subject=self.math)
+        performance.target_points = 30
+        performance.total_points += 5
+        # SELECT старой записи + UPDATE записи + UPDATE ячейки - оценки не пересчитываются
+        with self.assertNumQueries(3):
+            performance.save()
+        performance.target_points = 10
+        performance.save(update_fields=['target_points'])
+
+        incremental = self.cells()
+        GradebookEntry.rebuild()
+        self.assertEqual(incremental, self.cells())
+        self.assertIn((first.id, self.math.id, self.group.id, 3, 20.0, 10, 100.0), incremental)
+
+        # Без записи успеваемости в ячейке остаются только оценки
+        performance.delete()
+        self.assertIn((first.id, self.math.id, self.group.id, 3, None, None, None), self.cells())
+
+    def test_mark_does_not_recount_history(self):
+        student = self.students[0]
+        for _ in range(10):
+            self.grade(student, self.math)
+        # Вставка + успеваемость (get_or_create, UPDATE F()) + ячейка (UPDATE F()) - без пересчёта
+        # истории; остальные 4 - SAVEPOINT/RELEASE двух transaction.atomic
+        with self.assertNumQueries(8):
+            self.grade(student, self.math)
+
+
+class StudentPerformanceTest(TestCase):
+    """apply_points: баллы дельтами F() совпадают с пересчётом; reconcile_performance находит дрейф"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = make_group('СПД-103')
+        cls.first = Student.objects.create(login='first', password='secret', full_name='Студент 1', group=cls.group)
+        cls.second = Student.objects.create(login='second', password='secret', full_name='Студент 2', group=cls.group)
+        cls.math = Subject.objects.create(name='Математика', group=cls.group)
+        cls.history = Subject.objects.create(name='История', group=cls.group)
+
+    def grade(self, student, subject, grade_type='numeric_5'):
+        return StudentGrade.objects.create(student=student, subject=subject, grade_type=grade_type,
+                                           raw_value=grade_type, date=date(2026, 3, 2))
+
+    def totals(self):
+        # Запись успеваемости без оценок остаётся с нулём баллов - в сверке не участвует
+        return {
+            (student_id, subject_id): total
+            for student_id, subject_id, total in StudentPerformance.objects.values_list(
+                'student_id', 'subject_id', 'total_points'
+            )
+            if total
+        }
+
+    def recount(self):
+        return {
+            (row['student_id'], row['subject_id']): row['total']
+            for row in StudentGrade.objects.values('student_id', 'subject_id').annotate(total=Sum('points'))
+        }
+
+    def reconcile(self, *args):
+        out = io.StringIO()
+        call_command('reconcile_performance', *args, stdout=out)
+        return out.getvalue()
+
+    def test_points_match_recount(self):
+        first = self.grade(self.first, self.math)
+        self.grade(self.first, self.math, 'numeric_3')
+        moved = self.grade(self.second, self.math, 'plus')
+        removed = self.grade(self.second, self.history, 'numeric_4')
+        self.assertEqual(self.totals(), self.recount())
+
+        first.grade_type = 'numeric_2'
+        first.save()
+        moved.subject = self.history
+        moved.save()
+        self.assertEqual(self.totals(), self.recount())
+
+        removed.delete()
+        first.delete()
+        self.assertEqual(self.totals(), self.recount())
+        self.assertEqual(self.reconcile('--dry-run').count('Расхождение'), 0)
+
+    def test_reconcile_fixes_drift(self):
+        self.grade(self.first, self.math)
+        self.grade(self.second, self.math, 'numeric_3')
+        # Дрейф: update() в обход apply_points и оценки без записи успеваемости
+        StudentPerformance.objects.filter(student=self.first).update(total_points=100)
+        StudentPerformance.objects.filter(student=self.second).delete()
+
+        output = self.reconcile('--dry-run')
+        self.assertIn('Найдено расхождений: 2', output)
+        self.assertEqual(StudentPerformance.objects.get(student=self.first).total_points, 100)
+
+        output = self.reconcile('--group', str(self.group.id))
+        self.assertIn('Исправлено расхождений: 2', output)
+        self.assertEqual(self.totals(), self.recount())
+        cell = GradebookEntry.objects.get(student=self.first, subject=self.math)
+        self.assertEqual(cell.total_points, self.recount()[(self.first.id, self.math.id)])
+        self.assertIn('Найдено расхождений: 0', self.reconcile('--dry-run'))
@@ -1,25 +1,20 @@
 # students/views.py
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from admin_panel.models import Student, Group
+from admin_panel import principals
 from students.models import StudentProfile, StudentGrade, Subject, Schedule, ScheduleComment, Attendance, StudentPerformance
 from datetime import datetime, timedelta
-from django.db.models import Sum, Q
+from django.db.models import Sum
+from journal_project.schedule_utils import get_week_type
+from students.schedule_page import build_schedule_page, build_month_days
+from students.schedule_cache import get_week_schedule, get_week_lessons, aget_week_schedule
 import json
+import logging
 
-# ==================== ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ====================
-
-def get_week_type(target_date=None):
-    """Определяет тип недели (чётная/нечётная)"""
-    if target_date is None:
-        target_date = datetime.today().date()
-    
-    # Используем ту же логику, что и в панели старосты
-    start_date = datetime(2024, 9, 2).date()
-    delta = target_date - start_date
-    weeks_passed = delta.days // 7
-    return "even" if weeks_passed % 2 == 1 else "odd"
+logger = logging.getLogger(__name__)
 
 # ==================== АВТОРИЗАЦИЯ ====================
 
@@ -68,7 +63,7 @@ def student_dashboard(request):
         return redirect('student_login')
     
     try:
-        student = Student.objects.get(id=student_id)
+        student = principals.from_request(request, 'student')
         if not student.group:
             return render(request, 'students/dashboard.html', {
                 'student': student,
@@ -110,11 +105,7 @@ def student_dashboard(request):
         # Проверяем, есть ли сегодня занятия
         today = datetime.now().date()
         week_type = get_week_type(today)
-        today_schedule = Schedule.objects.filter(
-            group=student.group,
-            day=today.isoweekday(),
-            week_type__in=[week_type, 'both']
-        ).order_by('pair_number')
+        today_schedule = get_week_lessons(student.group_id, week_type, day=today.isoweekday())
         
         context = {
             'student': student,
@@ -143,155 +134,22 @@ def student_schedule(request):
         return redirect('student_login')
     
     try:
-        student = Student.objects.get(id=student_id)
+        student = principals.from_request(request, 'student')
         if not student.group:
             return render(request, 'students/schedule.html', {
                 'error': 'У вас не назначена группа'
             })
         
-        # Получаем текущую дату
-        today = datetime.now().date()
-        
-        # Определяем тип текущей недели
-        current_week_type = get_week_type(today)
-        current_week_display = 'Чётная' if current_week_type == 'even' else 'Нечётная'
-        
-        # Определяем тип следующей недели
-        next_week_type = 'even' if current_week_type == 'odd' else 'odd'
-        next_week_display = 'Чётная' if next_week_type == 'even' else 'Нечётная'
-        
-        # ОТЛАДОЧНЫЙ КОД
-        print(f"=== Отладка комментариев для студента {student.full_name} ===")
-        print(f"Сегодня: {today}, день недели: {today.isoweekday()}, тип недели: {current_week_type}")
-        
-        # Проверим все комментарии группы
-        all_comments = ScheduleComment.objects.filter(group=student.group, is_active=True)
-        print(f"Всего комментариев в группе: {all_comments.count()}")
-        
-        for c in all_comments:
-            print(f"Комментарий ID={c.id}: '{c.comment[:30]}...'")
-            print(f"  date={c.date}, week_type={c.week_type}, day={c.day}, lesson_id={c.lesson_id}")
-            print(f"  is_urgent={c.is_urgent}, created={c.created_at}")
-        
-        # ПОЛУЧАЕМ КОММЕНТАРИИ - ИСПРАВЛЕННАЯ ЛОГИКА
-        comments = ScheduleComment.objects.filter(
-            group=student.group,
-            is_active=True
-        ).filter(
-            # 1. Комментарии на конкретную дату (сегодня)
-            Q(date=today) |
-            # 2. Комментарии на сегодняшний день недели (ЛЮБОЙ тип недели)
-            Q(day=today.isoweekday(), date__isnull=True) |
-            # 3. Комментарии на всю неделю (ЛЮБОЙ тип)
-            Q(week_type__isnull=False, day__isnull=True, date__isnull=True) |
-            # 4. Комментарии без привязки (общие)
-            Q(week_type__isnull=True, day__isnull=True, date__isnull=True)
-        ).order_by('-is_urgent', '-created_at')
-        
-        print(f"Комментариев после фильтрации: {comments.count()}")
-        for c in comments:
-            print(f"  Попал в фильтр: {c.id} - {c.comment[:30]}")
-        
-        # Также получаем комментарии для завтрашнего дня
-        tomorrow = today + timedelta(days=1)
-        
-        tomorrow_comments = ScheduleComment.objects.filter(
-            group=student.group,
-            is_active=True
-        ).filter(
-            Q(date=tomorrow) |
-            Q(day=tomorrow.isoweekday(), date__isnull=True)
-        ).order_by('-is_urgent', '-created_at')
-        
-        # Проверяем, есть ли комментарии на сегодня
-        today_comments = comments.filter(
-            Q(date=today) |
-            Q(day=today.isoweekday(), date__isnull=True)
-        )
-        
-        # Расписание на сегодня
-        today_schedule = Schedule.objects.filter(
-            group=student.group,
-            day=today.isoweekday(),
-            week_type__in=[current_week_type, 'both']
-        ).order_by('pair_number')
-        
-        # Для каждой пары в today_schedule проверяем, есть ли комментарии
-        for lesson in today_schedule:
-            # Комментарии конкретно к этой паре (если lesson_id указан)
-            lesson_comments = ScheduleComment.objects.filter(
-                group=student.group,
-                is_active=True,
-                lesson=lesson
-            ).order_by('-created_at')
-            
-            # Сохраняем комментарии как атрибут объекта
-            setattr(lesson, 'lesson_comments', lesson_comments)
-            setattr(lesson, 'has_comments', lesson_comments.exists())
-        
-        # Расписание на завтра
-        tomorrow_schedule = Schedule.objects.filter(
-            group=student.group,
-            day=tomorrow.isoweekday(),
-            week_type__in=[current_week_type, 'both']  # ИСПРАВЛЕНО: используем current_week_type вместо tomorrow_week_type
-        ).order_by('pair_number')
-        
-        # Расписание на текущую неделю
-        current_week_schedule = Schedule.objects.filter(
-            group=student.group,
-            week_type__in=[current_week_type, 'both']
-        ).order_by('day', 'pair_number')
-        
-        # Расписание на следующую неделю
-        next_week_schedule = Schedule.objects.filter(
-            group=student.group,
-            week_type__in=[next_week_type, 'both']
-        ).order_by('day', 'pair_number')
-        
-        # Данные для календаря
-        month_days = get_month_days(today.year, today.month)
-        
-        # Добавляем к каждому дню календаря комментарии
-        for day_data in month_days['days']:
-            day_date = day_data['date']
-            day_comments = ScheduleComment.objects.filter(
-                group=student.group,
-                is_active=True
-            ).filter(
-                Q(date=day_date) |
-                Q(week_type=day_data['week_type'], day=day_date.isoweekday(), date__isnull=True)
-            )
-            day_data['has_comments'] = day_comments.exists()
-            day_data['urgent_comments'] = day_comments.filter(is_urgent=True).exists()
-            day_data['comments_count'] = day_comments.count()
-        
-        context = {
-            'student': student,
-            'group': student.group,
-            'today': today,
-            'tomorrow': tomorrow,
-            'current_week_type': current_week_type,
-            'current_week_display': current_week_display,
-            'next_week_type': next_week_type,
-            'next_week_display': next_week_display,
-            'today_schedule': today_schedule,
-            'tomorrow_schedule': tomorrow_schedule,
-            'current_week_schedule': current_week_schedule,
-            'next_week_schedule': next_week_schedule,
-            'comments': comments,
-            'today_comments': today_comments,
-            'tomorrow_comments': tomorrow_comments,
-            'month_days': month_days,
-            'monday': today - timedelta(days=today.weekday()),
-            'has_urgent': comments.filter(is_urgent=True).exists(),
-        }
+        # Комментарии - одним запросом, расписание - из кэша группы
+        context = build_schedule_page(student.group, datetime.now().date())
+        context['student'] = student
         
         return render(request, 'students/schedule.html', context)
         
     except Student.DoesNotExist:
         return redirect('student_login')
     except Exception as e:
-        print(f"Ошибка в student_schedule: {e}")
+        logger.debug('Ошибка в student_schedule: %s', e)
         return redirect('student_dashboard')
 
 # ==================== ПОСЕЩАЕМОСТЬ ====================
@@ -303,7 +161,7 @@ def student_attendance(request):
         return redirect('student_login')
     
     try:
-        student = Student.objects.get(id=student_id)
+        student = principals.from_request(request, 'student')
         profile = StudentProfile.objects.get_or_create(user=student)[0]
         
         # Получаем реальные пропуски
@@ -344,7 +202,7 @@ def student_priority(request):
         return redirect('student_login')
     
     try:
-        student = Student.objects.get(id=student_id)
+        student = principals.from_request(request, 'student')
         
         # Получаем все предметы группы
         subjects = Subject.objects.filter(group=student.group)
@@ -448,40 +306,14 @@ def student_priority(request):
 
 def get_month_days(year, month):
     """Возвращает список дней месяца с их типом недели"""
-    from calendar import monthrange
-    import calendar
-    
-    first_day, num_days = monthrange(year, month)
-    
-    # Переводим номер дня (0-6 понедельник-воскресенье) в наш формат (1-7)
-    first_day = (first_day + 1) % 7
-    if first_day == 0:
-        first_day = 7
-    
-    days = []
-    for day in range(1, num_days + 1):
-        date = datetime(year, month, day).date()
-        week_type = get_week_type(date)
-        days.append({
-            'day': day,
-            'date': date,
-            'week_type': week_type,
-            'is_today': date == datetime.now().date()
-        })
-    
-    return {
-        'first_day': first_day,
-        'days': days,
-        'month_name': calendar.month_name[month],
-        'year': year
-    }
+    return build_month_days(year, month, datetime.now().date())
 
 # ==================== API (опционально) ====================
 
 @csrf_exempt
-def api_get_grades(request):
+async def api_get_grades(request):
     """API для получения оценок"""
-    student_id = request.session.get('student_id')
+    student_id = await request.session.aget('student_id')
     if not student_id:
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     
@@ -491,29 +323,33 @@ def api_get_grades(request):
         ).select_related('subject').values(
             'id', 'subject__name', 'raw_value', 'points', 'date', 'comment'
         )
-        return JsonResponse(list(grades), safe=False)
+        return JsonResponse([grade async for grade in grades], safe=False)
     except:
         return JsonResponse({'error': 'Error loading grades'}, status=500)
 
 @csrf_exempt
-def api_get_schedule(request):
+async def api_get_schedule(request):
     """API для получения расписания"""
-    student_id = request.session.get('student_id')
+    student_id = await request.session.aget('student_id')
     if not student_id:
         return JsonResponse({'error': 'Not authenticated'}, status=401)
     
     try:
-        student = Student.objects.get(id=student_id)
-        week_type = request.GET.get('week_type', get_week_type())
-        
-        schedule = Schedule.objects.filter(
-            group=student.group,
-            week_type__in=[week_type, 'both']
-        ).order_by('day', 'pair_number').values(
-            'id', 'day', 'pair_number', 'start_time', 'end_time',
-            'subject', 'teacher', 'room', 'lesson_type'
-        )
-        
-        return JsonResponse(list(schedule), safe=False)
+        student = await principals.afrom_request(request, 'student')
+        week_type = request.GET.get('week_type')
+        if week_type is None:
+            # Тип недели может загрузить ручные настройки из базы - в потоке
+            week_type = await sync_to_async(get_week_type)()
+        elif week_type not in dict(Schedule.WEEK_TYPES):
+            return JsonResponse({'error': 'Invalid week_type'}, status=400)
+        
+        fields = ('id', 'day', 'pair_number', 'start_time', 'end_time',
+                  'subject', 'teacher', 'room', 'lesson_type')
+        schedule = [
+            {field: lesson[field] for field in fields}
+            for lesson in await aget_week_schedule(student.group_id, week_type)
+        ]
+        
+        return JsonResponse(schedule, safe=False)
     except:
         return JsonResponse({'error': 'Error loading schedule'}, status=500)
\ No newline at end of file